@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⚡ EXECUÇÃO DA AUTOMAÇÃO DENTRO DA INTERFACE
+Roda o main.py no próprio processo da interface, em uma thread de trabalho,
+em vez de abrir um novo 'python main.py' a cada clique.
+
+- Reaproveita o cliente Google já autorizado e a configuração em cache
+  (interpretador, pandas/gspread e OAuth só custam na primeira execução)
+- Saída do console, eventos (src/core/eventos.py) e o resultado final chegam
+  à interface por uma fila (queue.Queue) em vez de pipes
+- A saída é desviada por execução, não por thread: a marca da execução fica numa
+  ContextVar, que os pools de threads da automação (ex.: escrita_blocos) propagam
+  para os workers - as mensagens deles também chegam ao log da interface
+
+Quando a interface ainda abre 'python main.py' (AUTOMACAO_SUBPROCESSO=1),
+iniciar_subprocesso() entrega a saída do processo filho no mesmo formato:
+uma thread por pipe lê linha a linha para uma fila limitada, então a interface
+espera bloqueada (sem consumir CPU) e o filho nunca trava com o stderr cheio.
+
+Itens da fila:
+    {'tipo': 'log', 'fluxo': 'stdout'|'stderr', 'linha': str}
+    eventos do main.py ('inicio', 'arquivo_fim', 'fim', ...)
+    {'tipo': 'execucao_encerrada', 'codigo': int, 'erro': str|None}  (sempre o último)
+"""
+
+import contextvars
+import importlib
+import io
+import os
+import queue
+import subprocess
+import sys
+import threading
+import traceback
+
+# main.py fica na raiz do projeto
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+# Itens pendentes na fila do subprocesso antes de as threads leitoras esperarem a interface
+MAX_ITENS_FILA = 1000
+# Intervalo de leitura do arquivo de eventos do processo filho (segundos)
+INTERVALO_EVENTOS = 0.2
+
+# Execução dona do contexto atual (a thread de trabalho e os workers que herdam o contexto dela)
+_execucao_atual = contextvars.ContextVar('execucao_atual', default=None)
+
+
+class SaidaPorExecucao(io.TextIOBase):
+    """
+    Desvia para a fila, linha a linha, o que a execução escreve (na thread de trabalho ou
+    em workers que herdaram o contexto dela); o resto segue para o console
+    """
+
+    def __init__(self, original, fila, fluxo, execucao=None):
+        self.original = original
+        self.fila = fila
+        self.fluxo = fluxo
+        self.execucao = execucao if execucao is not None else object()
+        # Linha incompleta de cada thread: print() chama write() duas vezes (texto e '\n')
+        self._pendentes = {}
+        self._trava = threading.Lock()
+
+    def ativar(self):
+        """Marca o contexto da thread atual como desta execução"""
+        _execucao_atual.set(self.execucao)
+
+    def _da_execucao(self):
+        return _execucao_atual.get() is self.execucao
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        if not self._da_execucao():
+            if self.original is not None:
+                return self.original.write(texto)
+            return len(texto)
+
+        thread = threading.get_ident()
+        with self._trava:
+            linhas = (self._pendentes.pop(thread, '') + texto).split('\n')
+            resto = linhas.pop()
+            if resto:
+                self._pendentes[thread] = resto
+            for linha in linhas:
+                self.fila.put({'tipo': 'log', 'fluxo': self.fluxo, 'linha': linha})
+        return len(texto)
+
+    def flush(self):
+        if self.original is not None and not self._da_execucao():
+            self.original.flush()
+
+    def descarregar(self):
+        """Entrega as últimas linhas sem quebra de linha"""
+        with self._trava:
+            for linha in self._pendentes.values():
+                self.fila.put({'tipo': 'log', 'fluxo': self.fluxo, 'linha': linha})
+            self._pendentes.clear()
+
+
+class ExecutorLocal:
+    """Executa a automação no processo da interface, uma execução por vez"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+
+    @property
+    def executando(self):
+        return self._trava.locked()
+
+    def aquecer(self):
+        """Importa main.py e as dependências pesadas em segundo plano (primeiro clique mais rápido)"""
+        def _importar():
+            try:
+                importlib.import_module('main')
+                importlib.import_module('src.core.google_sheets_base')
+                import pandas  # noqa: F401
+                import gspread  # noqa: F401
+            except Exception as e:
+                print(f"⚠️ Pré-carregamento da automação falhou: {e}")
+
+        threading.Thread(target=_importar, daemon=True).start()
+
+    def iniciar(self, sistemas, verbose=False):
+        """
+        Inicia a execução em uma thread de trabalho
+
+        Args:
+            sistemas: lista com 'genesys', 'salesforce' e/ou 'produtividade' (vazia = todos)
+            verbose: repassa --verbose ao main.py
+
+        Returns:
+            queue.Queue: fila de logs/eventos; termina com 'execucao_encerrada'
+        """
+        fila = queue.Queue()
+        argumentos = [f"--{sistema}" for sistema in sistemas]
+        if verbose:
+            argumentos.append("--verbose")
+        threading.Thread(target=self._executar, args=(fila, argumentos), daemon=True).start()
+        return fila
+
+    def _executar(self, fila, argumentos):
+        with self._trava:
+            from src.core import eventos
+            from src.core.google_sheets_base import limpar_clientes_autorizados
+
+            codigo, erro = 0, None
+            execucao = object()
+            saida = SaidaPorExecucao(sys.stdout, fila, 'stdout', execucao)
+            saida_erro = SaidaPorExecucao(sys.stderr, fila, 'stderr', execucao)
+            saida.ativar()
+            stdout_original, stderr_original = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = saida, saida_erro
+            try:
+                main = importlib.import_module('main')
+                args = main.criar_parser().parse_args(argumentos)
+                eventos.abrir_canal_fila(fila)
+                main.executar_com_perfil(args)
+            except BaseException:
+                codigo = 1
+                erro = traceback.format_exc()
+                print(erro, file=saida_erro)
+                # Cliente pode ter ficado inválido (credencial trocada, token revogado)
+                limpar_clientes_autorizados()
+            finally:
+                eventos.fechar_canal()
+                sys.stdout, sys.stderr = stdout_original, stderr_original
+                saida.descarregar()
+                saida_erro.descarregar()
+                fila.put({'tipo': 'execucao_encerrada', 'codigo': codigo, 'erro': erro})
+
+
+def _ler_pipe(pipe, fila, fluxo):
+    """Repassa cada linha do pipe para a fila (bloqueia se a fila estiver cheia)"""
+    try:
+        for linha in iter(pipe.readline, ''):
+            fila.put({'tipo': 'log', 'fluxo': fluxo, 'linha': linha.rstrip('\r\n')})
+    finally:
+        pipe.close()
+
+
+def _acompanhar_processo(processo, fila, leitores, arquivo_eventos):
+    from src.core.eventos import LeitorEventos
+
+    leitor_eventos = LeitorEventos(arquivo_eventos) if arquivo_eventos else None
+    while True:
+        try:
+            processo.wait(timeout=INTERVALO_EVENTOS)
+            encerrado = True
+        except subprocess.TimeoutExpired:
+            encerrado = False
+        if leitor_eventos is not None:
+            for evento in leitor_eventos.novos():
+                fila.put(evento)
+        if encerrado:
+            break
+
+    for leitor in leitores:
+        leitor.join()
+    fila.put({'tipo': 'execucao_encerrada', 'codigo': processo.returncode, 'erro': None})
+
+
+def iniciar_subprocesso(comando, cwd=None, env=None, arquivo_eventos=None, max_itens=MAX_ITENS_FILA):
+    """
+    Executa um comando em outro processo, lendo stdout/stderr em threads dedicadas
+
+    Args:
+        comando: lista de argumentos (ex.: [sys.executable, 'main.py', '--genesys'])
+        cwd: diretório de trabalho do processo filho
+        env: variáveis de ambiente do processo filho
+        arquivo_eventos: arquivo JSON lines gravado pelo filho (--eventos), lido em paralelo
+        max_itens: tamanho máximo da fila (controle de fluxo)
+
+    Returns:
+        queue.Queue: fila de logs/eventos; termina com 'execucao_encerrada'
+    """
+    fila = queue.Queue(maxsize=max_itens)
+    processo = subprocess.Popen(
+        comando,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',  # Substituir caracteres inválidos
+        bufsize=1,
+        env=env,
+    )
+    leitores = [
+        threading.Thread(target=_ler_pipe, args=(processo.stdout, fila, 'stdout'), daemon=True),
+        threading.Thread(target=_ler_pipe, args=(processo.stderr, fila, 'stderr'), daemon=True),
+    ]
+    for leitor in leitores:
+        leitor.start()
+    threading.Thread(
+        target=_acompanhar_processo, args=(processo, fila, leitores, arquivo_eventos), daemon=True
+    ).start()
+    return fila
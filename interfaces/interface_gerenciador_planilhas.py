@@ -41,7 +41,7 @@
 sys.path.append(project_root)
 
 # Importar gerenciador
-from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+from scripts.gerenciador_planilhas import obter_gerenciador
 
 class InterfaceGerenciadorVisual:
     """Interface visual para o gerenciador de planilhas"""
@@ -72,7 +72,7 @@ def __init__(self):
         }
         
         # Inicializar gerenciador
-        self.gp = GerenciadorPlanilhas()
+        self.gp = obter_gerenciador()
         
         # Variáveis de estado
         self.planilha_selecionada = None
@@ -910,8 +910,8 @@ def criar_aba_backups(self):
     def carregar_dados(self):
         """Carrega dados das planilhas"""
         try:
-            # Recarregar gerenciador
-            self.gp = GerenciadorPlanilhas()
+            # Gerenciador compartilhado: relê o JSON só se ele mudou
+            self.gp = obter_gerenciador()
             
             # Obter dados
             self.dados_planilhas = self.gp.config.get('planilhas', {})
@@ -1334,6 +1334,8 @@ def restaurar_backup(self, event):
             
             import shutil
             shutil.copy2(caminho_backup, self.gp.caminho_config)
+            # copy2 preserva o mtime do backup: forçar releitura
+            self.gp.recarregar()
             
             messagebox.showinfo("Backup Restaurado", "✅ Configuração restaurada com sucesso!")
             self.carregar_dados()
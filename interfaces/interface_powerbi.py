@@ -38,17 +38,20 @@
 root_dir = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.insert(0, root_dir)
 
-# Importar renomeador e processadores Power BI
+# Importar renomeador (os processadores Power BI, com pandas/gspread, são
+# importados só ao executar a automação para a janela abrir rápido)
 from renomeador_inteligente import RenomeadorInteligente
-from src.processadores.powerbi.filas.filas_primeiro_semestre import ProcessadorFilasPrimeiroSemestre
-from src.processadores.powerbi.filas.filas_segundo_semestre import ProcessadorFilasSegundoSemestre
-from src.processadores.powerbi.autoservico.autoservico_primeiro_semestre import ProcessadorAutoservicoPrimeiroSemestre
-from src.processadores.powerbi.autoservico.autoservico_segundo_semestre import ProcessadorAutoservicoSegundoSemestre
-from src.processadores.powerbi.hibernação.hibernacao_primeiro_semestre import ProcessadorHibernacaoPrimeiroSemestre
-from src.processadores.powerbi.hibernação.hibernacao_segundo_semestre import ProcessadorHibernacaoSegundoSemestre
+from src.core.historico_execucoes import HistoricoExecucoes, formatar_ultima_execucao
+from src.core.perfilador import ativar_perfilador, finalizar_perfilador, modo_perfil_ambiente, etapa
 
 # Importar gerenciador de planilhas centralizado
-from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+from scripts.gerenciador_planilhas import obter_gerenciador
+from interfaces.painel_log import PainelLog
+from src.core.classificador_arquivos import tipo_do_arquivo, tipo_pelo_cabecalho
+from src.core.indice_dados import obter_indice
+
+# Origem gravada no histórico de execuções
+ORIGEM_HISTORICO = 'powerbi'
 
 # Simple tooltip helper (lightweight and safe)
 class ToolTip:
@@ -114,20 +117,22 @@ def __init__(self):
             'total_processados': 0,
             'taxa_sucesso': 0.0,
             'tempo_medio': 0,
+            'tempo_p95': 0,
+            'linhas_por_segundo': 0.0,
             'ultima_execucao': 'Nunca',
-            'arquivos_processados': 0,
-            'arquivos_sucesso': 0,
-            'arquivos_erro': 0
+            'execucoes': 0,
+            'execucoes_falha': 0
         }
         
         # Variáveis para labels KPI (para atualização dinâmica)
         self.kpi_labels = {}
         
-        # Arquivo para persistência dos KPIs - agora na pasta json/
-        self.arquivo_kpis = os.path.join('json', 'kpis_historico.json')
+        # Histórico de execuções em SQLite (json/historico_execucoes.db)
+        self.historico = HistoricoExecucoes()
         
         self.janela_principal = None
         self.texto_log = None
+        self.painel_log = None
         self.botao_executar = None
         self.botao_renomear = None
         self.progresso = None
@@ -450,9 +455,9 @@ def criar_kpis_dashboard(self):
             },
             {
                 'key': 'tempo_medio',
-                'titulo': 'Tempo Médio',
+                'titulo': 'Tempo (p50)',
                 'valor_inicial': '0s',
-                'subtitulo': 'por arquivo',
+                'subtitulo': 'por execução',
                 'emoji': '⚡',
                 'cor': self.CORES['azul_info']
             },
@@ -531,12 +536,7 @@ def criar_kpis_dashboard(self):
     def atualizar_kpis(self):
         """Atualiza os KPIs com dados reais"""
         try:
-            # Calcular taxa de sucesso
-            if self.kpis_data['arquivos_processados'] > 0:
-                taxa = (self.kpis_data['arquivos_sucesso'] / self.kpis_data['arquivos_processados']) * 100
-                self.kpis_data['taxa_sucesso'] = taxa
-            else:
-                taxa = 0
+            taxa = self.kpis_data['taxa_sucesso']
             
             # Atualizar labels
             if 'total_processados' in self.kpi_labels:
@@ -550,12 +550,12 @@ def atualizar_kpis(self):
                 )
             
             if 'tempo_medio' in self.kpi_labels:
-                tempo = self.kpis_data['tempo_medio']
-                if tempo > 60:
-                    texto_tempo = f"{tempo//60}m{tempo%60}s"
-                else:
-                    texto_tempo = f"{tempo}s"
-                self.kpi_labels['tempo_medio'].configure(text=texto_tempo)
+                self.kpi_labels['tempo_medio'].configure(text=self.formatar_tempo(self.kpis_data['tempo_medio']))
+                if 'tempo_medio_sub' in self.kpi_labels:
+                    self.kpi_labels['tempo_medio_sub'].configure(
+                        text=f"p95 {self.formatar_tempo(self.kpis_data['tempo_p95'])} · "
+                             f"{self.kpis_data['linhas_por_segundo']:.0f} linhas/s"
+                    )
             
             if 'ultima_execucao' in self.kpi_labels:
                 self.kpi_labels['ultima_execucao'].configure(
@@ -568,69 +568,43 @@ def atualizar_kpis(self):
         except Exception as e:
             print(f"Erro ao atualizar KPIs: {e}")
     
+    def formatar_tempo(self, segundos):
+        """Formata segundos como 45s ou 2m05s"""
+        segundos = int(round(segundos or 0))
+        if segundos > 60:
+            return f"{segundos // 60}m{segundos % 60:02d}s"
+        return f"{segundos}s"
+    
     def carregar_kpis(self):
-        """Carrega KPIs salvos do arquivo JSON"""
+        """Calcula os KPIs a partir do histórico de execuções (SQLite) desta interface"""
         try:
-            if os.path.exists(self.arquivo_kpis):
-                with open(self.arquivo_kpis, 'r', encoding='utf-8') as f:
-                    dados_salvos = json.load(f)
-                    self.kpis_data.update(dados_salvos)
-                print(f"✅ KPIs carregados: {self.kpis_data}")
-            else:
-                print("⚠️ Arquivo de KPIs não encontrado, usando valores padrão")
+            estatisticas = self.historico.estatisticas(origem=ORIGEM_HISTORICO)
+            self.kpis_data.update({
+                'total_processados': estatisticas['linhas'],
+                'taxa_sucesso': 100.0 - estatisticas['taxa_falha'] if estatisticas['execucoes'] else 0.0,
+                'tempo_medio': estatisticas['duracao_p50'] or 0,
+                'tempo_p95': estatisticas['duracao_p95'] or 0,
+                'linhas_por_segundo': estatisticas['linhas_por_segundo'],
+                'ultima_execucao': formatar_ultima_execucao(estatisticas['ultima_execucao']),
+                'execucoes': estatisticas['execucoes'],
+                'execucoes_falha': estatisticas['falhas']
+            })
+            print(f"✅ KPIs carregados do histórico: {estatisticas['execucoes']} execuções")
         except Exception as e:
             print(f"❌ Erro ao carregar KPIs: {e}")
     
-    def salvar_kpis(self):
-        """Salva KPIs no arquivo JSON"""
-        try:
-            # Garantir que o diretório config existe
-            os.makedirs('config', exist_ok=True)
-            
-            with open(self.arquivo_kpis, 'w', encoding='utf-8') as f:
-                json.dump(self.kpis_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ KPIs salvos: {self.kpis_data}")
-        except Exception as e:
-            print(f"❌ Erro ao salvar KPIs: {e}")
-    
-    def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segundos=0):
-        """Registra uma execução e atualiza os KPIs"""
+    def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segundos=0, etapas=()):
+        """Registra uma execução no histórico e atualiza os KPIs"""
         try:
-            from datetime import datetime
-            
-            # Atualizar contadores
-            self.kpis_data['arquivos_processados'] += 1
-            
-            if sucesso:
-                self.kpis_data['arquivos_sucesso'] += 1
-            else:
-                self.kpis_data['arquivos_erro'] += 1
-            
-            # Atualizar total de registros
-            self.kpis_data['total_processados'] += registros_processados
-            
-            # Atualizar tempo médio (média ponderada simples)
-            if tempo_segundos > 0:
-                tempo_atual = self.kpis_data['tempo_medio']
-                total_exec = self.kpis_data['arquivos_processados']
-                
-                # Média incremental: novo_tempo = (tempo_atual * (n-1) + tempo_novo) / n
-                if total_exec > 1:
-                    novo_tempo = ((tempo_atual * (total_exec - 1)) + tempo_segundos) / total_exec
-                else:
-                    novo_tempo = tempo_segundos
-                
-                self.kpis_data['tempo_medio'] = int(novo_tempo)
-            
-            # Atualizar última execução
-            agora = datetime.now()
-            self.kpis_data['ultima_execucao'] = agora.strftime("Hoje %H:%M")
-            
-            # Salvar dados
-            self.salvar_kpis()
+            self.historico.registrar_execucao(
+                origem=ORIGEM_HISTORICO,
+                sucesso=sucesso,
+                linhas=registros_processados,
+                duracao=tempo_segundos or None,
+                etapas=etapas
+            )
             
-            # Atualizar interface
+            self.carregar_kpis()
             self.atualizar_kpis()
             
             print(f"✅ Execução registrada: Sucesso={sucesso}, Registros={registros_processados}, Tempo={tempo_segundos}s")
@@ -638,97 +612,6 @@ def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segund
         except Exception as e:
             print(f"❌ Erro ao registrar execução: {e}")
     
-    def atualizar_kpis_com_resultados(self, resultados, tempo_total):
-        """Atualiza KPIs baseado nos resultados reais dos processadores"""
-        try:
-            total_linhas = sum(r.get('linhas_processadas', 0) for r in resultados)
-            
-            # Atualizar taxa de sucesso
-            sucesso_count = len([r for r in resultados if r.get('sucesso')])
-            total_count = len(resultados)
-            if total_count > 0:
-                taxa = (sucesso_count / total_count) * 100
-                self.kpis_data['taxa_sucesso'] = round(taxa, 1)
-            
-            # Atualizar tempo médio
-            if tempo_total > 0:
-                tempo_atual = self.kpis_data['tempo_medio']
-                total_exec = self.kpis_data['arquivos_processados'] + 1
-                
-                if total_exec > 1:
-                    novo_tempo = ((tempo_atual * (total_exec - 1)) + tempo_total) / total_exec
-                else:
-                    novo_tempo = tempo_total
-                
-                self.kpis_data['tempo_medio'] = int(novo_tempo)
-            
-            # Salvar e atualizar interface
-            self.salvar_kpis()
-            self.atualizar_kpis()
-            
-        except Exception as e:
-            print(f"❌ Erro ao atualizar KPIs: {e}")
-    
-    def extrair_total_registros(self, output):
-        """Extrai o total de registros processados do output"""
-        try:
-            if not output:
-                return 50  # Valor padrão estimado
-            
-            # Buscar padrões comuns no output
-            import re
-            
-            # Padrões: "processados: 123", "Total: 123", "123 registros"
-            padroes = [
-                r'processados?:\s*(\d+)',
-                r'Total.*?:\s*(\d+)',
-                r'(\d+)\s+registros?',
-                r'linhas?\s+processadas?:\s*(\d+)'
-            ]
-            
-            for padrao in padroes:
-                match = re.search(padrao, output, re.IGNORECASE)
-                if match:
-                    return int(match.group(1))
-            
-            # Se não encontrar, retornar valor padrão
-            return 50
-            
-        except:
-            return 50
-    
-    def extrair_tempo_execucao(self, output):
-        """Extrai o tempo de execução do output"""
-        try:
-            if not output:
-                return 15  # Valor padrão estimado (15 segundos)
-            
-            import re
-            
-            # Padrões: "Tempo: 45s", "Duração: 1m30s", "45.5 segundos"
-            padroes = [
-                r'tempo.*?:\s*(\d+)s',
-                r'duração.*?:\s*(\d+)s',
-                r'(\d+)\s+segundos?',
-                r'tempo.*?:\s*(\d+)m\s*(\d+)s'  # Minutos e segundos
-            ]
-            
-            for padrao in padroes:
-                match = re.search(padrao, output, re.IGNORECASE)
-                if match:
-                    if len(match.groups()) == 2:  # Formato minutos + segundos
-                        minutos = int(match.group(1))
-                        segundos = int(match.group(2))
-                        return (minutos * 60) + segundos
-                    else:
-                        return int(match.group(1))
-            
-            # Se não encontrar, retornar valor padrão
-            return 15
-            
-        except:
-            return 15
-    
     def criar_controles(self):
         """Cria área de controles - PROFISSIONAL (Verde + Preto + Branco)"""
         controles_frame = tk.Frame(self.container_principal, bg=self.CORES['preto_suave'])
@@ -1286,6 +1169,10 @@ def criar_area_logs(self):
         self.texto_log.insert('end', "🔧 Sistema iniciando...\n")
         self.texto_log.see('end')
         
+        # Mensagens entram numa fila e são gravadas em lote a cada 50 ms (widget limitado a 5000 linhas)
+        self.painel_log = PainelLog(self.janela_principal, self.texto_log)
+        self.painel_log.iniciar()
+        
         # Configurar tags para cores melhoradas e VIBRANTES
         self.texto_log.tag_configure('sucesso', foreground='#4EC9B0', font=('Cascadia Code', 9, 'bold'))
         self.texto_log.tag_configure('erro', foreground='#F48771', font=('Cascadia Code', 9, 'bold'))
@@ -1390,23 +1277,9 @@ def log_mensagem(self, mensagem, tag=None):
             # Debug: imprimir no console também
             print(f"LOG: {mensagem_completa.strip()}")
             
-            # Garantir que o widget existe
-            if hasattr(self, 'texto_log') and self.texto_log:
-                # Usar after() para garantir thread-safety
-                def _inserir_log():
-                    try:
-                        self.texto_log.configure(state='normal')
-                        self.texto_log.insert('end', mensagem_completa, tag)
-                        self.texto_log.see('end')  # Auto-scroll para o final
-                    except Exception as e:
-                        print(f"Erro ao inserir log: {e}")
-                
-                # Se chamado de thread diferente, usar after()
-                try:
-                    self.janela_principal.after(0, _inserir_log)
-                except:
-                    # Fallback: tentar inserção direta
-                    _inserir_log()
+            # Thread-safe: a fila é descarregada na thread do Tkinter pelo PainelLog
+            if self.painel_log is not None:
+                self.painel_log.adicionar(mensagem_completa, tag)
             else:
                 print("Widget texto_log não encontrado!")
         except Exception as e:
@@ -1423,17 +1296,17 @@ def verificar_arquivos(self):
             messagebox.showerror("Erro", "Pasta 'data' não encontrada!\nCrie a pasta e adicione os arquivos CSV.")
             return
         
-        arquivos_csv = [f for f in os.listdir(data_dir) if f.lower().endswith('.csv')]
+        # Uma leitura da pasta (nome, tamanho e mtime de todos os CSVs)
+        arquivos_csv = obter_indice(data_dir, atualizar=True).arquivos()
         
         if not arquivos_csv:
             self.log_mensagem("⚠️ Nenhum arquivo CSV encontrado na pasta data/", 'aviso')
             messagebox.showwarning("Aviso", "Nenhum arquivo CSV encontrado na pasta data/")
         else:
             self.log_mensagem(f"📁 Encontrados {len(arquivos_csv)} arquivos CSV:", 'sucesso')
-            for arquivo in sorted(arquivos_csv):
-                tamanho = os.path.getsize(os.path.join(data_dir, arquivo))
-                tamanho_mb = tamanho / (1024 * 1024)
-                self.log_mensagem(f"   📄 {arquivo} ({tamanho_mb:.2f} MB)", 'info')
+            for arquivo in sorted(arquivos_csv, key=lambda e: e['nome']):
+                tamanho_mb = arquivo['tamanho'] / (1024 * 1024)
+                self.log_mensagem(f"   📄 {arquivo['nome']} ({tamanho_mb:.2f} MB)", 'info')
     
     def buscar_arquivo_csv(self, nomes_possiveis, pasta='data'):
         """
@@ -1460,42 +1333,38 @@ def buscar_arquivo_csv(self, nomes_possiveis, pasta='data'):
             os.makedirs(pasta_busca, exist_ok=True)
             self.log_mensagem(f"📁 Pasta criada: {pasta_busca}", 'info')
         
+        # Todas as buscas abaixo usam uma única leitura da pasta
+        indice = obter_indice(pasta_busca, atualizar=True)
+        
         # 1. Tentar nomes exatos
         for nome in nomes_possiveis:
-            caminho = os.path.join(pasta_busca, nome)
-            if os.path.exists(caminho):
-                self.log_mensagem(f"✅ Arquivo encontrado: {nome}", 'sucesso')
-                return caminho
+            entrada = indice.obter(nome)
+            if entrada:
+                self.log_mensagem(f"✅ Arquivo encontrado: {entrada['nome']}", 'sucesso')
+                return entrada['caminho']
+        
+        # Nomes genéricos não dizem o tipo: com assinaturas configuradas, o cabeçalho
+        # (primeira linha) descarta CSVs de outra base antes de um envio pela aba errada
+        tipo_esperado = next((tipo for tipo in (tipo_do_arquivo(nome, 'powerbi') for nome in nomes_possiveis) if tipo), None)
+        def outra_base(entrada):
+            tipo = tipo_pelo_cabecalho(entrada['caminho'])
+            if tipo and tipo != tipo_esperado:
+                self.log_mensagem(f"⏭️ {entrada['nome']} ignorado: cabeçalho de {tipo}", 'aviso')
+                return True
+            return False
         
         # 2. Procurar por padrão data (número).csv
         pattern = re.compile(r'^data\s*\(\s*\d+\s*\)\.csv$', re.IGNORECASE)
-        
-        try:
-            arquivos = os.listdir(pasta_busca)
-            for arquivo in arquivos:
-                if pattern.match(arquivo):
-                    caminho = os.path.join(pasta_busca, arquivo)
-                    self.log_mensagem(f"✅ Arquivo encontrado (padrão data): {arquivo}", 'sucesso')
-                    return caminho
-        except Exception as e:
-            self.log_mensagem(f"⚠️ Erro ao listar arquivos: {e}", 'aviso')
+        for entrada in indice.arquivos():
+            if pattern.match(entrada['nome']) and not outra_base(entrada):
+                self.log_mensagem(f"✅ Arquivo encontrado (padrão data): {entrada['nome']}", 'sucesso')
+                return entrada['caminho']
         
         # 3. Pegar o CSV mais recente na pasta
-        try:
-            arquivos_csv = [f for f in os.listdir(pasta_busca) if f.lower().endswith('.csv')]
-            
-            if arquivos_csv:
-                # Ordenar por data de modificação (mais recente primeiro)
-                arquivos_csv.sort(
-                    key=lambda x: os.path.getmtime(os.path.join(pasta_busca, x)),
-                    reverse=True
-                )
-                arquivo_mais_recente = arquivos_csv[0]
-                caminho = os.path.join(pasta_busca, arquivo_mais_recente)
-                self.log_mensagem(f"✅ Usando arquivo mais recente: {arquivo_mais_recente}", 'info')
-                return caminho
-        except Exception as e:
-            self.log_mensagem(f"⚠️ Erro ao buscar CSV mais recente: {e}", 'aviso')
+        entrada = indice.mais_recente()
+        if entrada and not outra_base(entrada):
+            self.log_mensagem(f"✅ Usando arquivo mais recente: {entrada['nome']}", 'info')
+            return entrada['caminho']
         
         # Não encontrou
         self.log_mensagem(f"❌ Nenhum arquivo CSV encontrado em {pasta_busca}", 'erro')
@@ -1530,7 +1399,7 @@ def abrir_planilha(self, tipo):
         """Abre planilha oficial no navegador"""
         try:
             # Obter URLs via configuração centralizada
-            gerenciador = GerenciadorPlanilhas()
+            gerenciador = obter_gerenciador()
             
             if tipo == 'primeiro':
                 planilha_id = gerenciador.obter_id('power_bi_primeiro_semestre')
@@ -1587,9 +1456,7 @@ def abrir_planilha(self, tipo):
     
     def limpar_logs(self):
         """Limpa a área de logs"""
-        self.texto_log.configure(state='normal')
-        self.texto_log.delete(1.0, 'end')
-        self.texto_log.configure(state='disabled')
+        self.painel_log.limpar()
         self.log_mensagem("🧹 Logs limpos", 'info')
         self.log_mensagem("💚 Sistema pronto para nova operação", 'sucesso')
     
@@ -1787,6 +1654,12 @@ def _executar_automacao_thread(self):
             
             self.log_mensagem("🚀 Iniciando automação Power BI...", 'sucesso')
             
+            # Perfil opcional por etapa (AUTOMACAO_PERFIL=cpu|mem|rss|completo)
+            modo_perfil = modo_perfil_ambiente()
+            if modo_perfil:
+                perfilador = ativar_perfilador(modo_perfil)
+                self.log_mensagem(f"🔬 Perfil ({modo_perfil}) ativado: {perfilador.pasta_execucao}", 'info')
+            
             # Determinar quais semestres processar
             processar_primeiro = self.var_primeiro_semestre.get()
             processar_segundo = self.var_segundo_semestre.get()
@@ -1800,6 +1673,13 @@ def _executar_automacao_thread(self):
                 self.log_mensagem("⚠️ Nenhum semestre/tipo selecionado!", 'erro')
                 raise Exception("Selecione pelo menos um semestre/tipo para processar")
             
+            from src.processadores.powerbi.filas.filas_primeiro_semestre import ProcessadorFilasPrimeiroSemestre
+            from src.processadores.powerbi.filas.filas_segundo_semestre import ProcessadorFilasSegundoSemestre
+            from src.processadores.powerbi.autoservico.autoservico_primeiro_semestre import ProcessadorAutoservicoPrimeiroSemestre
+            from src.processadores.powerbi.autoservico.autoservico_segundo_semestre import ProcessadorAutoservicoSegundoSemestre
+            from src.processadores.powerbi.hibernação.hibernacao_primeiro_semestre import ProcessadorHibernacaoPrimeiroSemestre
+            from src.processadores.powerbi.hibernação.hibernacao_segundo_semestre import ProcessadorHibernacaoSegundoSemestre
+            
             # Variável para arquivo de Filas (só será buscado se necessário)
             arquivo_csv = None
             
@@ -1861,7 +1741,8 @@ def _executar_automacao_thread(self):
                     processador = ProcessadorFilasPrimeiroSemestre(arquivo_credenciais)
                     self.log_mensagem("✅ Processador PRIMEIRO SEMESTRE inicializado", 'sucesso')
                     
-                    resultado = processador.processar_e_enviar(arquivo_csv)
+                    with etapa(os.path.basename(arquivo_csv)):
+                        resultado = processador.processar_e_enviar(arquivo_csv)
                     
                     if resultado.get('sucesso'):
                         self.log_mensagem(f"✅ PRIMEIRO SEMESTRE processado com sucesso!", 'sucesso')
@@ -1885,7 +1766,8 @@ def _executar_automacao_thread(self):
                     processador = ProcessadorFilasSegundoSemestre(arquivo_credenciais)
                     self.log_mensagem("✅ Processador SEGUNDO SEMESTRE inicializado", 'sucesso')
                     
-                    resultado = processador.processar_e_enviar(arquivo_csv)
+                    with etapa(os.path.basename(arquivo_csv)):
+                        resultado = processador.processar_e_enviar(arquivo_csv)
                     
                     if resultado.get('sucesso'):
                         self.log_mensagem(f"✅ SEGUNDO SEMESTRE processado com sucesso!", 'sucesso')
@@ -1923,7 +1805,8 @@ def _executar_automacao_thread(self):
                         processador = ProcessadorAutoservicoPrimeiroSemestre(arquivo_credenciais)
                         self.log_mensagem("✅ Processador AUTOSERVIÇO 1º SEM inicializado", 'sucesso')
                         
-                        resultado = processador.processar_e_enviar(arquivo_auto)
+                        with etapa(os.path.basename(arquivo_auto)):
+                            resultado = processador.processar_e_enviar(arquivo_auto)
                         
                         if resultado.get('sucesso'):
                             self.log_mensagem(f"✅ AUTOSERVIÇO 1º SEM processado com sucesso!", 'sucesso')
@@ -1961,7 +1844,8 @@ def _executar_automacao_thread(self):
                         processador = ProcessadorAutoservicoSegundoSemestre(arquivo_credenciais)
                         self.log_mensagem("✅ Processador AUTOSERVIÇO 2º SEM inicializado", 'sucesso')
                         
-                        resultado = processador.processar_e_enviar(arquivo_auto)
+                        with etapa(os.path.basename(arquivo_auto)):
+                            resultado = processador.processar_e_enviar(arquivo_auto)
                         
                         if resultado.get('sucesso'):
                             self.log_mensagem(f"✅ AUTOSERVIÇO 2º SEM processado com sucesso!", 'sucesso')
@@ -2002,7 +1886,8 @@ def _executar_automacao_thread(self):
                         processador = ProcessadorHibernacaoPrimeiroSemestre(arquivo_credenciais)
                         self.log_mensagem("✅ Processador HIBERNAÇÃO 1º SEM inicializado", 'sucesso')
                         
-                        resultado = processador.processar_e_enviar(arquivo_hibernacao)
+                        with etapa(os.path.basename(arquivo_hibernacao)):
+                            resultado = processador.processar_e_enviar(arquivo_hibernacao)
                         
                         if resultado.get('sucesso'):
                             self.log_mensagem(f"✅ HIBERNAÇÃO 1º SEM processado com sucesso!", 'sucesso')
@@ -2043,7 +1928,8 @@ def _executar_automacao_thread(self):
                         processador = ProcessadorHibernacaoSegundoSemestre(arquivo_credenciais)
                         self.log_mensagem("✅ Processador HIBERNAÇÃO 2º SEM inicializado", 'sucesso')
                         
-                        resultado = processador.processar_e_enviar(arquivo_hibernacao)
+                        with etapa(os.path.basename(arquivo_hibernacao)):
+                            resultado = processador.processar_e_enviar(arquivo_hibernacao)
                         
                         if resultado.get('sucesso'):
                             self.log_mensagem(f"✅ HIBERNAÇÃO 2º SEM processado com sucesso!", 'sucesso')
@@ -2067,16 +1953,18 @@ def _executar_automacao_thread(self):
             self.log_mensagem(f"✅ Semestres processados: {len(resultados)}", 'sucesso')
             self.log_mensagem(f"⏱️ Tempo total: {tempo_total:.1f}s", 'info')
             
-            # Atualizar KPIs
-            if resultados:
-                self.atualizar_kpis_com_resultados(resultados, tempo_total)
-            
             self.log_mensagem("🎉 Automação concluída com sucesso!", 'sucesso')
             self.status_label.configure(text="✅ Automação concluída com sucesso!", fg=self.CORES['amarelo'])
             
-            # Registrar execução bem-sucedida
+            # Registrar execução bem-sucedida (uma etapa por aba enviada)
             total_registros = sum(r.get('linhas_processadas', 0) for r in resultados)
-            self.registrar_execucao(sucesso=True, registros_processados=total_registros, tempo_segundos=tempo_total)
+            etapas = [
+                {'base': r.get('aba') or r.get('arquivo', ''), 'sistema': r.get('planilha'),
+                 'arquivo': r.get('arquivo'), 'sucesso': True, 'linhas': r.get('linhas_processadas', 0)}
+                for r in resultados
+            ]
+            self.registrar_execucao(sucesso=True, registros_processados=total_registros,
+                                    tempo_segundos=tempo_total, etapas=etapas)
             
             messagebox.showinfo("Sucesso", "Automação concluída com sucesso! ✅")
                 
@@ -2099,6 +1987,10 @@ def _executar_automacao_thread(self):
             messagebox.showerror("Erro", f"Erro na execução:\n{error_msg}\n\nVerifique o log para mais detalhes.")
             
         finally:
+            pasta_perfil = finalizar_perfilador()
+            if pasta_perfil:
+                self.log_mensagem(f"🔬 Perfil salvo em: {pasta_perfil}", 'info')
+            
             # Restaurar interface
             self.executando = False
             self.botao_executar.configure(text="🚀 EXECUTAR AUTOMAÇÃO COMPLETA", state='normal')
@@ -29,7 +29,7 @@
 import threading
 import json
 from datetime import datetime
-import subprocess 
+import tempfile
 from tkinter import messagebox as mb
 from tkinter import ttk
 
@@ -40,6 +40,13 @@
 
 # Importar renomeador
 from renomeador_inteligente import RenomeadorInteligente
+from interfaces.execucao_local import ExecutorLocal, iniciar_subprocesso
+from interfaces.painel_log import PainelLog
+from src.core.indice_dados import obter_indice
+from src.core.historico_execucoes import HistoricoExecucoes, formatar_ultima_execucao
+
+# Origem gravada no histórico de execuções (o main.py grava a execução completa)
+ORIGEM_HISTORICO = 'pulso_boletim'
 
 # Simple tooltip helper (lightweight and safe)
 class ToolTip:
@@ -104,20 +111,22 @@ def __init__(self):
             'total_processados': 0,
             'taxa_sucesso': 0.0,
             'tempo_medio': 0,
+            'tempo_p95': 0,
+            'linhas_por_segundo': 0.0,
             'ultima_execucao': 'Nunca',
-            'arquivos_processados': 0,
-            'arquivos_sucesso': 0,
-            'arquivos_erro': 0
+            'execucoes': 0,
+            'execucoes_falha': 0
         }
         
         # Variáveis para labels KPI (para atualização dinâmica)
         self.kpi_labels = {}
         
-        # Arquivo para persistência dos KPIs - agora na pasta json/
-        self.arquivo_kpis = os.path.join('json', 'kpis_historico.json')
+        # Histórico de execuções em SQLite (json/historico_execucoes.db)
+        self.historico = HistoricoExecucoes()
         
         self.janela_principal = None
         self.texto_log = None
+        self.painel_log = None
         self.botao_executar = None
         self.botao_renomear = None
         self.progresso = None
@@ -125,6 +134,12 @@ def __init__(self):
         self.executando = False
         self.renomeador = RenomeadorInteligente()
         
+        # Automação roda no próprio processo; AUTOMACAO_SUBPROCESSO=1 volta a usar 'python main.py'
+        self.execucao_em_processo = os.environ.get('AUTOMACAO_SUBPROCESSO', '').strip() != '1'
+        self.executor_local = ExecutorLocal()
+        if self.execucao_em_processo:
+            self.executor_local.aquecer()
+        
         # Carregar KPIs salvos
         self.carregar_kpis()
         
@@ -423,9 +438,9 @@ def criar_kpis_dashboard(self):
             },
             {
                 'key': 'tempo_medio',
-                'titulo': 'Tempo Médio',
+                'titulo': 'Tempo (p50)',
                 'valor_inicial': '0s',
-                'subtitulo': 'por arquivo',
+                'subtitulo': 'por execução',
                 'emoji': '⚡',
                 'cor': self.CORES['azul_info']
             },
@@ -504,12 +519,7 @@ def criar_kpis_dashboard(self):
     def atualizar_kpis(self):
         """Atualiza os KPIs com dados reais"""
         try:
-            # Calcular taxa de sucesso
-            if self.kpis_data['arquivos_processados'] > 0:
-                taxa = (self.kpis_data['arquivos_sucesso'] / self.kpis_data['arquivos_processados']) * 100
-                self.kpis_data['taxa_sucesso'] = taxa
-            else:
-                taxa = 0
+            taxa = self.kpis_data['taxa_sucesso']
             
             # Atualizar labels
             if 'total_processados' in self.kpi_labels:
@@ -523,12 +533,12 @@ def atualizar_kpis(self):
                 )
             
             if 'tempo_medio' in self.kpi_labels:
-                tempo = self.kpis_data['tempo_medio']
-                if tempo > 60:
-                    texto_tempo = f"{tempo//60}m{tempo%60}s"
-                else:
-                    texto_tempo = f"{tempo}s"
-                self.kpi_labels['tempo_medio'].configure(text=texto_tempo)
+                self.kpi_labels['tempo_medio'].configure(text=self.formatar_tempo(self.kpis_data['tempo_medio']))
+                if 'tempo_medio_sub' in self.kpi_labels:
+                    self.kpi_labels['tempo_medio_sub'].configure(
+                        text=f"p95 {self.formatar_tempo(self.kpis_data['tempo_p95'])} · "
+                             f"{self.kpis_data['linhas_por_segundo']:.0f} linhas/s"
+                    )
             
             if 'ultima_execucao' in self.kpi_labels:
                 self.kpi_labels['ultima_execucao'].configure(
@@ -541,69 +551,43 @@ def atualizar_kpis(self):
         except Exception as e:
             print(f"Erro ao atualizar KPIs: {e}")
     
+    def formatar_tempo(self, segundos):
+        """Formata segundos como 45s ou 2m05s"""
+        segundos = int(round(segundos or 0))
+        if segundos > 60:
+            return f"{segundos // 60}m{segundos % 60:02d}s"
+        return f"{segundos}s"
+    
     def carregar_kpis(self):
-        """Carrega KPIs salvos do arquivo JSON"""
+        """Calcula os KPIs a partir do histórico de execuções (SQLite) desta interface"""
         try:
-            if os.path.exists(self.arquivo_kpis):
-                with open(self.arquivo_kpis, 'r', encoding='utf-8') as f:
-                    dados_salvos = json.load(f)
-                    self.kpis_data.update(dados_salvos)
-                print(f"✅ KPIs carregados: {self.kpis_data}")
-            else:
-                print("⚠️ Arquivo de KPIs não encontrado, usando valores padrão")
+            estatisticas = self.historico.estatisticas(origem=ORIGEM_HISTORICO)
+            self.kpis_data.update({
+                'total_processados': estatisticas['linhas'],
+                'taxa_sucesso': 100.0 - estatisticas['taxa_falha'] if estatisticas['execucoes'] else 0.0,
+                'tempo_medio': estatisticas['duracao_p50'] or 0,
+                'tempo_p95': estatisticas['duracao_p95'] or 0,
+                'linhas_por_segundo': estatisticas['linhas_por_segundo'],
+                'ultima_execucao': formatar_ultima_execucao(estatisticas['ultima_execucao']),
+                'execucoes': estatisticas['execucoes'],
+                'execucoes_falha': estatisticas['falhas']
+            })
+            print(f"✅ KPIs carregados do histórico: {estatisticas['execucoes']} execuções")
         except Exception as e:
             print(f"❌ Erro ao carregar KPIs: {e}")
     
-    def salvar_kpis(self):
-        """Salva KPIs no arquivo JSON"""
-        try:
-            # Garantir que o diretório config existe
-            os.makedirs('config', exist_ok=True)
-            
-            with open(self.arquivo_kpis, 'w', encoding='utf-8') as f:
-                json.dump(self.kpis_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ KPIs salvos: {self.kpis_data}")
-        except Exception as e:
-            print(f"❌ Erro ao salvar KPIs: {e}")
-    
-    def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segundos=0):
-        """Registra uma execução e atualiza os KPIs"""
+    def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segundos=0, etapas=()):
+        """Registra uma execução no histórico e atualiza os KPIs"""
         try:
-            from datetime import datetime
-            
-            # Atualizar contadores
-            self.kpis_data['arquivos_processados'] += 1
-            
-            if sucesso:
-                self.kpis_data['arquivos_sucesso'] += 1
-            else:
-                self.kpis_data['arquivos_erro'] += 1
-            
-            # Atualizar total de registros
-            self.kpis_data['total_processados'] += registros_processados
-            
-            # Atualizar tempo médio (média ponderada simples)
-            if tempo_segundos > 0:
-                tempo_atual = self.kpis_data['tempo_medio']
-                total_exec = self.kpis_data['arquivos_processados']
-                
-                # Média incremental: novo_tempo = (tempo_atual * (n-1) + tempo_novo) / n
-                if total_exec > 1:
-                    novo_tempo = ((tempo_atual * (total_exec - 1)) + tempo_segundos) / total_exec
-                else:
-                    novo_tempo = tempo_segundos
-                
-                self.kpis_data['tempo_medio'] = int(novo_tempo)
-            
-            # Atualizar última execução
-            agora = datetime.now()
-            self.kpis_data['ultima_execucao'] = agora.strftime("Hoje %H:%M")
-            
-            # Salvar dados
-            self.salvar_kpis()
+            self.historico.registrar_execucao(
+                origem=ORIGEM_HISTORICO,
+                sucesso=sucesso,
+                linhas=registros_processados,
+                duracao=tempo_segundos or None,
+                etapas=etapas
+            )
             
-            # Atualizar interface
+            self.carregar_kpis()
             self.atualizar_kpis()
             
             print(f"✅ Execução registrada: Sucesso={sucesso}, Registros={registros_processados}, Tempo={tempo_segundos}s")
@@ -611,65 +595,30 @@ def registrar_execucao(self, sucesso=True, registros_processados=0, tempo_segund
         except Exception as e:
             print(f"❌ Erro ao registrar execução: {e}")
     
-    def extrair_total_registros(self, output):
-        """Extrai o total de registros processados do output"""
-        try:
-            if not output:
-                return 50  # Valor padrão estimado
-            
-            # Buscar padrões comuns no output
-            import re
-            
-            # Padrões: "processados: 123", "Total: 123", "123 registros"
-            padroes = [
-                r'processados?:\s*(\d+)',
-                r'Total.*?:\s*(\d+)',
-                r'(\d+)\s+registros?',
-                r'linhas?\s+processadas?:\s*(\d+)'
-            ]
-            
-            for padrao in padroes:
-                match = re.search(padrao, output, re.IGNORECASE)
-                if match:
-                    return int(match.group(1))
-            
-            # Se não encontrar, retornar valor padrão
-            return 50
-            
-        except:
-            return 50
-    
-    def extrair_tempo_execucao(self, output):
-        """Extrai o tempo de execução do output"""
-        try:
-            if not output:
-                return 15  # Valor padrão estimado (15 segundos)
-            
-            import re
-            
-            # Padrões: "Tempo: 45s", "Duração: 1m30s", "45.5 segundos"
-            padroes = [
-                r'tempo.*?:\s*(\d+)s',
-                r'duração.*?:\s*(\d+)s',
-                r'(\d+)\s+segundos?',
-                r'tempo.*?:\s*(\d+)m\s*(\d+)s'  # Minutos e segundos
-            ]
-            
-            for padrao in padroes:
-                match = re.search(padrao, output, re.IGNORECASE)
-                if match:
-                    if len(match.groups()) == 2:  # Formato minutos + segundos
-                        minutos = int(match.group(1))
-                        segundos = int(match.group(2))
-                        return (minutos * 60) + segundos
-                    else:
-                        return int(match.group(1))
-            
-            # Se não encontrar, retornar valor padrão
-            return 15
-            
-        except:
-            return 15
+    def tratar_evento(self, evento):
+        """Atualiza o status da interface a partir de um evento do main.py"""
+        tipo = evento.get('tipo')
+        
+        if tipo == 'sistema_inicio':
+            texto = f"🔄 Processando {evento['sistema'].title()}..."
+        elif tipo == 'arquivo_inicio':
+            texto = f"📤 {evento['sistema'].title()}: {evento['arquivo']} ({evento['indice']}/{evento['total']})"
+        elif tipo == 'arquivo_fim':
+            if evento.get('sucesso'):
+                self.log_mensagem(
+                    f"📊 {evento['arquivo']} → {evento['aba']}: {evento['linhas']} linhas em {evento['duracao']:.1f}s",
+                    'sucesso'
+                )
+            else:
+                self.log_mensagem(f"❌ {evento['arquivo']} → {evento['aba']}: {evento.get('erro')}", 'erro')
+            return
+        elif tipo == 'orcamento_estourado':
+            self.log_mensagem(f"🐢 {evento['mensagem']}", 'aviso')
+            return
+        else:
+            return
+        
+        self.janela_principal.after(0, lambda: self.status_label.configure(text=texto, fg=self.CORES['laranja']))
     
     def criar_controles(self):
         """Cria área de controles - PROFISSIONAL (Verde + Preto + Branco)"""
@@ -1061,6 +1010,10 @@ def criar_area_logs(self):
         self.texto_log.insert('end', "🔧 Sistema iniciando...\n")
         self.texto_log.see('end')
         
+        # Mensagens entram numa fila e são gravadas em lote a cada 50 ms (widget limitado a 5000 linhas)
+        self.painel_log = PainelLog(self.janela_principal, self.texto_log)
+        self.painel_log.iniciar()
+        
         # Configurar tags para cores melhoradas e VIBRANTES
         self.texto_log.tag_configure('sucesso', foreground='#4EC9B0', font=('Cascadia Code', 9, 'bold'))
         self.texto_log.tag_configure('erro', foreground='#F48771', font=('Cascadia Code', 9, 'bold'))
@@ -1165,21 +1118,9 @@ def log_mensagem(self, mensagem, tag=None):
             # Debug: imprimir no console também
             print(f"LOG: {mensagem_completa.strip()}")
             
-            # Garantir que o widget existe
-            if hasattr(self, 'texto_log') and self.texto_log:
-                # Função interna para inserir o log de forma thread-safe
-                def _inserir_log():
-                    self.texto_log.configure(state='normal')
-                    self.texto_log.insert('end', mensagem_completa, tag)
-                    self.texto_log.see('end')  # Auto-scroll para o final
-                
-                # Usar after(0) para garantir que a inserção aconteça na thread principal do Tkinter
-                # Isso evita race conditions e crashes quando chamado de threads secundárias
-                try:
-                    self.janela_principal.after(0, _inserir_log)
-                except:
-                    # Fallback se não estiver em uma thread secundária
-                    _inserir_log()
+            # Thread-safe: a fila é descarregada na thread do Tkinter pelo PainelLog
+            if self.painel_log is not None:
+                self.painel_log.adicionar(mensagem_completa, tag)
             else:
                 print("Widget texto_log não encontrado!")
         except Exception as e:
@@ -1196,17 +1137,17 @@ def verificar_arquivos(self):
             messagebox.showerror("Erro", "Pasta 'data' não encontrada!\nCrie a pasta e adicione os arquivos CSV.")
             return
         
-        arquivos_csv = [f for f in os.listdir(data_dir) if f.lower().endswith('.csv')]
+        # Uma leitura da pasta (nome, tamanho e mtime de todos os CSVs)
+        arquivos_csv = obter_indice(data_dir, atualizar=True).arquivos()
         
         if not arquivos_csv:
             self.log_mensagem("⚠️ Nenhum arquivo CSV encontrado na pasta data/", 'aviso')
             messagebox.showwarning("Aviso", "Nenhum arquivo CSV encontrado na pasta data/")
         else:
             self.log_mensagem(f"📁 Encontrados {len(arquivos_csv)} arquivos CSV:", 'sucesso')
-            for arquivo in sorted(arquivos_csv):
-                tamanho = os.path.getsize(os.path.join(data_dir, arquivo))
-                tamanho_mb = tamanho / (1024 * 1024)
-                self.log_mensagem(f"   📄 {arquivo} ({tamanho_mb:.2f} MB)", 'info')
+            for arquivo in sorted(arquivos_csv, key=lambda e: e['nome']):
+                tamanho_mb = arquivo['tamanho'] / (1024 * 1024)
+                self.log_mensagem(f"   📄 {arquivo['nome']} ({tamanho_mb:.2f} MB)", 'info')
     
     def abrir_pasta_dados(self):
         """Abre a pasta de dados no explorer"""
@@ -1249,9 +1190,7 @@ def abrir_planilha(self, tipo):
     
     def limpar_logs(self):
         """Limpa a área de logs"""
-        self.texto_log.configure(state='normal')
-        self.texto_log.delete(1.0, 'end')
-        self.texto_log.configure(state='disabled')
+        self.painel_log.limpar()
         self.log_mensagem("🧹 Logs limpos", 'info')
         self.log_mensagem("💚 Sistema pronto para nova operação", 'sucesso')
     
@@ -1414,10 +1353,7 @@ def _executar_automacao_thread(self):
             
             self.log_mensagem("🚀 Iniciando automação...", 'sucesso')
             
-            # Construir comando
-            comando = ["python", "main.py"]
-            
-            # Adicionar opções baseadas nos checkboxes (lógica melhorada para três sistemas)
+            # Sistemas marcados nos checkboxes (todos = main.py processa tudo)
             sistemas_selecionados = []
             if self.var_genesys.get():
                 sistemas_selecionados.append("genesys")
@@ -1426,110 +1362,55 @@ def _executar_automacao_thread(self):
             if self.var_produtividade.get():
                 sistemas_selecionados.append("produtividade")
             
-            # Se apenas um sistema está selecionado, usar parâmetro específico
             if len(sistemas_selecionados) == 1:
-                comando.append(f"--{sistemas_selecionados[0]}")
                 self.log_mensagem(f"🎯 Modo: Apenas {sistemas_selecionados[0].title()}", 'info')
             else:
-                # Se múltiplos ou todos, não adicionar parâmetro específico (processará todos selecionados)
                 sistemas_texto = " + ".join([s.title() for s in sistemas_selecionados])
                 self.log_mensagem(f"🎯 Modo: {sistemas_texto}", 'info')
+            sistemas_execucao = sistemas_selecionados if len(sistemas_selecionados) < 3 else []
             
-            if self.var_verbose.get():
-                comando.append("--verbose")
+            verbose = self.var_verbose.get()
+            if verbose:
                 self.log_mensagem("🔍 Modo detalhado ativado", 'info')
             
-            # Configurar variáveis de ambiente para encoding
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONLEGACYWINDOWSFSENCODING'] = '0'
-            
-            self.log_mensagem(f"📋 Comando: {' '.join(comando)}", 'info')
-            
-            # Executar comando com encoding robusto
-            processo = subprocess.Popen(
-                comando,
-                cwd=current_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,  # Capturar stderr separadamente
-                text=True,
-                encoding='utf-8',
-                errors='replace',  # Substituir caracteres inválidos
-                universal_newlines=True,
-                env=env,
-                bufsize=0  # Sem buffer para saída em tempo real
-            )
-            
-            # Ler saída em tempo real (stdout e stderr)
-            import select
-            import time
-            
-            # Para Windows, ler linha por linha
-            linha_count = 0
-            while processo.poll() is None:
-                # Ler stdout
-                if processo.stdout.readable():
-                    linha = processo.stdout.readline()
-                    if linha:
-                        linha = linha.strip()
-                        if linha:
-                            linha_count += 1
-                            # Detectar tipo de mensagem baseado em emojis/símbolos
-                            if '✅' in linha or 'sucesso' in linha.lower():
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}", 'sucesso')
-                            elif '❌' in linha or 'erro' in linha.lower() or 'falha' in linha.lower():
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}", 'erro')
-                            elif '⚠️' in linha or 'aviso' in linha.lower():
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}", 'aviso')
-                            elif '🔍' in linha or '📊' in linha or '💼' in linha:
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}", 'info')
-                            elif linha.startswith('=') or linha.startswith('-'):
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}", 'destaque')
-                            else:
-                                self.log_mensagem(f"[{linha_count:03d}] {linha}")
-                
-                time.sleep(0.01)  # Pequena pausa para não sobrecarregar CPU
-            
-            # Ler qualquer saída restante
-            stdout_restante, stderr_output = processo.communicate()
-            
-            if stdout_restante:
-                for linha in stdout_restante.split('\n'):
-                    linha = linha.strip()
-                    if linha:
-                        linha_count += 1
-                        self.log_mensagem(f"[{linha_count:03d}] {linha}")
+            # Padrão: roda no próprio processo, reaproveitando cliente autorizado e configuração
+            if self.execucao_em_processo:
+                codigo, eventos_recebidos, stderr_output = self._executar_em_processo(sistemas_execucao, verbose)
+            else:
+                codigo, eventos_recebidos, stderr_output = self._executar_subprocesso(sistemas_execucao, verbose)
             
-            # Capturar stderr se houver
-            if stderr_output:
-                self.log_mensagem("🔍 Saída de erro (stderr):", 'aviso')
-                for linha in stderr_output.split('\n'):
-                    linha = linha.strip()
-                    if linha:
-                        linha_count += 1
-                        self.log_mensagem(f"[ERR{linha_count:03d}] {linha}", 'erro')
+            resumo = next((e for e in reversed(eventos_recebidos) if e.get('tipo') == 'fim'), None)
             
             # Verificar código de retorno
-            if processo.returncode == 0:
+            if codigo == 0:
                 self.log_mensagem("🎉 Automação concluída com sucesso!", 'sucesso')
                 self.status_label.configure(text="✅ Automação concluída com sucesso!", fg=self.CORES['verde_leroy'])
                 
-                # Registrar execução bem-sucedida com dados estimados
-                # (aqui você pode melhorar pegando dados reais do log/output)
-                registros = self.extrair_total_registros(stdout_restante)
-                tempo = self.extrair_tempo_execucao(stdout_restante)
-                self.registrar_execucao(sucesso=True, registros_processados=registros, tempo_segundos=tempo)
+                # O main.py já gravou a execução no histórico; só recalcular os KPIs
+                if resumo:
+                    self.log_mensagem(
+                        f"📊 {resumo.get('linhas', 0)} linhas em {resumo.get('processados', 0)} arquivo(s) "
+                        f"({resumo.get('duracao', 0):.1f}s)", 'info'
+                    )
+                else:
+                    self.log_mensagem("⚠️ main.py não enviou o resumo da execução", 'aviso')
+                self.carregar_kpis()
+                self.atualizar_kpis()
                 
                 messagebox.showinfo("Sucesso", "Automação concluída com sucesso! ✅")
             else:
-                self.log_mensagem(f"❌ Automação falhou (código {processo.returncode})", 'erro')
+                self.log_mensagem(f"❌ Automação falhou (código {codigo})", 'erro')
                 self.status_label.configure(text="❌ Automação falhou", fg=self.CORES['laranja'])
                 
-                # Registrar execução com falha
-                self.registrar_execucao(sucesso=False, registros_processados=0, tempo_segundos=0)
+                # Registrar execução com falha (se o main.py não chegou a gravar o resumo)
+                if resumo:
+                    self.carregar_kpis()
+                    self.atualizar_kpis()
+                else:
+                    self.registrar_execucao(sucesso=False, registros_processados=0, tempo_segundos=0)
                 
                 # Construir mensagem de erro mais detalhada
-                erro_msg = f"Automação falhou (código {processo.returncode})"
+                erro_msg = f"Automação falhou (código {codigo})"
                 if stderr_output:
                     erro_msg += f"\n\nDetalhes do erro:\n{stderr_output[:500]}"  # Limitar tamanho
                 
@@ -1562,6 +1443,97 @@ def _executar_automacao_thread(self):
             if not self.status_label.cget('text').startswith(('❌', '✅')):
                 self.status_label.configure(text="💚 Pronto para nova execução", fg=self.CORES['verde_escuro'])
     
+    def registrar_linha_saida(self, linha, numero, erro=False):
+        """Mostra no log uma linha da saída do main.py, colorida pelo conteúdo"""
+        if erro:
+            self.log_mensagem(f"[ERR{numero:03d}] {linha}", 'erro')
+        # Detectar tipo de mensagem baseado em emojis/símbolos
+        elif '✅' in linha or 'sucesso' in linha.lower():
+            self.log_mensagem(f"[{numero:03d}] {linha}", 'sucesso')
+        elif '❌' in linha or 'erro' in linha.lower() or 'falha' in linha.lower():
+            self.log_mensagem(f"[{numero:03d}] {linha}", 'erro')
+        elif '⚠️' in linha or 'aviso' in linha.lower():
+            self.log_mensagem(f"[{numero:03d}] {linha}", 'aviso')
+        elif '🔍' in linha or '📊' in linha or '💼' in linha:
+            self.log_mensagem(f"[{numero:03d}] {linha}", 'info')
+        elif linha.startswith('=') or linha.startswith('-'):
+            self.log_mensagem(f"[{numero:03d}] {linha}", 'destaque')
+        else:
+            self.log_mensagem(f"[{numero:03d}] {linha}")
+    
+    def _executar_em_processo(self, sistemas, verbose):
+        """
+        Executa o main.py nesta mesma instância (thread de trabalho + fila)
+        
+        Returns:
+            tuple: (código de retorno, eventos recebidos, saída de erro)
+        """
+        self.log_mensagem("⚡ Execução no processo da interface (cliente e configuração reaproveitados)", 'info')
+        return self._acompanhar_fila(self.executor_local.iniciar(sistemas, verbose))
+    
+    def _executar_subprocesso(self, sistemas, verbose):
+        """
+        Executa 'python main.py' em outro processo (AUTOMACAO_SUBPROCESSO=1)
+        
+        Returns:
+            tuple: (código de retorno, eventos recebidos, saída de erro)
+        """
+        # Construir comando (main.py fica na raiz do projeto)
+        comando = [sys.executable, "main.py"]
+        comando.extend(f"--{sistema}" for sistema in sistemas)
+        if verbose:
+            comando.append("--verbose")
+        
+        # Configurar variáveis de ambiente para encoding e saída sem buffer (linhas em tempo real)
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONLEGACYWINDOWSFSENCODING'] = '0'
+        env['PYTHONUNBUFFERED'] = '1'
+        
+        self.log_mensagem(f"📋 Comando: {' '.join(comando)}", 'info')
+        
+        # Canal de eventos: resultados exatos por arquivo em JSON lines
+        descritor, arquivo_eventos = tempfile.mkstemp(prefix='pulso_eventos_', suffix='.jsonl')
+        os.close(descritor)
+        comando.extend(["--eventos", arquivo_eventos])
+        
+        # stdout/stderr lidos por threads dedicadas; aqui só esperamos a fila (sem polling)
+        fila = iniciar_subprocesso(comando, cwd=root_dir, env=env, arquivo_eventos=arquivo_eventos)
+        try:
+            return self._acompanhar_fila(fila)
+        finally:
+            try:
+                os.remove(arquivo_eventos)
+            except OSError:
+                pass
+    
+    def _acompanhar_fila(self, fila):
+        """
+        Mostra logs e trata eventos da execução até 'execucao_encerrada'
+        
+        Returns:
+            tuple: (código de retorno, eventos recebidos, saída de erro)
+        """
+        eventos_recebidos = []
+        linhas_erro = []
+        linha_count = 0
+        while True:
+            item = fila.get()
+            tipo = item.get('tipo')
+            if tipo == 'execucao_encerrada':
+                return item['codigo'], eventos_recebidos, "\n".join(linhas_erro)
+            if tipo == 'log':
+                linha = item['linha'].strip()
+                if linha:
+                    linha_count += 1
+                    erro = item['fluxo'] == 'stderr'
+                    if erro:
+                        linhas_erro.append(linha)
+                    self.registrar_linha_saida(linha, linha_count, erro)
+            else:
+                eventos_recebidos.append(item)
+                self.tratar_evento(item)
+    
     def executar(self):
         """Inicia a interface"""
         try:
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📜 PAINEL DE LOG DAS INTERFACES
+Recebe as mensagens de log de qualquer thread em uma fila e as grava no
+widget Text em lotes, em um ritmo fixo (padrão: a cada 50 ms).
+
+- Um único insert + see('end') por lote, em vez de um after(0) por mensagem
+- O widget guarda no máximo MAX_LINHAS linhas (as mais antigas são descartadas)
+- Execuções longas, com centenas de linhas e tracebacks, não travam a janela
+"""
+
+import queue
+import tkinter as tk
+
+INTERVALO_MS = 50
+MAX_LINHAS = 5000
+MAX_POR_LOTE = 2000
+
+
+class PainelLog:
+    """Fila de mensagens + descarga periódica em um widget Text"""
+
+    def __init__(self, janela, texto, intervalo_ms=INTERVALO_MS, max_linhas=MAX_LINHAS, max_por_lote=MAX_POR_LOTE):
+        self.janela = janela
+        self.texto = texto
+        self.intervalo_ms = intervalo_ms
+        self.max_linhas = max_linhas
+        self.max_por_lote = max_por_lote
+        self._fila = queue.SimpleQueue()
+        self._ativo = False
+
+    def adicionar(self, mensagem, tag=None):
+        """Enfileira uma mensagem (pode ser chamado de qualquer thread)"""
+        self._fila.put((mensagem, tag))
+
+    def iniciar(self):
+        """Começa a descarregar a fila no ritmo configurado"""
+        if not self._ativo:
+            self._ativo = True
+            self.janela.after(self.intervalo_ms, self._ciclo)
+
+    def parar(self):
+        self._ativo = False
+
+    def _ciclo(self):
+        if not self._ativo:
+            return
+        try:
+            self.descarregar()
+            self.janela.after(self.intervalo_ms, self._ciclo)
+        except tk.TclError:
+            # Janela destruída
+            self._ativo = False
+
+    def _drenar(self):
+        lote = []
+        while len(lote) < self.max_por_lote:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def descarregar(self):
+        """Grava no widget as mensagens pendentes; retorna quantas foram gravadas"""
+        lote = self._drenar()
+        if not lote:
+            return 0
+
+        # insert(index, texto1, tags1, texto2, tags2, ...) grava o lote inteiro de uma vez
+        argumentos = []
+        for mensagem, tag in lote:
+            argumentos.extend((mensagem, tag or ()))
+
+        self.texto.configure(state='normal')
+        self.texto.insert('end', *argumentos)
+        self._limitar_linhas()
+        self.texto.see('end')
+        return len(lote)
+
+    def _limitar_linhas(self):
+        linhas = int(self.texto.index('end-1c').split('.')[0])
+        excedente = linhas - self.max_linhas
+        if excedente > 0:
+            self.texto.delete('1.0', f'{excedente + 1}.0')
+
+    def limpar(self):
+        """Descarta o conteúdo do widget e as mensagens ainda na fila"""
+        while self._drenar():
+            pass
+        self.texto.configure(state='normal')
+        self.texto.delete('1.0', 'end')
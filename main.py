@@ -13,6 +13,10 @@
     python main.py                # Executa tudo automaticamente
     python main.py --genesys      # Só Genesys
     python main.py --salesforce   # Só Salesforce
+    python main.py --profile      # Perfil de CPU por sistema/arquivo em logs/perfil/
+    python main.py --eventos ARQ  # Progresso/resultados em JSON lines (usado pelas interfaces)
+    python main.py --dry-run      # Mostra arquivo → aba sem conectar ao Google Sheets
+    python main.py --observar     # Envia cada CSV novo em data/ assim que termina de ser gravado
     python main.py --help         # Mostra ajuda
 """
 
@@ -29,6 +33,7 @@
         pass
 
 import argparse
+import time
 from datetime import datetime
 
 # Adicionar o diretório src ao path
@@ -36,126 +41,233 @@
 core_dir = os.path.join(os.path.dirname(current_dir), 'core')
 sys.path.append(core_dir)
  
-from src.core.google_sheets_base import GoogleSheetsBase
-from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+from src.core.perfilador import (MODOS_PERFIL, ativar_perfilador, finalizar_perfilador, modo_perfil_ambiente,
+                                  etapa, medir_etapas)
+from src.core import eventos
+from src.core.orcamentos import ETAPA_ARQUIVO, agrupar_medicoes, avaliar_orcamentos, orcamentos_da_base
 
-# Inicializar gerenciador de configurações
-gp = GerenciadorPlanilhas()
+# GoogleSheetsBase (pandas/gspread/google-auth), o histórico e o gerenciador de planilhas
+# são carregados só quando um sistema roda: --help, --dry-run e execuções sem CSV saem rápido
+_planilhas_config = None
+
+SISTEMAS = ("genesys", "salesforce", "produtividade")
+
+def obter_gerenciador():
+    """Gerenciador de configurações compartilhado do processo, criado no primeiro uso"""
+    from scripts.gerenciador_planilhas import obter_gerenciador as obter_gerenciador_compartilhado
+    return obter_gerenciador_compartilhado()
 
 # Configurações das planilhas - AGORA DINÂMICAS
 def obter_config_planilhas():
     """Obtém configurações atualizadas das planilhas"""
+    gp = obter_gerenciador()
+    abas_genesys = gp.obter_abas("genesys_boletim")
+    abas_salesforce = gp.obter_abas("salesforce_boletim")
+    abas_produtividade = gp.obter_abas("produtividade_boletim")
     return {
         "genesys": {
             "id": gp.obter_id("genesys_boletim"),
             "nome": "📊 GENESYS",
             "deteccao": {
-                "voz_hc": (gp.obter_abas("genesys_boletim").get("voz_hc", "BASE VOZ"), "GENESYS VOZ HC"),
-                "texto_hc": (gp.obter_abas("genesys_boletim").get("texto_hc", "BASE TEXTO"), "GENESYS TEXTO HC"), 
-                "gestao_n1": (gp.obter_abas("genesys_boletim").get("gestao_n1", "BASE GE COLABORADOR"), "GENESYS GESTÃO N1"),
-                "gestao": (gp.obter_abas("genesys_boletim").get("gestao_entrega", "BASE GE COLABORADOR"), "GENESYS GESTÃO"),
-                "fila": (gp.obter_abas("genesys_boletim").get("fila", "BASE VOZ FILA"), "GENESYS FILA")
+                "voz_hc": (abas_genesys.get("voz_hc", "BASE VOZ"), "GENESYS VOZ HC"),
+                "texto_hc": (abas_genesys.get("texto_hc", "BASE TEXTO"), "GENESYS TEXTO HC"), 
+                "gestao_n1": (abas_genesys.get("gestao_n1", "BASE GE COLABORADOR"), "GENESYS GESTÃO N1"),
+                "gestao": (abas_genesys.get("gestao_entrega", "BASE GE COLABORADOR"), "GENESYS GESTÃO"),
+                "fila": (abas_genesys.get("fila", "BASE VOZ FILA"), "GENESYS FILA")
             }
         },
         "salesforce": {
             "id": gp.obter_id("salesforce_boletim"),
             "nome": "💼 SALESFORCE", 
             "deteccao": {
-                "criado": (gp.obter_abas("salesforce_boletim").get("criado", "BASE ATUALIZADA CORRETA - CRIADO"), "SALESFORCE CRIADO"),
-                "resolvido": (gp.obter_abas("salesforce_boletim").get("resolvido", "BASE ATUALIZADA CORRETA - RESOLVIDA"), "SALESFORCE RESOLVIDO"),
-                "comentario_bko": (gp.obter_abas("salesforce_boletim").get("comentario_bko", "COMENTARIO BKO"), "SALESFORCE COMENTÁRIOS"),
-                "seller": (gp.obter_abas("salesforce_boletim").get("seller", "DADOS SELLER"), "SALESFORCE SELLER")
+                "criado": (abas_salesforce.get("criado", "BASE ATUALIZADA CORRETA - CRIADO"), "SALESFORCE CRIADO"),
+                "resolvido": (abas_salesforce.get("resolvido", "BASE ATUALIZADA CORRETA - RESOLVIDA"), "SALESFORCE RESOLVIDO"),
+                "comentario_bko": (abas_salesforce.get("comentario_bko", "COMENTARIO BKO"), "SALESFORCE COMENTÁRIOS"),
+                "seller": (abas_salesforce.get("seller", "DADOS SELLER"), "SALESFORCE SELLER")
             }
         },
         "produtividade": {
             "id": gp.obter_id("produtividade_boletim"),
             "nome": "📈 PRODUTIVIDADE",
             "deteccao": {
-                "produtividade": (gp.obter_abas("produtividade_boletim").get("produtividade", "BASE PROD"), "PRODUTIVIDADE VISÃO"),
-                "tempo": (gp.obter_abas("produtividade_boletim").get("tempo", "BASE TEMPO"), "PRODUTIVIDADE TEMPO")
+                "produtividade": (abas_produtividade.get("produtividade", "BASE PROD"), "PRODUTIVIDADE VISÃO"),
+                "tempo": (abas_produtividade.get("tempo", "BASE TEMPO"), "PRODUTIVIDADE TEMPO")
             }
         }
     }
 
-# Obter configurações dinâmicas
-PLANILHAS_CONFIG = obter_config_planilhas()
+def planilhas_config():
+    """Configurações das planilhas, resolvidas uma vez por execução"""
+    global _planilhas_config
+    if _planilhas_config is None:
+        _planilhas_config = obter_config_planilhas()
+    return _planilhas_config
 
-def detectar_tipo_arquivo(nome_arquivo, sistema):
-    """Detecta o tipo do arquivo baseado no sistema (genesys, salesforce ou produtividade)"""
-    nome_lower = nome_arquivo.lower()
-    
-    if sistema == "genesys":
-        if 'voz' in nome_lower and 'hc' in nome_lower:
-            return PLANILHAS_CONFIG["genesys"]["deteccao"]["voz_hc"]
-        elif 'texto' in nome_lower and 'hc' in nome_lower:
-            return PLANILHAS_CONFIG["genesys"]["deteccao"]["texto_hc"]
-        elif 'gestão' in nome_lower or 'gestao' in nome_lower:
-            if 'n1' in nome_lower or 'entrega' in nome_lower:
-                return PLANILHAS_CONFIG["genesys"]["deteccao"]["gestao_n1"]
-            else:
-                return PLANILHAS_CONFIG["genesys"]["deteccao"]["gestao"]
-        elif 'fila' in nome_lower and 'todas' in nome_lower:
-            # Arquivo de filas deve ir para Power BI, não para o boletim
-            print(f"⚠️  ATENÇÃO: Arquivo '{nome_arquivo}' é de FILAS GENESYS")
-            print("🎯 Este arquivo deve ser processado pela interface Power BI, não pelo Pulso Boletim")
-            print("💡 Use a interface Power BI para processar dados de filas")
-            return None, None  # Não processar na interface do boletim
-        elif 'fila' in nome_lower:
-            return PLANILHAS_CONFIG["genesys"]["deteccao"]["fila"]
-    
-    elif sistema == "salesforce":
-        if 'criado' in nome_lower or 'created' in nome_lower:
-            return PLANILHAS_CONFIG["salesforce"]["deteccao"]["criado"]
-        elif 'resolvido' in nome_lower or 'resolved' in nome_lower:
-            return PLANILHAS_CONFIG["salesforce"]["deteccao"]["resolvido"]
-        elif 'comentario' in nome_lower or 'comment' in nome_lower or 'bko' in nome_lower:
-            return PLANILHAS_CONFIG["salesforce"]["deteccao"]["comentario_bko"]
-        elif 'seller' in nome_lower or 'vendedor' in nome_lower:
-            return PLANILHAS_CONFIG["salesforce"]["deteccao"]["seller"]
-    
-    elif sistema == "produtividade":
-        if 'tempo' in nome_lower:
-            return PLANILHAS_CONFIG["produtividade"]["deteccao"]["tempo"]
-        elif 'produtiv' in nome_lower or 'visao' in nome_lower or 'visão' in nome_lower:
-            return PLANILHAS_CONFIG["produtividade"]["deteccao"]["produtividade"]
+def descartar_config_planilhas():
+    """Faz a próxima execução no mesmo processo (interface) usar o JSON atual"""
+    global _planilhas_config
+    _planilhas_config = None
+
+def orcamentos_latencia():
+    """Orçamentos de latência por base/etapa (segundos) - avisos quando estourados"""
+    return obter_gerenciador().obter_orcamentos_latencia()
+
+def detectar_tipo_arquivo(nome_arquivo, sistema, caminho=None):
+    """
+    Detecta o tipo do arquivo baseado no sistema (genesys, salesforce ou produtividade)
+    Com o caminho, o cabeçalho do CSV é comparado às assinaturas configuradas antes do nome
+    """
+    from src.core.classificador_arquivos import dividir_chave, tipo_do_arquivo, tipo_do_caminho
+    # Regras do próprio sistema: o mesmo nome pode ir para bases de sistemas diferentes
+    chave = tipo_do_caminho(caminho, sistema) if caminho else tipo_do_arquivo(nome_arquivo, sistema)
+    if chave is None:
+        return None, None
     
-    return None, None
+    if chave == 'powerbi_filas' and sistema == "genesys":
+        # Arquivo de filas deve ir para Power BI, não para o boletim
+        print(f"⚠️  ATENÇÃO: Arquivo '{nome_arquivo}' é de FILAS GENESYS")
+        print("🎯 Este arquivo deve ser processado pela interface Power BI, não pelo Pulso Boletim")
+        print("💡 Use a interface Power BI para processar dados de filas")
+        return None, None  # Não processar na interface do boletim
+    
+    sistema_arquivo, tipo = dividir_chave(chave)
+    if sistema_arquivo != sistema:
+        return None, None
+    return planilhas_config()[sistema]["deteccao"].get(tipo, (None, None))
+
+def detectar_tipos(nome_arquivo, caminho=None):
+    """Destino do arquivo em cada sistema cujas regras o reconhecem: {sistema: (aba, tipo)}"""
+    tipos = {}
+    for sistema_nome in SISTEMAS:
+        aba_destino, tipo_detectado = detectar_tipo_arquivo(nome_arquivo, sistema_nome, caminho)
+        if aba_destino:
+            tipos[sistema_nome] = (aba_destino, tipo_detectado)
+    return tipos
+
+def indice_dados():
+    """Índice de data/ da execução: um os.scandir, com o tipo detectado de cada CSV"""
+    from src.core.indice_dados import obter_indice
+    return obter_indice(os.path.join(current_dir, 'data'), classificar=detectar_tipos_em_data)
+
+def detectar_tipos_em_data(nome_arquivo):
+    """detectar_tipos de um CSV de data/ (lê o cabeçalho quando há assinaturas configuradas)"""
+    return detectar_tipos(nome_arquivo, os.path.join(current_dir, 'data', nome_arquivo))
 
 def buscar_arquivos_csv():
     """Busca todos os arquivos CSV na pasta data"""
-    data_dir = os.path.join(current_dir, 'data')
-    arquivos_csv = []
+    indice = indice_dados()
+    return indice.nomes(), os.path.join(current_dir, 'data')
+
+def mostrar_plano_envio(sistemas):
+    """Mostra arquivo → aba de cada sistema sem conectar ao Google Sheets (--dry-run)"""
+    print(f"\n🧪 DRY-RUN: nada será enviado")
+    for sistema_nome in sistemas:
+        print(f"\n{planilhas_config()[sistema_nome]['nome']}")
+        encontrados = 0
+        for entrada in indice_dados().arquivos():
+            if sistema_nome in entrada['tipo']:
+                aba_destino, tipo_detectado = entrada['tipo'][sistema_nome]
+                encontrados += 1
+                print(f"   📄 {entrada['nome']} → {aba_destino} ({tipo_detectado})")
+        if not encontrados:
+            print(f"   ⚠️  Nenhum arquivo {sistema_nome.upper()} encontrado")
+
+def processar_arquivo(sheets, sistema_nome, arquivo, aba_destino, tipo_detectado, indice, total, config_orcamentos):
+    """
+    Envia um CSV para a aba de destino, com eventos, etapas medidas e orçamentos de latência
+    
+    Returns:
+        dict: sucesso, linhas, arquivos (linhas do histórico) e estouros de orçamento
+    """
+    print(f"\n📤 Processando: {arquivo}")
+    print(f"🎯 Tipo: {tipo_detectado}")
+    print(f"📝 Destino: {aba_destino}")
+    eventos.emitir('arquivo_inicio', sistema=sistema_nome, arquivo=arquivo, aba=aba_destino,
+                   indice=indice, total=total)
+    inicio_arquivo = time.perf_counter()
+    
+    erro = None
+    medicoes = []
+    try:
+        with etapa(arquivo), medir_etapas() as medicoes:
+            # Processar arquivo (a leitura da aba feita no envio informa os dados existentes)
+            resultado = sheets.enviar_csv_para_planilha(arquivo, aba_destino)
+            if isinstance(resultado, dict) and resultado.get('linhas_existentes') is not None:
+                print(f"📊 Dados existentes: {resultado['linhas_existentes']:,} linhas")
+    except Exception as e:
+        resultado = None
+        erro = str(e)
+    
+    # enviar_csv_para_planilha retorna dict (ou False se o arquivo não existir)
+    resultado = resultado if isinstance(resultado, dict) else {}
+    sucesso = bool(resultado.get('sucesso'))
+    num_linhas = resultado.get('num_linhas') or 0
+    erro = erro or resultado.get('erro') or (None if sucesso else "Falha no envio do arquivo")
+    
+    if sucesso:
+        print(f"✅ SUCESSO: {arquivo} → {aba_destino}")
+    else:
+        print(f"❌ FALHA: {arquivo} → {aba_destino}")
     
-    if os.path.exists(data_dir):
-        for arquivo in os.listdir(data_dir):
-            if arquivo.lower().endswith('.csv'):
-                arquivos_csv.append(arquivo)
+    duracao_arquivo = round(time.perf_counter() - inicio_arquivo, 3)
     
-    return arquivos_csv, data_dir
+    # Orçamentos de latência: aviso com o detalhamento da etapa que estourou
+    orcamentos = orcamentos_da_base(config_orcamentos, aba_destino)
+    estouros = avaliar_orcamentos(aba_destino, medicoes, duracao_arquivo, config_orcamentos)
+    for estouro in estouros:
+        print(f"🐢 ORÇAMENTO: {estouro['mensagem']}")
+        eventos.emitir('orcamento_estourado', sistema=sistema_nome, arquivo=arquivo, aba=aba_destino,
+                       etapa=estouro['etapa'], duracao=estouro['duracao'],
+                       orcamento=estouro['orcamento'], mensagem=estouro['mensagem'])
+    
+    eventos.emitir('arquivo_fim', sistema=sistema_nome, arquivo=arquivo, aba=aba_destino,
+                   sucesso=sucesso, linhas=num_linhas,
+                   linha_inicial=resultado.get('linha_inicial'),
+                   linha_final=resultado.get('linha_final'),
+                   duracao=duracao_arquivo,
+                   erro=None if sucesso else erro)
+    arquivos_resultado = [{
+        'base': aba_destino, 'sistema': sistema_nome, 'arquivo': arquivo, 'sucesso': sucesso,
+        'linhas': num_linhas, 'duracao': duracao_arquivo, 'erro': None if sucesso else erro,
+        'orcamento': orcamentos.get(ETAPA_ARQUIVO)
+    }]
+    # Duração de cada etapa de ingestão também vai para o histórico
+    for nome_etapa, medida in agrupar_medicoes(medicoes).items():
+        arquivos_resultado.append({
+            'base': aba_destino, 'etapa': nome_etapa, 'sistema': sistema_nome, 'arquivo': arquivo,
+            'sucesso': sucesso, 'linhas': num_linhas, 'duracao': round(medida['duracao'], 3),
+            'orcamento': orcamentos.get(nome_etapa)
+        })
+    
+    print("-" * 50)
+    return {"sucesso": sucesso, "linhas": num_linhas, "arquivos": arquivos_resultado, "estouros": estouros}
 
 def processar_sistema(sistema_nome, executar_sistema=True):
     """Processa um sistema específico (genesys, salesforce ou produtividade)"""
     if not executar_sistema:
-        return {"sucessos": 0, "falhas": 0, "processados": 0}
+        return {"sucessos": 0, "falhas": 0, "processados": 0, "linhas": 0, "arquivos": [], "estouros": []}
     
     print(f"\n{'='*70}")
-    print(f"🎯 PROCESSANDO SISTEMA: {PLANILHAS_CONFIG[sistema_nome]['nome']}")
+    print(f"🎯 PROCESSANDO SISTEMA: {planilhas_config()[sistema_nome]['nome']}")
     print(f"{'='*70}")
     
+    from src.core.google_sheets_base import GoogleSheetsBase
+    
     # Configurar para a planilha específica
-    id_planilha = PLANILHAS_CONFIG[sistema_nome]["id"]
+    id_planilha = planilhas_config()[sistema_nome]["id"]
     sheets = GoogleSheetsBase(id_planilha=id_planilha)
+    config_orcamentos = orcamentos_latencia()
     
     print(f"📊 ID da Planilha: {id_planilha}")
     print(f"🔗 Conectando...")
     
     try:
-        client = sheets.client
-        planilha = client.open_by_key(id_planilha)
+        planilha = sheets.abrir_planilha()
         print(f"✅ Planilha: '{planilha.title}'")
         
         # Listar abas disponíveis
-        abas_disponiveis = [aba.title for aba in planilha.worksheets()]
+        abas = planilha.worksheets()
+        abas_disponiveis = [aba.title for aba in abas]
         print(f"📑 Abas disponíveis: {len(abas_disponiveis)} abas")
         
         # Buscar arquivos
@@ -171,10 +283,11 @@ def processar_sistema(sistema_nome, executar_sistema=True):
             print("💡 Execute: python interface_powerbi.py")
             print("-" * 70)
         
-        # Filtrar arquivos para este sistema
+        # Filtrar arquivos para este sistema (tipo já detectado no índice de data/)
         arquivos_sistema = []
-        for arquivo in arquivos_csv:
-            aba_destino, tipo_detectado = detectar_tipo_arquivo(arquivo, sistema_nome)
+        for entrada in indice_dados().arquivos():
+            arquivo = entrada['nome']
+            aba_destino, tipo_detectado = entrada['tipo'].get(sistema_nome, (None, None))
             if aba_destino and aba_destino in abas_disponiveis:
                 arquivos_sistema.append((arquivo, aba_destino, tipo_detectado))
             elif 'fila' in arquivo.lower() and 'todas' in arquivo.lower():
@@ -188,45 +301,109 @@ def processar_sistema(sistema_nome, executar_sistema=True):
                 print(f"💡 Use a interface Power BI para processar os arquivos de filas encontrados")
             else:
                 print(f"⚠️  Nenhum arquivo {sistema_nome.upper()} encontrado")
-            return {"sucessos": 0, "falhas": 0, "processados": 0}
+            return {"sucessos": 0, "falhas": 0, "processados": 0, "linhas": 0, "arquivos": [], "estouros": []}
         
         # Processar cada arquivo
         sucessos = 0
         falhas = 0
+        linhas_enviadas = 0
+        arquivos_resultado = []
+        estouros_sistema = []
         
-        for arquivo, aba_destino, tipo_detectado in arquivos_sistema:
-            print(f"\n📤 Processando: {arquivo}")
-            print(f"🎯 Tipo: {tipo_detectado}")
-            print(f"📝 Destino: {aba_destino}")
-            
-            # Verificar dados existentes
-            aba = planilha.worksheet(aba_destino)
-            valores_existentes = aba.get_all_values()
-            linhas_com_dados = sum(1 for linha in valores_existentes if any(cell.strip() for cell in linha))
-            print(f"📊 Dados existentes: {linhas_com_dados:,} linhas")
-            
-            # Processar arquivo
-            resultado = sheets.enviar_csv_para_planilha(arquivo, aba_destino)
-            
-            if resultado:
-                print(f"✅ SUCESSO: {arquivo} → {aba_destino}")
+        for indice, (arquivo, aba_destino, tipo_detectado) in enumerate(arquivos_sistema, 1):
+            resultado_arquivo = processar_arquivo(sheets, sistema_nome, arquivo, aba_destino, tipo_detectado,
+                                                  indice, len(arquivos_sistema), config_orcamentos)
+            if resultado_arquivo["sucesso"]:
                 sucessos += 1
+                linhas_enviadas += resultado_arquivo["linhas"]
             else:
-                print(f"❌ FALHA: {arquivo} → {aba_destino}")
                 falhas += 1
-            
-            print("-" * 50)
+            arquivos_resultado.extend(resultado_arquivo["arquivos"])
+            estouros_sistema.extend(resultado_arquivo["estouros"])
         
-        return {"sucessos": sucessos, "falhas": falhas, "processados": sucessos + falhas}
+        verificar_capacidade_planilha(sheets, abas, sistema_nome)
+        
+        return {"sucessos": sucessos, "falhas": falhas, "processados": sucessos + falhas,
+                "linhas": linhas_enviadas, "arquivos": arquivos_resultado, "estouros": estouros_sistema}
         
     except Exception as e:
         print(f"❌ ERRO no sistema {sistema_nome.upper()}: {e}")
-        return {"sucessos": 0, "falhas": 1, "processados": 1}
+        sheets.descartar_aba()
+        eventos.emitir('erro', sistema=sistema_nome, erro=str(e))
+        return {"sucessos": 0, "falhas": 1, "processados": 1, "linhas": 0, "estouros": [],
+                "arquivos": [{'base': sistema_nome, 'sistema': sistema_nome, 'sucesso': False, 'erro': str(e)}]}
 
-def main():
-    """Função principal"""
+def verificar_capacidade_planilha(sheets, abas, sistema_nome):
+    """Mede a planilha do sistema (grade em cache), projeta a lotação e arquiva linhas antigas se preciso"""
+    try:
+        from src.core.capacidade_planilhas import verificar_capacidade, descrever_capacidade
+        from src.core.historico_execucoes import HistoricoExecucoes
+        resultado = verificar_capacidade(sheets, abas, planilhas_config()[sistema_nome]['nome'], HistoricoExecucoes())
+    except Exception as e:
+        print(f"⚠️  Capacidade da planilha não verificada: {e}")
+        return None
+    print(descrever_capacidade(resultado))
+    eventos.emitir('capacidade', sistema=sistema_nome, celulas=resultado['celulas'], uso=round(resultado['uso'], 4),
+                   nivel=resultado['nivel'], lotacao=resultado['lotacao'],
+                   linhas_arquivadas=sum(a['linhas_arquivadas'] for a in resultado['arquivamentos']))
+    return resultado
+
+def sistema_da_aba(aba_destino):
+    """Sistema e tipo configurados para uma aba de destino (ou (None, None))"""
+    for sistema_nome, config in planilhas_config().items():
+        for aba, tipo in config["deteccao"].values():
+            if aba == aba_destino:
+                return sistema_nome, tipo
+    return None, None
+
+def classificar_arquivo(nome_arquivo, sistemas=SISTEMAS):
+    """Sistema, aba e tipo de um CSV pelas regras de detecção (ou (None, None, None))"""
+    entrada = indice_dados().obter(nome_arquivo)
+    tipos = entrada['tipo'] if entrada else detectar_tipos(nome_arquivo)
+    for sistema_nome in sistemas:
+        if sistema_nome in tipos:
+            return (sistema_nome,) + tipos[sistema_nome]
+    return None, None, None
+
+def processar_arquivo_avulso(caminho_arquivo, aba_destino, sistema_nome=None, tipo_detectado=None):
+    """Envia um único CSV para uma aba (job 'arquivo' do serviço e modo --observar)"""
+    descartar_config_planilhas()
+    if not sistema_nome:
+        sistema_nome, tipo_detectado = sistema_da_aba(aba_destino)
+    eventos.emitir('inicio', sistemas=[sistema_nome] if sistema_nome else [], arquivos_csv=1)
+    if not sistema_nome:
+        print(f"❌ Aba '{aba_destino}' não está configurada em nenhum sistema")
+        eventos.emitir('fim', sucessos=0, falhas=1, processados=1, linhas=0, duracao=0.0,
+                       erro=f"Aba desconhecida: {aba_destino}")
+        return {"sucesso": False, "linhas": 0, "arquivos": [], "estouros": []}
+    
+    from src.core.google_sheets_base import GoogleSheetsBase
+    sheets = GoogleSheetsBase(id_planilha=planilhas_config()[sistema_nome]["id"])
+    inicio_perf = time.perf_counter()
+    resultado = processar_arquivo(sheets, sistema_nome, caminho_arquivo, aba_destino, tipo_detectado,
+                                  1, 1, orcamentos_latencia())
+    duracao_total = round(time.perf_counter() - inicio_perf, 3)
+    eventos.emitir('fim', sucessos=int(resultado["sucesso"]), falhas=int(not resultado["sucesso"]),
+                   processados=1, linhas=resultado["linhas"], duracao=duracao_total,
+                   estouros_orcamento=len(resultado["estouros"]))
     
-    # Configurar argumentos de linha de comando
+    try:
+        from src.core.historico_execucoes import HistoricoExecucoes
+        HistoricoExecucoes().registrar_execucao(
+            origem='pulso_boletim',
+            sucesso=resultado["sucesso"],
+            linhas=resultado["linhas"],
+            duracao=duracao_total,
+            etapas=resultado["arquivos"],
+            detalhes={'sistemas': [sistema_nome], 'arquivo': caminho_arquivo,
+                      'estouros_orcamento': [e['mensagem'] for e in resultado["estouros"]]}
+        )
+    except Exception as e:
+        print(f"⚠️  Não foi possível gravar o histórico de execuções: {e}")
+    return resultado
+
+def criar_parser():
+    """Argumentos de linha de comando (também usados pela execução dentro da interface)"""
     parser = argparse.ArgumentParser(
         description='🚀 Automação Principal Leroy Merlin',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -237,6 +414,10 @@ def main():
   python main.py --salesforce       # Só Salesforce
   python main.py --produtividade    # Só Produtividade
   python main.py --dados ./csvs     # Especifica pasta de dados
+  python main.py --profile=mem      # Perfil de memória por sistema/arquivo
+  python main.py --eventos run.jsonl # Eventos JSON lines para as interfaces
+  python main.py --dry-run          # Só mostra o plano de envio (sem conectar)
+  python main.py --observar         # Fica observando data/ e envia cada CSV novo
         """
     )
     
@@ -250,8 +431,98 @@ def main():
                        help='Pasta onde estão os arquivos CSV')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Modo detalhado')
+    parser.add_argument('--profile', nargs='?', const='cpu', choices=MODOS_PERFIL,
+                       help='Perfila cada sistema, arquivo e etapa (cpu, mem, rss ou completo; default: cpu)')
+    parser.add_argument('--eventos', type=str, metavar='ARQUIVO',
+                       help='Grava progresso e resultados em JSON lines neste arquivo')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Mostra para qual aba cada CSV iria, sem conectar nem enviar')
+    parser.add_argument('--observar', action='store_true',
+                       help='Observa a pasta data/ e envia cada CSV novo assim que termina de ser gravado')
+    return parser
+
+def main():
+    """Função principal"""
+    args = criar_parser().parse_args()
+    
+    if args.eventos:
+        eventos.abrir_canal(args.eventos)
+    
+    try:
+        if args.observar:
+            observar(args)
+        else:
+            executar_com_perfil(args)
+    finally:
+        eventos.fechar_canal()
+
+def executar_com_perfil(args):
+    """Executa a automação, perfilada se --profile foi informado"""
+    modo_perfil = args.profile or modo_perfil_ambiente()
+    if modo_perfil:
+        perfilador = ativar_perfilador(modo_perfil)
+        print(f"🔬 Perfil ({modo_perfil}) ativado: {perfilador.pasta_execucao}")
+        try:
+            executar(args)
+        finally:
+            print(f"\n🔬 Perfil salvo em: {finalizar_perfilador()}")
+    else:
+        executar(args)
+
+def observar(args):
+    """Modo --observar: cada CSV novo em data/ é classificado e enviado assim que estabiliza"""
+    import queue
+    import threading
+    from src.core.observador_dados import ObservadorDados
+    
+    sistemas = [s for s in SISTEMAS if getattr(args, s)] or list(SISTEMAS)
+    _, data_dir = buscar_arquivos_csv()
+    fila_envio = queue.Queue()
+    
+    def ao_detectar(caminho):
+        nome_arquivo = os.path.basename(caminho)
+        # Só a entrada deste arquivo é atualizada no índice de data/
+        indice_dados().atualizar_arquivo(caminho)
+        sistema_nome, aba_destino, tipo_detectado = classificar_arquivo(nome_arquivo, sistemas)
+        if not aba_destino:
+            print(f"⚠️  IGNORADO: {nome_arquivo} (nenhuma regra de detecção para {' + '.join(sistemas).upper()})")
+            return
+        print(f"📥 Novo arquivo: {nome_arquivo} → {aba_destino} ({tipo_detectado})")
+        fila_envio.put((caminho, aba_destino, sistema_nome, tipo_detectado))
     
-    args = parser.parse_args()
+    observador = ObservadorDados(data_dir, ao_detectar)
+    # CSVs que já estavam na pasta não são reenviados
+    observador.marcar_existentes()
+    threading.Thread(target=observador.executar, daemon=True).start()
+    
+    print("👀 MODO OBSERVAR")
+    print(f"📁 Pasta de dados: {data_dir}")
+    if observador.modo == 'watchdog':
+        print("🔎 Detecção: eventos do sistema de arquivos (watchdog)")
+    else:
+        print(f"🔎 Detecção: varredura a cada {observador.intervalo:.0f}s (instale watchdog para eventos)")
+    print(f"🎯 Sistemas: {' + '.join(sistemas).upper()}")
+    print("⏹️  Ctrl+C para sair")
+    
+    try:
+        while True:
+            try:
+                caminho, aba_destino, sistema_nome, tipo_detectado = fila_envio.get(timeout=1)
+            except queue.Empty:
+                continue
+            processar_arquivo_avulso(caminho, aba_destino, sistema_nome, tipo_detectado)
+    except KeyboardInterrupt:
+        print("\n🛑 Observação encerrada")
+    finally:
+        observador.parar()
+
+def executar(args):
+    """Executa a automação com os argumentos já interpretados"""
+    from src.core.classificador_arquivos import recarregar_assinaturas
+    from src.core.indice_dados import descartar_indices
+    descartar_config_planilhas()
+    descartar_indices()
+    recarregar_assinaturas()
     
     # Header principal
     timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
@@ -286,22 +557,52 @@ def main():
     else:
         print("🎯 Executando: GENESYS + SALESFORCE + PRODUTIVIDADE")
     
+    sistemas_execucao = [nome for nome, executar_sistema in (
+        ("genesys", executar_genesys),
+        ("salesforce", executar_salesforce),
+        ("produtividade", executar_produtividade),
+    ) if executar_sistema]
+    
     # Verificar arquivos disponíveis
     arquivos_csv, data_dir = buscar_arquivos_csv()
     print(f"📁 Pasta de dados: {data_dir}")
     print(f"📄 Arquivos CSV encontrados: {len(arquivos_csv)}")
+    eventos.emitir('inicio', sistemas=sistemas_execucao, pasta_dados=data_dir, arquivos_csv=len(arquivos_csv))
     
     if not arquivos_csv:
         print(f"❌ Nenhum arquivo CSV encontrado em: {data_dir}")
         print("💡 Adicione arquivos CSV na pasta data/ e execute novamente")
+        eventos.emitir('fim', sucessos=0, falhas=0, processados=0, linhas=0, duracao=0.0,
+                       erro="Nenhum arquivo CSV encontrado")
+        return
+    
+    if args.dry_run:
+        mostrar_plano_envio(sistemas_execucao)
+        eventos.emitir('fim', sucessos=0, falhas=0, processados=0, linhas=0, duracao=0.0, dry_run=True)
         return
     
     # Executar processamentos
     inicio_processamento = datetime.now()
+    inicio_perf = time.perf_counter()
+    
+    resultados_sistemas = {}
+    for sistema_nome in ("genesys", "salesforce", "produtividade"):
+        if sistema_nome not in sistemas_execucao:
+            resultados_sistemas[sistema_nome] = processar_sistema(sistema_nome, False)
+            continue
+        eventos.emitir('sistema_inicio', sistema=sistema_nome)
+        inicio_sistema = time.perf_counter()
+        with etapa(sistema_nome):
+            resultados_sistemas[sistema_nome] = processar_sistema(sistema_nome, True)
+        resultado_sistema = resultados_sistemas[sistema_nome]
+        eventos.emitir('sistema_fim', sistema=sistema_nome,
+                       duracao=round(time.perf_counter() - inicio_sistema, 3),
+                       sucessos=resultado_sistema["sucessos"], falhas=resultado_sistema["falhas"],
+                       processados=resultado_sistema["processados"], linhas=resultado_sistema["linhas"])
     
-    resultado_genesys = processar_sistema("genesys", executar_genesys)
-    resultado_salesforce = processar_sistema("salesforce", executar_salesforce)
-    resultado_produtividade = processar_sistema("produtividade", executar_produtividade)
+    resultado_genesys = resultados_sistemas["genesys"]
+    resultado_salesforce = resultados_sistemas["salesforce"]
+    resultado_produtividade = resultados_sistemas["produtividade"]
     
     fim_processamento = datetime.now()
     duracao = fim_processamento - inicio_processamento
@@ -319,6 +620,40 @@ def main():
     total_sucessos = resultado_genesys["sucessos"] + resultado_salesforce["sucessos"] + resultado_produtividade["sucessos"]
     total_falhas = resultado_genesys["falhas"] + resultado_salesforce["falhas"] + resultado_produtividade["falhas"]
     total_processados = resultado_genesys["processados"] + resultado_salesforce["processados"] + resultado_produtividade["processados"]
+    total_linhas = resultado_genesys["linhas"] + resultado_salesforce["linhas"] + resultado_produtividade["linhas"]
+    
+    duracao_total = round(time.perf_counter() - inicio_perf, 3)
+    estouros = [e for r in resultados_sistemas.values() for e in r["estouros"]]
+    
+    eventos.emitir('fim', sucessos=total_sucessos, falhas=total_falhas, processados=total_processados,
+                   linhas=total_linhas, duracao=duracao_total, estouros_orcamento=len(estouros))
+    
+    # Histórico de execuções (SQLite) - base para p50/p95 e tendências nas interfaces
+    try:
+        from src.core.historico_execucoes import HistoricoExecucoes
+        historico = HistoricoExecucoes()
+        historico.registrar_execucao(
+            origem='pulso_boletim',
+            sucesso=total_falhas == 0,
+            linhas=total_linhas,
+            duracao=duracao_total,
+            etapas=[a for r in resultados_sistemas.values() for a in r["arquivos"]],
+            detalhes={'sistemas': sistemas_execucao,
+                      'estouros_orcamento': [e['mensagem'] for e in estouros]}
+        )
+    except Exception as e:
+        historico = None
+        print(f"⚠️  Não foi possível gravar o histórico de execuções: {e}")
+    
+    if estouros:
+        print(f"\n🐢 ORÇAMENTOS DE LATÊNCIA ESTOURADOS: {len(estouros)}")
+        for estouro in estouros:
+            print(f"   ⚠️  {estouro['mensagem']}")
+            if historico:
+                # Tendência: o p95 da etapa nos últimos 7 dias também passa do orçamento?
+                p95 = historico.estatisticas(base=estouro['base'], dias=7, etapa=estouro['etapa'])['duracao_p95']
+                if p95 is not None and p95 > estouro['orcamento']:
+                    print(f"      📈 p95 dos últimos 7 dias: {p95:.1f}s (tendência acima do orçamento)")
     
     if executar_genesys:
         print(f"📊 GENESYS:")
@@ -352,9 +687,9 @@ def main():
     if total_sucessos > 0:
         print(f"\n🔗 ACESSE AS PLANILHAS ATUALIZADAS:")
         if executar_genesys and resultado_genesys["sucessos"] > 0:
-            print(f"   📊 Genesys: https://docs.google.com/spreadsheets/d/{PLANILHAS_CONFIG['genesys']['id']}")
+            print(f"   📊 Genesys: https://docs.google.com/spreadsheets/d/{planilhas_config()['genesys']['id']}")
         if executar_salesforce and resultado_salesforce["sucessos"] > 0:
-            print(f"   💼 Salesforce: https://docs.google.com/spreadsheets/d/{PLANILHAS_CONFIG['salesforce']['id']}")
+            print(f"   💼 Salesforce: https://docs.google.com/spreadsheets/d/{planilhas_config()['salesforce']['id']}")
     
     print(f"\n✨ Automação concluída! Primeira linha de cada inserção está pintada de VERDE LEROY MERLIN 🟢")
     print("=" * 80)
@@ -11,11 +11,12 @@
 """
 
 import os
-import re
 import shutil
 from datetime import datetime
 import json
 
+from src.core.classificador_arquivos import NOMES_PADRONIZADOS, tipo_do_caminho
+
 class RenomeadorInteligente:
     """Classe para renomeação inteligente de arquivos CSV"""
     
@@ -26,54 +27,8 @@ def __init__(self, pasta_dados="data"):
         self.padroes_renomeacao = self.definir_padroes()
         
     def definir_padroes(self):
-        """Define padrões de renomeação para cada tipo de arquivo"""
-        return {
-            # POWER BI - Padrão para Filas Genesys (vários formatos possíveis)
-            r'.*filas.*genesys.*todas.*filas.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
-            r'.*filas.*genesys.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
-            r'.*genesys.*filas.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
-            r'^filas\s*genesys\.csv$': 'Filas Genesys - Todas as Filas .csv',  # "Filas genesys.csv"
-            r'^fila\s*genesys\.csv$': 'Filas Genesys - Todas as Filas .csv',   # "Fila genesys.csv"
-            
-            # POWER BI - Padrão para Autoserviço (vários formatos possíveis)
-            r'.*autoservi[cç]o.*power\s*bi.*\.csv$': 'Autoserviço Power BI.csv',
-            r'.*autoservi[cç]o.*powerbi.*\.csv$': 'Autoserviço Power BI.csv',
-            r'.*auto.*servi[cç]o.*\.csv$': 'Autoserviço Power BI.csv',
-            r'^autoservi[cç]o\s*-.*\.csv$': 'Autoserviço Power BI.csv',
-            r'^autoservi[cç]o.*\.csv$': 'Autoserviço Power BI.csv',
-            
-            # SALESFORCE - Padrões
-            r'.*criado.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_CRIADO.csv',
-            r'.*resolvid[oa].*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_RESOLVIDO.csv',
-            r'.*comentario.*bko.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
-            r'cópia de.*comentario.*bko.*\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
-            r'.*seller.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_SELLER.csv',
-            
-            # GENESYS - Padrões  
-            r'.*voz.*hc.*\.csv$': 'BASE_GENESYS_VOZ_HC.csv',
-            r'.*texto.*hc.*\.csv$': 'BASE_GENESYS_TEXTO_HC.csv',
-            r'.*gestão.*entrega.*n1.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_N1_HC.csv',
-            r'.*gestao.*entrega.*n1.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_N1_HC.csv',
-            r'.*gestão.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
-            r'.*gestao.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
-            r'.*fila.*hc.*\.csv$': 'BASE_GENESYS_FILA_HC.csv',
-            
-            # PRODUTIVIDADE - Padrões (mais específicos primeiro)
-            r'.*base.*tempo.*visão.*produtiva.*\.csv$': 'BASE_TEMPO.csv',
-            r'.*base\s*-\s*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
-            r'.*base.*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
-            r'.*tempo.*visão.*produtiva.*\.csv$': 'BASE_TEMPO.csv',
-            r'.*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
-            
-            # Padrões genéricos (fallback)
-            r'.*criado.*\.csv$': 'BASE_SALESFORCE_CRIADO.csv',
-            r'.*resolvid[oa].*\.csv$': 'BASE_SALESFORCE_RESOLVIDO.csv',
-            r'.*comentario.*\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
-            r'.*voz.*\.csv$': 'BASE_GENESYS_VOZ_HC.csv',
-            r'.*texto.*\.csv$': 'BASE_GENESYS_TEXTO_HC.csv',
-            r'.*gestão.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
-            r'.*gestao.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
-        }
+        """Define o nome padronizado de cada tipo de arquivo (regras em src/core/classificador_arquivos.py)"""
+        return dict(NOMES_PADRONIZADOS)
     
     def salvar_historico(self, renomeacoes):
         """Salva histórico das renomeações"""
@@ -107,15 +62,10 @@ def salvar_historico(self, renomeacoes):
             print(f"⚠️ Não foi possível salvar histórico: {e}")
     
     def detectar_tipo_arquivo(self, nome_arquivo):
-        """Detecta o tipo do arquivo baseado no nome"""
-        nome_lower = nome_arquivo.lower()
-        
-        # Testar cada padrão
-        for padrao, novo_nome in self.padroes_renomeacao.items():
-            if re.match(padrao, nome_lower):
-                return novo_nome
-        
-        return None
+        """Detecta o tipo do arquivo pelo cabeçalho (assinaturas configuradas) ou pelo nome"""
+        # Uma passada da expressão compilada com as regras do renomeador (resultado memorizado por nome)
+        caminho = os.path.join(self.pasta_dados, nome_arquivo)
+        return self.padroes_renomeacao.get(tipo_do_caminho(caminho, 'renomeador'))
     
     def listar_arquivos_csv(self):
         """Lista todos os arquivos CSV na pasta"""
@@ -28,13 +28,13 @@
 root_dir = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.insert(0, root_dir)
 
-from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+from scripts.gerenciador_planilhas import obter_gerenciador
 
 class AtualizadorPlanilhas:
     """Utilitário para atualização mensal das planilhas"""
     
     def __init__(self):
-        self.gp = GerenciadorPlanilhas()
+        self.gp = obter_gerenciador()
         self.backup_dir = os.path.join(root_dir, 'config', 'backups')
         
         # Criar diretório de backup se não existir
@@ -87,8 +87,8 @@ def restaurar_backup(self, caminho_backup: str) -> bool:
             # Restaurar backup
             shutil.copy2(caminho_backup, self.gp.caminho_config)
             
-            # Recarregar configurações
-            self.gp = GerenciadorPlanilhas()
+            # Recarregar configurações (copy2 preserva o mtime do backup)
+            self.gp.recarregar()
             
             print(f"✅ Backup restaurado: {os.path.basename(caminho_backup)}")
             return True
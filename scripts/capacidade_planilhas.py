@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📏 CAPACIDADE DAS PLANILHAS
+Mostra quantas células cada planilha do gerenciador usa (limite do Google Sheets:
+10 milhões), a data de lotação projetada pelo histórico e, com --arquivar, move as
+linhas antigas das abas registradas em 'capacidade' do planilhas_config.json para o
+arquivo quando a planilha passou do limite de arquivamento.
+
+Uso:
+    python scripts/capacidade_planilhas.py                        # Relatório de todas as planilhas
+    python scripts/capacidade_planilhas.py genesys_boletim        # Uma planilha
+    python scripts/capacidade_planilhas.py --arquivar             # Arquiva as que passaram do limite
+    python scripts/capacidade_planilhas.py --arquivar --forcar    # Arquiva mesmo abaixo do limite
+"""
+
+import os
+import sys
+import argparse
+
+# Adicionar diretório raiz ao path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.insert(0, root_dir)
+
+from scripts.gerenciador_planilhas import obter_gerenciador
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.historico_execucoes import HistoricoExecucoes
+from src.core.capacidade_planilhas import descrever_capacidade, verificar_capacidade
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Capacidade das planilhas e arquivamento de linhas antigas')
+    parser.add_argument('planilhas', nargs='*',
+                        help='Chaves das planilhas no gerenciador (vazio = todas)')
+    parser.add_argument('--arquivar', action='store_true',
+                        help='Arquiva as abas registradas das planilhas acima do limite de arquivamento')
+    parser.add_argument('--forcar', action='store_true',
+                        help='Com --arquivar, arquiva mesmo abaixo do limite')
+    return parser
+
+
+def main():
+    args = criar_parser().parse_args()
+    gerenciador = obter_gerenciador()
+    chaves = args.planilhas or list(gerenciador.listar_planilhas())
+    config = gerenciador.obter_capacidade()
+    historico = HistoricoExecucoes()
+
+    print("📏 CAPACIDADE DAS PLANILHAS" + ("" if args.arquivar else " (relatório - use --arquivar para arquivar)"))
+    print("=" * 70)
+    for chave in chaves:
+        info = gerenciador.obter_info_planilha(chave)
+        if not info:
+            print(f"⚠️  Planilha '{chave}' não encontrada no gerenciador")
+            continue
+        configuracao = dict(config, arquivar=0.0) if args.forcar else config
+        try:
+            sheets = GoogleSheetsBase(id_planilha=info['id'])
+            abas = sheets.abrir_planilha().worksheets()
+            resultado = verificar_capacidade(sheets, abas, info.get('nome', chave), historico,
+                                             configuracao, arquivar=args.arquivar)
+        except Exception as e:
+            print(f"❌ {info.get('nome', chave)}: {e}")
+            continue
+        print(descrever_capacidade(resultado))
+        maiores = sorted(resultado['abas'].items(), key=lambda item: item[1], reverse=True)[:3]
+        for titulo, celulas in maiores:
+            print(f"   📄 {titulo}: {celulas:,} células")
+
+    print("\n" + "=" * 70)
+    if not args.arquivar:
+        print("💡 Nada foi alterado. Rode com --arquivar para mover as linhas antigas das abas registradas.")
+
+
+if __name__ == "__main__":
+    main()
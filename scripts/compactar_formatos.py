@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧹 COMPACTAÇÃO DE FORMATOS DAS ABAS BASE
+Os destaques por célula de cada envio antigo (verde nas BASES, amarelo no Power BI)
+nunca são limpos; com o tempo a aba acumula milhares de trechos de formatação e fica
+lenta para abrir, recalcular e escrever. Este comando troca o histórico por um estilo
+uniforme (poucos repeatCell por aba) mantendo só o último lote destacado, e informa a
+redução. Sem --aplicar, só mostra o relatório.
+
+Uso:
+    python scripts/compactar_formatos.py                          # Relatório de todas as planilhas
+    python scripts/compactar_formatos.py genesys_boletim --aplicar # Compacta uma planilha
+    python scripts/compactar_formatos.py --aba "BASE VOZ" --aplicar
+    python scripts/compactar_formatos.py --sem-destaque --aplicar  # Não mantém o último lote destacado
+"""
+
+import os
+import sys
+import argparse
+
+# Adicionar diretório raiz ao path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.insert(0, root_dir)
+
+from scripts.gerenciador_planilhas import obter_gerenciador
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.compactacao_formatos import compactar_planilha
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Compacta a formatação acumulada das abas BASE')
+    parser.add_argument('planilhas', nargs='*',
+                        help='Chaves das planilhas no gerenciador (vazio = todas)')
+    parser.add_argument('--aba', action='append', metavar='NOME',
+                        help='Compacta só esta aba (pode repetir)')
+    parser.add_argument('--aplicar', action='store_true',
+                        help='Aplica a compactação (sem isso, só mostra o relatório)')
+    parser.add_argument('--sem-destaque', action='store_true',
+                        help='Não mantém o último lote destacado')
+    return parser
+
+
+def main():
+    args = criar_parser().parse_args()
+    gerenciador = obter_gerenciador()
+    chaves = args.planilhas or list(gerenciador.listar_planilhas())
+
+    print("🧹 COMPACTAÇÃO DE FORMATOS" + ("" if args.aplicar else " (relatório - use --aplicar para compactar)"))
+    print("=" * 70)
+    total_antes = total_depois = 0
+    for chave in chaves:
+        info = gerenciador.obter_info_planilha(chave)
+        if not info:
+            print(f"⚠️  Planilha '{chave}' não encontrada no gerenciador")
+            continue
+        abas = args.aba or list(info.get('abas', {}).values())
+        print(f"\n📊 {info.get('nome', chave)}")
+        try:
+            sheets = GoogleSheetsBase(id_planilha=info['id'])
+            relatorio = compactar_planilha(sheets, abas, aplicar=args.aplicar,
+                                           manter_ultimo=not args.sem_destaque)
+        except Exception as e:
+            print(f"   ❌ Erro: {e}")
+            continue
+        if not relatorio:
+            print("   ⚠️  Nenhuma das abas encontrada")
+        for item in relatorio:
+            total_antes += item['trechos_antes']
+            total_depois += item['trechos_depois']
+            lote = item['ultimo_lote']
+            if lote:
+                destaque = f"último lote {lote[0]}-{lote[1]}"
+            else:
+                destaque = ("destaque condicional intacto" if sheets.modo_destaque(item['aba']) == 'condicional'
+                            else "sem destaque")
+            enviado = f", {item['requisicoes']} requisição(ões)" if 'requisicoes' in item else ""
+            print(f"   📄 {item['aba']}: {item['trechos_antes']:,} → {item['trechos_depois']} trechos "
+                  f"({destaque}{enviado})")
+
+    print("\n" + "=" * 70)
+    reducao = (1 - total_depois / total_antes) * 100 if total_antes else 0.0
+    print(f"📉 Trechos de formatação: {total_antes:,} → {total_depois:,} ({reducao:.0f}% a menos)")
+    if not args.aplicar:
+        print("💡 Nada foi alterado. Rode com --aplicar para compactar.")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,10 @@
 - Interface de linha de comando para atualizações
 
 Uso:
-    from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+    from scripts.gerenciador_planilhas import obter_gerenciador
     
-    # Obter ID de uma planilha
-    gp = GerenciadorPlanilhas()
+    # Obter ID de uma planilha (instância compartilhada no processo)
+    gp = obter_gerenciador()
     id_genesys = gp.obter_id('genesys_boletim')
     
     # Atualizar ID via código
@@ -27,8 +27,15 @@
 import json
 import os
 import sys
+import threading
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+
+# Detectar automaticamente o caminho - arquivo agora está na pasta json/
+# Como estamos em scripts/, precisamos subir um nível para chegar na raiz
+CAMINHO_CONFIG_PADRAO = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'json', 'planilhas_config.json'
+)
 
 class GerenciadorPlanilhas:
     """Gerenciador centralizado de configurações de planilhas"""
@@ -37,47 +44,95 @@ def __init__(self, caminho_config: str = None):
         """
         Inicializa o gerenciador
         
+        Prefira obter_gerenciador(), que reaproveita a mesma instância no processo
+        
         Args:
             caminho_config: Caminho para o arquivo de configuração
         """
-        if caminho_config is None:
-            # Detectar automaticamente o caminho - arquivo agora está na pasta json/
-            # Como estamos em scripts/, precisamos subir um nível para chegar na raiz
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            self.caminho_config = os.path.join(project_root, 'json', 'planilhas_config.json')
-        else:
-            self.caminho_config = caminho_config
-            
+        self.caminho_config = caminho_config or CAMINHO_CONFIG_PADRAO
+        self._trava = threading.RLock()
+        self._mtime: Optional[int] = None
+        self._indice: Dict[str, Tuple[Optional[str], Dict[str, str]]] = {}
         self.config = self._carregar_config()
         
+    def _ler_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.caminho_config).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _indexar(self):
+        """Índice chave -> (id, abas) para consultas sem percorrer a configuração"""
+        self._indice = {
+            chave: (info.get('id'), info.get('abas', {}))
+            for chave, info in self.config.get('planilhas', {}).items()
+        }
+    
     def _carregar_config(self) -> Dict[str, Any]:
         """Carrega a configuração do arquivo JSON"""
-        try:
-            if not os.path.exists(self.caminho_config):
-                raise FileNotFoundError(f"Arquivo de configuração não encontrado: {self.caminho_config}")
-            
-            with open(self.caminho_config, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+        with self._trava:
+            try:
+                if not os.path.exists(self.caminho_config):
+                    raise FileNotFoundError(f"Arquivo de configuração não encontrado: {self.caminho_config}")
                 
-            print(f"✅ Configuração carregada: {len(config.get('planilhas', {}))} planilhas")
-            return config
+                mtime = self._ler_mtime()
+                with open(self.caminho_config, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                    
+                print(f"✅ Configuração carregada: {len(config.get('planilhas', {}))} planilhas")
+                self._mtime = mtime
+                
+            except Exception as e:
+                print(f"❌ Erro ao carregar configuração: {e}")
+                anterior = getattr(self, 'config', None)
+                if anterior is not None:
+                    # Releitura falhou (ex.: arquivo ainda sendo gravado): mantém a última
+                    # configuração válida e o mtime antigo, para tentar de novo depois
+                    print("   ↩️ Mantendo a última configuração carregada")
+                    return anterior
+                config = {"planilhas": {}, "historico_mudancas": []}
             
-        except Exception as e:
-            print(f"❌ Erro ao carregar configuração: {e}")
-            return {"planilhas": {}, "historico_mudancas": []}
+            self.config = config
+            self._indexar()
+            return config
+    
+    def recarregar(self) -> Dict[str, Any]:
+        """Força a releitura do JSON (ex.: após restaurar um backup com copy2)"""
+        return self._carregar_config()
+    
+    def recarregar_se_alterado(self) -> bool:
+        """
+        Relê o JSON só se o arquivo mudou desde a última leitura (mtime)
+        
+        Returns:
+            bool: True se a configuração foi recarregada
+        """
+        mtime = self._ler_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        with self._trava:
+            if mtime == self._mtime:
+                return False
+            self._carregar_config()
+            # Leitura falha não avança o mtime: False e nova tentativa na próxima consulta
+            return self._mtime == mtime
     
     def _salvar_config(self) -> bool:
         """Salva a configuração no arquivo JSON"""
-        try:
-            with open(self.caminho_config, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Configuração salva em: {self.caminho_config}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao salvar configuração: {e}")
-            return False
+        with self._trava:
+            try:
+                with open(self.caminho_config, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, indent=2, ensure_ascii=False)
+                
+                # O arquivo gravado já é o estado em memória: não precisa reler
+                self._mtime = self._ler_mtime()
+                self._indexar()
+                print(f"✅ Configuração salva em: {self.caminho_config}")
+                return True
+                
+            except Exception as e:
+                print(f"❌ Erro ao salvar configuração: {e}")
+                return False
     
     def obter_id(self, chave_planilha: str) -> Optional[str]:
         """
@@ -89,9 +144,8 @@ def obter_id(self, chave_planilha: str) -> Optional[str]:
         Returns:
             str: ID da planilha ou None se não encontrada
         """
-        planilha = self.config.get('planilhas', {}).get(chave_planilha)
-        if planilha:
-            return planilha.get('id')
+        if chave_planilha in self._indice:
+            return self._indice[chave_planilha][0]
         
         print(f"⚠️  Planilha '{chave_planilha}' não encontrada")
         return None
@@ -106,9 +160,8 @@ def obter_abas(self, chave_planilha: str) -> Dict[str, str]:
         Returns:
             dict: Mapeamento de abas
         """
-        planilha = self.config.get('planilhas', {}).get(chave_planilha)
-        if planilha:
-            return planilha.get('abas', {})
+        if chave_planilha in self._indice:
+            return self._indice[chave_planilha][1]
         
         print(f"⚠️  Abas da planilha '{chave_planilha}' não encontradas")
         return {}
@@ -124,7 +177,62 @@ def obter_info_planilha(self, chave_planilha: str) -> Optional[Dict[str, Any]]:
             dict: Informações da planilha
         """
         return self.config.get('planilhas', {}).get(chave_planilha)
-    
+
+    def obter_orcamentos_latencia(self) -> Dict[str, Any]:
+        """
+        Obtém os orçamentos de latência (segundos por etapa)
+
+        Returns:
+            dict: {'padrao': {etapa: segundos}, 'bases': {aba: {etapa: segundos}}}
+        """
+        return self.config.get('orcamentos_latencia', {})
+
+    def obter_assinaturas_cabecalho(self) -> Dict[str, Any]:
+        """
+        Obtém as assinaturas de cabeçalho usadas para reconhecer CSVs pelo conteúdo
+
+        Returns:
+            dict: {'bases': {tipo: [colunas obrigatórias]}}
+        """
+        return self.config.get('assinaturas_cabecalho', {})
+
+    def obter_colunas_derivadas(self) -> Dict[str, Any]:
+        """
+        Obtém o modo das colunas derivadas (FORMULAS_CONFIG) por base
+
+        Returns:
+            dict: {'padrao': 'formula' | 'materializada', 'bases': {aba: modo}}
+        """
+        return self.config.get('colunas_derivadas', {})
+
+    def obter_destaque(self) -> Dict[str, Any]:
+        """
+        Obtém o modo de destaque das linhas novas por base
+
+        Returns:
+            dict: {'padrao': 'celulas' | 'condicional', 'bases': {aba: modo}}
+        """
+        return self.config.get('destaque', {})
+
+    def obter_capacidade(self) -> Dict[str, Any]:
+        """
+        Obtém os limites de capacidade e as regras de arquivamento por aba
+
+        Returns:
+            dict: {'limite_celulas', 'aviso', 'arquivar', 'bases': {aba: {'planilha_arquivo',
+                   'aba_arquivo', 'coluna_data', 'meses'}}}
+        """
+        return self.config.get('capacidade', {})
+
+    def obter_particoes(self) -> Dict[str, Any]:
+        """
+        Obtém as bases gravadas em abas particionadas por período
+
+        Returns:
+            dict: {'bases': {aba: {'periodo', 'coluna_data', 'modelo', 'visao'}}}
+        """
+        return self.config.get('particoes', {})
+
     def listar_planilhas(self) -> Dict[str, str]:
         """
         Lista todas as planilhas disponíveis
@@ -351,6 +459,28 @@ def imprimir_status(self):
         print("="*80)
 
 
+# Uma instância por arquivo de configuração, compartilhada pelo processo
+_instancias: Dict[str, GerenciadorPlanilhas] = {}
+_trava_instancias = threading.Lock()
+
+
+def obter_gerenciador(caminho_config: str = None) -> GerenciadorPlanilhas:
+    """
+    Retorna o gerenciador compartilhado (thread-safe), criando-o no primeiro uso
+    
+    A configuração fica em memória e só é relida quando o mtime do JSON muda;
+    obter_id/obter_abas são consultas ao índice, sem acesso ao disco.
+    """
+    caminho = os.path.abspath(caminho_config or CAMINHO_CONFIG_PADRAO)
+    with _trava_instancias:
+        gp = _instancias.get(caminho)
+        if gp is None:
+            gp = _instancias[caminho] = GerenciadorPlanilhas(caminho)
+            return gp
+    gp.recarregar_se_alterado()
+    return gp
+
+
 def main():
     """Interface de linha de comando"""
     import argparse
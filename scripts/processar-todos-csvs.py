@@ -13,25 +13,21 @@
 
 from src.core.google_sheets_base import GoogleSheetsBase
 
-def detectar_tipo_arquivo(nome_arquivo):
-    """Detecta o tipo do arquivo baseado no nome"""
-    nome_lower = nome_arquivo.lower()
-    
-    if 'voz' in nome_lower and 'hc' in nome_lower:
-        return 'BASE VOZ', 'VOZ HC'
-    elif 'texto' in nome_lower and 'hc' in nome_lower:
-        return 'BASE TEXTO', 'TEXTO HC'
-    elif 'gestão' in nome_lower or 'gestao' in nome_lower:
-        if 'n1' in nome_lower:
-            return 'BASE GE COLABORADOR', 'GESTÃO N1'  # Corrigido para BASE GE COLABORADOR
-        else:
-            return 'BASE GE COLABORADOR', 'GESTÃO'
-    elif 'fila' in nome_lower:
-        return 'BASE GE FILA', 'FILA'
-    elif 'colaborador' in nome_lower or 'colab' in nome_lower:
-        return 'BASE GE COLABORADOR', 'COLABORADOR'
-    else:
-        return None, None
+from src.core.classificador_arquivos import tipo_do_caminho
+
+# Tipo detectado (classificador compartilhado) -> (aba, tipo) da planilha Genesys
+ABAS_POR_TIPO = {
+    'genesys_voz_hc': ('BASE VOZ', 'VOZ HC'),
+    'genesys_texto_hc': ('BASE TEXTO', 'TEXTO HC'),
+    'genesys_gestao_n1': ('BASE GE COLABORADOR', 'GESTÃO N1'),
+    'genesys_gestao': ('BASE GE COLABORADOR', 'GESTÃO'),
+    'genesys_fila': ('BASE GE FILA', 'FILA'),
+    'genesys_colaborador': ('BASE GE COLABORADOR', 'COLABORADOR'),
+}
+
+def detectar_tipo_arquivo(caminho_arquivo):
+    """Detecta o tipo do arquivo pelo cabeçalho (assinaturas configuradas) ou pelo nome"""
+    return ABAS_POR_TIPO.get(tipo_do_caminho(caminho_arquivo, 'processar_csvs'), (None, None))
 
 def main():
     print("🚀 PROCESSAMENTO COMPLETO - TODOS OS ARQUIVOS CSV")
@@ -87,7 +83,7 @@ def main():
             print(f"📤 Processando: {arquivo}")
             
             # Detectar tipo e aba de destino
-            aba_destino, tipo_detectado = detectar_tipo_arquivo(arquivo)
+            aba_destino, tipo_detectado = detectar_tipo_arquivo(os.path.join(data_dir, arquivo))
             
             if not aba_destino:
                 print(f"⚠️  Tipo não identificado para: {arquivo} - Pulando...")
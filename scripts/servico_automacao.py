@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🛰️ SERVIÇO DE AUTOMAÇÃO (processo residente)
+Mantém um processo aquecido - imports, configuração, credenciais, OAuth e
+metadados das planilhas/abas - e executa jobs recebidos por um socket local.
+
+- Jobs entram numa fila e rodam um por vez (pedidos de vários usuários são serializados)
+- Job igual a outro que ainda está na fila não é duplicado: o pedido recebe o job existente
+- Conexão só em 127.0.0.1, autenticada com chave (AUTOMACAO_SERVICO_CHAVE ou, sem ela, uma chave
+  aleatória gravada em ~/.automacao_servico/chave com permissão só do dono)
+- Pedidos e respostas trafegam como JSON (nunca pickle): um cliente não executa código no serviço
+
+Uso:
+    python scripts/servico_automacao.py iniciar                              # Sobe o serviço (primeiro plano)
+    python scripts/servico_automacao.py sistema genesys salesforce           # Job: rodar sistemas (vazio = todos)
+    python scripts/servico_automacao.py arquivo data/VOZ_HC.csv "BASE VOZ"   # Job: enviar arquivo X para a base Y
+    python scripts/servico_automacao.py sistema genesys --aguardar           # Espera o job terminar
+    python scripts/servico_automacao.py status [ID]                          # Situação da fila / de um job
+    python scripts/servico_automacao.py encerrar                             # Para o serviço
+"""
+
+import os
+import sys
+import argparse
+import getpass
+import json
+import queue
+import secrets
+import socket
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+
+# Adicionar diretório raiz ao path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.insert(0, root_dir)
+
+PORTA_PADRAO = 47651
+SISTEMAS = ("genesys", "salesforce", "produtividade")
+ESTADOS_FINAIS = ("concluido", "falhou")
+# Jobs concluídos mantidos para consulta de status
+MAX_JOBS_HISTORICO = 200
+
+
+def endereco_servico():
+    return ('127.0.0.1', int(os.environ.get('AUTOMACAO_SERVICO_PORTA', PORTA_PADRAO)))
+
+
+def caminho_chave():
+    return os.path.join(os.path.expanduser('~'), '.automacao_servico', 'chave')
+
+
+def chave_servico(criar=False):
+    """
+    Chave de autenticação: AUTOMACAO_SERVICO_CHAVE ou o arquivo de chave do usuário
+
+    Args:
+        criar: gera o arquivo (aleatório, permissão 0600) se ele não existir - usado por 'iniciar'
+
+    Raises:
+        PermissionError: sem chave configurada ou arquivo de chave legível por outros usuários
+    """
+    chave = os.environ.get('AUTOMACAO_SERVICO_CHAVE')
+    if chave:
+        return chave.encode('utf-8')
+
+    caminho = caminho_chave()
+    if criar and not os.path.exists(caminho):
+        os.makedirs(os.path.dirname(caminho), mode=0o700, exist_ok=True)
+        descritor = os.open(caminho, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(secrets.token_hex(32))
+        print(f"🔑 Chave do serviço criada em {caminho}")
+    if not os.path.exists(caminho):
+        raise PermissionError(f"Sem chave do serviço: defina AUTOMACAO_SERVICO_CHAVE ou inicie o serviço "
+                              f"com este usuário ({caminho})")
+    if os.name == 'posix' and os.stat(caminho).st_mode & 0o077:
+        raise PermissionError(f"Arquivo de chave acessível por outros usuários: {caminho} (use chmod 600)")
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return f.read().strip().encode('utf-8')
+
+
+def _enviar_json(conexao, dados):
+    conexao.send_bytes(json.dumps(dados, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def _receber_json(conexao):
+    """Lê um pedido/resposta JSON (recv_bytes não desserializa objetos Python, ao contrário de recv)"""
+    dados = json.loads(conexao.recv_bytes().decode('utf-8'))
+    if not isinstance(dados, dict):
+        raise ValueError("mensagem deve ser um objeto JSON")
+    return dados
+
+
+def normalizar_job(job):
+    """
+    Valida um job e calcula sua chave de deduplicação
+
+    Returns:
+        tuple: (job normalizado, chave)
+
+    Raises:
+        ValueError: job inválido
+    """
+    tipo = job.get('tipo')
+    if tipo == 'sistema':
+        pedidos = set(job.get('sistemas') or SISTEMAS)
+        desconhecidos = sorted(pedidos - set(SISTEMAS))
+        if desconhecidos:
+            raise ValueError(f"Sistema desconhecido: {', '.join(desconhecidos)}")
+        sistemas = [s for s in SISTEMAS if s in pedidos]
+        return {'tipo': 'sistema', 'sistemas': sistemas}, ('sistema', tuple(sistemas))
+    if tipo == 'arquivo':
+        arquivo, base = job.get('arquivo'), job.get('base')
+        if not arquivo or not base:
+            raise ValueError("Job 'arquivo' precisa de 'arquivo' e 'base'")
+        arquivo = os.path.abspath(arquivo)
+        if not os.path.exists(arquivo):
+            raise ValueError(f"Arquivo não encontrado: {arquivo}")
+        return {'tipo': 'arquivo', 'arquivo': arquivo, 'base': base}, ('arquivo', os.path.normcase(arquivo), base)
+    raise ValueError(f"Tipo de job desconhecido: {tipo}")
+
+
+def executar_job(job):
+    """Executa um job com o main.py deste processo, coletando os eventos da execução"""
+    import main
+    from src.core import eventos
+
+    fila_eventos = queue.Queue()
+    eventos.abrir_canal_fila(fila_eventos)
+    try:
+        if job['tipo'] == 'sistema':
+            main.executar(main.criar_parser().parse_args([f"--{s}" for s in job['sistemas']]))
+        else:
+            main.processar_arquivo_avulso(job['arquivo'], job['base'])
+    finally:
+        eventos.fechar_canal()
+
+    lista_eventos = []
+    while not fila_eventos.empty():
+        lista_eventos.append(fila_eventos.get_nowait())
+    fim = next((e for e in reversed(lista_eventos) if e['tipo'] == 'fim'), {})
+    return {
+        'sucesso': bool(fim) and not fim.get('falhas') and not fim.get('erro'),
+        'resumo': fim,
+        'arquivos': [e for e in lista_eventos if e['tipo'] == 'arquivo_fim'],
+    }
+
+
+class ServicoAutomacao:
+    """Fila de jobs + trabalhador único + atendimento de pedidos pelo socket local"""
+
+    def __init__(self, executor=executar_job):
+        self.executor = executor
+        self.jobs = {}
+        self._fila = deque()
+        self._condicao = threading.Condition()
+        self._contador = 0
+        self._ativo = True
+        self._listener = None
+
+    def enviar(self, job, usuario=None):
+        """Enfileira um job (ou devolve o igual que já está na fila)"""
+        job, chave = normalizar_job(job)
+        with self._condicao:
+            for id_job in self._fila:
+                if self.jobs[id_job]['chave'] == chave:
+                    return self._publico(self.jobs[id_job]), True
+
+            self._contador += 1
+            registro = {
+                'id': f"{self._contador:04d}", 'chave': chave, 'job': job, 'usuario': usuario,
+                'estado': 'na_fila', 'criado': datetime.now().isoformat(timespec='seconds'),
+                'inicio': None, 'fim': None, 'resultado': None, 'erro': None,
+            }
+            self.jobs[registro['id']] = registro
+            self._fila.append(registro['id'])
+            self._condicao.notify_all()
+            return self._publico(registro), False
+
+    def status(self, id_job=None):
+        with self._condicao:
+            if id_job is not None:
+                registro = self.jobs.get(id_job)
+                return self._publico(registro) if registro else None
+            return [self._publico(r) for r in self.jobs.values()]
+
+    def aguardar(self, id_job, timeout=None):
+        """Espera o job terminar (ou o timeout) e retorna sua situação"""
+        with self._condicao:
+            registro = self.jobs.get(id_job)
+            if registro is None:
+                return None
+            self._condicao.wait_for(lambda: registro['estado'] in ESTADOS_FINAIS, timeout=timeout)
+            return self._publico(registro)
+
+    def _publico(self, registro):
+        return {k: v for k, v in registro.items() if k != 'chave'}
+
+    def processar_proximo(self, timeout=None):
+        """Executa o próximo job da fila; retorna False se não havia job"""
+        with self._condicao:
+            if not self._condicao.wait_for(lambda: self._fila or not self._ativo, timeout=timeout) or not self._fila:
+                return False
+            registro = self.jobs[self._fila.popleft()]
+            registro['estado'] = 'executando'
+            registro['inicio'] = datetime.now().isoformat(timespec='seconds')
+            self._condicao.notify_all()
+
+        print(f"\n🛰️ Job {registro['id']} ({registro['usuario'] or '?'}): {registro['job']}")
+        try:
+            resultado, erro = self.executor(registro['job']), None
+        except Exception:
+            resultado, erro = None, traceback.format_exc()
+            print(f"❌ Job {registro['id']} falhou:\n{erro}")
+            from src.core.google_sheets_base import limpar_clientes_autorizados
+            limpar_clientes_autorizados()
+
+        with self._condicao:
+            registro['resultado'] = resultado
+            registro['erro'] = erro
+            registro['estado'] = 'concluido' if resultado and resultado.get('sucesso') else 'falhou'
+            registro['fim'] = datetime.now().isoformat(timespec='seconds')
+            self._limpar_historico()
+            self._condicao.notify_all()
+        print(f"{'✅' if registro['estado'] == 'concluido' else '❌'} Job {registro['id']}: {registro['estado']}")
+        return True
+
+    def _limpar_historico(self):
+        finalizados = [i for i, r in self.jobs.items() if r['estado'] in ESTADOS_FINAIS]
+        for id_job in finalizados[:max(0, len(finalizados) - MAX_JOBS_HISTORICO)]:
+            del self.jobs[id_job]
+
+    def atender(self, pedido):
+        """Responde a um pedido do cliente (dict -> dict)"""
+        acao = pedido.get('acao')
+        try:
+            if acao == 'enviar':
+                job, duplicado = self.enviar(pedido.get('job') or {}, pedido.get('usuario'))
+                return {'ok': True, 'job': job, 'duplicado': duplicado}
+            if acao == 'status':
+                return {'ok': True, 'status': self.status(pedido.get('id'))}
+            if acao == 'aguardar':
+                return {'ok': True, 'status': self.aguardar(pedido.get('id'), pedido.get('timeout'))}
+            if acao == 'encerrar':
+                # Encerrado por _atender_conexao depois de enviar a resposta
+                return {'ok': True}
+            return {'ok': False, 'erro': f"Ação desconhecida: {acao}"}
+        except ValueError as e:
+            return {'ok': False, 'erro': str(e)}
+
+    def aquecer(self):
+        """Carrega main.py, credenciais, OAuth e os metadados das planilhas configuradas"""
+        import main
+        from src.core.google_sheets_base import GoogleSheetsBase
+
+        print("🔥 Aquecendo: imports, configuração, credenciais e planilhas...")
+        for sistema_nome, config in main.planilhas_config().items():
+            try:
+                sheets = GoogleSheetsBase(id_planilha=config['id'])
+                planilha = sheets.abrir_planilha()
+                for aba, _ in config['deteccao'].values():
+                    try:
+                        sheets.abrir_aba(aba)
+                    except Exception:
+                        pass
+                print(f"   ✅ {config['nome']}: '{planilha.title}'")
+            except Exception as e:
+                print(f"   ⚠️  {sistema_nome}: {e}")
+
+    def servir(self, endereco=None, chave=None):
+        """Atende pedidos até 'encerrar' (bloqueia)"""
+        threading.Thread(target=self._trabalhar, daemon=True).start()
+        self._listener = Listener(endereco or endereco_servico(), authkey=chave or chave_servico(criar=True))
+        print(f"🛰️ Serviço de automação ouvindo em {self._listener.address[0]}:{self._listener.address[1]}")
+        try:
+            while self._ativo:
+                try:
+                    conexao = self._listener.accept()
+                except Exception as e:
+                    if self._ativo:
+                        print(f"⚠️  Conexão recusada: {e}")
+                    continue
+                if not self._ativo:
+                    conexao.close()
+                    break
+                threading.Thread(target=self._atender_conexao, args=(conexao,), daemon=True).start()
+        finally:
+            self._ativo = False
+            self._listener.close()
+        print("🛑 Serviço de automação encerrado")
+
+    def _atender_conexao(self, conexao):
+        with conexao:
+            try:
+                pedido = _receber_json(conexao)
+                _enviar_json(conexao, self.atender(pedido))
+            except (EOFError, OSError, ValueError):
+                return
+        if pedido.get('acao') == 'encerrar':
+            self.encerrar()
+
+    def _trabalhar(self):
+        while self._ativo:
+            self.processar_proximo(timeout=1)
+
+    def encerrar(self):
+        with self._condicao:
+            self._ativo = False
+            self._condicao.notify_all()
+        if self._listener is not None:
+            # Conexão local só para acordar o accept() bloqueado em servir()
+            try:
+                socket.create_connection(self._listener.address, timeout=1).close()
+            except OSError:
+                pass
+
+
+def enviar_pedido(pedido, endereco=None, chave=None):
+    """Envia um pedido ao serviço e retorna a resposta (ConnectionRefusedError se ele não estiver rodando)"""
+    with Client(endereco or endereco_servico(), authkey=chave or chave_servico()) as conexao:
+        _enviar_json(conexao, pedido)
+        return _receber_json(conexao)
+
+
+def _mostrar_job(job):
+    detalhe = ', '.join(job['job']['sistemas']) if job['job']['tipo'] == 'sistema' else \
+        f"{os.path.basename(job['job']['arquivo'])} → {job['job']['base']}"
+    print(f"   [{job['id']}] {job['estado']:<10} {job['job']['tipo']}: {detalhe} ({job['usuario'] or '?'})")
+    resumo = (job.get('resultado') or {}).get('resumo')
+    if resumo:
+        print(f"          ✅ {resumo.get('sucessos', 0)}  ❌ {resumo.get('falhas', 0)}  "
+              f"📊 {resumo.get('linhas', 0)} linhas  ⏱️ {resumo.get('duracao', 0)}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='🛰️ Serviço de automação residente')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('iniciar', help='Sobe o serviço neste terminal')
+    p_sistema = sub.add_parser('sistema', help='Job: processar sistemas (vazio = todos)')
+    p_sistema.add_argument('sistemas', nargs='*', metavar='SISTEMA', help=' / '.join(SISTEMAS))
+    p_arquivo = sub.add_parser('arquivo', help='Job: enviar um CSV para uma base')
+    p_arquivo.add_argument('arquivo')
+    p_arquivo.add_argument('base')
+    for p in (p_sistema, p_arquivo):
+        p.add_argument('--aguardar', action='store_true', help='Espera o job terminar')
+    p_status = sub.add_parser('status', help='Situação da fila ou de um job')
+    p_status.add_argument('id', nargs='?')
+    sub.add_parser('encerrar', help='Para o serviço')
+    args = parser.parse_args()
+
+    if args.comando == 'iniciar':
+        # Mesmo diretório de trabalho de 'python main.py' (data/, credenciais, json/)
+        os.chdir(root_dir)
+        try:
+            chave = chave_servico(criar=True)
+        except PermissionError as e:
+            print(f"❌ {e}")
+            return 1
+        servico = ServicoAutomacao()
+        servico.aquecer()
+        servico.servir(chave=chave)
+        return 0
+
+    if args.comando == 'sistema':
+        pedido = {'acao': 'enviar', 'job': {'tipo': 'sistema', 'sistemas': args.sistemas}}
+    elif args.comando == 'arquivo':
+        pedido = {'acao': 'enviar', 'job': {'tipo': 'arquivo', 'arquivo': os.path.abspath(args.arquivo),
+                                             'base': args.base}}
+    elif args.comando == 'status':
+        pedido = {'acao': 'status', 'id': args.id}
+    else:
+        pedido = {'acao': 'encerrar'}
+    pedido['usuario'] = getpass.getuser()
+
+    try:
+        resposta = enviar_pedido(pedido)
+    except ConnectionRefusedError:
+        print("❌ Serviço não está rodando. Inicie com: python scripts/servico_automacao.py iniciar")
+        return 1
+    except PermissionError as e:
+        print(f"❌ {e}")
+        return 1
+    if not resposta.get('ok'):
+        print(f"❌ {resposta.get('erro')}")
+        return 1
+
+    if args.comando in ('sistema', 'arquivo'):
+        job = resposta['job']
+        print(f"{'♻️ Job já estava na fila' if resposta['duplicado'] else '📥 Job enfileirado'}: {job['id']}")
+        if args.aguardar:
+            job = enviar_pedido({'acao': 'aguardar', 'id': job['id']})['status']
+            _mostrar_job(job)
+            return 0 if job['estado'] == 'concluido' else 1
+    elif args.comando == 'status':
+        status = resposta['status']
+        if status is None:
+            print(f"❌ Job não encontrado: {args.id}")
+            return 1
+        for job in (status if isinstance(status, list) else [status]):
+            _mostrar_job(job)
+        if isinstance(status, list) and not status:
+            print("📭 Nenhum job")
+    else:
+        print("🛑 Serviço encerrando")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Capacidade das planilhas e arquivamento de linhas antigas
+As abas das BASES e do Power BI só crescem; o Google Sheets aceita no máximo 10 milhões
+de células por planilha e fica lento bem antes disso. A cada execução o tamanho da
+grade de cada aba (linhas x colunas, das propriedades já em cache - sem leitura extra)
+é somado por planilha e gravado no histórico; com as amostras, projeta-se a data em
+que a planilha lota.
+
+Acima do limite de arquivamento, as abas registradas em 'capacidade' do
+planilhas_config.json têm as linhas mais antigas que N meses movidas para outra
+planilha de arquivo: uma leitura do bloco antigo, um values.append no arquivo e um
+deleteDimension na aba viva. O arquivo precisa ser outra planilha - mover linhas para
+uma aba da mesma não libera nenhuma célula - e a regra sem 'planilha_arquivo' é recusada.
+
+Cada append leva, numa coluna de marca depois dos dados ('coluna_marca'; padrão: a
+coluna seguinte à grade da aba viva), o ID do arquivamento e o estado 'pendente'; depois
+do deleteDimension a marca vira 'ok'. Se uma execução anterior anexou e não chegou a
+remover, o último append do arquivo continua 'pendente': quando o bloco inteiro dele é
+igual ao início do bloco atual, essas linhas só são removidas da aba viva, sem duplicar.
+Linhas repetidas são normais nas bases, então o fim do arquivo nunca é comparado sem a
+marca - uma coincidência não faz linhas que nunca foram copiadas serem removidas. Isso
+custa uma leitura da coluna de marca (e do bloco pendente, se houver) e uma escrita
+para confirmar, só quando há o que arquivar.
+
+    "capacidade": {
+        "limite_celulas": 10000000, "aviso": 0.7, "arquivar": 0.85,
+        "bases": {"BASE VOZ": {"planilha_arquivo": "arquivo_boletim", "aba_arquivo": "BASE VOZ",
+                               "coluna_data": "C", "meses": 6}}
+    }
+
+As linhas são anexadas em ordem de chegada, então as antigas ficam no topo: só o bloco
+contíguo a partir da linha 2 com data anterior ao corte é movido.
+"""
+
+import re
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .colunas_derivadas import indice_coluna
+from .escrita_blocos import letra_coluna
+from .plano_escrita import titulo_a1
+from .valores_tipados import data_do_valor
+
+LIMITE_CELULAS = 10_000_000
+AVISO_PADRAO = 0.7
+ARQUIVAR_PADRAO = 0.85
+# Amostras usadas na projeção e linhas movidas por aba em cada arquivamento
+DIAS_PROJECAO = 90
+LOTE_ARQUIVAMENTO = 50_000
+# Marca de cada linha anexada ao arquivo: arquivamento:<id>:pendente|ok
+PREFIXO_MARCA = 'arquivamento'
+
+
+def config_capacidade() -> Dict[str, Any]:
+    """Seção 'capacidade' do planilhas_config.json (vazia se o gerenciador não estiver disponível)"""
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+    except ImportError:
+        return {}
+    try:
+        return obter_gerenciador().obter_capacidade()
+    except Exception as e:
+        print(f"⚠️ Configuração de capacidade não carregada: {e}")
+        return {}
+
+
+def celulas_das_abas(sheets, abas) -> Dict[str, int]:
+    """
+    {título: linhas x colunas da grade} - usa a aba já aberta pelo envio quando houver
+    (tamanho atualizado localmente pelo plano de escrita), sem consultar a API
+    """
+    celulas = {}
+    for aba in abas:
+        atual = sheets.aba_em_cache(aba.title) or aba
+        celulas[aba.title] = atual.row_count * atual.col_count
+    return celulas
+
+
+def projetar_lotacao(amostras: List[Tuple[datetime, int]], limite: int = LIMITE_CELULAS) -> Optional[datetime]:
+    """
+    Data em que a planilha chega ao limite, pela reta de mínimos quadrados das amostras
+    (data, células); None com menos de duas amostras ou sem crescimento
+    """
+    if len(amostras) < 2:
+        return None
+    inicio = amostras[0][0]
+    dias = [(data - inicio).total_seconds() / 86400 for data, _ in amostras]
+    celulas = [valor for _, valor in amostras]
+    media_dias = sum(dias) / len(dias)
+    media_celulas = sum(celulas) / len(celulas)
+    variancia = sum((d - media_dias) ** 2 for d in dias)
+    if variancia == 0:
+        return None
+    inclinacao = sum((d - media_dias) * (c - media_celulas) for d, c in zip(dias, celulas)) / variancia
+    if inclinacao <= 0:
+        return None
+    ultima_data, ultimas_celulas = amostras[-1]
+    if ultimas_celulas >= limite:
+        return ultima_data
+    return ultima_data + timedelta(days=(limite - ultimas_celulas) / inclinacao)
+
+
+def nivel_capacidade(uso: float, config: Dict[str, Any]) -> str:
+    """'ok', 'aviso' ou 'arquivar' para a fração do limite em uso"""
+    if uso >= config.get('arquivar', ARQUIVAR_PADRAO):
+        return 'arquivar'
+    if uso >= config.get('aviso', AVISO_PADRAO):
+        return 'aviso'
+    return 'ok'
+
+
+def subtrair_meses(dia: date, meses: int) -> date:
+    """31/08/2025 - 6 meses -> 28/02/2025 (dia limitado ao fim do mês)"""
+    mes = dia.month - 1 - meses
+    ano = dia.year + mes // 12
+    mes = mes % 12 + 1
+    fim_mes = (date(ano + (mes == 12), mes % 12 + 1, 1) - timedelta(days=1)).day
+    return date(ano, mes, min(dia.day, fim_mes))
+
+
+def linhas_antigas(valores_data: list, corte: date) -> int:
+    """Quantas linhas do topo têm data anterior ao corte (para na primeira que não tiver)"""
+    total = 0
+    for linha in valores_data:
+        dia = data_do_valor(linha[0]) if linha else None
+        if dia is None or dia >= corte:
+            break
+        total += 1
+    return total
+
+
+def arquivar_linhas(sheets, nome_aba: str, regra: Dict[str, Any], hoje: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Move as linhas mais antigas que regra['meses'] para o arquivo e as remove da aba
+
+    Args:
+        regra: {'planilha_arquivo': chave do gerenciador ou ID (obrigatório, outra planilha),
+                'aba_arquivo', 'coluna_data' (letra), 'meses', 'lote_maximo' e 'coluna_marca'
+                (letra, opcionais)}
+
+    Returns:
+        dict: {'aba', 'linhas_arquivadas', 'corte', 'destino'}
+    """
+    id_arquivo = _id_arquivo(regra.get('planilha_arquivo'))
+    if not id_arquivo or id_arquivo == sheets.ID_PLANILHA:
+        raise ValueError("'planilha_arquivo' precisa ser outra planilha: "
+                         "mover linhas dentro da mesma não libera células")
+    corte = subtrair_meses(hoje or date.today(), int(regra.get('meses', 6)))
+    planilha = sheets.abrir_planilha()
+    aba = sheets.abrir_aba(nome_aba)
+    titulo = titulo_a1(aba.title)
+    coluna = regra.get('coluna_data', 'A')
+    opcoes = {'valueRenderOption': 'UNFORMATTED_VALUE', 'dateTimeRenderOption': 'SERIAL_NUMBER'}
+    relatorio = {'aba': nome_aba, 'linhas_arquivadas': 0, 'corte': corte.isoformat(),
+                 'destino': regra.get('aba_arquivo')}
+
+    limite = int(regra.get('lote_maximo', LOTE_ARQUIVAMENTO))
+    resposta = planilha.values_batch_get([f"{titulo}!{coluna}2:{coluna}{limite + 1}"], params=opcoes)
+    quantidade = linhas_antigas((resposta.get('valueRanges') or [{}])[0].get('values', []), corte)
+    if quantidade == 0:
+        return relatorio
+
+    resposta = planilha.values_batch_get([f"{titulo}!2:{quantidade + 1}"], params=opcoes)
+    linhas = (resposta.get('valueRanges') or [{}])[0].get('values', [])
+    destino = sheets.client.open_by_key(id_arquivo)
+    titulo_arquivo = titulo_a1(regra['aba_arquivo'])
+    coluna_marca = regra.get('coluna_marca') or letra_coluna(aba.col_count + 1)
+    largura = indice_coluna(coluna_marca)
+    if any(len(linha) > largura for linha in linhas):
+        raise ValueError(f"coluna_marca {coluna_marca} sobrescreveria dados de {nome_aba}")
+
+    pendente = append_pendente(destino, titulo_arquivo, coluna_marca, opcoes)
+    ja_arquivadas = 0
+    if pendente and _mesmas_linhas(pendente['linhas'], linhas[:len(pendente['linhas'])], largura):
+        ja_arquivadas = len(pendente['linhas'])
+        print(f"   ↩️ {nome_aba}: {ja_arquivadas} linhas já estavam no arquivo (execução anterior interrompida)")
+    a_confirmar = [pendente] if ja_arquivadas else []
+
+    pendentes = linhas[ja_arquivadas:]
+    if pendentes:
+        execucao = uuid.uuid4().hex[:12]
+        valores = [list(linha) + [''] * (largura - len(linha)) + [_marca(execucao, 'pendente')]
+                   for linha in pendentes]
+        anexadas = destino.values_append(f"{titulo_arquivo}!A1",
+                                         params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+                                         body={'values': valores})
+        gravadas = anexadas.get('updates', {}).get('updatedRows', len(pendentes))
+        if gravadas != len(pendentes):
+            raise RuntimeError(f"arquivo recebeu {gravadas} de {len(pendentes)} linhas; "
+                               f"nada foi removido de {nome_aba}")
+        faixa = _linhas_do_intervalo(anexadas.get('updates', {}).get('updatedRange', ''))
+        if faixa:
+            a_confirmar.append({'execucao': execucao, 'inicio': faixa[0], 'fim': faixa[1]})
+
+    planilha.batch_update({'requests': [{'deleteDimension': {'range': {
+        'sheetId': aba.id, 'dimension': 'ROWS', 'startIndex': 1, 'endIndex': quantidade + 1}}}]})
+    # A grade diminuiu: a próxima abertura relê o tamanho da aba
+    sheets.descartar_aba(nome_aba)
+    confirmar_append(destino, titulo_arquivo, coluna_marca, a_confirmar)
+    relatorio['linhas_arquivadas'] = quantidade
+    return relatorio
+
+
+def _marca(execucao: str, estado: str) -> str:
+    return f"{PREFIXO_MARCA}:{execucao}:{estado}"
+
+
+def _ler_marca(valor: Any) -> Optional[Tuple[str, str]]:
+    """(id, estado) de uma célula de marca; None para qualquer outro valor"""
+    partes = str(valor).split(':')
+    if len(partes) != 3 or partes[0] != PREFIXO_MARCA:
+        return None
+    return partes[1], partes[2]
+
+
+def _linhas_do_intervalo(intervalo: str) -> Optional[Tuple[int, int]]:
+    """"'ARQUIVO'!A101:K150" -> (101, 150)"""
+    encontrado = re.search(r"![A-Z]*(\d+)(?::[A-Z]*(\d+))?$", intervalo)
+    if not encontrado:
+        return None
+    inicio = int(encontrado.group(1))
+    return inicio, int(encontrado.group(2) or inicio)
+
+
+def _mesmas_linhas(arquivadas: list, linhas: list, largura: int) -> bool:
+    """Compara só as colunas de dados, ignorando células vazias no fim (a API as omite)"""
+    def normalizar(linha):
+        dados = list(linha[:largura])
+        while dados and dados[-1] == '':
+            dados.pop()
+        return dados
+    return (len(arquivadas) == len(linhas) and
+            all(normalizar(a) == normalizar(l) for a, l in zip(arquivadas, linhas)))
+
+
+def append_pendente(destino, titulo_arquivo: str, coluna_marca: str, opcoes: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Último append do arquivo ainda 'pendente' (a remoção da aba viva não foi confirmada):
+    {'execucao', 'inicio', 'fim', 'linhas'}; None quando o arquivo termina numa linha
+    confirmada ou sem marca
+    """
+    resposta = destino.values_batch_get([f"{titulo_arquivo}!{coluna_marca}:{coluna_marca}"], params=opcoes)
+    marcas = (resposta.get('valueRanges') or [{}])[0].get('values', [])
+    ultima = marcas[-1][0] if marcas and marcas[-1] else None
+    marca = _ler_marca(ultima) if ultima is not None else None
+    if marca is None or marca[1] != 'pendente':
+        return None
+    inicio = len(marcas)
+    while inicio > 1 and marcas[inicio - 2] and marcas[inicio - 2][0] == ultima:
+        inicio -= 1
+    resposta = destino.values_batch_get([f"{titulo_arquivo}!{inicio}:{len(marcas)}"], params=opcoes)
+    linhas = (resposta.get('valueRanges') or [{}])[0].get('values', [])
+    return {'execucao': marca[0], 'inicio': inicio, 'fim': len(marcas), 'linhas': linhas}
+
+
+def confirmar_append(destino, titulo_arquivo: str, coluna_marca: str, appends: List[Dict[str, Any]]):
+    """Marca como 'ok' as linhas dos appends cujas linhas já saíram da aba viva (uma escrita)"""
+    if not appends:
+        return
+    dados = [{'range': f"{titulo_arquivo}!{coluna_marca}{item['inicio']}:{coluna_marca}{item['fim']}",
+              'values': [[_marca(item['execucao'], 'ok')]] * (item['fim'] - item['inicio'] + 1)}
+             for item in appends]
+    try:
+        destino.values_batch_update({'valueInputOption': 'RAW', 'data': dados})
+    except Exception as e:
+        # As linhas já foram movidas; sem a confirmação, a próxima execução compara o
+        # bloco pendente inteiro com a aba viva (que não tem mais essas linhas) e anexa normalmente
+        print(f"   ⚠️ Marca do arquivamento não confirmada em {titulo_arquivo}: {e}")
+
+
+def _id_arquivo(referencia: Optional[str]) -> Optional[str]:
+    """ID da planilha de arquivo: chave do gerenciador ou ID direto (None sem referência)"""
+    if not referencia:
+        return None
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+        info = obter_gerenciador().obter_info_planilha(referencia)
+    except ImportError:
+        info = None
+    return info['id'] if info else referencia
+
+
+def verificar_capacidade(sheets, abas, nome: str = '', historico=None, config: Optional[Dict[str, Any]] = None,
+                         arquivar: bool = True, agora: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Mede a planilha, grava a amostra, projeta a lotação e, acima do limite, arquiva
+
+    Args:
+        sheets: GoogleSheetsBase da planilha
+        abas: abas da planilha (ex.: planilha.worksheets() já lida na execução)
+        historico: HistoricoExecucoes para gravar/ler as amostras (None = sem projeção)
+
+    Returns:
+        dict: {'planilha', 'celulas', 'uso', 'nivel', 'lotacao' (ISO ou None), 'abas', 'arquivamentos'}
+    """
+    config = config_capacidade() if config is None else config
+    limite = int(config.get('limite_celulas', LIMITE_CELULAS))
+    agora = agora or datetime.now()
+    por_aba = celulas_das_abas(sheets, abas)
+    total = sum(por_aba.values())
+
+    lotacao = None
+    if historico is not None:
+        historico.registrar_capacidade(sheets.ID_PLANILHA, total, data=agora)
+        amostras = historico.amostras_capacidade(sheets.ID_PLANILHA, dias=DIAS_PROJECAO)
+        lotacao = projetar_lotacao(amostras, limite)
+
+    uso = total / limite if limite else 0.0
+    resultado = {'planilha': nome or sheets.ID_PLANILHA, 'celulas': total, 'uso': uso,
+                 'nivel': nivel_capacidade(uso, config),
+                 'lotacao': lotacao.isoformat(timespec='seconds') if lotacao else None,
+                 'abas': por_aba, 'arquivamentos': []}
+
+    if resultado['nivel'] == 'arquivar' and arquivar:
+        regras = config.get('bases', {})
+        # Maiores primeiro: são as que mais liberam células
+        for titulo in sorted(por_aba, key=por_aba.get, reverse=True):
+            if titulo not in regras:
+                continue
+            try:
+                resultado['arquivamentos'].append(arquivar_linhas(sheets, titulo, regras[titulo], agora.date()))
+            except Exception as e:
+                print(f"   ❌ Erro ao arquivar {titulo}: {e}")
+                resultado['arquivamentos'].append({'aba': titulo, 'linhas_arquivadas': 0, 'erro': str(e)})
+    return resultado
+
+
+def descrever_capacidade(resultado: Dict[str, Any]) -> str:
+    """Resumo legível do resultado de verificar_capacidade"""
+    icones = {'ok': '🟢', 'aviso': '🟡', 'arquivar': '🔴'}
+    linhas = [f"{icones[resultado['nivel']]} {resultado['planilha']}: {resultado['celulas']:,} células "
+              f"({resultado['uso'] * 100:.1f}% do limite)"]
+    if resultado['lotacao']:
+        linhas.append(f"   📅 Lotação projetada: {datetime.fromisoformat(resultado['lotacao']).strftime('%d/%m/%Y')}")
+    for item in resultado['arquivamentos']:
+        if item.get('erro'):
+            linhas.append(f"   ❌ {item['aba']}: arquivamento falhou ({item['erro']})")
+        elif item['linhas_arquivadas']:
+            linhas.append(f"   📦 {item['aba']}: {item['linhas_arquivadas']:,} linhas anteriores a "
+                          f"{date.fromisoformat(item['corte']).strftime('%d/%m/%Y')} movidas para '{item['destino']}'")
+        else:
+            linhas.append(f"   ✅ {item['aba']}: nenhuma linha anterior ao corte")
+    return '\n'.join(linhas)
@@ -0,0 +1,285 @@
+"""
+Classificador de arquivos CSV pelo nome
+Regras do RenomeadorInteligente, de cada sistema do main.py, da interface Power BI e
+do scripts/processar-todos-csvs.py num só lugar, agrupadas por ponto de entrada (cada
+um mantém a sua classificação). As regras de cada grupo são compiladas em uma só
+expressão (alternação com grupos nomeados, na ordem de prioridade), então cada
+arquivo custa uma passada de regex por grupo, e o resultado fica memorizado por nome.
+
+O resultado é uma chave 'sistema_tipo' (ex.: 'genesys_voz_hc', 'salesforce_criado',
+'powerbi_filas'); cada chamador converte a chave no que precisa (nome padronizado,
+aba de destino etc.).
+
+Quando há assinaturas de cabeçalho configuradas, tipo_do_caminho() lê só a primeira
+linha do CSV (algumas centenas de bytes, com detecção de encoding e separador) e
+compara as colunas com as assinaturas de cada base - um export renomeado como
+"data (3).csv" é reconhecido pelo conteúdo. Formato no planilhas_config.json
+(colunas sem distinguir maiúsculas/acentos; vence a assinatura mais específica):
+
+    "assinaturas_cabecalho": {
+        "bases": {"salesforce_criado": ["Número do caso", "Data de abertura"]}
+    }
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Regras de cada ponto de entrada, na ordem de prioridade: (chave, padrão), a primeira que
+# casa vence; padrões aplicados ao nome em minúsculas. Os grupos são separados de propósito:
+# o mesmo nome pode ter destinos diferentes em cada sistema ("Tempo em fila.csv" é BASE
+# TEMPO na produtividade e fila no Genesys) e os fallbacks do renomeador não enviam nada.
+REGRAS: Dict[str, List[Tuple[str, str]]] = {
+    # main.py --genesys (filas de todas as filas vão para o Power BI, não para o boletim)
+    'genesys': [
+        ('genesys_voz_hc', r'(?=.*voz)(?=.*hc)'),
+        ('genesys_texto_hc', r'(?=.*texto)(?=.*hc)'),
+        ('genesys_gestao_n1', r'(?=.*gest(?:ão|ao))(?=.*(?:n1|entrega))'),
+        ('genesys_gestao', r'.*gest(?:ão|ao)'),
+        ('powerbi_filas', r'(?=.*fila)(?=.*todas)'),
+        ('genesys_fila', r'.*fila'),
+    ],
+    # main.py --salesforce
+    'salesforce': [
+        ('salesforce_criado', r'.*(?:criado|created)'),
+        ('salesforce_resolvido', r'.*(?:resolvido|resolved)'),
+        ('salesforce_comentario_bko', r'.*(?:comentario|comment|bko)'),
+        ('salesforce_seller', r'.*(?:seller|vendedor)'),
+    ],
+    # main.py --produtividade (tempo antes da visão produtiva)
+    'produtividade': [
+        ('produtividade_tempo', r'.*tempo'),
+        ('produtividade_produtividade', r'.*(?:produtiv|vis[aã]o)'),
+    ],
+    # Interface Power BI
+    'powerbi': [
+        ('powerbi_filas', r'(?=.*fila)(?=.*todas)'),
+        ('powerbi_filas', r'.*filas.*genesys|.*genesys.*filas|filas?\s*genesys\.csv$'),
+        ('powerbi_autoservico', r'.*auto.*servi[cç]o'),
+        ('powerbi_hibernacao', r'.*hiberna[cç][aã]o'),
+    ],
+    # scripts/processar-todos-csvs.py (só a planilha Genesys)
+    'processar_csvs': [
+        ('genesys_voz_hc', r'(?=.*voz)(?=.*hc)'),
+        ('genesys_texto_hc', r'(?=.*texto)(?=.*hc)'),
+        ('genesys_gestao_n1', r'(?=.*gest(?:ão|ao))(?=.*n1)'),
+        ('genesys_gestao', r'.*gest(?:ão|ao)'),
+        ('genesys_fila', r'.*fila'),
+        ('genesys_colaborador', r'.*(?:colaborador|colab)'),
+    ],
+    # RenomeadorInteligente (nome completo, com a extensão)
+    'renomeador': [
+        ('powerbi_filas', r'.*filas.*genesys.*todas.*filas.*\.csv$'),
+        ('powerbi_filas', r'.*filas.*genesys.*\.csv$'),
+        ('powerbi_filas', r'.*genesys.*filas.*\.csv$'),
+        ('powerbi_filas', r'filas\s*genesys\.csv$'),
+        ('powerbi_filas', r'fila\s*genesys\.csv$'),
+        ('powerbi_autoservico', r'.*autoservi[cç]o.*power\s*bi.*\.csv$'),
+        ('powerbi_autoservico', r'.*autoservi[cç]o.*powerbi.*\.csv$'),
+        ('powerbi_autoservico', r'.*auto.*servi[cç]o.*\.csv$'),
+        ('powerbi_autoservico', r'autoservi[cç]o.*\.csv$'),
+        ('salesforce_criado', r'.*criado.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$'),
+        ('salesforce_resolvido', r'.*resolvid[oa].*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$'),
+        ('salesforce_comentario_bko', r'.*comentario.*bko.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$'),
+        ('salesforce_comentario_bko', r'cópia de.*comentario.*bko.*\.csv$'),
+        ('salesforce_seller', r'.*seller.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$'),
+        ('genesys_voz_hc', r'.*voz.*hc.*\.csv$'),
+        ('genesys_texto_hc', r'.*texto.*hc.*\.csv$'),
+        ('genesys_gestao_n1', r'.*gest(?:ão|ao).*entrega.*n1.*hc.*\.csv$'),
+        ('genesys_gestao', r'.*gest(?:ão|ao).*hc.*\.csv$'),
+        ('genesys_fila', r'.*fila.*hc.*\.csv$'),
+        ('produtividade_tempo', r'.*base.*tempo.*visão.*produtiva.*\.csv$'),
+        ('produtividade_produtividade', r'.*base\s*-\s*visão.*produtiva.*\.csv$'),
+        ('produtividade_produtividade', r'.*base.*visão.*produtiva.*\.csv$'),
+        ('produtividade_tempo', r'.*tempo.*visão.*produtiva.*\.csv$'),
+        ('produtividade_produtividade', r'.*visão.*produtiva.*\.csv$'),
+        # Padrões genéricos (fallback) - só para renomear
+        ('salesforce_criado', r'.*criado.*\.csv$'),
+        ('salesforce_resolvido', r'.*resolvid[oa].*\.csv$'),
+        ('salesforce_comentario_bko', r'.*comentario.*\.csv$'),
+        ('genesys_voz_hc', r'.*voz.*\.csv$'),
+        ('genesys_texto_hc', r'.*texto.*\.csv$'),
+        ('genesys_gestao', r'.*gest(?:ão|ao).*\.csv$'),
+    ],
+}
+
+# Nome padronizado de cada tipo (RenomeadorInteligente)
+NOMES_PADRONIZADOS: Dict[str, str] = {
+    'powerbi_filas': 'Filas Genesys - Todas as Filas .csv',
+    'powerbi_autoservico': 'Autoserviço Power BI.csv',
+    'genesys_voz_hc': 'BASE_GENESYS_VOZ_HC.csv',
+    'genesys_texto_hc': 'BASE_GENESYS_TEXTO_HC.csv',
+    'genesys_gestao_n1': 'BASE_GENESYS_GESTAO_N1_HC.csv',
+    'genesys_gestao': 'BASE_GENESYS_GESTAO_HC.csv',
+    'genesys_fila': 'BASE_GENESYS_FILA_HC.csv',
+    'salesforce_criado': 'BASE_SALESFORCE_CRIADO.csv',
+    'salesforce_resolvido': 'BASE_SALESFORCE_RESOLVIDO.csv',
+    'salesforce_comentario_bko': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
+    'salesforce_seller': 'BASE_SALESFORCE_SELLER.csv',
+    'produtividade_tempo': 'BASE_TEMPO.csv',
+    'produtividade_produtividade': 'BASE_PRODUTIVIDADE.csv',
+}
+
+
+# Leitura do cabeçalho: blocos até achar o fim da primeira linha
+TAMANHO_BLOCO_CABECALHO = 512
+LIMITE_CABECALHO = 8192
+SEPARADORES = (';', ',', '\t', '|')
+
+
+def normalizar_coluna(coluna: str) -> str:
+    """'  "Número do Caso" ' -> 'numero do caso' (sem acentos, espaços ou aspas)"""
+    coluna = unicodedata.normalize('NFKD', coluna.strip().strip('"\'').strip())
+    coluna = ''.join(c for c in coluna if not unicodedata.combining(c))
+    return ' '.join(coluna.lower().split())
+
+
+def _decodificar(dados: bytes) -> str:
+    if dados.startswith(b'\xef\xbb\xbf'):
+        return dados.decode('utf-8-sig', errors='ignore')
+    if dados.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return dados.decode('utf-16', errors='ignore')
+    try:
+        return dados.decode('utf-8')
+    except UnicodeDecodeError as erro:
+        # Bloco cortado no meio de um caractere UTF-8: o que veio antes é válido
+        if erro.start >= len(dados) - 3 and erro.reason == 'unexpected end of data':
+            return dados[:erro.start].decode('utf-8')
+        return dados.decode('cp1252', errors='replace')
+
+
+def ler_cabecalho(caminho: str, limite: int = LIMITE_CABECALHO) -> List[str]:
+    """Colunas da primeira linha do CSV, normalizadas ([] se não der para ler)"""
+    dados = b''
+    try:
+        with open(caminho, 'rb') as f:
+            while len(dados) < limite:
+                bloco = f.read(TAMANHO_BLOCO_CABECALHO)
+                if not bloco:
+                    break
+                dados += bloco
+                if b'\n' in bloco:
+                    break
+    except OSError:
+        return []
+
+    linhas = _decodificar(dados).splitlines()
+    primeira_linha = linhas[0] if linhas else ''
+    separador = max(SEPARADORES, key=primeira_linha.count)
+    if not primeira_linha.count(separador):
+        return []
+    return [normalizar_coluna(coluna) for coluna in primeira_linha.split(separador)]
+
+
+def dividir_chave(chave: str) -> Tuple[str, str]:
+    """'genesys_voz_hc' -> ('genesys', 'voz_hc')"""
+    sistema, tipo = chave.split('_', 1)
+    return sistema, tipo
+
+
+class ClassificadorArquivos:
+    """Regras (chave, padrão) compiladas em uma única alternação priorizada"""
+
+    def __init__(self, regras: List[Tuple[str, str]],
+                 assinaturas: Optional[Dict[str, Iterable[str]]] = None):
+        self.chaves = [chave for chave, _ in regras]
+        self.assinaturas: List[Tuple[str, frozenset]] = []
+        self.definir_assinaturas(assinaturas or {})
+        # Grupos r0, r1, ... na ordem das regras: re.match tenta as alternativas da esquerda
+        # para a direita, então lastgroup indica a regra de maior prioridade que casou
+        self.expressao = re.compile('|'.join(f'(?P<r{i}>{padrao})' for i, (_, padrao) in enumerate(regras)),
+                                    re.DOTALL)
+        self._cache: Dict[str, Optional[str]] = {}
+        self._trava = threading.Lock()
+
+    def classificar(self, nome_arquivo: str) -> Optional[str]:
+        """Chave do tipo do arquivo (ou None se nenhuma regra reconhece o nome)"""
+        try:
+            return self._cache[nome_arquivo]
+        except KeyError:
+            pass
+        encontrado = self.expressao.match(nome_arquivo.lower())
+        chave = self.chaves[int(encontrado.lastgroup[1:])] if encontrado else None
+        with self._trava:
+            self._cache[nome_arquivo] = chave
+        return chave
+
+    def definir_assinaturas(self, assinaturas: Dict[str, Iterable[str]]):
+        """Substitui as assinaturas de cabeçalho: {chave: [colunas obrigatórias]}"""
+        self.assinaturas = [(chave, frozenset(normalizar_coluna(c) for c in colunas))
+                            for chave, colunas in assinaturas.items() if colunas]
+
+    def classificar_cabecalho(self, colunas: Iterable[str]) -> Optional[str]:
+        """Chave da assinatura mais específica contida nas colunas (ou None)"""
+        presentes = set(colunas)
+        melhor, tamanho = None, 0
+        for chave, obrigatorias in self.assinaturas:
+            if len(obrigatorias) > tamanho and obrigatorias <= presentes:
+                melhor, tamanho = chave, len(obrigatorias)
+        return melhor
+
+    def classificar_conteudo(self, caminho: str) -> Optional[str]:
+        """Tipo pelo cabeçalho do CSV (None sem assinaturas - o arquivo nem é aberto)"""
+        if not self.assinaturas:
+            return None
+        return self.classificar_cabecalho(ler_cabecalho(caminho))
+
+    def classificar_caminho(self, caminho: str) -> Optional[str]:
+        """Tipo pelo cabeçalho (se houver assinaturas) e, sem correspondência, pelo nome"""
+        return self.classificar_conteudo(caminho) or self.classificar(os.path.basename(caminho))
+
+
+# Um classificador por grupo de REGRAS, criado no primeiro uso
+_classificadores: Dict[str, ClassificadorArquivos] = {}
+_trava_classificadores = threading.Lock()
+
+
+def _assinaturas_configuradas() -> Dict[str, Any]:
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+    except ImportError:
+        return {}
+    try:
+        return obter_gerenciador().obter_assinaturas_cabecalho().get('bases', {})
+    except Exception as e:
+        print(f"⚠️ Assinaturas de cabeçalho não carregadas: {e}")
+        return {}
+
+
+def classificador_compartilhado(grupo: str) -> ClassificadorArquivos:
+    """Classificador do processo para o grupo de REGRAS (+ assinaturas do planilhas_config.json)"""
+    with _trava_classificadores:
+        classificador = _classificadores.get(grupo)
+    if classificador is None:
+        classificador = ClassificadorArquivos(REGRAS[grupo], assinaturas=_assinaturas_configuradas())
+        with _trava_classificadores:
+            classificador = _classificadores.setdefault(grupo, classificador)
+    return classificador
+
+
+def recarregar_assinaturas():
+    """Relê as assinaturas de cabeçalho da configuração (início de cada execução)"""
+    with _trava_classificadores:
+        classificadores = list(_classificadores.values())
+    if classificadores:
+        assinaturas = _assinaturas_configuradas()
+        for classificador in classificadores:
+            classificador.definir_assinaturas(assinaturas)
+
+
+def tipo_do_arquivo(nome_arquivo: str, grupo: str) -> Optional[str]:
+    """Classifica o nome com as regras do grupo (classificador compartilhado do processo)"""
+    return classificador_compartilhado(grupo).classificar(nome_arquivo)
+
+
+def tipo_pelo_cabecalho(caminho: str) -> Optional[str]:
+    """Tipo reconhecido só pelo cabeçalho do CSV (None se nenhuma assinatura corresponde)"""
+    # As assinaturas são as mesmas em todos os grupos
+    return classificador_compartilhado('powerbi').classificar_conteudo(caminho)
+
+
+def tipo_do_caminho(caminho: str, grupo: str) -> Optional[str]:
+    """Classifica o CSV pelo cabeçalho e, sem assinatura correspondente, pelas regras do grupo"""
+    return classificador_compartilhado(grupo).classificar_caminho(caminho)
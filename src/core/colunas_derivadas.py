@@ -0,0 +1,187 @@
+"""
+Colunas derivadas calculadas localmente
+As colunas de FORMULAS_CONFIG são, na maioria, transformações simples dos dados do
+próprio CSV - cópias (=B{row}) e datas em texto (=TEXT(C{row};"DD/M")). Como fórmulas,
+o Sheets as recalcula a cada edição da aba, o que pesa na planilha e nos painéis que a
+leem. No modo 'materializada' essas colunas são calculadas aqui, com operações
+vetorizadas do pandas sobre as linhas já limpas, e gravadas como valores no mesmo
+values.batchUpdate dos dados:
+
+    {'coluna': 'P', 'formula': '=TEXT(C{row};"DD/M")'}  ->  P10 = '03/2' (valor, não fórmula)
+
+O modo é escolhido por base (nome da aba) em 'colunas_derivadas' do planilhas_config.json:
+
+    "colunas_derivadas": {"padrao": "formula", "bases": {"BASE VOZ": "materializada"}}
+
+Templates fora do que se sabe calcular (SE, ÍNDICE/CORRESP, aritmética, ...), colunas
+com 'arrayformula' e referências a colunas fora do CSV continuam como fórmulas.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .valores_tipados import converter_data
+
+MODOS_DERIVADAS = ('formula', 'materializada')
+
+_COPIA = re.compile(r'^=\s*([A-Z]{1,3})\{row\}\s*$')
+_TEXTO_DATA = re.compile(r'^=\s*TEXTO?\(\s*([A-Z]{1,3})\{row\}\s*[;,]\s*"([^"]*)"\s*\)\s*$', re.IGNORECASE)
+# Partes do padrão de data do TEXT que se sabe reproduzir -> (atributo, zeros à esquerda)
+_PARTES_DATA = {'d': ('day', 1), 'dd': ('day', 2), 'm': ('month', 1), 'mm': ('month', 2),
+                'yy': ('year', -2), 'yyyy': ('year', 4)}
+
+
+def indice_coluna(letra: str) -> int:
+    """'A' -> 0, 'AB' -> 27"""
+    indice = 0
+    for caractere in letra.upper():
+        indice = indice * 26 + (ord(caractere) - ord('A') + 1)
+    return indice - 1
+
+
+def modo_da_base(nome_aba: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """'formula' ou 'materializada' para a aba ('bases' sobrescreve 'padrao'; sem configuração, 'formula')"""
+    if config is None:
+        config = _config_derivadas()
+    modo = config.get('bases', {}).get(nome_aba, config.get('padrao', 'formula'))
+    return modo if modo in MODOS_DERIVADAS else 'formula'
+
+
+def _config_derivadas() -> Dict[str, Any]:
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+    except ImportError:
+        return {}
+    try:
+        return obter_gerenciador().obter_colunas_derivadas()
+    except Exception as e:
+        print(f"⚠️ Configuração de colunas derivadas não carregada: {e}")
+        return {}
+
+
+def _partes_padrao(padrao: str) -> Optional[List[Any]]:
+    """'DD/M' -> [('day', 2), '/', ('month', 1)]; None se o padrão tiver partes não suportadas"""
+    partes = []
+    for trecho in re.findall(r'[A-Za-z]+|[^A-Za-z]+', padrao):
+        if trecho[0].isalpha():
+            if trecho.lower() not in _PARTES_DATA:
+                return None
+            partes.append(_PARTES_DATA[trecho.lower()])
+        else:
+            partes.append(trecho)
+    return partes if any(isinstance(parte, tuple) for parte in partes) else None
+
+
+def compilar_derivada(config: dict) -> Optional[Tuple[int, str, Callable]]:
+    """
+    (índice da coluna de origem, 'copia' ou 'texto', função Series -> Series) do template;
+    None se ele fica como fórmula
+    """
+    if config.get('arrayformula'):
+        return None
+    formula = config.get('formula', '').strip()
+    copia = _COPIA.match(formula)
+    if copia:
+        return indice_coluna(copia.group(1)), 'copia', lambda serie: serie
+    texto = _TEXTO_DATA.match(formula)
+    if texto:
+        partes = _partes_padrao(texto.group(2))
+        if partes is not None:
+            return indice_coluna(texto.group(1)), 'texto', lambda serie: texto_de_datas(serie, partes)
+    return None
+
+
+def como_datas(serie):
+    """
+    Números de série da planilha (escrita tipada) ou datas em texto -> datetime64 (NaT se não for data)
+
+    Textos são lidos pelos mesmos formatos da escrita tipada (converter_data, em cache por valor),
+    para que '03/02/2025' seja 3 de fevereiro aqui como na planilha.
+    """
+    import pandas as pd
+
+    numeros = pd.to_numeric(serie, errors='coerce')
+    textos = serie[numeros.isna() & serie.map(lambda valor: isinstance(valor, str) and valor != '')]
+    if len(textos):
+        numeros = numeros.fillna(textos.map(lambda valor: (converter_data(valor) or (None,))[0]).astype(float))
+    return pd.to_datetime(numeros, unit='D', origin='1899-12-30')
+
+
+def texto_de_datas(serie, partes: List[Any]):
+    """
+    Equivalente vetorizado de TEXT(data;"DD/M") para as partes já interpretadas do padrão
+    (como no Sheets, textos que não são data saem como estão)
+    """
+    datas = como_datas(serie)
+    validas = datas.notna()
+    resultado = None
+    for parte in partes:
+        if isinstance(parte, tuple):
+            atributo, digitos = parte
+            numeros = getattr(datas.dt, atributo).fillna(0).astype(int)
+            if digitos < 0:
+                numeros = numeros % 100
+            texto = numeros.astype(str).str.zfill(abs(digitos))
+        else:
+            texto = parte
+        resultado = texto if resultado is None else resultado + texto
+    return resultado.where(validas, serie.map(str))
+
+
+def separar_derivadas(formulas_config: Optional[list], num_colunas: int) -> Tuple[list, list]:
+    """
+    (calculáveis [(config, origem, tipo, função)], restantes) - a origem precisa ser coluna do CSV
+    ou uma coluna derivada já calculada antes dela na configuração
+    """
+    calculaveis, restantes = [], []
+    disponiveis = set(range(num_colunas))
+    for config in formulas_config or []:
+        compilada = compilar_derivada(config)
+        if compilada and compilada[0] in disponiveis:
+            calculaveis.append((config, *compilada))
+            disponiveis.add(indice_coluna(config['coluna']))
+        else:
+            restantes.append(config)
+    return calculaveis, restantes
+
+
+def materializar_colunas(dados: list, calculaveis: list, formatos_data: Optional[dict] = None,
+                         texto_literal: bool = False) -> Dict[int, list]:
+    """
+    Calcula as colunas derivadas sobre as linhas já limpas (e tipadas, se for o caso)
+
+    Args:
+        formatos_data: {índice: tipo} das colunas de data; cópias de uma coluna de data
+                       herdam o tipo (para receber o mesmo formato de número)
+        texto_literal: prefixa ' nos textos calculados (USER_ENTERED reinterpretaria '03/2' como data)
+
+    Returns:
+        dict: {índice da coluna derivada: [valor de cada linha]}
+    """
+    import pandas as pd
+
+    tabela = pd.DataFrame(dados, dtype=object)
+    colunas = {}
+    for config, origem, tipo, funcao in calculaveis:
+        destino = indice_coluna(config['coluna'])
+        serie = tabela[origem] if origem in tabela.columns else pd.Series('', index=tabela.index, dtype=object)
+        resultado = funcao(serie.where(serie.notna(), ''))
+        if tipo == 'copia':
+            if formatos_data is not None and origem in formatos_data:
+                formatos_data[destino] = formatos_data[origem]
+        elif texto_literal:
+            resultado = resultado.where(resultado == '', "'" + resultado)
+        tabela[destino] = resultado
+        colunas[destino] = resultado.tolist()
+    return colunas
+
+
+def agrupar_colunas(colunas: Dict[int, list]) -> List[Tuple[int, list]]:
+    """Colunas vizinhas num só intervalo: {20: [...], 21: [...]} -> [(20, [[u, v], ...])]"""
+    grupos = []
+    for indice in sorted(colunas):
+        if grupos and grupos[-1][0] + len(grupos[-1][1]) == indice:
+            grupos[-1][1].append(colunas[indice])
+        else:
+            grupos.append((indice, [colunas[indice]]))
+    return [(inicio, [list(linha) for linha in zip(*valores)]) for inicio, valores in grupos]
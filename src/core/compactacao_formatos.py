@@ -0,0 +1,195 @@
+"""
+Compactação da dívida de formatação das abas BASE
+Cada envio antigo pintou seu bloco de linhas (verde com bordas nas BASES, amarelo no
+Power BI). Esses trechos nunca são limpos e, depois de meses, a aba carrega milhares de
+formatos distintos - abrir, recalcular e escrever pela API fica cada vez mais lento.
+
+A compactação troca todo o histórico por um estilo uniforme com poucas requisições:
+um repeatCell que limpa cor de fundo, bordas e texto de todas as linhas abaixo do
+cabeçalho (formatos de número, como os de data, são preservados) e, no modo 'celulas', o
+destaque só do último lote pintado. No modo 'condicional' os envios não pintam células: o
+último lote pintado é anterior à troca de modo, e o intervalo nomeado NOVAS_LINHAS_<id>
+já aponta para o envio mais recente - ele e as regras não são tocados.
+
+Para medir, lê-se o cabeçalho e a coluna A de cada aba numa única leitura por planilha:
+cada mudança de cor/borda entre linhas consecutivas conta como um trecho de formatação.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .destaque_linhas import confirmar_destaque
+from .google_sheets_base import (FORMATO_AMARELO_CLARO, FORMATO_AMARELO_FORTE, FORMATO_PRIMEIRA_LINHA,
+                                 FORMATO_VERDE_CLARO)
+
+# Cor da primeira linha de cada lote -> (formato da primeira linha, formato das demais) do destaque:
+# verde escuro #00A859 (BASES) e amarelo forte (Power BI)
+DESTAQUES_LOTE = (
+    (FORMATO_PRIMEIRA_LINHA['backgroundColor'], FORMATO_PRIMEIRA_LINHA, FORMATO_VERDE_CLARO),
+    (FORMATO_AMARELO_FORTE['backgroundColor'], FORMATO_AMARELO_FORTE, FORMATO_AMARELO_CLARO),
+)
+# Fundo branco (sem cor) - o que fica depois da compactação
+_BRANCO = {'red': 1.0, 'green': 1.0, 'blue': 1.0}
+_TOLERANCIA_COR = 0.01
+
+# Campos limpos pela compactação (numberFormat fica intacto)
+CAMPOS_ESTILO = 'userEnteredFormat(backgroundColor,borders,textFormat)'
+
+
+def mesma_cor(cor: Optional[dict], referencia: dict) -> bool:
+    """Compara cores da API (componentes zerados vêm omitidos; valores em float de 8 bits)"""
+    cor = cor or _BRANCO
+    return all(abs(cor.get(c, 0.0) - referencia.get(c, 0.0)) <= _TOLERANCIA_COR for c in ('red', 'green', 'blue'))
+
+
+def assinatura_formato(formato: Optional[dict]) -> str:
+    """Chave comparável da parte visual do formato de uma célula (fundo e bordas)"""
+    formato = formato or {}
+    fundo = formato.get('backgroundColor')
+    if fundo is None or mesma_cor(fundo, _BRANCO):
+        fundo = None
+    else:
+        fundo = {c: round(fundo.get(c, 0.0), 2) for c in ('red', 'green', 'blue')}
+    return json.dumps([fundo, formato.get('borders') or None], sort_keys=True)
+
+
+def contar_trechos(formatos: List[Optional[dict]]) -> int:
+    """Número de trechos contíguos com o mesmo formato (linhas sem formato contam como um estilo)"""
+    return contar_trechos_estilos([assinatura_formato(formato) for formato in formatos])
+
+
+def ultimo_lote(formatos: List[Optional[dict]]) -> Optional[tuple]:
+    """
+    (início, fim, destaque) do último lote destacado: da última linha com a cor de início de
+    lote até a última linha colorida contígua a ela (índices em formatos); None se não houver
+    """
+    encontrado = None
+    for i, formato in enumerate(formatos):
+        fundo = (formato or {}).get('backgroundColor')
+        if not fundo:
+            continue
+        for indice, (cor, _, _) in enumerate(DESTAQUES_LOTE):
+            if mesma_cor(fundo, cor):
+                encontrado = (i, indice)
+    if encontrado is None:
+        return None
+    inicio, destaque = encontrado
+    fim = inicio
+    while fim + 1 < len(formatos) and assinatura_formato(formatos[fim + 1]) != assinatura_formato(None):
+        fim += 1
+    return inicio, fim, destaque
+
+
+def trechos_apos(num_linhas: int, lote: Optional[tuple], condicional: bool) -> int:
+    """Trechos de formatação por célula que sobram depois da compactação"""
+    if lote is None or condicional:
+        return 1
+    inicio, fim, _ = lote
+    estilos = ['lote_demais' if inicio < i <= fim else ('lote_inicio' if i == inicio else None)
+               for i in range(num_linhas)]
+    return contar_trechos_estilos(estilos)
+
+
+def contar_trechos_estilos(estilos: List[Any]) -> int:
+    return sum(1 for i, estilo in enumerate(estilos) if i == 0 or estilo != estilos[i - 1])
+
+
+def ler_formatos(planilha, titulos: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Cabeçalho e formatos da coluna A de cada aba - uma leitura para todas as abas
+
+    Returns:
+        dict: {título: {'sheet_id', 'linhas_grade', 'colunas_grade', 'colunas', 'formatos'}}
+              formatos[i] = userEnteredFormat da linha i + 2 (None = sem formato)
+    """
+    intervalos = []
+    for titulo in titulos:
+        prefixo = "'" + titulo.replace("'", "''") + "'"
+        intervalos += [f"{prefixo}!1:1", f"{prefixo}!A2:A"]
+    metadados = planilha.fetch_sheet_metadata(params={
+        'ranges': intervalos,
+        'fields': 'sheets(properties(sheetId,title,gridProperties(rowCount,columnCount)),'
+                  'data(startRow,rowData(values(formattedValue,userEnteredFormat(backgroundColor,borders)))))'})
+    abas = {}
+    for aba in metadados.get('sheets', []):
+        propriedades = aba.get('properties', {})
+        grade = propriedades.get('gridProperties', {})
+        info = {'sheet_id': propriedades.get('sheetId'), 'linhas_grade': grade.get('rowCount', 0),
+                'colunas_grade': grade.get('columnCount', 0), 'colunas': 0, 'formatos': []}
+        for dados in aba.get('data', []):
+            linhas = dados.get('rowData', [])
+            if not dados.get('startRow'):
+                # Cabeçalho: colunas preenchidas
+                valores = linhas[0].get('values', []) if linhas else []
+                info['colunas'] = sum(1 for v in valores if v.get('formattedValue'))
+            else:
+                info['formatos'] = [(linha.get('values') or [{}])[0].get('userEnteredFormat') for linha in linhas]
+        abas[propriedades.get('title')] = info
+    return abas
+
+
+def planejar_compactacao(info: Dict[str, Any], manter_ultimo: bool = True, condicional: bool = True) -> Dict[str, Any]:
+    """
+    Requisição que uniformiza o estilo de uma aba e o relatório antes/depois
+
+    Returns:
+        dict: {'requisicoes', 'trechos_antes', 'trechos_depois',
+               'ultimo_lote': (linha_inicial, linha_final) | None, 'destaque': (formato_primeira, formato_demais)}
+    """
+    formatos = info['formatos']
+    # Condicional: o destaque vem do intervalo nomeado (intacto), não das cores das células
+    lote = ultimo_lote(formatos) if manter_ultimo and not condicional else None
+    return {
+        'requisicoes': [{'repeatCell': {
+            'range': {'sheetId': info['sheet_id'], 'startRowIndex': 1},
+            'cell': {'userEnteredFormat': {}},
+            'fields': CAMPOS_ESTILO}}],
+        'trechos_antes': contar_trechos(formatos),
+        'trechos_depois': trechos_apos(len(formatos), lote, condicional),
+        'ultimo_lote': (lote[0] + 2, lote[1] + 2) if lote else None,
+        'destaque': DESTAQUES_LOTE[lote[2]][1:] if lote else None,
+    }
+
+
+def compactar_planilha(sheets, titulos: List[str], aplicar: bool = False,
+                       manter_ultimo: bool = True) -> List[Dict[str, Any]]:
+    """
+    Compacta a formatação das abas de uma planilha (uma leitura e, se aplicar, uma batchUpdate)
+
+    Args:
+        sheets: GoogleSheetsBase com ID_PLANILHA definido (o destaque do último lote segue sheets.modo_destaque)
+        titulos: abas a compactar (as que não existirem são ignoradas)
+        aplicar: False = só relatório
+
+    Returns:
+        list: [{'aba', 'trechos_antes', 'trechos_depois', 'ultimo_lote', 'requisicoes'}]
+              ('requisicoes' só quando aplicado)
+    """
+    planilha = sheets.abrir_planilha()
+    existentes = {aba.title: aba for aba in planilha.worksheets()}
+    titulos = [t for t in dict.fromkeys(titulos) if t in existentes]
+    if not titulos:
+        return []
+
+    relatorio = []
+    requisicoes = []
+    for titulo, info in ler_formatos(planilha, titulos).items():
+        if titulo not in existentes:
+            continue
+        plano = planejar_compactacao(info, manter_ultimo, sheets.modo_destaque(titulo) == 'condicional')
+        item = {'aba': titulo, 'trechos_antes': plano['trechos_antes'],
+                'trechos_depois': plano['trechos_depois'], 'ultimo_lote': plano['ultimo_lote']}
+        if aplicar:
+            pedidos = list(plano['requisicoes'])
+            if plano['ultimo_lote']:
+                linha_inicial, linha_final = plano['ultimo_lote']
+                pedidos += sheets.requisicoes_destaque(planilha, existentes[titulo], linha_inicial, linha_final,
+                                                       info['colunas'] or info['colunas_grade'], *plano['destaque'])
+            requisicoes += pedidos
+            item['requisicoes'] = len(pedidos)
+        relatorio.append(item)
+    if requisicoes:
+        planilha.batch_update({'requests': requisicoes})
+        for titulo in titulos:
+            confirmar_destaque(sheets.ID_PLANILHA, existentes[titulo].id, requisicoes)
+    return relatorio
@@ -0,0 +1,201 @@
+"""
+Destaque das linhas novas por formatação condicional
+Pintar as linhas de cada envio com formatos de célula (verde nas BASES, amarelo no
+Power BI) deixa na aba um bloco de formatos novo por execução: depois de meses são
+dezenas de milhares de trechos de formatação, que deixam a planilha lenta para abrir
+(Looker Studio) e para escrever pela API.
+
+O padrão continua sendo 'celulas' (o visual de sempre). O modo 'condicional' é ligado
+por base na seção 'destaque' do planilhas_config.json (ou para tudo com
+AUTOMACAO_DESTAQUE=condicional):
+
+    "destaque": {"padrao": "celulas", "bases": {"BASE VOZ": "condicional"}}
+
+No modo condicional, cada aba tem um intervalo nomeado NOVAS_LINHAS_<sheetId> e duas
+regras de formatação condicional (primeira linha em cor forte, demais em cor clara).
+Cada regra vale só para as linhas do último envio e usa uma fórmula constante - nada de
+ROW(INDIRECT(...)) sobre a aba inteira, que o Sheets recalcularia em toda linha a cada
+alteração. A cada envio o intervalo nomeado e as faixas das duas regras são movidos
+para as linhas novas (requisições pequenas, sem formatos novos nas células). Regras de
+versões anteriores (com INDIRECT) são substituídas no primeiro envio.
+
+Regras condicionais aceitam cor de fundo e cor/negrito/itálico do texto; bordas e
+tamanho de fonte do modo 'celulas' não são reproduzidos, e só o último envio fica
+destacado.
+
+O estado "aba preparada" só é guardado (confirmar_destaque) depois que a batchUpdate com
+as requisições foi aceita: uma simulação ou um envio que falhou não conta como preparado.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+MODOS_DESTAQUE = ('condicional', 'celulas')
+
+# Campos de formato aceitos por uma regra de formatação condicional
+_CAMPOS_CONDICIONAIS = ('backgroundColor', 'textFormat')
+_CAMPOS_TEXTO = ('foregroundColor', 'bold', 'italic', 'strikethrough', 'underline')
+
+# (id da planilha, sheetId) -> (namedRangeId, [índice da regra da primeira linha, das demais])
+# das abas com intervalo e regras já criados
+_destaques_prontos: Dict[Tuple[str, int], Tuple[str, List[int]]] = {}
+_trava = threading.Lock()
+
+
+def destaque_ambiente() -> Optional[str]:
+    """Modo imposto a todas as abas por AUTOMACAO_DESTAQUE (None = segue a configuração por base)"""
+    modo = os.environ.get('AUTOMACAO_DESTAQUE', '').strip().lower()
+    return modo if modo in MODOS_DESTAQUE else None
+
+
+def destaque_da_base(nome_aba: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """'celulas' ou 'condicional' para a aba ('bases' sobrescreve 'padrao'; sem configuração, 'celulas')"""
+    if config is None:
+        config = _config_destaque()
+    modo = config.get('bases', {}).get(nome_aba, config.get('padrao', 'celulas'))
+    return modo if modo in MODOS_DESTAQUE else 'celulas'
+
+
+def _config_destaque() -> Dict[str, Any]:
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+    except ImportError:
+        return {}
+    try:
+        return obter_gerenciador().obter_destaque()
+    except Exception as e:
+        print(f"⚠️ Configuração de destaque não carregada: {e}")
+        return {}
+
+
+def nome_intervalo_novas(sheet_id: int) -> str:
+    return f"NOVAS_LINHAS_{sheet_id}"
+
+
+def formato_condicional(formato: dict) -> dict:
+    """Só a parte do formato que uma regra condicional aceita (cor de fundo e texto)"""
+    resultado = {campo: formato[campo] for campo in _CAMPOS_CONDICIONAIS if campo in formato}
+    if 'textFormat' in resultado:
+        resultado['textFormat'] = {campo: valor for campo, valor in resultado['textFormat'].items()
+                                   if campo in _CAMPOS_TEXTO}
+    return resultado
+
+
+def _formula(nome: str) -> str:
+    # Sempre verdadeira e sem função volátil: quem limita o destaque é a faixa da regra.
+    # O nome do intervalo identifica as regras da aba; sem separador de argumentos, vale
+    # em qualquer localidade da planilha
+    return f'="{nome}"<>""'
+
+
+def _intervalo(sheet_id: int, linha_inicial: int, linha_final: Optional[int], num_colunas: int) -> dict:
+    intervalo = {'sheetId': sheet_id, 'startRowIndex': linha_inicial - 1,
+                 'startColumnIndex': 0, 'endColumnIndex': num_colunas}
+    if linha_final is not None:
+        intervalo['endRowIndex'] = linha_final
+    return intervalo
+
+
+def _regras(nome: str, sheet_id: int, linha_inicial: int, linha_final: int, num_colunas: int,
+            formato_primeira: dict, formato_demais: dict) -> List[dict]:
+    """Regra da primeira linha e regra das demais, cada uma só com as suas linhas"""
+    primeira = _intervalo(sheet_id, linha_inicial, linha_inicial, num_colunas)
+    demais = _intervalo(sheet_id, linha_inicial + 1, linha_final, num_colunas) if linha_final > linha_inicial else primeira
+    return [{'ranges': [faixa], 'booleanRule': {
+                'condition': {'type': 'CUSTOM_FORMULA', 'values': [{'userEnteredValue': _formula(nome)}]},
+                'format': formato_condicional(formato)}}
+            for faixa, formato in ((primeira, formato_primeira), (demais, formato_demais))]
+
+
+def _regra_do_intervalo(regra: dict, nome: str) -> bool:
+    valores = regra.get('booleanRule', {}).get('condition', {}).get('values', [])
+    return any(nome in v.get('userEnteredValue', '') for v in valores)
+
+
+def _situacao_aba(planilha, sheet_id: int, nome: str) -> Tuple[Optional[str], List[int]]:
+    """(namedRangeId já existente ou None, índices das regras condicionais do intervalo) - uma leitura"""
+    metadados = planilha.fetch_sheet_metadata(params={
+        'fields': 'namedRanges(namedRangeId,name),'
+                  'sheets(properties(sheetId),conditionalFormats(booleanRule(condition(values))))'})
+    id_existente = next((n['namedRangeId'] for n in metadados.get('namedRanges', []) if n.get('name') == nome), None)
+    indices = []
+    for aba in metadados.get('sheets', []):
+        if aba.get('properties', {}).get('sheetId') != sheet_id:
+            continue
+        indices = [i for i, regra in enumerate(aba.get('conditionalFormats', [])) if _regra_do_intervalo(regra, nome)]
+    return id_existente, indices
+
+
+def requisicoes_destaque(planilha, chave_planilha: str, sheet_id: int, linha_inicial: int, linha_final: int,
+                         num_colunas: int, formato_primeira: dict, formato_demais: dict) -> list:
+    """
+    Requisições (spreadsheets.batchUpdate) que destacam as linhas linha_inicial..linha_final
+
+    Na primeira vez por aba e processo lê os metadados para saber se o intervalo nomeado e
+    as regras já existem e cria (ou substitui) o que for preciso; depois (confirmar_destaque
+    após a batchUpdate), só move o intervalo e as faixas das duas regras.
+    """
+    nome = nome_intervalo_novas(sheet_id)
+    chave = (chave_planilha, sheet_id)
+    linhas_novas = _intervalo(sheet_id, linha_inicial, linha_final, num_colunas)
+    regras = _regras(nome, sheet_id, linha_inicial, linha_final, num_colunas, formato_primeira, formato_demais)
+    with _trava:
+        pronto = _destaques_prontos.get(chave)
+    if pronto is not None:
+        id_intervalo, indices = pronto
+        return ([{'updateNamedRange': {'namedRange': {'namedRangeId': id_intervalo, 'name': nome,
+                                                      'range': linhas_novas},
+                                       'fields': 'range'}}] +
+                [{'updateConditionalFormatRule': {'index': indice, 'sheetId': sheet_id, 'rule': regra}}
+                 for indice, regra in zip(indices, regras)])
+
+    id_existente, indices = _situacao_aba(planilha, sheet_id, nome)
+    requisicoes = []
+    if id_existente is None:
+        requisicoes.append({'addNamedRange': {'namedRange': {'namedRangeId': nome.lower(), 'name': nome,
+                                                             'range': linhas_novas}}})
+    else:
+        requisicoes.append({'updateNamedRange': {'namedRange': {'namedRangeId': id_existente, 'name': nome,
+                                                                'range': linhas_novas},
+                                                 'fields': 'range'}})
+    if len(indices) == 2:
+        # Regras já existentes (inclusive as antigas, com INDIRECT): substituídas no mesmo lugar
+        requisicoes += [{'updateConditionalFormatRule': {'index': indice, 'sheetId': sheet_id, 'rule': regra}}
+                        for indice, regra in zip(indices, regras)]
+    else:
+        # Nenhuma ou um conjunto incompleto: remove o que houver e cria as duas no topo
+        # (a primeira da lista tem prioridade)
+        requisicoes += [{'deleteConditionalFormatRule': {'index': indice, 'sheetId': sheet_id}}
+                        for indice in sorted(indices, reverse=True)]
+        requisicoes += [{'addConditionalFormatRule': {'index': indice, 'rule': regra}}
+                        for indice, regra in enumerate(regras)]
+    return requisicoes
+
+
+def confirmar_destaque(chave_planilha: str, sheet_id: int, requisicoes: list):
+    """
+    Registra a aba como preparada depois que a batchUpdate com as requisições de
+    requisicoes_destaque foi aceita (sem intervalo nomeado e as duas regras, nada a registrar)
+    """
+    nome = nome_intervalo_novas(sheet_id)
+    id_intervalo = None
+    indices = []
+    for requisicao in requisicoes:
+        corpo = requisicao.get('addNamedRange') or requisicao.get('updateNamedRange')
+        if corpo and corpo['namedRange'].get('name') == nome:
+            id_intervalo = corpo['namedRange']['namedRangeId']
+        regra = requisicao.get('addConditionalFormatRule') or requisicao.get('updateConditionalFormatRule')
+        if regra and _regra_do_intervalo(regra['rule'], nome):
+            indices.append(regra['index'])
+    if id_intervalo is not None and len(indices) == 2:
+        with _trava:
+            _destaques_prontos[(chave_planilha, sheet_id)] = (id_intervalo, indices)
+
+
+def descartar_destaque(chave_planilha: Optional[str] = None, sheet_id: Optional[int] = None):
+    """Esquece o estado em cache (a batchUpdate falhou, ou a aba foi recriada) - o próximo envio relê"""
+    with _trava:
+        for chave in list(_destaques_prontos):
+            if (chave_planilha is None or chave[0] == chave_planilha) and (sheet_id is None or chave[1] == sheet_id):
+                del _destaques_prontos[chave]
@@ -0,0 +1,173 @@
+"""
+Escrita de linhas em blocos paralelos
+Um único aba.update/append_rows com dezenas de milhares de linhas pode passar do
+limite de payload da API e estourar o timeout em links lentos. Aqui as linhas são
+divididas em blocos limitados pelo tamanho estimado em bytes (não pela contagem de
+linhas), cada bloco recebe seu intervalo A1 já calculado e os blocos são gravados em
+paralelo, respeitando a cota de escrita. Um bloco que falha é repetido sozinho.
+
+O progresso é confirmado em ordem: 'linhas_confirmadas' só avança quando todos os
+blocos anteriores terminaram. Se um bloco falha de vez, os blocos seguintes que ainda
+não começaram são cancelados e os que já foram gravados são limpos (uma
+values.batchClear), então a aba fica contígua até 'linhas_confirmadas' - sem um buraco
+que a próxima execução, que anexa depois da última linha com dados, tornaria permanente.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Payload por requisição (estimado) - bem abaixo do limite da API
+MAX_BYTES_BLOCO = 2 * 1024 * 1024
+MAX_PARALELO = 4
+# Cota de escrita do Google Sheets: 60 requisições por minuto por usuário
+MAX_POR_MINUTO = 60
+TENTATIVAS = 3
+ESPERA_TENTATIVA = 2.0
+
+# Aspas, vírgula e colchetes de cada célula no JSON da requisição
+_BYTES_POR_CELULA = 4
+
+
+def letra_coluna(numero: int) -> str:
+    """1 -> 'A', 27 -> 'AA'"""
+    letras = ''
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def estimar_bytes(linha: Sequence[Any]) -> int:
+    """Tamanho aproximado da linha no corpo JSON da requisição"""
+    return sum(len(str(valor).encode('utf-8')) + _BYTES_POR_CELULA for valor in linha) + 2
+
+
+def dividir_em_blocos(linhas: Sequence[Sequence[Any]], max_bytes: int = MAX_BYTES_BLOCO) -> List[Tuple[int, int]]:
+    """Fatias [inicio, fim) de linhas cujo tamanho estimado cabe em max_bytes (mínimo uma linha)"""
+    blocos = []
+    inicio, tamanho = 0, 0
+    for i, linha in enumerate(linhas):
+        bytes_linha = estimar_bytes(linha)
+        if i > inicio and tamanho + bytes_linha > max_bytes:
+            blocos.append((inicio, i))
+            inicio, tamanho = i, 0
+        tamanho += bytes_linha
+    if inicio < len(linhas):
+        blocos.append((inicio, len(linhas)))
+    return blocos
+
+
+class LimiteTaxa:
+    """Espaça o início das requisições para não passar de max_por_minuto"""
+
+    def __init__(self, max_por_minuto: int = MAX_POR_MINUTO):
+        self.intervalo = 60.0 / max_por_minuto if max_por_minuto else 0.0
+        self._proximo = 0.0
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        with self._trava:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def escrever_em_blocos(aba, linha_inicial: int, linhas: Sequence[Sequence[Any]], coluna_inicial: int = 1,
+                       value_input_option: str = 'USER_ENTERED', max_bytes: int = MAX_BYTES_BLOCO,
+                       max_paralelo: int = MAX_PARALELO, max_por_minuto: int = MAX_POR_MINUTO,
+                       tentativas: int = TENTATIVAS, espera_tentativa: float = ESPERA_TENTATIVA,
+                       ao_progresso: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Grava as linhas a partir de linha_inicial em blocos paralelos
+
+    Args:
+        aba: worksheet do gspread (só aba.update é usado)
+        linha_inicial: primeira linha da planilha a receber dados
+        linhas: valores (lista de listas)
+        ao_progresso: chamado, na ordem dos blocos, com {'bloco', 'total', 'linha_inicial',
+                      'linha_final', 'linhas_confirmadas', 'tentativas'}
+
+    Returns:
+        dict: {'sucesso', 'blocos', 'linhas', 'linhas_confirmadas', 'falhas': [{'bloco', 'intervalo', 'erro'}],
+               'desfeitos': intervalos limpos após a falha, 'cancelados': blocos que nem começaram}
+        Com falha, 'erro_desfazer' traz o erro da limpeza, se ela também falhar.
+    """
+    fatias = dividir_em_blocos(linhas, max_bytes)
+    if not fatias:
+        return {'sucesso': True, 'blocos': 0, 'linhas': 0, 'linhas_confirmadas': 0, 'falhas': [],
+                'desfeitos': [], 'cancelados': 0}
+
+    num_colunas = max(len(linha) for linha in linhas) or 1
+    coluna_a = letra_coluna(coluna_inicial)
+    coluna_b = letra_coluna(coluna_inicial + num_colunas - 1)
+    limite = LimiteTaxa(max_por_minuto)
+    # Sinalizado quando um bloco esgota as tentativas: os que ainda não gravaram desistem
+    parar = threading.Event()
+
+    def intervalo(inicio, fim):
+        return f"{coluna_a}{linha_inicial + inicio}:{coluna_b}{linha_inicial + fim - 1}"
+
+    def gravar(indice):
+        """Tentativas usadas, ou None se o bloco foi cancelado antes de gravar"""
+        inicio, fim = fatias[indice]
+        for tentativa in range(1, tentativas + 1):
+            if parar.is_set():
+                return None
+            limite.aguardar()
+            try:
+                aba.update(intervalo(inicio, fim), [list(linha) for linha in linhas[inicio:fim]],
+                           value_input_option=value_input_option)
+                return tentativa
+            except Exception as e:
+                if tentativa == tentativas:
+                    parar.set()
+                    raise
+                print(f"⚠️ Bloco {indice + 1}/{len(fatias)} falhou ({e}); nova tentativa {tentativa + 1}/{tentativas}")
+                time.sleep(espera_tentativa * tentativa)
+
+    falhas = []
+    gravados_apos_falha = []
+    cancelados = 0
+    linhas_confirmadas = 0
+    confirmando = True
+    with ThreadPoolExecutor(max_workers=max(1, min(max_paralelo, len(fatias)))) as executor:
+        # Cada bloco roda no contexto de quem chamou (ex.: saída desviada para a interface)
+        futuros = [executor.submit(contextvars.copy_context().run, gravar, i) for i in range(len(fatias))]
+        # Confirmação em ordem: o bloco N só é reportado depois dos blocos 1..N-1
+        for indice, futuro in enumerate(futuros):
+            inicio, fim = fatias[indice]
+            try:
+                usadas = futuro.result()
+            except Exception as e:
+                falhas.append({'bloco': indice + 1, 'intervalo': intervalo(inicio, fim), 'erro': str(e)})
+                confirmando = False
+                continue
+            if usadas is None:
+                cancelados += 1
+                continue
+            if not confirmando:
+                gravados_apos_falha.append(intervalo(inicio, fim))
+                continue
+            linhas_confirmadas = fim
+            if ao_progresso:
+                ao_progresso({'bloco': indice + 1, 'total': len(fatias),
+                              'linha_inicial': linha_inicial + inicio, 'linha_final': linha_inicial + fim - 1,
+                              'linhas_confirmadas': linhas_confirmadas, 'tentativas': usadas})
+
+    resultado = {'sucesso': not falhas, 'blocos': len(fatias), 'linhas': len(linhas),
+                 'linhas_confirmadas': linhas_confirmadas, 'falhas': falhas,
+                 'desfeitos': [], 'cancelados': cancelados}
+    if gravados_apos_falha:
+        # Blocos gravados depois do que falhou: limpos para a aba não ficar com um buraco
+        try:
+            aba.batch_clear(gravados_apos_falha)
+            resultado['desfeitos'] = gravados_apos_falha
+        except Exception as e:
+            print(f"❌ Não foi possível limpar {', '.join(gravados_apos_falha)} após a falha: {e}")
+            resultado['erro_desfazer'] = str(e)
+    return resultado
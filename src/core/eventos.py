@@ -0,0 +1,127 @@
+"""
+Canal de eventos estruturados da automação
+Grava progresso e resultados em JSON lines (um objeto por linha) para que as
+interfaces leiam números exatos em vez de interpretar o texto do console.
+Quando a automação roda dentro da interface, os eventos vão direto para uma fila.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+
+def _criar_evento(tipo: str, dados: Dict[str, Any]) -> Dict[str, Any]:
+    evento = {'tipo': tipo, 'ts': datetime.now().isoformat(timespec='milliseconds')}
+    evento.update(dados)
+    return evento
+
+
+class CanalEventos:
+    """Escreve eventos JSON lines em um arquivo, com flush a cada evento"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+
+    def emitir(self, tipo: str, **dados: Any) -> Dict[str, Any]:
+        """Grava um evento e retorna o dicionário gravado"""
+        evento = _criar_evento(tipo, dados)
+        self._arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+        self._arquivo.flush()
+        return evento
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._arquivo.close()
+
+
+class CanalFila:
+    """Entrega os eventos a uma fila em memória (execução no processo da interface)"""
+
+    def __init__(self, fila):
+        self.fila = fila
+
+    def emitir(self, tipo: str, **dados: Any) -> Dict[str, Any]:
+        evento = _criar_evento(tipo, dados)
+        self.fila.put(evento)
+        return evento
+
+    def fechar(self):
+        pass
+
+
+class LeitorEventos:
+    """Lê incrementalmente um arquivo de eventos enquanto ele é escrito"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._posicao = 0
+        self._pendente = ''
+
+    def novos(self) -> List[Dict[str, Any]]:
+        """Retorna os eventos completos gravados desde a última leitura"""
+        if not os.path.exists(self.caminho):
+            return []
+
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            f.seek(self._posicao)
+            conteudo = f.read()
+            self._posicao = f.tell()
+
+        conteudo = self._pendente + conteudo
+        linhas = conteudo.split("\n")
+        # A última parte pode ser uma linha ainda incompleta
+        self._pendente = linhas.pop()
+
+        eventos = []
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                eventos.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+        return eventos
+
+
+def ler_eventos(caminho: str) -> Iterator[Dict[str, Any]]:
+    """Lê todos os eventos de um arquivo"""
+    yield from LeitorEventos(caminho).novos()
+
+
+# Canal ativo da execução (None = eventos desligados)
+_canal_ativo: Optional[Union[CanalEventos, CanalFila]] = None
+
+
+def abrir_canal(caminho: str) -> CanalEventos:
+    """Abre o canal de eventos da execução atual"""
+    global _canal_ativo
+    fechar_canal()
+    _canal_ativo = CanalEventos(caminho)
+    return _canal_ativo
+
+
+def abrir_canal_fila(fila) -> CanalFila:
+    """Abre um canal que entrega os eventos em uma fila (queue.Queue)"""
+    global _canal_ativo
+    fechar_canal()
+    _canal_ativo = CanalFila(fila)
+    return _canal_ativo
+
+
+def fechar_canal():
+    global _canal_ativo
+    if _canal_ativo is not None:
+        _canal_ativo.fechar()
+        _canal_ativo = None
+
+
+def emitir(tipo: str, **dados: Any) -> Optional[Dict[str, Any]]:
+    """Emite um evento no canal ativo; sem efeito se não houver canal"""
+    if _canal_ativo is None:
+        return None
+    return _canal_ativo.emitir(tipo, **dados)
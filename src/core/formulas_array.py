@@ -0,0 +1,48 @@
+"""
+Fórmulas de coluna em modo ARRAYFORMULA
+Por padrão, cada envio grava uma fórmula por linha nova (=TEXT(C{row};"DD/M") em P10,
+P11, ...): o upload cresce com o número de linhas. Com 'arrayformula' na configuração da
+coluna, uma única fórmula é instalada na célula do cabeçalho e calcula a coluna inteira:
+
+    {'coluna': 'P', 'formula': '=TEXT(C{row};"DD/M")', 'arrayformula': True}
+    -> P1: ={"Data";ARRAYFORMULA(IF(C2:C="";"";TEXT(C2:C;"DD/M")))}
+
+Depois de instalada, nenhum envio escreve fórmulas nessa coluna. Fórmulas que não se
+traduzem por simples troca de C{row} por C2:C (ÍNDICE/CORRESP, por exemplo) podem
+informar o corpo da ARRAYFORMULA diretamente: 'arrayformula': 'IF(C2:C="";"";...)'.
+"""
+
+import re
+from typing import Optional
+
+_REFERENCIA_LINHA = re.compile(r'(\$?)([A-Z]{1,3})\{row\}')
+
+
+def eh_arrayformula(valor: Optional[str]) -> bool:
+    """True se a célula (renderizada como FORMULA) já tem a ARRAYFORMULA instalada"""
+    return bool(valor) and str(valor).startswith('=') and 'ARRAYFORMULA' in str(valor).upper()
+
+
+def corpo_arrayformula(config: dict, linha_inicial: int = 2) -> str:
+    """
+    Corpo da ARRAYFORMULA de uma coluna configurada
+
+    Raises:
+        ValueError: template sem referência {row} e sem corpo informado
+    """
+    if isinstance(config.get('arrayformula'), str):
+        return config['arrayformula']
+    template = config['formula'].lstrip('=')
+    referencias = _REFERENCIA_LINHA.findall(template)
+    if not referencias:
+        raise ValueError(f"Fórmula da coluna {config['coluna']} sem referência {{row}}: informe o corpo da ARRAYFORMULA")
+    expressao = _REFERENCIA_LINHA.sub(lambda m: f"{m.group(2)}{linha_inicial}:{m.group(2)}", template)
+    # Linhas ainda vazias ficam vazias (a fórmula cobre a coluna inteira)
+    guarda = f"{referencias[0][1]}{linha_inicial}:{referencias[0][1]}"
+    return f'IF({guarda}="";"";{expressao})'
+
+
+def formula_cabecalho(config: dict, rotulo: str, linha_inicial: int = 2) -> str:
+    """Fórmula da célula do cabeçalho: mantém o rótulo e preenche a coluna abaixo dele"""
+    rotulo = (rotulo or config['coluna']).replace('"', '""')
+    return f'={{"{rotulo}";ARRAYFORMULA({corpo_arrayformula(config, linha_inicial)})}}'
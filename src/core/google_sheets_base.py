@@ -1,30 +1,132 @@
 """
 Classe base para operações com Google Sheets
 Inclui detecção inteligente de arquivos duplicados e localizador automático de credenciais
+
+pandas, gspread e google-auth são importados só quando usados (conexão/leitura do CSV),
+para que --help, --dry-run e execuções sem CSV iniciem rápido
 """
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import os
-import glob
 import re
 import json
 import shutil
+import threading
 from typing import Optional, List
 
+from .perfilador import etapa, anotar_etapa
+from .escrita_blocos import escrever_em_blocos, letra_coluna
+from .valores_tipados import FORMATOS_NUMERO, tipar_colunas_data, tipar_colunas_numericas
+from .indice_dados import obter_indice
+from .plano_escrita import PlanoEscrita, titulo_a1
+from .destaque_linhas import (confirmar_destaque, destaque_ambiente, destaque_da_base, descartar_destaque,
+                              requisicoes_destaque)
+from .formulas_array import eh_arrayformula, formula_cabecalho
+from .colunas_derivadas import agrupar_colunas, materializar_colunas, modo_da_base, separar_derivadas
+from .particoes_abas import abas_conhecidas, garantir_particoes, regra_da_base, rotear_linhas
+
+# Clientes já autorizados no processo, por arquivo de credenciais: novas instâncias
+# (outro sistema, nova execução pela interface) não repetem busca de credenciais e OAuth
+_clientes_autorizados = {}
+_trava_clientes = threading.Lock()
+
+# Planilhas/abas já abertas, por (id da planilha, aba): evitam buscar os metadados a cada
+# arquivo e a cada execução. Guardam o cliente que as abriu (outro cliente = reabrir).
+_planilhas_abertas = {}
+_abas_abertas = {}
+
+
+# Linhas adicionadas: verde claro com bordas; primeira linha em verde escuro #00A859
+FORMATO_VERDE_CLARO = {
+    "backgroundColor": {
+        "red": 0.8,    # Verde bem claro para contraste
+        "green": 0.95,  
+        "blue": 0.85
+    },
+    "borders": {
+        "top": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
+        "bottom": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
+        "left": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
+        "right": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}}
+    },
+    "textFormat": {
+        "foregroundColor": {
+            "red": 0.1,
+            "green": 0.3,
+            "blue": 0.1
+        },
+        "fontSize": 10
+    }
+}
+
+FORMATO_PRIMEIRA_LINHA = {
+    "backgroundColor": {
+        "red": 0.0,
+        "green": 0.66,  # #00A859 Leroy Merlin
+        "blue": 0.35
+    },
+    "textFormat": {
+        "foregroundColor": {
+            "red": 1.0,
+            "green": 1.0,
+            "blue": 1.0
+        },
+        "bold": True,
+        "fontSize": 11
+    },
+    "borders": {
+        "top": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
+        "bottom": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
+        "left": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
+        "right": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}}
+    }
+}
+
+
+# Destaque das linhas novas do Power BI: primeira linha em amarelo forte, demais em amarelo claro
+FORMATO_AMARELO_FORTE = {
+    "backgroundColor": {"red": 1.0, "green": 0.66, "blue": 0.0},
+    "textFormat": {"bold": True, "fontSize": 10, "fontFamily": "Arial"}
+}
+
+FORMATO_AMARELO_CLARO = {
+    "backgroundColor": {"red": 1.0, "green": 0.88, "blue": 0.4},
+    "textFormat": {"fontSize": 10, "fontFamily": "Arial"}
+}
+
+
+def escrita_tipada_ambiente() -> bool:
+    """Escrita tipada (RAW) é o padrão; AUTOMACAO_ESCRITA=user_entered volta ao modo antigo"""
+    return os.environ.get('AUTOMACAO_ESCRITA', 'tipada').strip().lower() != 'user_entered'
+
+
+def limpar_clientes_autorizados():
+    """Descarta os clientes e planilhas/abas em cache (ex.: após erro de autenticação)"""
+    with _trava_clientes:
+        _clientes_autorizados.clear()
+        _planilhas_abertas.clear()
+        _abas_abertas.clear()
+
+
 class GoogleSheetsBase:
     """Classe base para operações com Google Sheets com detecção inteligente de arquivos"""
     
-    def __init__(self, caminho_credenciais: str = "boletim.json", id_planilha: str = ""):
+    def __init__(self, caminho_credenciais: str = "boletim.json", id_planilha: str = "",
+                 escrita_tipada: Optional[bool] = None, destaque: Optional[str] = None):
         """
         Inicializa a classe GoogleSheetsBase
         
         Args:
             caminho_credenciais: Caminho para o arquivo de credenciais JSON
             id_planilha: ID da planilha (será definido pelo sistema principal)
+            escrita_tipada: envia datas como número de série e grava com RAW
+                            (None = variável AUTOMACAO_ESCRITA, padrão tipada)
+            destaque: 'condicional' (intervalo nomeado + regra condicional) ou 'celulas'
+                      (formatos por célula) para todas as abas; None = variável AUTOMACAO_DESTAQUE
+                      ou, sem ela, a seção 'destaque' do planilhas_config.json por base
         """
         self.CAMINHO_CREDENCIAIS = caminho_credenciais
         self.ID_PLANILHA = id_planilha
+        self.escrita_tipada = escrita_tipada_ambiente() if escrita_tipada is None else escrita_tipada
+        self.destaque = destaque_ambiente() if destaque is None else destaque
         self._client = None
     
     def localizar_credenciais(self, nome_arquivo: str = "boletim.json") -> Optional[str]:
@@ -147,20 +249,258 @@ def configurar_credenciais(self) -> str:
     def client(self):
         """Lazy loading do cliente Google Sheets com conexão universal robusta"""
         if self._client is None:
-            scopes = ["https://www.googleapis.com/auth/spreadsheets", 
-                    "https://www.googleapis.com/auth/drive"]
-            
-            # Configurar credenciais automaticamente
-            credenciais_path = self.configurar_credenciais()
-            
-            # Conexão robusta com múltiplas tentativas
-            self._client = self._conectar_robusto(credenciais_path, scopes)
+            with _trava_clientes:
+                self._client = _clientes_autorizados.get(self.CAMINHO_CREDENCIAIS)
+                if self._client is None:
+                    scopes = ["https://www.googleapis.com/auth/spreadsheets", 
+                            "https://www.googleapis.com/auth/drive"]
+                    
+                    # Configurar credenciais automaticamente
+                    credenciais_path = self.configurar_credenciais()
+                    
+                    # Conexão robusta com múltiplas tentativas
+                    self._client = self._conectar_robusto(credenciais_path, scopes)
+                    _clientes_autorizados[self.CAMINHO_CREDENCIAIS] = self._client
             
         return self._client
     
+    def abrir_planilha(self):
+        """Planilha ID_PLANILHA, aberta uma vez por processo e cliente"""
+        client = self.client
+        with _trava_clientes:
+            aberta = _planilhas_abertas.get(self.ID_PLANILHA)
+        if aberta is not None and aberta[0] is client:
+            return aberta[1]
+        planilha = client.open_by_key(self.ID_PLANILHA)
+        with _trava_clientes:
+            _planilhas_abertas[self.ID_PLANILHA] = (client, planilha)
+        return planilha
+    
+    def abrir_aba(self, nome_aba: str):
+        """Aba da planilha, aberta uma vez por processo e cliente"""
+        client = self.client
+        chave = (self.ID_PLANILHA, nome_aba)
+        with _trava_clientes:
+            aberta = _abas_abertas.get(chave)
+        if aberta is not None and aberta[0] is client:
+            return aberta[1]
+        aba = self.abrir_planilha().worksheet(nome_aba)
+        with _trava_clientes:
+            _abas_abertas[chave] = (client, aba)
+        return aba
+    
+    def aba_em_cache(self, nome_aba: str):
+        """Aba já aberta neste processo (com o tamanho atualizado pelos envios), sem consultar a API"""
+        with _trava_clientes:
+            aberta = _abas_abertas.get((self.ID_PLANILHA, nome_aba))
+        return aberta[1] if aberta is not None and aberta[0] is self._client else None
+    
+    def descartar_aba(self, nome_aba: Optional[str] = None):
+        """Esquece a aba (ou a planilha inteira) em cache - a próxima chamada reabre"""
+        with _trava_clientes:
+            if nome_aba is None:
+                _planilhas_abertas.pop(self.ID_PLANILHA, None)
+                for chave in [c for c in _abas_abertas if c[0] == self.ID_PLANILHA]:
+                    del _abas_abertas[chave]
+            else:
+                _abas_abertas.pop((self.ID_PLANILHA, nome_aba), None)
+    
+    def montar_plano_escrita(self, planilha, aba, linha_inicial: int, dados: list, num_colunas: int,
+                             formatos_data: Optional[dict] = None, formulas_config: Optional[list] = None,
+                             colunas_derivadas: Optional[dict] = None,
+                             nome_base: Optional[str] = None) -> PlanoEscrita:
+        """
+        Plano de escrita das linhas novas (ver plano_escrita.py): valores, grade, cores,
+        formatos de data e fórmulas - executado em até três chamadas (grade, valores, formatos)
+        
+        A grade vem das propriedades da aba já em cache (sem consulta extra); as fórmulas
+        de origem (linha anterior às novas) são lidas numa única values.batchGet.
+        colunas_derivadas ({índice: valores}, ver colunas_derivadas.py) vão como intervalos
+        de valores na mesma values.batchUpdate dos dados. nome_base: base configurada quando
+        a aba é uma partição (modo de destaque por base).
+        """
+        linha_final = linha_inicial + len(dados) - 1
+        plano = PlanoEscrita(aba, 'RAW' if self.escrita_tipada else 'USER_ENTERED')
+        colunas_formula = [self._letra_para_indice(config['coluna']) for config in (formulas_config or [])]
+        colunas_formula += list(colunas_derivadas or {})
+        plano.garantir_grade(linha_final, max([num_colunas] + [c + 1 for c in colunas_formula]))
+        
+        # Linhas adicionadas em verde claro; PRIMEIRA LINHA COM DESTAQUE ESPECIAL (verde escuro)
+        plano.adicionar_formatos(self.requisicoes_destaque(planilha, aba, linha_inicial, linha_final, num_colunas,
+                                                           FORMATO_PRIMEIRA_LINHA, FORMATO_VERDE_CLARO, nome_base))
+        for idx, tipo in sorted((formatos_data or {}).items()):
+            plano.formatar(linha_inicial, linha_final, {'numberFormat': FORMATOS_NUMERO[tipo]}, idx, idx + 1)
+        
+        self._planejar_formulas(plano, planilha, formulas_config, linha_inicial, linha_final)
+        plano.adicionar_valores(linha_inicial, dados)
+        for coluna, linhas in agrupar_colunas(colunas_derivadas or {}):
+            plano.adicionar_valores(linha_inicial, linhas, coluna + 1)
+        return plano
+    
+    def modo_colunas_derivadas(self, nome_aba: str) -> str:
+        """'formula' ou 'materializada' para as colunas de FORMULAS_CONFIG da aba (planilhas_config.json)"""
+        return modo_da_base(nome_aba)
+    
+    def modo_destaque(self, nome_aba: str) -> str:
+        """'celulas' (padrão) ou 'condicional' para a aba: o modo imposto na instância/ambiente ou o da base"""
+        return self.destaque or destaque_da_base(nome_aba)
+    
+    def requisicoes_destaque(self, planilha, aba, linha_inicial: int, linha_final: int, num_colunas: int,
+                             formato_primeira: dict, formato_demais: dict, nome_base: Optional[str] = None) -> list:
+        """
+        Requisições que destacam as linhas novas (ver destaque_linhas.py)
+        
+        Modo 'condicional': move o intervalo nomeado e as regras da aba (criados na primeira vez);
+        modo 'celulas', ou se os metadados não puderem ser lidos: repeatCell nas linhas novas.
+        """
+        if self.modo_destaque(nome_base or aba.title) == 'condicional':
+            try:
+                return requisicoes_destaque(planilha, self.ID_PLANILHA, aba.id, linha_inicial, linha_final,
+                                            num_colunas, formato_primeira, formato_demais)
+            except Exception as e:
+                print(f"⚠️ Destaque condicional indisponível ({e}); usando formatos por célula")
+        plano = PlanoEscrita(aba)
+        plano.formatar(linha_inicial, linha_final, formato_demais, 0, num_colunas)
+        plano.formatar(linha_inicial, linha_inicial, formato_primeira, 0, num_colunas)
+        return plano.formatos
+    
+    def destacar_linhas_novas(self, planilha, aba, linha_inicial: int, linha_final: int, num_colunas: int,
+                              formato_primeira: dict, formato_demais: dict, nome_base: Optional[str] = None) -> bool:
+        """Destaca as linhas novas numa única batchUpdate (para quem não usa o plano de escrita)"""
+        try:
+            requisicoes = self.requisicoes_destaque(planilha, aba, linha_inicial, linha_final, num_colunas,
+                                                    formato_primeira, formato_demais, nome_base)
+            planilha.batch_update({'requests': requisicoes})
+            confirmar_destaque(self.ID_PLANILHA, aba.id, requisicoes)
+            return True
+        except Exception as e:
+            descartar_destaque(self.ID_PLANILHA, aba.id)
+            print(f"   ⚠️  Aviso ao destacar linhas novas: {e}")
+            return False
+    
+    def _planejar_formulas(self, plano: PlanoEscrita, planilha, formulas_config: Optional[list],
+                           linha_inicial: int, linha_final: int):
+        """
+        Fórmulas das linhas novas: copia a da linha anterior (copyPaste, como Ctrl+C + Ctrl+V)
+        ou, se ela não tiver fórmula, escreve o template {row} de cada linha
+        
+        Colunas com 'arrayformula' (ver formulas_array.py) recebem uma única ARRAYFORMULA no
+        cabeçalho, se ainda não a tiverem; depois disso nada é escrito nelas a cada envio.
+        Origens e cabeçalhos são lidos numa única values.batchGet.
+        """
+        if not formulas_config:
+            return
+        linha_origem = linha_inicial - 1
+        em_array = [config for config in formulas_config if config.get('arrayformula')]
+        por_linha = [config for config in formulas_config if not config.get('arrayformula')]
+        celulas = [f"{config['coluna']}1" for config in em_array]
+        if linha_origem >= 1:
+            celulas += [f"{config['coluna']}{linha_origem}" for config in por_linha]
+        lidas = self._ler_formulas(planilha, plano.aba, celulas)
+        
+        for config in em_array:
+            if lidas is None:
+                print(f"    ⚠️ Cabeçalho da coluna {config['coluna']} não lido; ARRAYFORMULA não instalada")
+                continue
+            cabecalho = lidas.get(f"{config['coluna']}1", '')
+            if not eh_arrayformula(cabecalho):
+                print(f"    🧮 Instalando ARRAYFORMULA no cabeçalho da coluna {config['coluna']}")
+                plano.instalar_arrayformula(self._letra_para_indice(config['coluna']),
+                                            formula_cabecalho(config, cabecalho))
+        
+        for config in por_linha:
+            coluna = self._letra_para_indice(config['coluna'])
+            if (lidas or {}).get(f"{config['coluna']}{linha_origem}", '').startswith('='):
+                plano.copiar_formula(coluna, linha_origem, linha_inicial, linha_final)
+            else:
+                plano.escrever_formula(coluna, config['formula'], linha_inicial, linha_final)
+    
+    def _ler_formulas(self, planilha, aba, celulas: list) -> Optional[dict]:
+        """{'P9': '=TEXT(C9;"DD/M")', ...} renderizado como FORMULA, numa leitura; None se ela falhar"""
+        celulas = list(dict.fromkeys(celulas))
+        if not celulas:
+            return {}
+        titulo = titulo_a1(aba.title)
+        try:
+            resposta = planilha.values_batch_get([f"{titulo}!{celula}" for celula in celulas],
+                                                 params={'valueRenderOption': 'FORMULA'})
+        except Exception as e:
+            print(f"    ⚠️ Erro ao ler fórmulas ({', '.join(celulas)}): {e}")
+            return None
+        lidas = {}
+        for celula, intervalo in zip(celulas, resposta.get('valueRanges', [])):
+            valores = intervalo.get('values') or [['']]
+            lidas[celula] = str(valores[0][0]) if valores[0] else ''
+        return lidas
+    
+    def instalar_arrayformulas(self, nome_aba: str, formulas_config: list) -> bool:
+        """
+        Instala as ARRAYFORMULA das colunas com 'arrayformula' que ainda não as têm
+        (uma leitura e, se preciso, uma batchUpdate)
+        """
+        em_array = [config for config in formulas_config if config.get('arrayformula')]
+        if not em_array:
+            return True
+        try:
+            planilha = self.abrir_planilha()
+            plano = PlanoEscrita(self.abrir_aba(nome_aba))
+            self._planejar_formulas(plano, planilha, em_array, 2, 2)
+            plano.aplicar_lote(planilha)
+            if not plano.formulas:
+                print(f"  ✅ ARRAYFORMULA já instalada em {', '.join(c['coluna'] for c in em_array)}")
+            return True
+        except Exception as e:
+            print(f"  ❌ Erro ao instalar ARRAYFORMULA em {nome_aba}: {str(e)}")
+            return False
+    
+    def garantir_grade(self, planilha, aba, linha_final: int, num_colunas: int) -> bool:
+        """
+        appendDimension das linhas/colunas que faltam até linha_final (tamanho da aba em cache)
+        Necessário antes de escrever_linhas: values.update, ao contrário de append_rows, não cresce a grade
+        
+        Returns:
+            bool: True se a grade precisou crescer
+        """
+        plano = PlanoEscrita(aba)
+        plano.garantir_grade(linha_final, num_colunas)
+        if not plano.grade:
+            return False
+        print(f"📈 Aumentando a grade de '{aba.title}' até a linha {linha_final}")
+        plano.aplicar_lote(planilha)
+        return True
+    
+    def escrever_linhas(self, aba, linha_inicial: int, dados: list, coluna_inicial: int = 1, **opcoes) -> dict:
+        """
+        Grava as linhas a partir de linha_inicial em blocos paralelos (ver escrita_blocos.py)
+        opcoes: repassadas a escrever_em_blocos (max_bytes, max_paralelo, tentativas...)
+        
+        Returns:
+            dict: resultado de escrever_em_blocos; lança exceção se algum bloco falhar
+        """
+        def progresso(info):
+            if info['total'] > 1:
+                print(f"📦 Bloco {info['bloco']}/{info['total']}: linhas {info['linha_inicial']}-{info['linha_final']} "
+                      f"(confirmadas: {info['linhas_confirmadas']}/{len(dados)})")
+        
+        resultado = escrever_em_blocos(aba, linha_inicial, dados, coluna_inicial=coluna_inicial,
+                                       ao_progresso=progresso, **opcoes)
+        anotar_etapa(blocos=resultado['blocos'])
+        if not resultado['sucesso']:
+            intervalos = ', '.join(f['intervalo'] for f in resultado['falhas'])
+            if resultado.get('erro_desfazer'):
+                situacao = f"os blocos seguintes NÃO puderam ser limpos ({resultado['erro_desfazer']})"
+            else:
+                situacao = "aba contígua até a última linha confirmada"
+            raise Exception(f"Falha ao gravar {len(resultado['falhas'])} bloco(s) ({intervalos}); "
+                            f"{resultado['linhas_confirmadas']} de {len(dados)} linhas confirmadas em ordem, "
+                            f"{situacao}")
+        return resultado
+    
     def _conectar_robusto(self, credenciais_path: str, scopes: list, max_tentativas: int = 3):
         """Conecta de forma robusta, funcionando em qualquer computador"""
         import time
+        import gspread
+        from google.oauth2.service_account import Credentials
         
         for tentativa in range(1, max_tentativas + 1):
             try:
@@ -260,37 +600,12 @@ def encontrar_arquivo_mais_recente(self, padrao_nome: str, pasta_busca: Optional
             ]
             pasta_busca = next((d for d in possibles_dirs if os.path.exists(d)), ".")
         
-        # Criar padrões de busca flexíveis
-        base_nome = padrao_nome.replace('.csv', '').replace('.CSV', '')
-        padroes = [
-            f"{base_nome}.csv",
-            f"{base_nome} (*).csv",
-            f"*{base_nome}*.csv",
-            f"{base_nome}.CSV",
-            f"{base_nome} (*).CSV"
-        ]
-        
-        arquivos_encontrados = []
-        
-        for padrao in padroes:
-            caminho_padrao = os.path.join(pasta_busca, padrao)
-            arquivos_encontrados.extend(glob.glob(caminho_padrao))
-        
-        # Busca adicional por similaridade
-        if not arquivos_encontrados and os.path.exists(pasta_busca):
-            for arquivo in os.listdir(pasta_busca):
-                if arquivo.lower().endswith(('.csv', '.CSV')):
-                    # Verificar similaridade no nome
-                    arquivo_limpo = arquivo.lower().replace('.csv', '').replace('.CSV', '')
-                    base_limpo = base_nome.lower()
-                    if base_limpo in arquivo_limpo or arquivo_limpo in base_limpo:
-                        arquivos_encontrados.append(os.path.join(pasta_busca, arquivo))
-        
-        if not arquivos_encontrados:
+        # Busca no índice da pasta (um os.scandir por execução, compartilhado com main.py)
+        entrada = obter_indice(pasta_busca).mais_recente(padrao_nome)
+        if entrada is None:
             return None
         
-        # Retorna o arquivo mais recente
-        arquivo_mais_recente = max(arquivos_encontrados, key=os.path.getmtime)
+        arquivo_mais_recente = entrada['caminho']
         nome_arquivo = os.path.basename(arquivo_mais_recente)
         
         # Feedback sobre o arquivo encontrado
@@ -306,6 +621,8 @@ def limpar_data_formato(self, valor):
         Função especializada para limpar formatação de datas
         Remove apóstrofos ('), aspas, vírgulas e outros caracteres que fazem o Sheets interpretar como texto
         """
+        import pandas as pd
+        
         if pd.isna(valor) or valor is None:
             return ''
         
@@ -355,6 +672,8 @@ def limpar_numero_formato(self, valor):
         Função utilitária para limpar formatação desnecessária de números
         Remove .0 de números inteiros, aspas desnecessárias e outros problemas comuns
         """
+        import pandas as pd
+        
         if pd.isna(valor) or valor is None:
             return ''
         
@@ -430,11 +749,239 @@ def strip_edge_quotes(s: str) -> str:
             # Não é numérico — retornar string limpa
             return valor_str
 
-    def enviar_csv_para_planilha(self, caminho_csv_ou_padrao: str, nome_aba: str) -> bool:
+    def _ler_csv_com_deteccao(self, caminho_csv: str):
+        """
+        Lê o CSV testando encodings e detectando o separador
+
+        Returns:
+            tuple: (DataFrame, separador, encoding usado)
+        """
+        # Detectar separador automaticamente com suporte robusto a encodings
+        import csv
+        import pandas as pd
+        
+        # Lista extendida de encodings para tentar (ordem de prioridade)
+        encodings = [
+            'utf-8-sig',    # UTF-8 com BOM (comum em Excel)
+            'utf-8', 
+            'latin-1', 
+            'cp1252',       # Windows-1252 (Western European)
+            'iso-8859-1',   # ISO Latin-1
+            'cp850',        # DOS Latin-1
+            'utf-16',       # UTF-16 (pode ter BOM)
+            'utf-16le',     # UTF-16 Little Endian
+            'utf-16be'      # UTF-16 Big Endian
+        ]
+        df = None
+        encoding_usado = None
+        melhor_sep = ','
+        max_colunas = 0
+        
+        for encoding in encodings:
+            try:
+                print(f"🔍 Tentando encoding: {encoding}")
+                
+                with open(caminho_csv, 'r', encoding=encoding, errors='replace') as f:
+                    # Ler primeira linha para detectar separador
+                    primeira_linha = f.readline()
+                    
+                    # Se a linha está vazia ou muito pequena, tentar próxima
+                    if not primeira_linha or len(primeira_linha.strip()) < 3:
+                        f.seek(0)  # Voltar ao início
+                        primeira_linha = f.read(1000)  # Ler primeiro KB
+                    
+                    # Testar diferentes separadores
+                    separadores = [';', ',', '\t', '|', ':']
+                    temp_max_colunas = 0
+                    temp_melhor_sep = ','
+                    
+                    for sep in separadores:
+                        # Contar colunas na primeira linha
+                        colunas = len(primeira_linha.split(sep))
+                        # Verificar se tem pelo menos 2 colunas e se não são todas vazias
+                        if colunas >= 2 and colunas > temp_max_colunas:
+                            # Verificar se não é um falso positivo (muitos campos vazios)
+                            campos_nao_vazios = sum(1 for campo in primeira_linha.split(sep) if campo.strip())
+                            if campos_nao_vazios >= 2:  # Pelo menos 2 campos com dados
+                                temp_max_colunas = colunas
+                                temp_melhor_sep = sep
+                    
+                    max_colunas = temp_max_colunas
+                    melhor_sep = temp_melhor_sep
+                    
+                    print(f"🔍 Separador detectado: '{melhor_sep}' ({max_colunas} colunas)")
+                
+                # Tentar ler o CSV completo com configurações detectadas
+                df = pd.read_csv(
+                    caminho_csv, 
+                    sep=melhor_sep, 
+                    encoding=encoding,
+                    on_bad_lines='skip',    # Pular linhas problemáticas
+                    engine='python',        # Engine mais tolerante
+                    quoting=csv.QUOTE_ALL,  # Tratar todas as aspas corretamente
+                    quotechar='"',          # Caractere de aspas padrão
+                    skipinitialspace=True,  # Remove espaços extras
+                    na_values=['', 'N/A', 'NULL', 'null', 'None', '#N/A', '#NULL!'],  # Valores nulos
+                    keep_default_na=True,
+                    doublequote=True,       # Tratar aspas duplas escapadas
+                    escapechar=None         # Não usar caractere de escape
+                )
+                
+                encoding_usado = encoding
+                print(f"📊 CSV carregado: {len(df)} linhas, {len(df.columns)} colunas")
+                print(f"🔤 Encoding usado: {encoding}")
+                print(f"📋 Colunas: {list(df.columns)[:5]}{'...' if len(df.columns) > 5 else ''}")
+                
+                # Verificar se DataFrame tem dados válidos
+                if len(df) > 0 and len(df.columns) > 0:
+                    break  # Sucesso!
+                else:
+                    print(f"⚠️ DataFrame vazio com {encoding}, tentando próximo...")
+                    df = None
+                    continue
+                
+            except UnicodeDecodeError as ude:
+                print(f"❌ Erro de encoding {encoding}: {ude}")
+                continue
+            except pd.errors.EmptyDataError:
+                print(f"⚠️ Arquivo vazio ou sem dados válidos com {encoding}")
+                continue
+            except pd.errors.ParserError as pe:
+                print(f"⚠️ Erro de parsing com {encoding}: {pe}")
+                continue
+            except Exception as e:
+                print(f"⚠️ Erro com encoding {encoding}: {e}")
+                continue
+        
+        if df is None:
+            # Último recurso: tentar leitura binária e conversão manual
+            print("🔧 Tentando leitura binária como último recurso...")
+            try:
+                with open(caminho_csv, 'rb') as f:
+                    conteudo_bytes = f.read()
+                
+                # Detectar encoding usando chardet se disponível
+                try:
+                    import chardet
+                    detectado = chardet.detect(conteudo_bytes)
+                    encoding_detectado = detectado['encoding']
+                    confianca = detectado['confidence']
+                    
+                    print(f"🔍 Chardet detectou: {encoding_detectado} (confiança: {confianca:.2f})")
+                    
+                    if encoding_detectado and confianca > 0.7:
+                        conteudo_texto = conteudo_bytes.decode(encoding_detectado, errors='replace')
+                        
+                        # Salvar temporariamente e tentar ler
+                        temp_file = caminho_csv + '.temp'
+                        with open(temp_file, 'w', encoding='utf-8') as f:
+                            f.write(conteudo_texto)
+                        
+                        df = pd.read_csv(
+                            temp_file,
+                            sep=melhor_sep,
+                            encoding='utf-8',
+                            on_bad_lines='skip',
+                            engine='python'
+                        )
+                        
+                        # Remover arquivo temporário
+                        os.remove(temp_file)
+                        encoding_usado = f"{encoding_detectado} (convertido via chardet)"
+                        
+                except ImportError:
+                    print("💡 Instale 'chardet' para melhor detecção: pip install chardet")
+            except Exception as e:
+                print(f"⚠️ Falha na leitura binária: {e}")
+            
+            if df is None:
+                raise Exception(
+                    "Não foi possível ler o arquivo CSV com nenhum encoding testado. "
+                    "Verifique se o arquivo está corrompido ou em formato não suportado. "
+                    f"Encodings testados: {', '.join(encodings)}"
+                )
+
+        return df, melhor_sep, encoding_usado
+
+    def _colunas_data(self, df) -> list:
+        """Índices das colunas de data, identificadas pelo nome da coluna"""
+        colunas_data = []
+        palavras_chave_data = ['data', 'date', 'abertura', 'fechamento', 'criado', 'criação', 
+                                'modificado', 'atualizado', 'hora', 'timestamp', 'criacao']
+        
+        for idx, col_nome in enumerate(df.columns):
+            col_lower = str(col_nome).lower()
+            if any(palavra in col_lower for palavra in palavras_chave_data):
+                colunas_data.append(idx)
+        return colunas_data
+    
+    def _formatar_dados_csv(self, df, dados_csv: list) -> list:
+        """
+        Limpa números, datas e aspas das linhas do CSV para envio ao Google Sheets
+        Colunas de data são identificadas pelo nome da coluna
+        """
+        colunas_data = self._colunas_data(df)
+        
+        if colunas_data:
+            print(f"📅 Colunas de data identificadas: {[df.columns[i] for i in colunas_data]}")
+        
+        # Converter valores usando função de limpeza inteligente E processamento robusto
+        print(f"🔧 Aplicando limpeza automática de formatação (números, datas e aspas)...")
+        dados_formatados = []
+        for linha in dados_csv:
+            linha_formatada = []
+            for idx, valor in enumerate(linha):
+                # Processar valor para garantir compatibilidade com Google Sheets
+                if valor is None or valor == '' or str(valor).lower() == 'nan':
+                    linha_formatada.append('')
+                else:
+                    valor_str = str(valor).strip()
+                    
+                    # Se é coluna de data, usar limpeza específica para data
+                    if idx in colunas_data:
+                        valor_limpo = self.limpar_data_formato(valor)
+                        linha_formatada.append(valor_limpo)
+                    else:
+                        # Tentar converter para número se possível
+                        try:
+                            # Se contém apenas dígitos, ponto ou vírgula, pode ser número
+                            if valor_str.replace('.', '').replace(',', '').replace('-', '').replace('+', '').replace(' ', '').isdigit():
+                                # Tentar converter para float
+                                valor_num = float(valor_str.replace(',', '.').replace(' ', ''))
+                                # Se for inteiro, converter para int
+                                if valor_num.is_integer():
+                                    linha_formatada.append(int(valor_num))
+                                else:
+                                    linha_formatada.append(valor_num)
+                            else:
+                                # Não é número, aplicar limpeza normal
+                                valor_limpo = self.limpar_numero_formato(valor)
+                                linha_formatada.append(valor_limpo)
+                        except:
+                            # Se falhar, usar limpeza normal
+                            valor_limpo = self.limpar_numero_formato(valor)
+                            linha_formatada.append(valor_limpo)
+            
+            dados_formatados.append(linha_formatada)
+        
+        print(f"✅ Formatação limpa aplicada a {len(dados_formatados)} linhas ({len(colunas_data)} colunas de data tratadas)")
+        
+        return dados_formatados
+
+    def enviar_csv_para_planilha(self, caminho_csv_ou_padrao: str, nome_aba: str,
+                                 formulas_config: Optional[list] = None, simular: bool = False) -> bool:
         """
         Método genérico para enviar CSV para uma aba específica
         COMPLEMENTA dados existentes (não remove) e remove cabeçalho do CSV
         Detecta automaticamente o separador correto do CSV
+        
+        Args:
+            formulas_config: fórmulas das linhas novas ({'coluna', 'formula'}), no mesmo plano de escrita;
+                             com a base em modo 'materializada', as que se sabe calcular viram valores
+            simular: só monta e mostra o plano de escrita (lê a aba, não grava nada)
+        
+        Bases particionadas (ver particoes_abas.py) gravam cada linha na aba do seu período;
+        o retorno traz então 'particoes' com as linhas de cada uma.
         """
         try:
             # Verificar se é um caminho direto ou padrão para buscar
@@ -447,350 +994,191 @@ def enviar_csv_para_planilha(self, caminho_csv_ou_padrao: str, nome_aba: str) ->
                     print(f"❌ Arquivo não encontrado para padrão: {caminho_csv_ou_padrao}")
                     return False
             
-            # Detectar separador automaticamente com suporte robusto a encodings
-            import csv
+            with etapa('ler_csv'):
+                df, melhor_sep, encoding_usado = self._ler_csv_com_deteccao(caminho_csv)
+                anotar_etapa(linhas_csv=len(df))
             
-            # Lista extendida de encodings para tentar (ordem de prioridade)
-            encodings = [
-                'utf-8-sig',    # UTF-8 com BOM (comum em Excel)
-                'utf-8', 
-                'latin-1', 
-                'cp1252',       # Windows-1252 (Western European)
-                'iso-8859-1',   # ISO Latin-1
-                'cp850',        # DOS Latin-1
-                'utf-16',       # UTF-16 (pode ter BOM)
-                'utf-16le',     # UTF-16 Little Endian
-                'utf-16be'      # UTF-16 Big Endian
-            ]
-            df = None
-            encoding_usado = None
-            melhor_sep = ','
-            max_colunas = 0
-            
-            for encoding in encodings:
-                try:
-                    print(f"🔍 Tentando encoding: {encoding}")
-                    
-                    with open(caminho_csv, 'r', encoding=encoding, errors='replace') as f:
-                        # Ler primeira linha para detectar separador
-                        primeira_linha = f.readline()
-                        
-                        # Se a linha está vazia ou muito pequena, tentar próxima
-                        if not primeira_linha or len(primeira_linha.strip()) < 3:
-                            f.seek(0)  # Voltar ao início
-                            primeira_linha = f.read(1000)  # Ler primeiro KB
-                        
-                        # Testar diferentes separadores
-                        separadores = [';', ',', '\t', '|', ':']
-                        temp_max_colunas = 0
-                        temp_melhor_sep = ','
-                        
-                        for sep in separadores:
-                            # Contar colunas na primeira linha
-                            colunas = len(primeira_linha.split(sep))
-                            # Verificar se tem pelo menos 2 colunas e se não são todas vazias
-                            if colunas >= 2 and colunas > temp_max_colunas:
-                                # Verificar se não é um falso positivo (muitos campos vazios)
-                                campos_nao_vazios = sum(1 for campo in primeira_linha.split(sep) if campo.strip())
-                                if campos_nao_vazios >= 2:  # Pelo menos 2 campos com dados
-                                    temp_max_colunas = colunas
-                                    temp_melhor_sep = sep
-                        
-                        max_colunas = temp_max_colunas
-                        melhor_sep = temp_melhor_sep
-                        
-                        print(f"🔍 Separador detectado: '{melhor_sep}' ({max_colunas} colunas)")
-                    
-                    # Tentar ler o CSV completo com configurações detectadas
-                    df = pd.read_csv(
-                        caminho_csv, 
-                        sep=melhor_sep, 
-                        encoding=encoding,
-                        on_bad_lines='skip',    # Pular linhas problemáticas
-                        engine='python',        # Engine mais tolerante
-                        quoting=csv.QUOTE_ALL,  # Tratar todas as aspas corretamente
-                        quotechar='"',          # Caractere de aspas padrão
-                        skipinitialspace=True,  # Remove espaços extras
-                        na_values=['', 'N/A', 'NULL', 'null', 'None', '#N/A', '#NULL!'],  # Valores nulos
-                        keep_default_na=True,
-                        doublequote=True,       # Tratar aspas duplas escapadas
-                        escapechar=None         # Não usar caractere de escape
-                    )
-                    
-                    encoding_usado = encoding
-                    print(f"📊 CSV carregado: {len(df)} linhas, {len(df.columns)} colunas")
-                    print(f"🔤 Encoding usado: {encoding}")
-                    print(f"📋 Colunas: {list(df.columns)[:5]}{'...' if len(df.columns) > 5 else ''}")
-                    
-                    # Verificar se DataFrame tem dados válidos
-                    if len(df) > 0 and len(df.columns) > 0:
-                        break  # Sucesso!
-                    else:
-                        print(f"⚠️ DataFrame vazio com {encoding}, tentando próximo...")
-                        df = None
-                        continue
-                    
-                except UnicodeDecodeError as ude:
-                    print(f"❌ Erro de encoding {encoding}: {ude}")
-                    continue
-                except pd.errors.EmptyDataError:
-                    print(f"⚠️ Arquivo vazio ou sem dados válidos com {encoding}")
-                    continue
-                except pd.errors.ParserError as pe:
-                    print(f"⚠️ Erro de parsing com {encoding}: {pe}")
-                    continue
-                except Exception as e:
-                    print(f"⚠️ Erro com encoding {encoding}: {e}")
-                    continue
-            
-            if df is None:
-                # Último recurso: tentar leitura binária e conversão manual
-                print("🔧 Tentando leitura binária como último recurso...")
-                try:
-                    with open(caminho_csv, 'rb') as f:
-                        conteudo_bytes = f.read()
-                    
-                    # Detectar encoding usando chardet se disponível
-                    try:
-                        import chardet
-                        detectado = chardet.detect(conteudo_bytes)
-                        encoding_detectado = detectado['encoding']
-                        confianca = detectado['confidence']
-                        
-                        print(f"🔍 Chardet detectou: {encoding_detectado} (confiança: {confianca:.2f})")
-                        
-                        if encoding_detectado and confianca > 0.7:
-                            conteudo_texto = conteudo_bytes.decode(encoding_detectado, errors='replace')
-                            
-                            # Salvar temporariamente e tentar ler
-                            temp_file = caminho_csv + '.temp'
-                            with open(temp_file, 'w', encoding='utf-8') as f:
-                                f.write(conteudo_texto)
-                            
-                            df = pd.read_csv(
-                                temp_file,
-                                sep=melhor_sep,
-                                encoding='utf-8',
-                                on_bad_lines='skip',
-                                engine='python'
-                            )
-                            
-                            # Remover arquivo temporário
-                            os.remove(temp_file)
-                            encoding_usado = f"{encoding_detectado} (convertido via chardet)"
-                            
-                    except ImportError:
-                        print("💡 Instale 'chardet' para melhor detecção: pip install chardet")
-                except Exception as e:
-                    print(f"⚠️ Falha na leitura binária: {e}")
-                
-                if df is None:
-                    raise Exception(
-                        "Não foi possível ler o arquivo CSV com nenhum encoding testado. "
-                        "Verifique se o arquivo está corrompido ou em formato não suportado. "
-                        f"Encodings testados: {', '.join(encodings)}"
-                    )
-            
-            # Abre a planilha e aba
-            planilha = self.client.open_by_key(self.ID_PLANILHA)
+            # Abre a planilha (reaproveitada entre arquivos e execuções)
+            planilha = self.abrir_planilha()
             print(f"📋 Conectado à planilha: '{planilha.title}'")
-            aba = planilha.worksheet(nome_aba)
-            print(f"📄 Processando aba: '{nome_aba}'")
-            
-            # Encontrar a próxima linha vazia (após os dados existentes)
-            valores_existentes = aba.get_all_values()
-            # Encontrar última linha com dados (não vazia)
-            ultima_linha_com_dados = 0
-            for i, linha in enumerate(valores_existentes):
-                if any(cell.strip() for cell in linha):  # Se tem algum dado na linha
-                    ultima_linha_com_dados = i + 1
-            
-            # Próxima linha disponível
-            proxima_linha = ultima_linha_com_dados + 1
-            
-            # SOLUÇÃO: Adicionar linha em branco para expandir a planilha se necessário
-            try:
-                # Tentar adicionar uma linha vazia na próxima posição para garantir espaço
-                linha_teste = proxima_linha + len(df)
-                if linha_teste > len(valores_existentes):
-                    print(f"📈 Expandindo planilha para acomodar {len(df)} linhas...")
-                    # Adicionar uma linha em branco para forçar expansão
-                    aba.append_row([''])
-                    print(f"✅ Planilha expandida com sucesso!")
-            except Exception as expand_error:
-                print(f"⚠️ Aviso ao expandir planilha: {expand_error}")
             
             # Preparar dados SEM CABEÇALHO (só os dados do CSV)
-            dados_csv = df.values.tolist()
-            
-            # Identificar colunas de data baseado nos nomes
-            colunas_data = []
-            palavras_chave_data = ['data', 'date', 'abertura', 'fechamento', 'criado', 'criação', 
-                                    'modificado', 'atualizado', 'hora', 'timestamp', 'criacao']
-            
-            for idx, col_nome in enumerate(df.columns):
-                col_lower = str(col_nome).lower()
-                if any(palavra in col_lower for palavra in palavras_chave_data):
-                    colunas_data.append(idx)
-            
-            if colunas_data:
-                print(f"📅 Colunas de data identificadas: {[df.columns[i] for i in colunas_data]}")
+            with etapa('converter_lista'):
+                dados_csv = df.values.tolist()
             
-            # Converter valores usando função de limpeza inteligente E processamento robusto
-            print(f"🔧 Aplicando limpeza automática de formatação (números, datas e aspas)...")
-            dados_formatados = []
-            for linha in dados_csv:
-                linha_formatada = []
-                for idx, valor in enumerate(linha):
-                    # Processar valor para garantir compatibilidade com Google Sheets
-                    if valor is None or valor == '' or str(valor).lower() == 'nan':
-                        linha_formatada.append('')
-                    else:
-                        valor_str = str(valor).strip()
-                        
-                        # Se é coluna de data, usar limpeza específica para data
-                        if idx in colunas_data:
-                            valor_limpo = self.limpar_data_formato(valor)
-                            linha_formatada.append(valor_limpo)
-                        else:
-                            # Tentar converter para número se possível
-                            try:
-                                # Se contém apenas dígitos, ponto ou vírgula, pode ser número
-                                if valor_str.replace('.', '').replace(',', '').replace('-', '').replace('+', '').replace(' ', '').isdigit():
-                                    # Tentar converter para float
-                                    valor_num = float(valor_str.replace(',', '.').replace(' ', ''))
-                                    # Se for inteiro, converter para int
-                                    if valor_num.is_integer():
-                                        linha_formatada.append(int(valor_num))
-                                    else:
-                                        linha_formatada.append(valor_num)
-                                else:
-                                    # Não é número, aplicar limpeza normal
-                                    valor_limpo = self.limpar_numero_formato(valor)
-                                    linha_formatada.append(valor_limpo)
-                            except:
-                                # Se falhar, usar limpeza normal
-                                valor_limpo = self.limpar_numero_formato(valor)
-                                linha_formatada.append(valor_limpo)
-                
-                dados_formatados.append(linha_formatada)
+            with etapa('formatar'):
+                dados_formatados = self._formatar_dados_csv(df, dados_csv)
             
-            print(f"✅ Formatação limpa aplicada a {len(dados_formatados)} linhas ({len(colunas_data)} colunas de data tratadas)")
+            # Escrita tipada: datas viram número de série, durações/percentuais/moeda viram
+            # números, cada coluna recebe o formato de número e tudo é gravado com RAW
+            # (o Sheets não reinterpreta cada célula; fórmulas continuam com USER_ENTERED)
+            formatos_data = {}
+            if self.escrita_tipada:
+                with etapa('tipar'):
+                    colunas_data = self._colunas_data(df)
+                    formatos_data = tipar_colunas_data(dados_formatados, colunas_data)
+                    formatos_data.update(tipar_colunas_numericas(dados_formatados, colunas_data))
             
-            # Calcular range para inserir dados
             num_colunas = len(df.columns)
-            num_linhas = len(dados_formatados)
+            nome_arquivo = os.path.basename(caminho_csv)
             
-            if num_linhas > 0:
-                # Inserir dados a partir da próxima linha
-                # IMPORTANTE: usar USER_ENTERED para que Sheets interprete datas corretamente
-                range_destino = f"A{proxima_linha}:{chr(65 + num_colunas - 1)}{proxima_linha + num_linhas - 1}"
-                aba.update(range_destino, dados_formatados, value_input_option='USER_ENTERED')
-                
-            # PINTAR TODAS AS LINHAS ADICIONADAS COM VERDE LEROY MERLIN
-            try:
-                if num_linhas > 0:
-                    # Definir range de todas as linhas inseridas
-                    range_colorir = f"A{proxima_linha}:{chr(65 + num_colunas - 1)}{proxima_linha + num_linhas - 1}"
-                    
-                    print(f"🎨 Colorindo linhas {proxima_linha} até {proxima_linha + num_linhas - 1}...")
-                    
-                    # Criar formatação verde Leroy Merlin com gradiente
-                    formato_verde_claro = {
-                        "backgroundColor": {
-                            "red": 0.8,    # Verde bem claro para contraste
-                            "green": 0.95,  
-                            "blue": 0.85
-                        },
-                        "borders": {
-                            "top": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
-                            "bottom": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
-                            "left": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}},
-                            "right": {"style": "SOLID", "width": 1, "color": {"red": 0.0, "green": 0.66, "blue": 0.35}}
-                        },
-                        "textFormat": {
-                            "foregroundColor": {
-                                "red": 0.1,
-                                "green": 0.3,
-                                "blue": 0.1
-                            },
-                            "fontSize": 10
-                        }
-                    }
-                    
-                    # Aplicar formatação para todas as linhas
-                    aba.format(range_colorir, formato_verde_claro)
-                    
-                    # PRIMEIRA LINHA COM DESTAQUE ESPECIAL (verde escuro)
-                    primeira_linha_range = f"A{proxima_linha}:{chr(65 + num_colunas - 1)}{proxima_linha}"
-                    
-                    formato_primeira_linha = {
-                        "backgroundColor": {
-                            "red": 0.0,
-                            "green": 0.66,  # #00A859 Leroy Merlin
-                            "blue": 0.35
-                        },
-                        "textFormat": {
-                            "foregroundColor": {
-                                "red": 1.0,
-                                "green": 1.0,
-                                "blue": 1.0
-                            },
-                            "bold": True,
-                            "fontSize": 11
-                        },
-                        "borders": {
-                            "top": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
-                            "bottom": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
-                            "left": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}},
-                            "right": {"style": "SOLID", "width": 2, "color": {"red": 0.0, "green": 0.53, "blue": 0.28}}
-                        }
-                    }
-                    
-                    aba.format(primeira_linha_range, formato_primeira_linha)
-                    
-                    print(f"🎨✅ Coloração aplicada com sucesso!")
-                    print(f"   🟢 Primeira linha: Verde escuro Leroy Merlin (destaque)")
-                    print(f"   💚 Demais linhas: Verde claro com bordas (total: {num_linhas} linhas)")
-                    
-                    # Retornar informações das linhas adicionadas para aplicar fórmulas
-                    nome_arquivo = os.path.basename(caminho_csv)
-                    print(f"✅ {nome_arquivo} → {nome_aba} (linhas {proxima_linha}-{proxima_linha + num_linhas - 1})")
-                    print(f"📊 {num_linhas} registros adicionados (sem cabeçalho)")
-                    print(f"🔧 Separador usado: '{melhor_sep}'")
-                    
-                    return {
-                        'sucesso': True,
-                        'linha_inicial': proxima_linha,
-                        'linha_final': proxima_linha + num_linhas - 1,
-                        'num_linhas': num_linhas
-                    }
-                    
-            except Exception as format_error:
-                print(f"⚠️ Aviso: Não foi possível aplicar formatação colorida: {format_error}")
-                print("💡 Os dados foram inseridos com sucesso, apenas sem coloração")
-                
-                nome_arquivo = os.path.basename(caminho_csv)
-                print(f"✅ {nome_arquivo} → {nome_aba} (linhas {proxima_linha}-{proxima_linha + num_linhas - 1})")
-                print(f"📊 {num_linhas} registros adicionados (sem cabeçalho)")
-                print(f"🔧 Separador usado: '{melhor_sep}'")
-                
-                # Retornar informações das linhas adicionadas para aplicar fórmulas
-                return {
-                    'sucesso': True,
-                    'linha_inicial': proxima_linha,
-                    'linha_final': proxima_linha + num_linhas - 1,
-                    'num_linhas': num_linhas
-                }
+            regra = self.regra_particao(nome_aba)
+            if regra is None:
+                resultado = self._enviar_linhas_aba(planilha, nome_aba, dados_formatados, num_colunas, formatos_data,
+                                                    formulas_config, simular, nome_arquivo)
+                if resultado.get('num_linhas') == 0:
+                    print(f"⚠️ Arquivo CSV vazio: {caminho_csv}")
             else:
-                print(f"⚠️ Arquivo CSV vazio: {caminho_csv}")
-            
-            return {'sucesso': True, 'linha_inicial': None, 'linha_final': None, 'num_linhas': 0}
+                resultado = self._enviar_particionado(planilha, nome_aba, regra, dados_formatados, num_colunas,
+                                                      formatos_data, formulas_config, simular, nome_arquivo)
+            if resultado.get('num_linhas'):
+                print(f"📊 {resultado['num_linhas']} registros adicionados (sem cabeçalho)")
+                print(f"🔧 Separador usado: '{melhor_sep}'")
+            return resultado
             
         except Exception as e:
             print(f"❌ Erro ao processar arquivo: {str(e)}")
-            return {'sucesso': False, 'linha_inicial': None, 'linha_final': None, 'num_linhas': 0}
+            # Aba renomeada/removida ou handle inválido: reabrir na próxima vez
+            self.descartar_aba(nome_aba)
+            return {'sucesso': False, 'linha_inicial': None, 'linha_final': None, 'num_linhas': 0, 'erro': str(e)}
+    
+    def regra_particao(self, nome_aba: str) -> Optional[dict]:
+        """Regra de partição da base (planilhas_config.json); None se ela grava numa aba só"""
+        return regra_da_base(nome_aba)
+    
+    def _enviar_particionado(self, planilha, nome_aba: str, regra: dict, dados: list, num_colunas: int,
+                             formatos_data: dict, formulas_config: Optional[list], simular: bool,
+                             nome_arquivo: str) -> dict:
+        """Roteia as linhas pela coluna de data, cria as partições que faltam e grava cada uma"""
+        periodo = regra.get('periodo', 'mensal')
+        grupos = rotear_linhas(dados, self._letra_para_indice(regra.get('coluna_data', 'A')), nome_aba, periodo)
+        print(f"🗂️ {len(dados)} linhas em {len(grupos)} partição(ões) ({periodo}): "
+              f"{', '.join(f'{nome} ({len(linhas)})' for nome, linhas in grupos)}")
+        
+        if simular:
+            existentes = abas_conhecidas(planilha, self.ID_PLANILHA)
+            for nome, _ in grupos:
+                if nome not in existentes:
+                    print(f"🆕 Partição '{nome}' seria criada")
+            grupos = [(nome, linhas) for nome, linhas in grupos if nome in existentes]
+        else:
+            criadas = garantir_particoes(planilha, self.ID_PLANILHA, nome_aba, regra, [nome for nome, _ in grupos])
+            for nome in criadas:
+                print(f"🆕 Partição criada: '{nome}'")
+            if criadas and regra.get('visao'):
+                print(f"🔗 Visão '{regra['visao']}' atualizada com as partições")
+        
+        particoes = []
+        for nome, linhas in grupos:
+            try:
+                resultado = self._enviar_linhas_aba(planilha, nome, linhas, num_colunas, formatos_data,
+                                                    formulas_config, simular, nome_arquivo, nome_base=nome_aba)
+            except Exception:
+                self.descartar_aba(nome)
+                raise
+            particoes.append(dict(resultado, aba=nome))
+        
+        unica = particoes[0] if len(particoes) == 1 else {}
+        return {
+            'sucesso': True,
+            'linha_inicial': unica.get('linha_inicial'),
+            'linha_final': unica.get('linha_final'),
+            'num_linhas': sum(p['num_linhas'] for p in particoes),
+            'linhas_existentes': sum(p['linhas_existentes'] for p in particoes) if particoes else None,
+            'particoes': [{chave: p.get(chave) for chave in ('aba', 'linha_inicial', 'linha_final', 'num_linhas', 'plano')
+                           if chave in p} for p in particoes],
+            **({'simulado': True} if simular else {}),
+        }
+    
+    def _enviar_linhas_aba(self, planilha, nome_aba: str, dados_formatados: list, num_colunas: int,
+                           formatos_data: dict, formulas_config: Optional[list], simular: bool,
+                           nome_arquivo: str, nome_base: Optional[str] = None) -> dict:
+        """
+        Acha o fim dos dados da aba e grava as linhas novas com o plano de escrita
+
+        nome_base: base configurada quando nome_aba é uma partição ('BASE VOZ' para
+        'BASE VOZ 2026-10') - as regras por base do planilhas_config.json usam esse nome
+        """
+        aba = self.abrir_aba(nome_aba)
+        print(f"📄 Processando aba: '{nome_aba}'")
+        
+        # Encontrar a próxima linha vazia (após os dados existentes)
+        with etapa('localizar_fim'):
+            valores_existentes = aba.get_all_values()
+            # Encontrar última linha com dados (não vazia)
+            ultima_linha_com_dados = 0
+            for i, linha in enumerate(valores_existentes):
+                if any(cell.strip() for cell in linha):  # Se tem algum dado na linha
+                    ultima_linha_com_dados = i + 1
+            anotar_etapa(linhas_aba=len(valores_existentes))
+        
+        # Próxima linha disponível
+        proxima_linha = ultima_linha_com_dados + 1
+        num_linhas = len(dados_formatados)
+        
+        if num_linhas == 0:
+            return {'sucesso': True, 'linha_inicial': None, 'linha_final': None, 'num_linhas': 0,
+                    'linhas_existentes': ultima_linha_com_dados}
+        
+        linha_final = proxima_linha + num_linhas - 1
+        
+        # Colunas derivadas materializadas: calculadas aqui e gravadas como valores
+        colunas_derivadas = {}
+        if formulas_config and self.modo_colunas_derivadas(nome_base or nome_aba) == 'materializada':
+            calculaveis, formulas_config = separar_derivadas(formulas_config, num_colunas)
+            if calculaveis:
+                with etapa('derivar'):
+                    colunas_derivadas = materializar_colunas(dados_formatados, calculaveis, formatos_data,
+                                                             texto_literal=not self.escrita_tipada)
+                print(f"🧮 Colunas calculadas localmente: "
+                      f"{', '.join(config['coluna'] for config, *_ in calculaveis)}")
+        
+        # Plano de escrita do arquivo: grade (appendDimension, se faltar), os valores numa
+        # values.batchUpdate e só então VERDE LEROY MERLIN, formatos e fórmulas numa batchUpdate
+        plano = self.montar_plano_escrita(planilha, aba, proxima_linha, dados_formatados, num_colunas,
+                                          formatos_data, formulas_config, colunas_derivadas, nome_base)
+        if simular:
+            print(plano.descrever())
+            return {'sucesso': True, 'simulado': True, 'linha_inicial': proxima_linha,
+                    'linha_final': linha_final, 'num_linhas': num_linhas,
+                    'linhas_existentes': ultima_linha_com_dados, 'plano': plano.resumo()}
+        
+        # Inserir dados a partir da próxima linha (blocos paralelos se passar do limite de payload).
+        # Valores antes de cores e fórmulas: se falharem, nenhuma linha fica formatada sem dados
+        with etapa('enviar'):
+            plano.aplicar_grade(planilha)
+            plano.gravar_valores(planilha, self.escrever_linhas)
+            anotar_etapa(linhas_enviadas=num_linhas, chamadas=plano.resumo()['chamadas'])
+        
+        print(f"🎨 Colorindo linhas {proxima_linha} até {linha_final}...")
+        with etapa('colorir'):
+            colorido = plano.aplicar_lote(planilha)
+        if colorido:
+            confirmar_destaque(self.ID_PLANILHA, aba.id, plano.formatos)
+        else:
+            descartar_destaque(self.ID_PLANILHA, aba.id)
+        
+        if plano.formulas:
+            print(f"🔧 {len(plano.formulas)} fórmula(s) aplicadas nas linhas {proxima_linha}-{linha_final}")
+        if colorido:
+            print(f"🎨✅ Coloração aplicada com sucesso!")
+            print(f"   🟢 Primeira linha: Verde escuro Leroy Merlin (destaque)")
+            print(f"   💚 Demais linhas: Verde claro com bordas (total: {num_linhas} linhas)")
+        else:
+            print("💡 Os dados foram inseridos com sucesso, apenas sem coloração")
+        
+        print(f"✅ {nome_arquivo} → {nome_aba} (linhas {proxima_linha}-{linha_final})")
+        
+        # Retornar informações das linhas adicionadas para aplicar fórmulas
+        return {
+            'sucesso': True,
+            'linha_inicial': proxima_linha,
+            'linha_final': linha_final,
+            'num_linhas': num_linhas,
+            'linhas_existentes': ultima_linha_com_dados
+        }
     
+
     def aplicar_formula_coluna(self, nome_aba, coluna, linha_inicial, formula_template, linha_final=None):
         """
         Aplica uma fórmula em toda uma coluna
@@ -863,8 +1251,11 @@ def aplicar_formulas_multiplas(self, nome_aba, formulas_config, linha_inicial=2)
             
             print(f"  🔧 Aplicando {len(formulas_config)} fórmula(s) em {nome_aba}...")
             
-            sucesso = True
+            # Colunas em ARRAYFORMULA: só a instalação no cabeçalho, sem fórmulas por linha
+            sucesso = self.instalar_arrayformulas(nome_aba, formulas_config)
             for config in formulas_config:
+                if config.get('arrayformula'):
+                    continue
                 coluna = config['coluna']
                 formula_template = config['formula']
                 
@@ -889,6 +1280,8 @@ def aplicar_formulas_linhas_novas(self, nome_aba, formulas_config, linha_inicial
         """
         Aplica fórmulas APENAS nas linhas recém-adicionadas (as que ficaram verdes)
         MÉTODO: Copia a fórmula da linha anterior e cola nas linhas novas (simulando Ctrl+C + Ctrl+V)
+        No envio de um CSV, prefira enviar_csv_para_planilha(..., formulas_config=...): as fórmulas
+        vão no mesmo plano de escrita dos dados, sem chamadas extras
         
         Args:
             nome_aba: Nome da aba
@@ -907,81 +1300,23 @@ def aplicar_formulas_linhas_novas(self, nome_aba, formulas_config, linha_inicial
                 print(f"  ⚠️ Sem linhas novas para aplicar fórmulas")
                 return True
             
-            planilha = self.client.open_by_key(self.ID_PLANILHA)
-            aba = planilha.worksheet(nome_aba)
+            planilha = self.abrir_planilha()
+            aba = self.abrir_aba(nome_aba)
             
             print(f"  🔧 Copiando e colando fórmulas nas linhas {linha_inicial}-{linha_final}...")
             print(f"  📋 Método: Copiar fórmula da linha {linha_inicial - 1} e colar nas novas linhas")
             
-            sucesso = True
-            for config in formulas_config:
-                coluna = config['coluna']
-                
-                # ETAPA 1: Copiar a fórmula da linha ANTERIOR (linha_inicial - 1)
-                linha_origem = linha_inicial - 1
-                celula_origem = f'{coluna}{linha_origem}'
-                
-                try:
-                    # Pegar o valor/fórmula da célula origem
-                    valor_origem = aba.acell(celula_origem, value_render_option='FORMULA').value
-                    
-                    if valor_origem and valor_origem.startswith('='):
-                        print(f"    📋 Copiando de {celula_origem}: {valor_origem[:60]}...")
-                        
-                        # ETAPA 2: Usar copyPaste do Google Sheets API (simula Ctrl+C + Ctrl+V)
-                        # Isso faz o Google Sheets ajustar automaticamente as referências
-                        requests = [{
-                            "copyPaste": {
-                                "source": {
-                                    "sheetId": aba.id,
-                                    "startRowIndex": linha_origem - 1,  # 0-indexed
-                                    "endRowIndex": linha_origem,
-                                    "startColumnIndex": self._letra_para_indice(coluna),
-                                    "endColumnIndex": self._letra_para_indice(coluna) + 1
-                                },
-                                "destination": {
-                                    "sheetId": aba.id,
-                                    "startRowIndex": linha_inicial - 1,  # 0-indexed
-                                    "endRowIndex": linha_final,
-                                    "startColumnIndex": self._letra_para_indice(coluna),
-                                    "endColumnIndex": self._letra_para_indice(coluna) + 1
-                                },
-                                "pasteType": "PASTE_FORMULA"  # Copiar apenas a fórmula
-                            }
-                        }]
-                        
-                        # Executar o copyPaste
-                        body = {'requests': requests}
-                        planilha.batch_update(body)
-                        
-                        print(f"    ✅ Fórmula copiada e colada em {coluna}{linha_inicial}:{coluna}{linha_final}")
-                        
-                    else:
-                        # Se não tem fórmula na linha anterior, criar do zero usando template
-                        print(f"    ⚠️ Não há fórmula em {celula_origem}, criando do zero...")
-                        formula_template = config['formula']
-                        formulas = []
-                        for linha in range(linha_inicial, linha_final + 1):
-                            formula = formula_template.replace('{row}', str(linha))
-                            formulas.append([formula])
-                        
-                        range_cells = f'{coluna}{linha_inicial}:{coluna}{linha_final}'
-                        aba.update(range_cells, formulas, value_input_option='USER_ENTERED')
-                        print(f"    ✅ Fórmula criada em {coluna}{linha_inicial}:{coluna}{linha_final}")
-                        
-                except Exception as e:
-                    print(f"    ⚠️ Erro ao copiar de {celula_origem}: {e}")
-                    # Fallback: criar fórmula do zero
-                    formula_template = config['formula']
-                    formulas = []
-                    for linha in range(linha_inicial, linha_final + 1):
-                        formula = formula_template.replace('{row}', str(linha))
-                        formulas.append([formula])
-                    
-                    range_cells = f'{coluna}{linha_inicial}:{coluna}{linha_final}'
-                    aba.update(range_cells, formulas, value_input_option='USER_ENTERED')
-                    print(f"    ✅ Fórmula criada (fallback) em {coluna}{linha_inicial}:{coluna}{linha_final}")
+            # Uma leitura das fórmulas de origem e uma batchUpdate, qualquer que seja o número de colunas
+            plano = PlanoEscrita(aba)
+            self._planejar_formulas(plano, planilha, formulas_config, linha_inicial, linha_final)
+            plano.aplicar_lote(planilha)
+            for requisicao in plano.formulas:
+                if 'range' in requisicao.get('updateCells', {}):
+                    continue
+                print(f"    ✅ {'Fórmula copiada e colada' if 'copyPaste' in requisicao else 'Fórmula criada'}"
+                      f" em {self._intervalo_formula(requisicao)}")
             
+            sucesso = True
             return sucesso
             
         except Exception as e:
@@ -990,6 +1325,22 @@ def aplicar_formulas_linhas_novas(self, nome_aba, formulas_config, linha_inicial
             traceback.print_exc()
             return False
     
+    def _intervalo_formula(self, requisicao: dict) -> str:
+        """'P10:P20' de uma requisição copyPaste/updateCells do plano de escrita"""
+        if 'copyPaste' in requisicao:
+            destino = requisicao['copyPaste']['destination']
+            coluna, primeira, ultima = destino['startColumnIndex'], destino['startRowIndex'] + 1, destino['endRowIndex']
+        elif 'range' in requisicao['updateCells']:
+            # Limpeza da coluna abaixo do cabeçalho (instalação de ARRAYFORMULA)
+            letra = letra_coluna(requisicao['updateCells']['range']['startColumnIndex'] + 1)
+            return f"{letra}2:{letra}"
+        else:
+            celulas = requisicao['updateCells']
+            coluna, primeira = celulas['start']['columnIndex'], celulas['start']['rowIndex'] + 1
+            ultima = primeira + len(celulas['rows']) - 1
+        letra = letra_coluna(coluna + 1)
+        return f"{letra}{primeira}:{letra}{ultima}"
+    
     def _letra_para_indice(self, letra):
         """Converte letra de coluna (A, B, Z, AA) para índice numérico (0-indexed)"""
         indice = 0
@@ -1032,8 +1383,11 @@ def aplicar_formulas_todas_linhas(self, nome_aba, formulas_config, linha_inicial
             total_linhas = linha_final - linha_inicial + 1
             print(f"  🔧 Aplicando {len(formulas_config)} fórmula(s) em TODAS as {total_linhas} linhas ({linha_inicial}-{linha_final})...")
             
-            sucesso = True
+            # Colunas em ARRAYFORMULA: só a instalação no cabeçalho, sem fórmulas por linha
+            sucesso = self.instalar_arrayformulas(nome_aba, formulas_config)
             for config in formulas_config:
+                if config.get('arrayformula'):
+                    continue
                 coluna = config['coluna']
                 formula_template = config['formula']
                 
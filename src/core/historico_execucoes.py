@@ -0,0 +1,334 @@
+"""
+Histórico de execuções em SQLite
+Guarda cada execução e cada etapa por base (append-only, índices por data e base)
+e calcula p50/p95 de duração, linhas/s e taxa de falha. Linhas antigas são
+compactadas em um resumo diário para manter o arquivo pequeno.
+"""
+
+import json
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+CAMINHO_HISTORICO_PADRAO = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'json', 'historico_execucoes.db'
+)
+
+# Dias mantidos com detalhe por execução/etapa antes de virar resumo diário
+DIAS_DETALHE_PADRAO = 60
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    sucesso INTEGER NOT NULL,
+    arquivos_sucesso INTEGER NOT NULL DEFAULT 0,
+    arquivos_erro INTEGER NOT NULL DEFAULT 0,
+    linhas INTEGER NOT NULL DEFAULT 0,
+    duracao REAL,
+    detalhes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_execucoes_data ON execucoes(data);
+
+CREATE TABLE IF NOT EXISTS etapas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    execucao_id INTEGER REFERENCES execucoes(id) ON DELETE CASCADE,
+    data TEXT NOT NULL,
+    base TEXT NOT NULL,
+    etapa TEXT NOT NULL DEFAULT 'arquivo',
+    sistema TEXT,
+    arquivo TEXT,
+    sucesso INTEGER NOT NULL DEFAULT 1,
+    linhas INTEGER NOT NULL DEFAULT 0,
+    duracao REAL,
+    erro TEXT,
+    orcamento REAL
+);
+CREATE INDEX IF NOT EXISTS idx_etapas_data ON etapas(data);
+CREATE INDEX IF NOT EXISTS idx_etapas_base_data ON etapas(base, etapa, data);
+
+CREATE TABLE IF NOT EXISTS resumo_diario (
+    dia TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    base TEXT NOT NULL,
+    execucoes INTEGER NOT NULL,
+    falhas INTEGER NOT NULL,
+    linhas INTEGER NOT NULL,
+    duracao_total REAL NOT NULL,
+    duracao_p50 REAL,
+    duracao_p95 REAL,
+    duracao_max REAL,
+    PRIMARY KEY (dia, origem, base)
+);
+
+CREATE TABLE IF NOT EXISTS capacidade (
+    data TEXT NOT NULL,
+    planilha TEXT NOT NULL,
+    celulas INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_capacidade_planilha_data ON capacidade(planilha, data);
+"""
+
+
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil com interpolação linear (p entre 0 e 100)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100.0
+    inferior = math.floor(posicao)
+    superior = math.ceil(posicao)
+    if inferior == superior:
+        return ordenados[int(posicao)]
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+class HistoricoExecucoes:
+    """Histórico de execuções e etapas persistido em SQLite"""
+
+    def __init__(self, caminho_db: Optional[str] = None, dias_detalhe: int = DIAS_DETALHE_PADRAO):
+        self.caminho_db = caminho_db or CAMINHO_HISTORICO_PADRAO
+        self.dias_detalhe = dias_detalhe
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        with self._conexao() as conexao:
+            conexao.executescript(ESQUEMA)
+            # Bancos criados antes dos orçamentos de latência não têm a coluna
+            colunas = {linha['name'] for linha in conexao.execute("PRAGMA table_info(etapas)")}
+            if 'orcamento' not in colunas:
+                conexao.execute("ALTER TABLE etapas ADD COLUMN orcamento REAL")
+
+    @contextmanager
+    def _conexao(self):
+        conexao = sqlite3.connect(self.caminho_db, timeout=10)
+        conexao.row_factory = sqlite3.Row
+        try:
+            conexao.execute("PRAGMA foreign_keys = ON")
+            yield conexao
+            conexao.commit()
+        except Exception:
+            conexao.rollback()
+            raise
+        finally:
+            conexao.close()
+
+    def registrar_execucao(self, origem: str, sucesso: bool, linhas: int = 0,
+                           duracao: Optional[float] = None, etapas: Iterable[Dict[str, Any]] = (),
+                           detalhes: Optional[Dict[str, Any]] = None,
+                           data: Optional[datetime] = None) -> int:
+        """
+        Registra uma execução e suas etapas por base
+
+        Cada etapa é um dict com: base, etapa ('arquivo' por padrão), sistema,
+        arquivo, sucesso, linhas, duracao, erro e orcamento (segundos, opcional)
+        """
+        data_iso = (data or datetime.now()).isoformat(timespec='seconds')
+        etapas = list(etapas)
+        arquivos_sucesso = sum(1 for e in etapas if e.get('etapa', 'arquivo') == 'arquivo' and e.get('sucesso', True))
+        arquivos_erro = sum(1 for e in etapas if e.get('etapa', 'arquivo') == 'arquivo' and not e.get('sucesso', True))
+
+        with self._conexao() as conexao:
+            cursor = conexao.execute(
+                "INSERT INTO execucoes (data, origem, sucesso, arquivos_sucesso, arquivos_erro, linhas, duracao, detalhes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (data_iso, origem, int(bool(sucesso)), arquivos_sucesso, arquivos_erro, int(linhas or 0), duracao,
+                 json.dumps(detalhes, ensure_ascii=False, default=str) if detalhes else None)
+            )
+            execucao_id = cursor.lastrowid
+            conexao.executemany(
+                "INSERT INTO etapas (execucao_id, data, base, etapa, sistema, arquivo, sucesso, linhas, duracao, erro, "
+                "orcamento) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (execucao_id, data_iso, e['base'], e.get('etapa', 'arquivo'), e.get('sistema'), e.get('arquivo'),
+                     int(bool(e.get('sucesso', True))), int(e.get('linhas') or 0), e.get('duracao'), e.get('erro'),
+                     e.get('orcamento'))
+                    for e in etapas
+                ]
+            )
+
+        # Compacta quando o detalhe mais antigo passou bastante do prazo
+        limite = datetime.now() - timedelta(days=self.dias_detalhe + 7)
+        mais_antiga = self._data_mais_antiga()
+        if mais_antiga and mais_antiga < limite.isoformat(timespec='seconds'):
+            self.compactar()
+
+        return execucao_id
+
+    def _data_mais_antiga(self) -> Optional[str]:
+        with self._conexao() as conexao:
+            return conexao.execute("SELECT MIN(data) FROM execucoes").fetchone()[0]
+
+    def estatisticas(self, base: Optional[str] = None, dias: Optional[int] = None,
+                     origem: Optional[str] = None, etapa: str = 'arquivo') -> Dict[str, Any]:
+        """
+        Estatísticas das execuções (ou de uma base/etapa específica)
+
+        Returns:
+            dict com execucoes, falhas, taxa_falha (%), linhas, duracao_p50,
+            duracao_p95, linhas_por_segundo e ultima_execucao
+        """
+        filtros = []
+        parametros: List[Any] = []
+        if dias is not None:
+            filtros.append("data >= ?")
+            parametros.append((datetime.now() - timedelta(days=dias)).isoformat(timespec='seconds'))
+
+        if base is not None:
+            tabela = "etapas"
+            filtros.extend(["base = ?", "etapa = ?"])
+            parametros.extend([base, etapa])
+        else:
+            tabela = "execucoes"
+        if origem is not None and base is None:
+            filtros.append("origem = ?")
+            parametros.append(origem)
+
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+
+        with self._conexao() as conexao:
+            linhas_db = conexao.execute(
+                f"SELECT data, sucesso, linhas, duracao FROM {tabela} {where} ORDER BY data", parametros
+            ).fetchall()
+
+            # Dias já compactados entram nas contagens (percentis usam só o detalhe)
+            filtros_resumo = ["base = ?"]
+            parametros_resumo: List[Any] = [base if base is not None else '']
+            if base is not None:
+                filtros_resumo.append("origem = ?")
+                parametros_resumo.append(etapa)
+            elif origem is not None:
+                filtros_resumo.append("origem = ?")
+                parametros_resumo.append(origem)
+            if dias is not None:
+                filtros_resumo.append("dia >= ?")
+                parametros_resumo.append((datetime.now() - timedelta(days=dias)).strftime('%Y-%m-%d'))
+            resumo = conexao.execute(
+                "SELECT COALESCE(SUM(execucoes), 0), COALESCE(SUM(falhas), 0), COALESCE(SUM(linhas), 0), "
+                "COALESCE(SUM(duracao_total), 0), MAX(dia) "
+                f"FROM resumo_diario WHERE {' AND '.join(filtros_resumo)}", parametros_resumo
+            ).fetchone()
+
+        duracoes = [l['duracao'] for l in linhas_db if l['duracao'] is not None]
+        execucoes = len(linhas_db) + resumo[0]
+        falhas = sum(1 for l in linhas_db if not l['sucesso']) + resumo[1]
+        total_linhas = sum(l['linhas'] for l in linhas_db) + resumo[2]
+
+        # Vazão considera só execuções com duração conhecida
+        linhas_com_duracao = sum(l['linhas'] for l in linhas_db if l['duracao']) + resumo[2]
+        tempo_total = sum(duracoes) + resumo[3]
+
+        return {
+            'execucoes': execucoes,
+            'falhas': falhas,
+            'taxa_falha': (falhas / execucoes * 100) if execucoes else 0.0,
+            'linhas': total_linhas,
+            'duracao_p50': percentil(duracoes, 50),
+            'duracao_p95': percentil(duracoes, 95),
+            'linhas_por_segundo': (linhas_com_duracao / tempo_total) if tempo_total > 0 else 0.0,
+            'ultima_execucao': linhas_db[-1]['data'] if linhas_db else resumo[4],
+        }
+
+    def estatisticas_por_base(self, dias: Optional[int] = None, etapa: str = 'arquivo') -> Dict[str, Dict[str, Any]]:
+        """Estatísticas de cada base que aparece no histórico"""
+        with self._conexao() as conexao:
+            bases = [linha[0] for linha in conexao.execute(
+                "SELECT DISTINCT base FROM etapas WHERE etapa = ? ORDER BY base", (etapa,)
+            )]
+        return {base: self.estatisticas(base=base, dias=dias, etapa=etapa) for base in bases}
+
+    def estouros_orcamento(self, dias: Optional[int] = 7, base: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Etapas que passaram do orçamento de latência, mais recentes primeiro"""
+        filtros = ["orcamento IS NOT NULL", "duracao > orcamento"]
+        parametros: List[Any] = []
+        if dias is not None:
+            filtros.append("data >= ?")
+            parametros.append((datetime.now() - timedelta(days=dias)).isoformat(timespec='seconds'))
+        if base is not None:
+            filtros.append("base = ?")
+            parametros.append(base)
+
+        with self._conexao() as conexao:
+            return [dict(linha) for linha in conexao.execute(
+                "SELECT data, base, etapa, sistema, arquivo, duracao, orcamento FROM etapas "
+                f"WHERE {' AND '.join(filtros)} ORDER BY data DESC", parametros
+            )]
+
+    def registrar_capacidade(self, planilha: str, celulas: int, data: Optional[datetime] = None):
+        """Amostra do tamanho (células da grade) de uma planilha - base da projeção de lotação"""
+        with self._conexao() as conexao:
+            conexao.execute("INSERT INTO capacidade (data, planilha, celulas) VALUES (?, ?, ?)",
+                            ((data or datetime.now()).isoformat(timespec='seconds'), planilha, int(celulas)))
+
+    def amostras_capacidade(self, planilha: str, dias: Optional[int] = None) -> List[tuple]:
+        """[(datetime, células)] da planilha em ordem de data"""
+        filtros = ["planilha = ?"]
+        parametros: List[Any] = [planilha]
+        if dias is not None:
+            filtros.append("data >= ?")
+            parametros.append((datetime.now() - timedelta(days=dias)).isoformat(timespec='seconds'))
+        with self._conexao() as conexao:
+            return [(datetime.fromisoformat(linha['data']), linha['celulas']) for linha in conexao.execute(
+                f"SELECT data, celulas FROM capacidade WHERE {' AND '.join(filtros)} ORDER BY data", parametros
+            )]
+
+    def compactar(self, dias_detalhe: Optional[int] = None) -> Dict[str, int]:
+        """
+        Agrega execuções/etapas mais antigas que dias_detalhe em resumo_diario
+        e remove o detalhe. Retorna quantas linhas foram compactadas.
+        """
+        dias_detalhe = self.dias_detalhe if dias_detalhe is None else dias_detalhe
+        corte = (datetime.now() - timedelta(days=dias_detalhe)).strftime('%Y-%m-%d')
+
+        with self._conexao() as conexao:
+            grupos: Dict[tuple, List[sqlite3.Row]] = {}
+            for linha in conexao.execute(
+                "SELECT substr(data, 1, 10) AS dia, origem, sucesso, linhas, duracao FROM execucoes WHERE data < ?",
+                (corte,)
+            ):
+                grupos.setdefault((linha['dia'], linha['origem'], ''), []).append(linha)
+
+            # Para etapas, a coluna origem do resumo guarda o nome da etapa
+            for linha in conexao.execute(
+                "SELECT substr(data, 1, 10) AS dia, etapa, base, sucesso, linhas, duracao FROM etapas WHERE data < ?",
+                (corte,)
+            ):
+                grupos.setdefault((linha['dia'], linha['etapa'], linha['base']), []).append(linha)
+
+            for (dia, origem, base), linhas_grupo in grupos.items():
+                duracoes = [l['duracao'] for l in linhas_grupo if l['duracao'] is not None]
+                conexao.execute(
+                    "INSERT INTO resumo_diario (dia, origem, base, execucoes, falhas, linhas, duracao_total, "
+                    "duracao_p50, duracao_p95, duracao_max) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(dia, origem, base) DO UPDATE SET "
+                    "execucoes = execucoes + excluded.execucoes, falhas = falhas + excluded.falhas, "
+                    "linhas = linhas + excluded.linhas, duracao_total = duracao_total + excluded.duracao_total, "
+                    "duracao_p95 = MAX(COALESCE(duracao_p95, 0), COALESCE(excluded.duracao_p95, 0)), "
+                    "duracao_max = MAX(COALESCE(duracao_max, 0), COALESCE(excluded.duracao_max, 0))",
+                    (dia, origem, base, len(linhas_grupo), sum(1 for l in linhas_grupo if not l['sucesso']),
+                     sum(l['linhas'] for l in linhas_grupo), sum(duracoes),
+                     percentil(duracoes, 50), percentil(duracoes, 95), max(duracoes) if duracoes else None)
+                )
+
+            etapas_removidas = conexao.execute("DELETE FROM etapas WHERE data < ?", (corte,)).rowcount
+            execucoes_removidas = conexao.execute("DELETE FROM execucoes WHERE data < ?", (corte,)).rowcount
+
+        return {'execucoes': execucoes_removidas, 'etapas': etapas_removidas}
+
+
+def formatar_ultima_execucao(data_iso: Optional[str]) -> str:
+    """Formata a data da última execução para exibição nos KPIs"""
+    if not data_iso:
+        return 'Nunca'
+    try:
+        data = datetime.fromisoformat(data_iso)
+    except ValueError:
+        # Dia compactado (AAAA-MM-DD)
+        return data_iso
+    if data.date() == datetime.now().date():
+        return data.strftime("Hoje %H:%M")
+    return data.strftime("%d/%m %H:%M")
+
@@ -0,0 +1,156 @@
+"""
+Índice da pasta de dados
+Uma única passada de os.scandir por execução guarda nome, caminho, tamanho,
+mtime e o tipo detectado de cada CSV; todas as buscas de arquivo (main.py,
+GoogleSheetsBase.encontrar_arquivo_mais_recente, interfaces) respondem a partir
+dele em vez de repetir glob/listdir/getmtime - importante em pastas de rede.
+
+O modo --observar atualiza entradas individuais com atualizar_arquivo().
+"""
+
+import fnmatch
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Índices compartilhados do processo, por pasta (caminho absoluto)
+_indices: Dict[str, 'IndiceDados'] = {}
+_trava_indices = threading.Lock()
+
+
+def _eh_csv(nome: str) -> bool:
+    return nome.lower().endswith('.csv')
+
+
+class IndiceDados:
+    """Índice dos CSVs de uma pasta: nome -> {nome, caminho, tamanho, mtime, tipo}"""
+
+    def __init__(self, pasta: str, classificar: Optional[Callable[[str], Any]] = None):
+        self.pasta = os.path.abspath(pasta)
+        self.classificar = classificar
+        self._arquivos: Optional[Dict[str, Dict[str, Any]]] = None
+        self._trava = threading.RLock()
+
+    def _entrada(self, nome: str, tamanho: int, mtime: float) -> Dict[str, Any]:
+        anterior = (self._arquivos or {}).get(nome)
+        if anterior is not None and (anterior['tamanho'], anterior['mtime']) == (tamanho, mtime):
+            tipo = anterior['tipo']
+        else:
+            tipo = self.classificar(nome) if self.classificar else None
+        return {'nome': nome, 'caminho': os.path.join(self.pasta, nome),
+                'tamanho': tamanho, 'mtime': mtime, 'tipo': tipo}
+
+    def definir_classificador(self, classificar: Callable[[str], Any]):
+        """Passa a detectar o tipo com esta função (reclassifica as entradas já lidas)"""
+        with self._trava:
+            self.classificar = classificar
+            for entrada in (self._arquivos or {}).values():
+                entrada['tipo'] = classificar(entrada['nome'])
+
+    def atualizar(self) -> List[str]:
+        """Relê a pasta (um os.scandir); retorna os caminhos novos ou alterados"""
+        with self._trava:
+            atuais = {}
+            try:
+                entradas = list(os.scandir(self.pasta))
+            except OSError:
+                entradas = []
+            for entrada in entradas:
+                if not _eh_csv(entrada.name):
+                    continue
+                try:
+                    if not entrada.is_file():
+                        continue
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                atuais[entrada.name] = self._entrada(entrada.name, info.st_size, info.st_mtime)
+
+            anteriores = self._arquivos or {}
+            alterados = [e['caminho'] for nome, e in atuais.items()
+                         if nome not in anteriores
+                         or (anteriores[nome]['tamanho'], anteriores[nome]['mtime']) != (e['tamanho'], e['mtime'])]
+            self._arquivos = atuais
+            return alterados
+
+    def atualizar_arquivo(self, caminho: str) -> Optional[Dict[str, Any]]:
+        """Atualiza (ou remove) só a entrada de um arquivo - usado pelo modo --observar"""
+        nome = os.path.basename(caminho)
+        with self._trava:
+            if self._arquivos is None:
+                self.atualizar()
+                return self._arquivos.get(nome)
+            if not _eh_csv(nome):
+                return None
+            try:
+                info = os.stat(os.path.join(self.pasta, nome))
+            except OSError:
+                self._arquivos.pop(nome, None)
+                return None
+            self._arquivos[nome] = self._entrada(nome, info.st_size, info.st_mtime)
+            return self._arquivos[nome]
+
+    def arquivos(self) -> List[Dict[str, Any]]:
+        """Entradas do índice (a pasta é lida na primeira chamada)"""
+        with self._trava:
+            if self._arquivos is None:
+                self.atualizar()
+            return list(self._arquivos.values())
+
+    def nomes(self) -> List[str]:
+        return [e['nome'] for e in self.arquivos()]
+
+    def obter(self, nome: str) -> Optional[Dict[str, Any]]:
+        """Entrada pelo nome exato (sem distinguir maiúsculas no Windows)"""
+        for entrada in self.arquivos():
+            if os.path.normcase(entrada['nome']) == os.path.normcase(nome):
+                return entrada
+        return None
+
+    def mais_recente(self, padrao_nome: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        CSV mais recente que corresponde ao padrão (ou o mais recente da pasta)
+        Aceita duplicados como 'arquivo (1).csv' e, sem correspondência direta,
+        nomes que contenham o padrão (ou estejam contidos nele)
+        """
+        arquivos = self.arquivos()
+        if padrao_nome is not None:
+            base_nome = padrao_nome.replace('.csv', '').replace('.CSV', '')
+            padroes = [f"{base_nome}.csv", f"{base_nome} (*).csv", f"*{base_nome}*.csv",
+                       f"{base_nome}.CSV", f"{base_nome} (*).CSV"]
+            encontrados = [e for e in arquivos if any(fnmatch.fnmatch(e['nome'], p) for p in padroes)]
+            if not encontrados:
+                # Busca adicional por similaridade
+                base_limpo = base_nome.lower()
+                encontrados = [e for e in arquivos
+                               if base_limpo in e['nome'].lower()[:-4] or e['nome'].lower()[:-4] in base_limpo]
+            arquivos = encontrados
+        return max(arquivos, key=lambda e: e['mtime']) if arquivos else None
+
+
+def obter_indice(pasta: str, atualizar: bool = False,
+                 classificar: Optional[Callable[[str], Any]] = None) -> IndiceDados:
+    """
+    Índice compartilhado da pasta
+
+    Args:
+        pasta: pasta de dados
+        atualizar: relê a pasta agora (interfaces, antes de listar arquivos)
+        classificar: função nome -> tipo detectado (usada ao criar o índice ou se ele ainda não tiver uma)
+    """
+    chave = os.path.normcase(os.path.abspath(pasta))
+    with _trava_indices:
+        indice = _indices.get(chave)
+        if indice is None:
+            indice = _indices[chave] = IndiceDados(pasta, classificar)
+    if classificar is not None and indice.classificar is None:
+        indice.definir_classificador(classificar)
+    if atualizar:
+        indice.atualizar()
+    return indice
+
+
+def descartar_indices():
+    """Próxima busca relê as pastas (início de cada execução)"""
+    with _trava_indices:
+        _indices.clear()
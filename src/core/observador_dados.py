@@ -0,0 +1,142 @@
+"""
+Observador da pasta de dados (modo --observar)
+Detecta CSVs novos ou alterados em data/ e os entrega assim que terminam de ser
+gravados, sem reprocessar a pasta inteira.
+
+- Com watchdog instalado (inotify/ReadDirectoryChangesW/FSEvents) cada evento custa O(1)
+- Sem watchdog: índice da pasta (IndiceDados) relido e comparado a cada intervalo
+- Arquivo só é entregue quando tamanho e mtime ficam estáveis por alguns segundos
+  (download em andamento não é enviado pela metade)
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .indice_dados import IndiceDados
+
+INTERVALO_PADRAO = 1.0
+ESTABILIDADE_PADRAO = 2.0
+
+
+def _assinatura(caminho: str) -> Optional[Tuple[int, int]]:
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime
+
+
+def _eh_csv(caminho: str) -> bool:
+    return caminho.lower().endswith('.csv') and not os.path.basename(caminho).startswith(('~$', '.'))
+
+
+class ObservadorDados:
+    """Entrega a ao_detectar(caminho) cada CSV novo/alterado depois que ele estabiliza"""
+
+    def __init__(self, pasta: str, ao_detectar: Callable[[str], None],
+                 intervalo: float = INTERVALO_PADRAO, estabilidade: float = ESTABILIDADE_PADRAO,
+                 usar_watchdog: bool = True):
+        self.pasta = pasta
+        self.ao_detectar = ao_detectar
+        self.intervalo = intervalo
+        self.estabilidade = estabilidade
+        self.indice = IndiceDados(pasta)
+        self._pendentes: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # Última versão entregue (ou já presente no início) de cada arquivo
+        self._entregues: Dict[str, Tuple[int, int]] = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._observer = self._iniciar_watchdog() if usar_watchdog else None
+
+    @property
+    def modo(self) -> str:
+        return 'watchdog' if self._observer is not None else 'varredura'
+
+    def _iniciar_watchdog(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        observador = self
+
+        class _Eventos(FileSystemEventHandler):
+            def on_created(self, evento):
+                if not evento.is_directory:
+                    observador.notificar(evento.src_path)
+
+            def on_modified(self, evento):
+                if not evento.is_directory:
+                    observador.notificar(evento.src_path)
+
+            def on_moved(self, evento):
+                # Navegadores gravam .crdownload/.part e renomeiam para .csv no fim
+                if not evento.is_directory:
+                    observador.notificar(evento.dest_path)
+
+        observer = Observer()
+        observer.schedule(_Eventos(), self.pasta, recursive=False)
+        return observer
+
+    def marcar_existentes(self):
+        """Considera os CSVs já presentes como conhecidos (não são entregues)"""
+        with self._trava:
+            self._entregues.update({e['caminho']: (e['tamanho'], e['mtime']) for e in self.indice.arquivos()})
+
+    def notificar(self, caminho: str, agora: Optional[float] = None):
+        """Registra um arquivo possivelmente novo; a entrega espera ele estabilizar"""
+        if not _eh_csv(caminho):
+            return
+        assinatura = _assinatura(caminho)
+        if assinatura is None:
+            return
+        with self._trava:
+            if self._entregues.get(caminho) == assinatura:
+                return
+            anterior = self._pendentes.get(caminho)
+            if anterior is None or anterior[0] != assinatura:
+                self._pendentes[caminho] = (assinatura, time.monotonic() if agora is None else agora)
+
+    def verificar_pendentes(self, agora: Optional[float] = None) -> List[str]:
+        """Entrega os arquivos pendentes que ficaram estáveis; retorna os entregues"""
+        agora = time.monotonic() if agora is None else agora
+        prontos = []
+        with self._trava:
+            for caminho, (assinatura, desde) in list(self._pendentes.items()):
+                atual = _assinatura(caminho)
+                if atual is None:
+                    del self._pendentes[caminho]
+                elif atual != assinatura:
+                    self._pendentes[caminho] = (atual, agora)
+                elif agora - desde >= self.estabilidade:
+                    del self._pendentes[caminho]
+                    self._entregues[caminho] = atual
+                    prontos.append(caminho)
+        for caminho in prontos:
+            self.ao_detectar(caminho)
+        return prontos
+
+    def ciclo(self, agora: Optional[float] = None) -> List[str]:
+        """Uma rodada: varre a pasta (sem watchdog) e entrega os arquivos estáveis"""
+        if self._observer is None:
+            for caminho in self.indice.atualizar():
+                self.notificar(caminho, agora)
+        return self.verificar_pendentes(agora)
+
+    def executar(self):
+        """Observa até parar() ser chamado (bloqueia)"""
+        if self._observer is not None:
+            self._observer.start()
+        try:
+            while not self._parar.wait(self.intervalo):
+                self.ciclo()
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join()
+
+    def parar(self):
+        self._parar.set()
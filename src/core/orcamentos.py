@@ -0,0 +1,119 @@
+"""
+Orçamentos de latência por base e por etapa
+Lê 'orcamentos_latencia' do planilhas_config.json e compara com as durações
+medidas em cada arquivo (etapas ler_csv, localizar_fim, enviar... e o arquivo
+inteiro, etapa 'arquivo'). Cada estouro vira um aviso com o detalhamento da
+etapa, ex.: "BASE RESOLVIDA localizar_fim 48 s acima do orçamento de 10 s;
+aba tem 512.000 linhas".
+
+Formato no JSON (segundos; 'bases' sobrescreve 'padrao' por nome da aba):
+
+    "orcamentos_latencia": {
+        "padrao": {"arquivo": 180, "localizar_fim": 30, "enviar": 90},
+        "bases": {"BASE ATUALIZADA CORRETA - RESOLVIDA": {"localizar_fim": 10}}
+    }
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# Etapa que representa o arquivo inteiro (mesmo nome usado no histórico)
+ETAPA_ARQUIVO = 'arquivo'
+
+# Como cada anotação de etapa aparece no aviso
+DESCRICAO_CONTEXTO = {
+    'linhas_aba': "aba tem {} linhas",
+    'linhas_csv': "CSV tem {} linhas",
+    'linhas_enviadas': "{} linhas enviadas",
+}
+
+
+def formatar_segundos(segundos: float) -> str:
+    """Duração curta para avisos (48 s, 2.5 s)"""
+    return f"{segundos:.0f} s" if segundos >= 10 else f"{segundos:.1f} s"
+
+
+def _formatar_numero(valor: Any) -> str:
+    if isinstance(valor, int):
+        return f"{valor:,}".replace(',', '.')
+    return str(valor)
+
+
+def orcamentos_da_base(config_orcamentos: Optional[Dict[str, Any]], base: str) -> Dict[str, float]:
+    """Orçamentos (segundos por etapa) que valem para a base"""
+    if not config_orcamentos:
+        return {}
+    orcamentos = dict(config_orcamentos.get('padrao', {}))
+    orcamentos.update(config_orcamentos.get('bases', {}).get(base, {}))
+    return {nome: float(valor) for nome, valor in orcamentos.items() if valor}
+
+
+def agrupar_medicoes(medicoes: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Soma a duração das etapas de mesmo nome (ex.: 'colorir' roda duas vezes)"""
+    agrupadas: Dict[str, Dict[str, Any]] = {}
+    for medicao in medicoes:
+        if medicao.get('duracao') is None:
+            continue
+        grupo = agrupadas.setdefault(medicao['nome'], {'duracao': 0.0, 'contexto': {}})
+        grupo['duracao'] += medicao['duracao']
+        grupo['contexto'].update(medicao.get('contexto', {}))
+    return agrupadas
+
+
+def avaliar_orcamentos(base: str, medicoes: Iterable[Dict[str, Any]], duracao_arquivo: Optional[float],
+                       config_orcamentos: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compara as durações medidas de um arquivo com os orçamentos da base
+
+    Returns:
+        list: um dict por estouro com base, etapa, duracao, orcamento, contexto,
+        detalhamento (duração das demais etapas) e mensagem
+    """
+    orcamentos = orcamentos_da_base(config_orcamentos, base)
+    if not orcamentos:
+        return []
+
+    agrupadas = agrupar_medicoes(medicoes)
+    if duracao_arquivo is not None:
+        contexto_arquivo: Dict[str, Any] = {}
+        for grupo in agrupadas.values():
+            contexto_arquivo.update(grupo['contexto'])
+        agrupadas[ETAPA_ARQUIVO] = {'duracao': duracao_arquivo, 'contexto': contexto_arquivo}
+
+    estouros = []
+    for nome, orcamento in orcamentos.items():
+        medida = agrupadas.get(nome)
+        if not medida or medida['duracao'] <= orcamento:
+            continue
+        # Estouro do arquivo inteiro mostra quanto cada etapa consumiu
+        detalhamento = {
+            outra: round(grupo['duracao'], 3) for outra, grupo in agrupadas.items()
+            if outra != ETAPA_ARQUIVO
+        } if nome == ETAPA_ARQUIVO else {}
+        estouro = {
+            'base': base,
+            'etapa': nome,
+            'duracao': round(medida['duracao'], 3),
+            'orcamento': orcamento,
+            'contexto': medida['contexto'],
+            'detalhamento': detalhamento,
+        }
+        estouro['mensagem'] = formatar_estouro(estouro)
+        estouros.append(estouro)
+    return estouros
+
+
+def formatar_estouro(estouro: Dict[str, Any]) -> str:
+    """Mensagem do aviso: '<base> <etapa> 48 s acima do orçamento de 10 s; aba tem 512.000 linhas'"""
+    partes = [
+        f"{estouro['base']} {estouro['etapa']} {formatar_segundos(estouro['duracao'])} "
+        f"acima do orçamento de {formatar_segundos(estouro['orcamento'])}"
+    ]
+    for chave, valor in estouro.get('contexto', {}).items():
+        if chave in DESCRICAO_CONTEXTO:
+            partes.append(DESCRICAO_CONTEXTO[chave].format(_formatar_numero(valor)))
+    if estouro.get('detalhamento'):
+        partes.append(" · ".join(
+            f"{nome} {formatar_segundos(duracao)}"
+            for nome, duracao in sorted(estouro['detalhamento'].items(), key=lambda item: -item[1])
+        ))
+    return "; ".join(partes)
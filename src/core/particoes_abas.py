@@ -0,0 +1,216 @@
+"""
+Abas particionadas por período
+Bases que recebem tudo numa aba só ("BASE VOZ", "BASE") fazem cada leitura - achar o
+fim dos dados, conferências, painéis - percorrer o histórico inteiro. Com partição, as
+linhas de cada envio vão para a aba do seu mês ou semana, pela coluna de data
+configurada, e o custo de cada execução passa a depender só do tamanho da partição:
+
+    BASE VOZ            (histórico anterior à partição, não recebe mais linhas)
+    BASE VOZ 2026-09    BASE VOZ 2026-10    ...   (mensal)
+    BASE VOZ 2026-S42   ...                       (semanal, semana ISO)
+
+Partições que ainda não existem são criadas numa batchUpdate, a partir da aba modelo
+(duplicateSheet) ou, sem modelo, com o cabeçalho da aba da base:
+
+    "particoes": {"bases": {"BASE VOZ": {"periodo": "mensal", "coluna_data": "C",
+                                         "modelo": "MODELO BASE VOZ"}}}
+
+A aba de visão ('visao', desligada por padrão) junta a base e as partições numa única
+FILTER, reescrita só quando surge uma partição nova. Ela custa caro: o resultado da
+FILTER é uma cópia do histórico inteiro, então a planilha passa a ter cerca do dobro
+das células da base (contando no limite de 10 milhões) e a visão é recalculada a cada
+envio. É criada com uma linha e as colunas da base; a FILTER expande o que precisar.
+"""
+
+import random
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from .escrita_blocos import letra_coluna
+from .plano_escrita import titulo_a1
+from .valores_tipados import data_do_valor
+
+PERIODOS = ('mensal', 'semanal')
+
+# Abas conhecidas por planilha: {id da planilha: {título: (sheetId, colunas da grade)}}.
+# Lidas uma vez por processo (worksheets) e atualizadas quando uma partição é criada.
+_abas_conhecidas: Dict[str, Dict[str, Tuple[int, int]]] = {}
+_trava = threading.Lock()
+
+
+def config_particoes() -> Dict[str, Any]:
+    """Seção 'particoes' do planilhas_config.json (vazia se o gerenciador não estiver disponível)"""
+    try:
+        from scripts.gerenciador_planilhas import obter_gerenciador
+    except ImportError:
+        return {}
+    try:
+        return obter_gerenciador().obter_particoes()
+    except Exception as e:
+        print(f"⚠️ Configuração de partições não carregada: {e}")
+        return {}
+
+
+def regra_da_base(nome_aba: str, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Regra de partição da aba; None se ela não for particionada (ou o período for inválido)"""
+    if config is None:
+        config = config_particoes()
+    regra = config.get('bases', {}).get(nome_aba)
+    if not regra or regra.get('periodo', 'mensal') not in PERIODOS:
+        return None
+    return regra
+
+
+def nome_particao(base: str, dia: date, periodo: str = 'mensal') -> str:
+    """('BASE VOZ', 17/10/2026) -> 'BASE VOZ 2026-10' (mensal) ou 'BASE VOZ 2026-S42' (semanal)"""
+    if periodo == 'semanal':
+        ano, semana, _ = dia.isocalendar()
+        return f"{base} {ano}-S{semana:02d}"
+    return f"{base} {dia:%Y-%m}"
+
+
+def rotear_linhas(dados: list, coluna: int, base: str, periodo: str = 'mensal',
+                  hoje: Optional[date] = None) -> List[Tuple[str, list]]:
+    """
+    [(partição, linhas)] em ordem de período, mantendo a ordem das linhas em cada uma
+
+    Linhas sem data válida acompanham a linha datada anterior (no início do arquivo, a
+    primeira datada); um arquivo sem nenhuma data vai para o período de hoje.
+    """
+    grupos: Dict[str, list] = {}
+    pendentes = []
+    atual = None
+    for linha in dados:
+        dia = data_do_valor(linha[coluna]) if coluna < len(linha) else None
+        if dia is not None:
+            atual = nome_particao(base, dia, periodo)
+            if pendentes:
+                grupos.setdefault(atual, []).extend(pendentes)
+                pendentes = []
+        if atual is None:
+            pendentes.append(linha)
+        else:
+            grupos.setdefault(atual, []).append(linha)
+    if pendentes:
+        grupos.setdefault(nome_particao(base, hoje or date.today(), periodo), []).extend(pendentes)
+    return sorted(grupos.items())
+
+
+def formula_visao(titulos: List[str], num_colunas: int) -> str:
+    """FILTER que empilha o cabeçalho da primeira aba e as linhas com coluna A preenchida de todas"""
+    ultima = letra_coluna(max(num_colunas, 1))
+    blocos, chaves = [], []
+    for i, titulo in enumerate(titulos):
+        prefixo = titulo_a1(titulo)
+        primeira = 1 if i == 0 else 2
+        blocos.append(f"{prefixo}!A{primeira}:{ultima}")
+        chaves.append(f"{prefixo}!A{primeira}:A")
+    return f'=FILTER({{{";".join(blocos)}}};{{{";".join(chaves)}}}<>"")'
+
+
+def particoes_da_base(abas: Dict[str, Tuple[int, int]], base: str) -> List[str]:
+    """Títulos das partições existentes da base, em ordem de período"""
+    prefixo = base + ' '
+    return sorted(t for t in abas if t.startswith(prefixo) and t[len(prefixo):len(prefixo) + 4].isdigit()
+                  and len(t) in (len(prefixo) + 7, len(prefixo) + 8))
+
+
+def abas_conhecidas(planilha, id_planilha: str) -> Dict[str, Tuple[int, int]]:
+    """{título: (sheetId, colunas)} da planilha - uma leitura (worksheets) por processo"""
+    with _trava:
+        abas = _abas_conhecidas.get(id_planilha)
+    if abas is None:
+        abas = {aba.title: (aba.id, aba.col_count) for aba in planilha.worksheets()}
+        with _trava:
+            _abas_conhecidas[id_planilha] = abas
+    return abas
+
+
+def descartar_abas_conhecidas(id_planilha: Optional[str] = None):
+    """Esquece as abas conhecidas (todas ou de uma planilha) - a próxima partição relê a lista"""
+    with _trava:
+        if id_planilha is None:
+            _abas_conhecidas.clear()
+        else:
+            _abas_conhecidas.pop(id_planilha, None)
+
+
+def requisicoes_criacao(abas: Dict[str, Tuple[int, int]], base: str, regra: Dict[str, Any],
+                        novas: List[str]) -> List[dict]:
+    """
+    Requisições que criam as partições novas e reescrevem a visão (uma batchUpdate)
+    Atualiza abas com os títulos criados.
+    """
+    usados = {sheet_id for sheet_id, _ in abas.values()}
+
+    def novo_id():
+        while True:
+            candidato = random.randint(1, 2 ** 31 - 1)
+            if candidato not in usados:
+                usados.add(candidato)
+                return candidato
+
+    base_id, colunas = abas[base]
+    modelo = abas.get(regra.get('modelo') or '')
+    requisicoes = []
+    for nome in novas:
+        sheet_id = novo_id()
+        if modelo:
+            requisicoes.append({'duplicateSheet': {'sourceSheetId': modelo[0], 'newSheetId': sheet_id,
+                                                   'newSheetName': nome}})
+            abas[nome] = (sheet_id, modelo[1])
+            continue
+        requisicoes.append({'addSheet': {'properties': {
+            'sheetId': sheet_id, 'title': nome,
+            'gridProperties': {'rowCount': 1000, 'columnCount': colunas, 'frozenRowCount': 1}}}})
+        # Cabeçalho (valores, fórmulas e formatos) copiado da aba da base
+        requisicoes.append({'copyPaste': {
+            'source': {'sheetId': base_id, 'startRowIndex': 0, 'endRowIndex': 1,
+                       'startColumnIndex': 0, 'endColumnIndex': colunas},
+            'destination': {'sheetId': sheet_id, 'startRowIndex': 0, 'endRowIndex': 1,
+                            'startColumnIndex': 0, 'endColumnIndex': colunas},
+            'pasteType': 'PASTE_NORMAL'}})
+        abas[nome] = (sheet_id, colunas)
+
+    visao = regra.get('visao')
+    if visao and novas:
+        if visao not in abas:
+            visao_id = novo_id()
+            # Grade mínima: sem ela, addSheet cria 1000 x 26 células vazias além da cópia
+            requisicoes.append({'addSheet': {'properties': {
+                'sheetId': visao_id, 'title': visao,
+                'gridProperties': {'rowCount': 1, 'columnCount': colunas}}}})
+            abas[visao] = (visao_id, colunas)
+            print(f"⚠️ Visão '{visao}': a FILTER copia a base e todas as partições, "
+                  f"cerca do dobro das células do histórico")
+        formula = formula_visao([base] + particoes_da_base(abas, base), colunas)
+        requisicoes.append({'updateCells': {
+            'start': {'sheetId': abas[visao][0], 'rowIndex': 0, 'columnIndex': 0},
+            'rows': [{'values': [{'userEnteredValue': {'formulaValue': formula}}]}],
+            'fields': 'userEnteredValue'}})
+    return requisicoes
+
+
+def garantir_particoes(planilha, id_planilha: str, base: str, regra: Dict[str, Any], nomes: List[str]) -> List[str]:
+    """
+    Cria as partições que faltam (e atualiza a visão) numa única batchUpdate
+
+    Returns:
+        list: títulos criados agora
+    """
+    abas = abas_conhecidas(planilha, id_planilha)
+    if base not in abas:
+        raise ValueError(f"aba da base '{base}' não encontrada para criar as partições")
+    novas = [nome for nome in nomes if nome not in abas]
+    if not novas:
+        return []
+    with _trava:
+        requisicoes = requisicoes_criacao(abas, base, regra, novas)
+    try:
+        planilha.batch_update({'requests': requisicoes})
+    except Exception:
+        # O estado real da planilha é incerto: relê na próxima vez
+        descartar_abas_conhecidas(id_planilha)
+        raise
+    return novas
@@ -0,0 +1,413 @@
+"""
+Perfilador por etapa da automação
+Envolve cada sistema, arquivo e etapa de ingestão (ler_csv, converter_lista,
+formatar, enviar...) em cProfile, tracemalloc e/ou amostragem de RSS e grava,
+em uma pasta por execução, o .prof e um resumo top-N de cada etapa
+
+Modos: cpu (cProfile), mem (tracemalloc + RSS), rss (só RSS, custo mínimo)
+e completo (tudo). Também pode ser ativado pela variável AUTOMACAO_PERFIL.
+
+Sem perfil, medir_etapas() ainda cronometra as etapas (orçamentos de latência).
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+MODOS_PERFIL = ('cpu', 'mem', 'rss', 'completo')
+
+# Variável de ambiente para perfilar execuções sem flag (ex.: interfaces)
+VARIAVEL_AMBIENTE_PERFIL = 'AUTOMACAO_PERFIL'
+
+# Pasta padrão: <raiz do projeto>/logs/perfil/<timestamp>
+PASTA_PERFIL_PADRAO = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'logs', 'perfil'
+)
+
+
+def _criar_leitor_rss():
+    """Retorna função que lê o RSS atual do processo (psutil ou /proc), ou None"""
+    try:
+        import psutil
+        processo = psutil.Process()
+        return lambda: processo.memory_info().rss
+    except ImportError:
+        pass
+
+    if os.path.exists('/proc/self/statm'):
+        tamanho_pagina = os.sysconf('SC_PAGE_SIZE')
+
+        def _ler_statm():
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * tamanho_pagina
+        return _ler_statm
+
+    return None
+
+
+class AmostradorRSS:
+    """Amostra o RSS do processo em uma thread e guarda o pico desde o último reinício"""
+
+    def __init__(self, intervalo: float = 0.01):
+        self.intervalo = intervalo
+        self._ler = _criar_leitor_rss()
+        self._pico = 0
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def disponivel(self) -> bool:
+        return self._ler is not None
+
+    def atual(self) -> int:
+        valor = self._ler() if self._ler else 0
+        with self._lock:
+            self._pico = max(self._pico, valor)
+        return valor
+
+    def pico(self) -> int:
+        self.atual()
+        with self._lock:
+            return self._pico
+
+    def reiniciar_pico(self) -> int:
+        """Zera o pico (a partir do valor atual) e retorna o pico anterior"""
+        anterior = self.pico()
+        valor = self._ler() if self._ler else 0
+        with self._lock:
+            self._pico = valor
+        return anterior
+
+    def iniciar(self):
+        if not self.disponivel or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._executar, name='amostrador-rss', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.atual()
+            except Exception:
+                return
+
+
+class Perfilador:
+    """Coleta CPU e memória por etapa, com etapas aninhadas (sistema > arquivo)"""
+
+    def __init__(self, modo: str = 'cpu', pasta_base: Optional[str] = None, top_n: int = 30):
+        if modo not in MODOS_PERFIL:
+            raise ValueError(f"Modo de perfil inválido: {modo} (use {', '.join(MODOS_PERFIL)})")
+
+        self.modo = modo
+        self.top_n = top_n
+        self.cpu = modo in ('cpu', 'completo')
+        self.mem = modo in ('mem', 'completo')
+        self.rss = modo in ('mem', 'rss', 'completo')
+
+        pasta_base = pasta_base or PASTA_PERFIL_PADRAO
+        self.pasta_execucao = os.path.join(pasta_base, datetime.now().strftime('%Y%m%d_%H%M%S'))
+        os.makedirs(self.pasta_execucao, exist_ok=True)
+
+        self.etapas: List[Dict[str, Any]] = []
+        self._pilha: List[Dict[str, Any]] = []
+        self._contador = 0
+        self._inicio = time.perf_counter()
+
+        if self.mem and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        self.amostrador: Optional[AmostradorRSS] = None
+        if self.rss:
+            self.amostrador = AmostradorRSS()
+            if self.amostrador.disponivel:
+                self.amostrador.iniciar()
+            else:
+                print("💡 RSS indisponível neste sistema (instale 'psutil' para amostrar a memória do processo)")
+                self.amostrador = None
+
+    def _nome_arquivo(self, nome: str) -> str:
+        """Gera nome de arquivo seguro e ordenado para a etapa"""
+        self._contador += 1
+        seguro = re.sub(r'[^\w.-]+', '_', nome, flags=re.UNICODE).strip('_')[:80]
+        return f"{self._contador:03d}_{seguro or 'etapa'}"
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Perfila o bloco como uma etapa; etapas internas são somadas à externa"""
+        pai = self._pilha[-1] if self._pilha else None
+        caminho = f"{pai['caminho']} > {nome}" if pai else nome
+
+        registro: Dict[str, Any] = {
+            'nome': nome,
+            'caminho': caminho,
+            'arquivo': self._nome_arquivo(caminho),
+            'filhos_prof': [],
+            'pico_filhos': 0,
+            'rss_pico_filhos': 0,
+        }
+
+        # cProfile não aceita dois perfis ativos: pausa o da etapa externa
+        if pai and pai.get('perfil'):
+            pai['perfil'].disable()
+
+        if self.mem:
+            # O pico da etapa externa até aqui não pode se perder com o reset
+            if pai:
+                pai['pico_filhos'] = max(pai['pico_filhos'], tracemalloc.get_traced_memory()[1])
+            registro['snapshot_inicio'] = tracemalloc.take_snapshot()
+            registro['mem_inicio'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        if self.amostrador:
+            pico_anterior = self.amostrador.reiniciar_pico()
+            if pai:
+                pai['rss_pico_filhos'] = max(pai['rss_pico_filhos'], pico_anterior)
+            registro['rss_inicio'] = self.amostrador.atual()
+
+        if self.cpu:
+            registro['perfil'] = cProfile.Profile()
+            registro['perfil'].enable()
+
+        self._pilha.append(registro)
+        registro['inicio'] = time.perf_counter()
+        erro = None
+        try:
+            yield registro
+        except BaseException as e:
+            erro = e
+            raise
+        finally:
+            duracao = time.perf_counter() - registro['inicio']
+            if registro.get('perfil'):
+                registro['perfil'].disable()
+            self._pilha.pop()
+
+            self._finalizar_etapa(registro, duracao, erro)
+
+            if pai:
+                # O .prof da etapa interna já inclui as etapas abaixo dela
+                if registro.get('caminho_prof'):
+                    pai['filhos_prof'].append(registro['caminho_prof'])
+                else:
+                    pai['filhos_prof'].extend(registro['filhos_prof'])
+                pai['pico_filhos'] = max(pai['pico_filhos'], registro.get('pico_bytes', 0))
+                pai['rss_pico_filhos'] = max(pai['rss_pico_filhos'], registro.get('rss_pico', 0))
+                if pai.get('perfil'):
+                    pai['perfil'].enable()
+
+    def _finalizar_etapa(self, registro: Dict[str, Any], duracao: float, erro: Optional[BaseException]):
+        """Grava .prof e resumo da etapa"""
+        base = os.path.join(self.pasta_execucao, registro['arquivo'])
+        linhas = [
+            f"Etapa: {registro['caminho']}",
+            f"Duração: {duracao:.3f}s",
+        ]
+        if erro is not None:
+            linhas.append(f"Erro: {type(erro).__name__}: {erro}")
+
+        if registro.get('perfil'):
+            try:
+                estatisticas = pstats.Stats(registro['perfil'])
+                for caminho_filho in registro['filhos_prof']:
+                    estatisticas.add(caminho_filho)
+                estatisticas.dump_stats(base + '.prof')
+                registro['caminho_prof'] = base + '.prof'
+
+                buffer = io.StringIO()
+                estatisticas.stream = buffer
+                estatisticas.sort_stats('cumulative').print_stats(self.top_n)
+                linhas.append("")
+                linhas.append(f"=== CPU (top {self.top_n} por tempo acumulado) ===")
+                linhas.append(buffer.getvalue().strip())
+            except TypeError:
+                # Etapa sem chamadas registradas
+                pass
+
+        if self.mem and 'snapshot_inicio' in registro:
+            atual, pico = tracemalloc.get_traced_memory()
+            pico = max(pico, registro['pico_filhos'])
+            retido = atual - registro['mem_inicio']
+            registro['pico_bytes'] = pico
+            registro['retido_bytes'] = retido
+
+            filtros = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            snapshot_fim = tracemalloc.take_snapshot().filter_traces(filtros)
+            diferencas = snapshot_fim.compare_to(
+                registro['snapshot_inicio'].filter_traces(filtros), 'lineno'
+            )[:self.top_n]
+
+            linhas.append("")
+            linhas.append("=== MEMÓRIA ===")
+            linhas.append(f"Pico: {formatar_bytes(pico)}")
+            linhas.append(f"Retido ao final: {formatar_bytes(retido)}")
+            linhas.append(f"Top {self.top_n} locais de alocação:")
+            linhas.extend(f"  {diferenca}" for diferenca in diferencas)
+
+        if self.amostrador and 'rss_inicio' in registro:
+            rss_fim = self.amostrador.atual()
+            registro['rss_pico'] = max(self.amostrador.pico(), registro['rss_pico_filhos'])
+            registro['rss_retido'] = rss_fim - registro['rss_inicio']
+            linhas.append("")
+            linhas.append("=== RSS DO PROCESSO ===")
+            linhas.append(f"Início: {formatar_bytes(registro['rss_inicio'])}")
+            linhas.append(f"Pico: {formatar_bytes(registro['rss_pico'])} "
+                          f"(+{formatar_bytes(registro['rss_pico'] - registro['rss_inicio'])})")
+            linhas.append(f"Fim: {formatar_bytes(rss_fim)} (retido {formatar_bytes(registro['rss_retido'])})")
+
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+
+        self.etapas.append({
+            'caminho': registro['caminho'],
+            'arquivo': registro['arquivo'],
+            'duracao': duracao,
+            'pico_bytes': registro.get('pico_bytes'),
+            'retido_bytes': registro.get('retido_bytes'),
+            'rss_pico': registro.get('rss_pico'),
+            'rss_retido': registro.get('rss_retido'),
+            'erro': None if erro is None else str(erro),
+        })
+
+    def finalizar(self) -> str:
+        """Grava o índice da execução e retorna a pasta com os artefatos"""
+        total = time.perf_counter() - self._inicio
+        linhas = [
+            f"Perfil da execução ({self.modo}) - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
+            f"Comando: {' '.join(sys.argv)}",
+            f"Tempo total: {total:.3f}s",
+            "",
+        ]
+        for etapa_info in self.etapas:
+            linha = f"{etapa_info['duracao']:9.3f}s  {etapa_info['caminho']}"
+            if etapa_info['pico_bytes'] is not None:
+                linha += (f"  (pico {formatar_bytes(etapa_info['pico_bytes'])}, "
+                          f"retido {formatar_bytes(etapa_info['retido_bytes'])})")
+            if etapa_info['rss_pico'] is not None:
+                linha += f"  (RSS pico {formatar_bytes(etapa_info['rss_pico'])})"
+            if etapa_info['erro']:
+                linha += f"  ❌ {etapa_info['erro']}"
+            linhas.append(f"{linha}  -> {etapa_info['arquivo']}")
+
+        with open(os.path.join(self.pasta_execucao, 'indice.txt'), 'w', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+
+        if self.mem and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self.amostrador:
+            self.amostrador.parar()
+
+        return self.pasta_execucao
+
+
+def formatar_bytes(valor: float) -> str:
+    """Formata quantidade de bytes de forma legível"""
+    for unidade in ('B', 'KB', 'MB', 'GB'):
+        if abs(valor) < 1024 or unidade == 'GB':
+            return f"{valor:.1f} {unidade}"
+        valor /= 1024
+    return f"{valor:.1f} GB"
+
+
+# Perfilador ativo da execução (None = perfil desligado)
+_perfilador_ativo: Optional[Perfilador] = None
+
+
+def ativar_perfilador(modo: str, pasta_base: Optional[str] = None) -> Perfilador:
+    """Cria e ativa o perfilador da execução atual"""
+    global _perfilador_ativo
+    _perfilador_ativo = Perfilador(modo, pasta_base)
+    return _perfilador_ativo
+
+
+def modo_perfil_ambiente() -> Optional[str]:
+    """Modo de perfil pedido pela variável AUTOMACAO_PERFIL (None se ausente/inválido)"""
+    modo = os.environ.get(VARIAVEL_AMBIENTE_PERFIL, '').strip().lower()
+    return modo if modo in MODOS_PERFIL else None
+
+
+def perfilador_ativo() -> Optional[Perfilador]:
+    return _perfilador_ativo
+
+
+def finalizar_perfilador() -> Optional[str]:
+    """Finaliza o perfilador ativo e retorna a pasta gerada"""
+    global _perfilador_ativo
+    if _perfilador_ativo is None:
+        return None
+    pasta = _perfilador_ativo.finalizar()
+    _perfilador_ativo = None
+    return pasta
+
+
+# Medições leves de duração por etapa (independentes do perfil, usadas nos
+# orçamentos de latência). Cada medir_etapas() ativo recebe as etapas do bloco.
+_medicoes_ativas: List[List[Dict[str, Any]]] = []
+_pilha_medicoes: List[Dict[str, Any]] = []
+
+
+@contextmanager
+def medir_etapas():
+    """Coleta nome, caminho, duração e anotações de cada etapa executada no bloco"""
+    medicoes: List[Dict[str, Any]] = []
+    _medicoes_ativas.append(medicoes)
+    try:
+        yield medicoes
+    finally:
+        _medicoes_ativas.remove(medicoes)
+
+
+def anotar_etapa(**dados):
+    """Anota dados de contexto (ex.: linhas_aba) na etapa medida em andamento"""
+    if _pilha_medicoes:
+        _pilha_medicoes[-1]['contexto'].update(dados)
+
+
+@contextmanager
+def etapa(nome: str):
+    """Etapa perfilada/medida quando há perfilador ou medição ativa; sem custo caso contrário"""
+    if _perfilador_ativo is None and not _medicoes_ativas:
+        yield None
+        return
+
+    medicao = None
+    if _medicoes_ativas:
+        pai = _pilha_medicoes[-1] if _pilha_medicoes else None
+        medicao = {
+            'nome': nome,
+            'caminho': f"{pai['caminho']} > {nome}" if pai else nome,
+            'duracao': None,
+            'contexto': {},
+        }
+        _pilha_medicoes.append(medicao)
+        inicio = time.perf_counter()
+
+    try:
+        if _perfilador_ativo is None:
+            yield None
+        else:
+            with _perfilador_ativo.etapa(nome) as registro:
+                yield registro
+    finally:
+        if medicao is not None:
+            medicao['duracao'] = time.perf_counter() - inicio
+            _pilha_medicoes.remove(medicao)
+            for medicoes in _medicoes_ativas:
+                medicoes.append(medicao)
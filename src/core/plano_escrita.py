@@ -0,0 +1,249 @@
+"""
+Plano de escrita por arquivo
+Antes, cada CSV custava uma chamada por tipo de alteração: a batchUpdate da grade e das
+cores, a escrita dos valores e, por coluna de fórmula, uma leitura (acell) mais um
+copyPaste ou um update. O plano junta tudo localmente - intervalos de valores, aumento
+da grade, formatos e fórmulas - e executa em no máximo três chamadas, qualquer que seja
+o número de formatos e colunas de fórmula, nesta ordem:
+
+1. spreadsheets.batchUpdate com o appendDimension (só quando a grade precisa crescer)
+2. values.batchUpdate: todos os intervalos de valores, com RAW ou USER_ENTERED
+3. spreadsheets.batchUpdate: repeatCell, copyPaste e updateCells
+   (fórmulas escritas do zero vão como formulaValue, sem depender de USER_ENTERED)
+
+Os valores vão antes dos formatos e fórmulas: se a escrita deles falhar, a aba fica só com
+linhas vazias a mais na grade - nunca com linhas coloridas e com fórmulas (=TEXT(C;"DD/M")
+de célula vazia mostra "30/12") sem dados, que o próximo envio contaria como preenchidas.
+
+Valores acima de MAX_BYTES_BLOCO voltam para a escrita em blocos paralelos
+(escrita_blocos.py). Sem executar, descrever() mostra o que seria enviado (simulação).
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .escrita_blocos import MAX_BYTES_BLOCO, estimar_bytes, letra_coluna
+
+
+def titulo_a1(titulo: str) -> str:
+    """Nome da aba como prefixo de intervalo A1 ('BASE VOZ' -> "'BASE VOZ'")"""
+    return "'" + titulo.replace("'", "''") + "'"
+
+
+class PlanoEscrita:
+    """Alterações de um arquivo em uma aba, montadas localmente e enviadas em até três chamadas"""
+
+    def __init__(self, aba, value_input_option: str = 'RAW'):
+        self.aba = aba
+        self.sheet_id = aba.id
+        self.value_input_option = value_input_option
+        # [(linha_inicial, coluna_inicial, linhas)]
+        self.valores: List[tuple] = []
+        self.grade: List[dict] = []
+        self.formatos: List[dict] = []
+        self.formulas: List[dict] = []
+        self._grade_final = None
+        self._grade_aplicada = False
+
+    def _intervalo(self, primeira: int, ultima: int, coluna_inicial: int, coluna_final: int) -> dict:
+        """GridRange com linhas 1-indexadas inclusivas e colunas 0-indexadas [inicial, final)"""
+        return {'sheetId': self.sheet_id, 'startRowIndex': primeira - 1, 'endRowIndex': ultima,
+                'startColumnIndex': coluna_inicial, 'endColumnIndex': coluna_final}
+
+    def adicionar_valores(self, linha_inicial: int, linhas: Sequence[Sequence[Any]], coluna_inicial: int = 1):
+        """Intervalo de valores a partir de linha_inicial/coluna_inicial (1-indexadas)"""
+        if linhas:
+            self.valores.append((linha_inicial, coluna_inicial, linhas))
+
+    def garantir_grade(self, linhas_necessarias: int, colunas_necessarias: int):
+        """appendDimension para as linhas/colunas que faltam (tamanho da aba em cache, sem consulta)"""
+        faltam_linhas = linhas_necessarias - self.aba.row_count
+        faltam_colunas = colunas_necessarias - self.aba.col_count
+        if faltam_linhas > 0:
+            self.grade.append({'appendDimension': {'sheetId': self.sheet_id, 'dimension': 'ROWS',
+                                                   'length': faltam_linhas}})
+        if faltam_colunas > 0:
+            self.grade.append({'appendDimension': {'sheetId': self.sheet_id, 'dimension': 'COLUMNS',
+                                                   'length': faltam_colunas}})
+        self._grade_final = (max(linhas_necessarias, self.aba.row_count),
+                             max(colunas_necessarias, self.aba.col_count))
+
+    def formatar(self, linha_inicial: int, linha_final: int, formato: dict,
+                 coluna_inicial: int = 0, coluna_final: int = 1):
+        """repeatCell de userEnteredFormat só com os campos do formato"""
+        self.formatos.append({'repeatCell': {
+            'range': self._intervalo(linha_inicial, linha_final, coluna_inicial, coluna_final),
+            'cell': {'userEnteredFormat': formato},
+            'fields': f"userEnteredFormat({','.join(formato)})"}})
+
+    def adicionar_formatos(self, requisicoes: List[dict]):
+        """Requisições de formato já montadas (ex.: destaque condicional das linhas novas)"""
+        self.formatos.extend(requisicoes)
+
+    def copiar_formula(self, coluna: int, linha_origem: int, linha_inicial: int, linha_final: int):
+        """copyPaste PASTE_FORMULA da célula de origem (referências ajustadas pelo Sheets)"""
+        self.formulas.append({'copyPaste': {
+            'source': self._intervalo(linha_origem, linha_origem, coluna, coluna + 1),
+            'destination': self._intervalo(linha_inicial, linha_final, coluna, coluna + 1),
+            'pasteType': 'PASTE_FORMULA'}})
+
+    def escrever_formula(self, coluna: int, formula_template: str, linha_inicial: int, linha_final: int):
+        """updateCells com a fórmula do template ({row} = número da linha) em cada linha"""
+        self.formulas.append({'updateCells': {
+            'start': {'sheetId': self.sheet_id, 'rowIndex': linha_inicial - 1, 'columnIndex': coluna},
+            'rows': [{'values': [{'userEnteredValue': {'formulaValue': formula_template.replace('{row}', str(linha))}}]}
+                     for linha in range(linha_inicial, linha_final + 1)],
+            'fields': 'userEnteredValue'}})
+
+    def instalar_arrayformula(self, coluna: int, formula: str):
+        """Limpa a coluna abaixo do cabeçalho e grava a ARRAYFORMULA no cabeçalho (ver formulas_array.py)"""
+        self.formulas.append({'updateCells': {
+            'range': {'sheetId': self.sheet_id, 'startRowIndex': 1, 'startColumnIndex': coluna, 'endColumnIndex': coluna + 1},
+            'fields': 'userEnteredValue'}})
+        self.formulas.append({'updateCells': {
+            'start': {'sheetId': self.sheet_id, 'rowIndex': 0, 'columnIndex': coluna},
+            'rows': [{'values': [{'userEnteredValue': {'formulaValue': formula}}]}],
+            'fields': 'userEnteredValue'}})
+
+    def requisicoes(self) -> List[dict]:
+        """Corpo da spreadsheets.batchUpdate: grade (se ainda não enviada) antes de formatos e fórmulas"""
+        return self._grade_pendente() + self.formatos + self.formulas
+
+    def _grade_pendente(self) -> List[dict]:
+        return [] if self._grade_aplicada else self.grade
+
+    def corpo_valores(self) -> dict:
+        """Corpo da values.batchUpdate com todos os intervalos de valores"""
+        titulo = titulo_a1(self.aba.title)
+        dados = []
+        for linha_inicial, coluna_inicial, linhas in self.valores:
+            num_colunas = max(len(linha) for linha in linhas) or 1
+            intervalo = (f"{letra_coluna(coluna_inicial)}{linha_inicial}:"
+                         f"{letra_coluna(coluna_inicial + num_colunas - 1)}{linha_inicial + len(linhas) - 1}")
+            dados.append({'range': f"{titulo}!{intervalo}", 'values': [list(linha) for linha in linhas]})
+        return {'valueInputOption': self.value_input_option, 'data': dados}
+
+    def bytes_valores(self) -> int:
+        return sum(estimar_bytes(linha) for _, _, linhas in self.valores for linha in linhas)
+
+    def resumo(self) -> Dict[str, Any]:
+        """Contagens do plano (para simulação, eventos e testes)"""
+        em_blocos = self.bytes_valores() > MAX_BYTES_BLOCO
+        return {
+            'intervalos_valores': len(self.valores),
+            'linhas': sum(len(linhas) for _, _, linhas in self.valores),
+            'bytes_valores': self.bytes_valores(),
+            'grade': len(self.grade),
+            'formatos': len(self.formatos),
+            'formulas': len(self.formulas),
+            'valores_em_blocos': em_blocos,
+            'chamadas': (int(bool(self.grade)) + 1 + int(bool(self.formatos or self.formulas))
+                         if self.valores else int(bool(self.requisicoes()))),
+        }
+
+    def descrever(self) -> str:
+        """Plano legível, uma alteração por linha"""
+        resumo = self.resumo()
+        linhas = [f"🗺️ Plano de escrita para '{self.aba.title}': {resumo['chamadas']} chamada(s)"]
+        for requisicao in self.grade:
+            dimensao = requisicao['appendDimension']
+            linhas.append(f"   📈 Grade: +{dimensao['length']} {'linhas' if dimensao['dimension'] == 'ROWS' else 'colunas'}")
+        for dados in self.corpo_valores()['data']:
+            linhas.append(f"   📤 Valores {dados['range']} ({len(dados['values'])} linhas, {self.value_input_option})")
+        if resumo['valores_em_blocos']:
+            linhas.append(f"   📦 Valores acima de {MAX_BYTES_BLOCO // 1024 // 1024}MB: gravados em blocos paralelos")
+        for requisicao in self.formatos:
+            if 'repeatCell' in requisicao:
+                intervalo = requisicao['repeatCell']['range']
+                linhas.append(f"   🎨 Formato {requisicao['repeatCell']['fields']}: {self._a1(intervalo)}")
+            else:
+                tipo, corpo = next(iter(requisicao.items()))
+                intervalo = corpo.get('namedRange', {}).get('range')
+                linhas.append(f"   🎨 {tipo}" + (f": {self._a1(intervalo)}" if intervalo else ''))
+        for requisicao in self.formulas:
+            if 'copyPaste' in requisicao:
+                copia = requisicao['copyPaste']
+                linhas.append(f"   📋 Fórmula copiada de {self._a1(copia['source'])} para {self._a1(copia['destination'])}")
+            elif 'range' in requisicao['updateCells']:
+                coluna = letra_coluna(requisicao['updateCells']['range']['startColumnIndex'] + 1)
+                linhas.append(f"   🧽 Coluna {coluna} limpa abaixo do cabeçalho (ARRAYFORMULA)")
+            else:
+                celulas = requisicao['updateCells']
+                coluna = letra_coluna(celulas['start']['columnIndex'] + 1)
+                primeira = celulas['start']['rowIndex'] + 1
+                linhas.append(f"   🧮 Fórmula do template em {coluna}{primeira}:{coluna}{primeira + len(celulas['rows']) - 1}")
+        return '\n'.join(linhas)
+
+    def _a1(self, intervalo: dict) -> str:
+        return (f"{letra_coluna(intervalo['startColumnIndex'] + 1)}{intervalo['startRowIndex'] + 1}:"
+                f"{letra_coluna(intervalo['endColumnIndex'])}{intervalo['endRowIndex']}")
+
+    def aplicar_grade(self, planilha):
+        """Envia só o aumento da grade - antes dos valores, já que values.batchUpdate não cresce a aba"""
+        if not self._grade_pendente():
+            return
+        planilha.batch_update({'requests': self.grade})
+        self._grade_aplicada = True
+        self._registrar_grade()
+
+    def aplicar_lote(self, planilha) -> bool:
+        """
+        Envia grade (se ainda não enviada), formatos e fórmulas em uma spreadsheets.batchUpdate
+
+        Se ela falhar, repete sem os formatos (grade e fórmulas são necessárias; cor não).
+
+        Returns:
+            bool: True se os formatos foram aplicados
+        """
+        if not self.requisicoes():
+            return True
+        try:
+            planilha.batch_update({'requests': self.requisicoes()})
+            self._grade_aplicada = True
+            self._registrar_grade()
+            return True
+        except Exception as format_error:
+            if not self.formatos:
+                raise
+            print(f"⚠️ Aviso: Não foi possível aplicar formatação colorida: {format_error}")
+        if self._grade_pendente() or self.formulas:
+            planilha.batch_update({'requests': self._grade_pendente() + self.formulas})
+            self._grade_aplicada = True
+            self._registrar_grade()
+        return False
+
+    def gravar_valores(self, planilha, escrever_blocos: Optional[Callable[..., Any]] = None):
+        """
+        Envia os valores em uma values.batchUpdate
+
+        Acima de MAX_BYTES_BLOCO, cada intervalo vai para escrever_blocos(aba, linha_inicial,
+        linhas, coluna_inicial=..., value_input_option=...) - blocos paralelos com repetição.
+        """
+        if not self.valores:
+            return
+        if escrever_blocos is not None and self.bytes_valores() > MAX_BYTES_BLOCO:
+            for linha_inicial, coluna_inicial, linhas in self.valores:
+                escrever_blocos(self.aba, linha_inicial, linhas, coluna_inicial=coluna_inicial,
+                                value_input_option=self.value_input_option)
+            return
+        planilha.values_batch_update(self.corpo_valores())
+
+    def executar(self, planilha, escrever_blocos: Optional[Callable[..., Any]] = None) -> bool:
+        """
+        aplicar_grade + gravar_valores + aplicar_lote; retorna se os formatos foram aplicados
+        Se os valores falharem, nada de formato ou fórmula é enviado.
+        """
+        self.aplicar_grade(planilha)
+        self.gravar_valores(planilha, escrever_blocos)
+        return self.aplicar_lote(planilha)
+
+    def _registrar_grade(self):
+        """Atualiza o tamanho da grade na aba em cache (como faz o add_rows do gspread)"""
+        if self._grade_final is None:
+            return
+        propriedades = getattr(self.aba, '_properties', None)
+        if propriedades is None:
+            return
+        grade = propriedades.setdefault('gridProperties', {})
+        linhas, colunas = self._grade_final
+        grade['rowCount'] = max(grade.get('rowCount', 0), linhas)
+        grade['columnCount'] = max(grade.get('columnCount', 0), colunas)
@@ -0,0 +1,179 @@
+"""
+Valores tipados para escrita RAW
+Com value_input_option='USER_ENTERED' o Google Sheets interpreta cada célula como se
+fosse digitada - caro em envios grandes e dependente da localidade da planilha
+(01/02 vira 1º de fevereiro ou 2 de janeiro). Na escrita tipada a limpeza local já
+produz o valor final: números como números JSON e datas/horas como número de série
+da planilha (dias desde 30/12/1899), gravados com RAW e exibidos por um formato de
+número aplicado à coluna.
+
+Nas demais colunas, durações ('00:05:32'), percentuais ('12,5%') e moeda ('R$ 1.234,56')
+também viram números com o formato correspondente - com USER_ENTERED o Sheets fazia
+essa conversão, e somas/painéis dependem dela.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Dia zero do calendário do Google Sheets (o mesmo do Excel)
+DATA_ZERO = datetime(1899, 12, 30)
+
+# (formato strptime, tipo) - datas brasileiras primeiro
+FORMATOS_DATA = (
+    ('%d/%m/%Y %H:%M:%S', 'DATE_TIME'),
+    ('%d/%m/%Y %H:%M', 'DATE_TIME'),
+    ('%d/%m/%Y', 'DATE'),
+    ('%Y-%m-%d %H:%M:%S', 'DATE_TIME'),
+    ('%Y-%m-%dT%H:%M:%S', 'DATE_TIME'),
+    ('%Y-%m-%d %H:%M', 'DATE_TIME'),
+    ('%Y-%m-%d', 'DATE'),
+    ('%d/%m/%y', 'DATE'),
+    ('%d-%m-%Y', 'DATE'),
+    ('%H:%M:%S', 'TIME'),
+    ('%H:%M', 'TIME'),
+)
+
+# Formato de exibição de cada tipo (numberFormat da API)
+FORMATOS_NUMERO = {
+    'DATE': {'type': 'DATE', 'pattern': 'dd/mm/yyyy'},
+    'DATE_TIME': {'type': 'DATE_TIME', 'pattern': 'dd/mm/yyyy hh:mm:ss'},
+    'TIME': {'type': 'TIME', 'pattern': 'hh:mm:ss'},
+    'DURATION': {'type': 'TIME', 'pattern': '[h]:mm:ss'},
+    'PERCENT': {'type': 'PERCENT', 'pattern': '0.00%'},
+    'CURRENCY': {'type': 'CURRENCY', 'pattern': '"R$" #,##0.00'},
+}
+
+_NUMERO = r'\d+(?:[.,]\d+)*'
+_DURACAO = re.compile(r'(-?)(\d+):([0-5]\d)(?::([0-5]\d))?')
+_PERCENTUAL = re.compile(rf'([-+]?{_NUMERO})\s*%')
+_MOEDA = re.compile(rf'(-?)\s*R\$\s*([-+]?)\s*({_NUMERO})')
+
+# Coluna com tipos misturados fica com o formato mais completo
+_PRIORIDADE = {'TIME': 0, 'DATE': 1, 'DATE_TIME': 2}
+
+
+def serial_planilha(momento: datetime) -> float:
+    """datetime -> número de série da planilha (dias desde 30/12/1899, fração = hora)"""
+    return (momento - DATA_ZERO).total_seconds() / 86400
+
+
+@lru_cache(maxsize=65536)
+def converter_data(valor: str) -> Optional[Tuple[Any, str]]:
+    """
+    '31/01/2025 08:30:00' -> (45688.354..., 'DATE_TIME'); None se não for data/hora
+
+    Datas sem hora viram inteiros; horas sozinhas, a fração do dia.
+    Datas se repetem muito nas bases, então o resultado fica em cache.
+    """
+    valor = valor.strip()
+    if not valor or not valor[0].isdigit():
+        return None
+    for formato, tipo in FORMATOS_DATA:
+        try:
+            momento = datetime.strptime(valor, formato)
+        except ValueError:
+            continue
+        if tipo == 'TIME':
+            return (momento.hour * 3600 + momento.minute * 60 + momento.second) / 86400, tipo
+        serial = serial_planilha(momento)
+        return (int(serial) if tipo == 'DATE' else serial), tipo
+    return None
+
+
+def _numero_brasileiro(texto: str) -> Optional[float]:
+    """'1.234,56' -> 1234.56; mesma regra de limpar_numero_formato ('.' milhar quando há ',')"""
+    if ',' in texto and '.' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    elif texto.count('.') > 1:
+        texto = texto.replace('.', '')
+    else:
+        texto = texto.replace(',', '.')
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=65536)
+def converter_numero_formatado(valor: str) -> Optional[Tuple[float, str]]:
+    """
+    '00:05:32' -> (0.00384..., 'DURATION'), '12,5%' -> (0.125, 'PERCENT'),
+    'R$ 1.234,56' -> (1234.56, 'CURRENCY'); None para qualquer outro texto
+
+    Durações são frações de dia, como as horas (aceitam mais de 24h: '36:00:00' = 1,5).
+    """
+    valor = valor.strip()
+    if not valor:
+        return None
+    duracao = _DURACAO.fullmatch(valor)
+    if duracao:
+        sinal, horas, minutos, segundos = duracao.groups()
+        total = (int(horas) * 3600 + int(minutos) * 60 + int(segundos or 0)) / 86400
+        return (-total if sinal else total), 'DURATION'
+    percentual = _PERCENTUAL.fullmatch(valor)
+    if percentual:
+        numero = _numero_brasileiro(percentual.group(1))
+        return None if numero is None else (numero / 100, 'PERCENT')
+    moeda = _MOEDA.fullmatch(valor)
+    if moeda:
+        numero = _numero_brasileiro(moeda.group(3))
+        if numero is None:
+            return None
+        return (-numero if '-' in moeda.group(1) + moeda.group(2) else numero), 'CURRENCY'
+    return None
+
+
+def data_do_valor(valor: Any) -> Optional[date]:
+    """Número de série (escrita tipada, UNFORMATTED_VALUE) ou texto de data -> date; None se não for data"""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return (DATA_ZERO + timedelta(days=valor)).date()
+    convertido = converter_data(str(valor)) if valor not in (None, '') else None
+    if convertido is None or convertido[1] == 'TIME':
+        return None
+    return (DATA_ZERO + timedelta(days=convertido[0])).date()
+
+
+def tipar_colunas_data(dados: list, colunas: Iterable[int]) -> Dict[int, str]:
+    """
+    Troca, nas colunas indicadas, as datas em texto por números de série (no lugar)
+
+    Returns:
+        dict: {índice da coluna: tipo} das colunas em que alguma data foi convertida
+    """
+    colunas = list(colunas)
+    tipos: Dict[int, str] = {}
+    for linha in dados:
+        for idx in colunas:
+            if idx >= len(linha) or not isinstance(linha[idx], str):
+                continue
+            convertido = converter_data(linha[idx])
+            if convertido is None:
+                continue
+            linha[idx], tipo = convertido
+            if _PRIORIDADE[tipo] > _PRIORIDADE.get(tipos.get(idx), -1):
+                tipos[idx] = tipo
+    return tipos
+
+
+def tipar_colunas_numericas(dados: list, ignorar: Iterable[int] = ()) -> Dict[int, str]:
+    """
+    Troca durações, percentuais e valores em reais em texto por números (no lugar),
+    em todas as colunas menos as ignoradas (as de data, tratadas por tipar_colunas_data)
+
+    Returns:
+        dict: {índice da coluna: tipo} - o primeiro tipo encontrado na coluna
+    """
+    ignorar = set(ignorar)
+    tipos: Dict[int, str] = {}
+    for linha in dados:
+        for idx, valor in enumerate(linha):
+            if idx in ignorar or not isinstance(valor, str) or not valor:
+                continue
+            convertido = converter_numero_formatado(valor)
+            if convertido is None:
+                continue
+            linha[idx], tipo = convertido
+            tipos.setdefault(idx, tipo)
+    return tipos
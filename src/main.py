@@ -9,6 +9,7 @@
     python main.py                    # Processa tudo automaticamente
     python main.py --genesys          # Apenas bases Genesys
     python main.py --salesforce       # Apenas bases Salesforce
+    python main.py --profile          # Gera perfil de CPU por etapa em logs/perfil/
     python main.py --help             # Mostra ajuda
 """
 
@@ -23,10 +24,14 @@
 
 # Adicionar paths necessários
 sys.path.append(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 sys.path.append(os.path.join(current_dir, 'processadores', 'genesys'))
 sys.path.append(os.path.join(current_dir, 'processadores', 'salesforce'))
 sys.path.append(os.path.join(current_dir, 'processadores', 'produtividade'))
 
+from src.core.perfilador import MODOS_PERFIL, ativar_perfilador, finalizar_perfilador, modo_perfil_ambiente, etapa
+
 def main():
     """Função principal da automação"""
     
@@ -41,6 +46,7 @@ def main():
   python main.py --salesforce       # Só Salesforce
   python main.py --produtividade    # Só Produtividade
   python main.py --dados ./meus_csvs # Especifica pasta de dados
+  python main.py --profile=mem      # Perfil de memória por etapa
         """
     )
     
@@ -56,9 +62,25 @@ def main():
                        help='ID específico da planilha Google Sheets')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Modo verboso')
+    parser.add_argument('--profile', nargs='?', const='cpu', choices=MODOS_PERFIL,
+                       help='Perfila cada sistema, arquivo e etapa (cpu, mem, rss ou completo; default: cpu)')
     
     args = parser.parse_args()
     
+    modo_perfil = args.profile or modo_perfil_ambiente()
+    if modo_perfil:
+        perfilador = ativar_perfilador(modo_perfil)
+        print(f"🔬 Perfil ({modo_perfil}) ativado: {perfilador.pasta_execucao}")
+        try:
+            executar(args)
+        finally:
+            print(f"\n🔬 Perfil salvo em: {finalizar_perfilador()}")
+    else:
+        executar(args)
+
+def executar(args):
+    """Executa a automação com os argumentos já interpretados"""
+    
     # Banner inicial
     print("🚀 AUTOMAÇÃO DE BOLETINS - LEROY MERLIN")
     print("=" * 60)
@@ -78,15 +100,18 @@ def main():
     
     # Processar Genesys
     if not args.salesforce and not args.produtividade:  # Se não especificou só salesforce ou produtividade
-        resultados.update(processar_genesys(args.verbose, args.planilha))
+        with etapa("genesys"):
+            resultados.update(processar_genesys(args.verbose, args.planilha))
     
     # Processar Salesforce
     if not args.genesys and not args.produtividade:  # Se não especificou só genesys ou produtividade
-        resultados.update(processar_salesforce(args.verbose, args.planilha))
+        with etapa("salesforce"):
+            resultados.update(processar_salesforce(args.verbose, args.planilha))
     
     # Processar Produtividade
     if not args.genesys and not args.salesforce:  # Se não especificou só genesys ou salesforce
-        resultados.update(processar_produtividade(args.verbose, args.planilha))
+        with etapa("produtividade"):
+            resultados.update(processar_produtividade(args.verbose, args.planilha))
     
     # Relatório final
     gerar_relatorio_final(resultados)
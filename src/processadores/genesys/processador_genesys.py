@@ -5,33 +5,35 @@
 import sys
 import os
 
-# Adicionar o diretório src ao path para imports funcionarem tanto no main.py quanto em testes
+# Adicionar a raiz do projeto ao path para imports funcionarem tanto no main.py quanto em testes
+# (sempre 'src.core.*': um caminho só, uma cópia de cada módulo)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(current_dir, '..', '..')
-if src_dir not in sys.path:
-    sys.path.insert(0, src_dir)
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # Adicionar diretório config ao path
 root_dir = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
 config_dir = os.path.join(root_dir, 'config')
 sys.path.insert(0, config_dir)
 
-from core.google_sheets_base import GoogleSheetsBase
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.perfilador import etapa
 
 try:
-    from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+    from scripts.gerenciador_planilhas import obter_gerenciador
 except ImportError:
     # Fallback se não conseguir importar
     print("⚠️  Gerenciador de planilhas não encontrado, usando configuração padrão")
-    GerenciadorPlanilhas = None
+    obter_gerenciador = None
 
 class ProcessadorGenesys(GoogleSheetsBase):
     """Processador especializado para arquivos do Genesys"""
     
     def __init__(self, id_planilha=None):
         # Usar gerenciador de configurações se disponível
-        if GerenciadorPlanilhas:
-            self.gp = GerenciadorPlanilhas()
+        if obter_gerenciador:
+            self.gp = obter_gerenciador()
             
             # Usar ID específico se fornecido, senão usar do gerenciador
             if id_planilha:
@@ -82,6 +84,8 @@ def __init__(self, id_planilha=None):
         
         # Configuração de fórmulas para cada aba
         # Fórmula TEXT na coluna P para formatar data (coluna C) como DD/M
+        # Com 'arrayformula': True a coluna recebe uma única ARRAYFORMULA no cabeçalho e os
+        # envios deixam de gravar uma fórmula por linha (ver src/core/formulas_array.py)
         self.FORMULAS_CONFIG = {
             "voz": [
                 {'coluna': 'P', 'formula': '=TEXT(C{row};"DD/M")'}
@@ -99,22 +103,13 @@ def processar_gestao_entrega(self, caminho_csv=None):
         if caminho_csv is None:
             caminho_csv = f"{self.PADROES_ARQUIVOS['gestao_entrega']}.csv"
         
+        # Fórmulas das linhas novas (as verdes) no mesmo plano de escrita dos dados
         resultado = self.enviar_csv_para_planilha(
-            caminho_csv, 
-            self.NOME_ABAS["gestao_entrega"]
+            caminho_csv,
+            self.NOME_ABAS["gestao_entrega"],
+            formulas_config=self.FORMULAS_CONFIG.get("gestao_entrega")
         )
         
-        # Aplicar fórmulas APENAS nas linhas recém-adicionadas (as novas linhas verdes)
-        if resultado.get('sucesso') and resultado.get('num_linhas', 0) > 0:
-            if self.FORMULAS_CONFIG.get("gestao_entrega"):
-                print(f"🔧 Aplicando fórmulas nas {resultado['num_linhas']} linhas novas da aba {self.NOME_ABAS['gestao_entrega']}...")
-                self.aplicar_formulas_linhas_novas(
-                    self.NOME_ABAS["gestao_entrega"], 
-                    self.FORMULAS_CONFIG["gestao_entrega"],
-                    resultado['linha_inicial'],
-                    resultado['linha_final']
-                )
-        
         return resultado.get('sucesso', False)
     
     def processar_texto_hc(self, caminho_csv=None):
@@ -122,22 +117,13 @@ def processar_texto_hc(self, caminho_csv=None):
         if caminho_csv is None:
             caminho_csv = f"{self.PADROES_ARQUIVOS['texto']}.csv"
         
+        # Fórmulas das linhas novas (as verdes) no mesmo plano de escrita dos dados
         resultado = self.enviar_csv_para_planilha(
-            caminho_csv, 
-            self.NOME_ABAS["texto"]
+            caminho_csv,
+            self.NOME_ABAS["texto"],
+            formulas_config=self.FORMULAS_CONFIG.get("texto")
         )
         
-        # Aplicar fórmulas APENAS nas linhas recém-adicionadas (as novas linhas verdes)
-        if resultado.get('sucesso') and resultado.get('num_linhas', 0) > 0:
-            if self.FORMULAS_CONFIG.get("texto"):
-                print(f"🔧 Aplicando fórmulas nas {resultado['num_linhas']} linhas novas da aba {self.NOME_ABAS['texto']}...")
-                self.aplicar_formulas_linhas_novas(
-                    self.NOME_ABAS["texto"], 
-                    self.FORMULAS_CONFIG["texto"],
-                    resultado['linha_inicial'],
-                    resultado['linha_final']
-                )
-        
         return resultado.get('sucesso', False)
     
     def processar_voz_hc(self, caminho_csv=None):
@@ -145,22 +131,13 @@ def processar_voz_hc(self, caminho_csv=None):
         if caminho_csv is None:
             caminho_csv = f"{self.PADROES_ARQUIVOS['voz']}.csv"
         
+        # Fórmulas das linhas novas (as verdes) no mesmo plano de escrita dos dados
         resultado = self.enviar_csv_para_planilha(
             caminho_csv,
-            self.NOME_ABAS["voz"]
+            self.NOME_ABAS["voz"],
+            formulas_config=self.FORMULAS_CONFIG.get("voz")
         )
         
-        # Aplicar fórmulas APENAS nas linhas recém-adicionadas (as novas linhas verdes)
-        if resultado.get('sucesso') and resultado.get('num_linhas', 0) > 0:
-            if self.FORMULAS_CONFIG.get("voz"):
-                print(f"🔧 Aplicando fórmulas nas {resultado['num_linhas']} linhas novas da aba {self.NOME_ABAS['voz']}...")
-                self.aplicar_formulas_linhas_novas(
-                    self.NOME_ABAS["voz"], 
-                    self.FORMULAS_CONFIG["voz"],
-                    resultado['linha_inicial'],
-                    resultado['linha_final']
-                )
-        
         return resultado.get('sucesso', False)
     
     def processar_todos(self):
@@ -177,7 +154,8 @@ def processar_todos(self):
         
         for nome, funcao in processadores.items():
             try:
-                resultado = funcao()
+                with etapa(nome):
+                    resultado = funcao()
                 resultados[nome] = resultado
                 if resultado:
                     print(f"✅ {nome} processado")
@@ -27,7 +27,8 @@
 root_dir = os.path.abspath(os.path.join(current_dir, '..', '..', '..', '..'))
 sys.path.insert(0, root_dir)
 
-from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.google_sheets_base import GoogleSheetsBase, FORMATO_AMARELO_FORTE, FORMATO_AMARELO_CLARO
+from src.core.perfilador import etapa
 
 
 class ProcessadorAutoservicoSegundoSemestre(GoogleSheetsBase):
@@ -48,9 +49,9 @@ def __init__(self, caminho_credenciais=None):
         # Tentar usar gerenciador de configurações
         try:
             sys.path.insert(0, os.path.join(root_dir, 'config'))
-            from scripts.gerenciador_planilhas import GerenciadorPlanilhas
+            from scripts.gerenciador_planilhas import obter_gerenciador
             
-            gp = GerenciadorPlanilhas()
+            gp = obter_gerenciador()
             planilha_id = gp.obter_id('autoservico_segundo_semestre')
             
             if not planilha_id:
@@ -110,13 +111,15 @@ def processar_e_enviar(self, caminho_csv):
             
             # Ler CSV
             print("\n📖 Lendo arquivo CSV...")
-            df = self._ler_csv(caminho_csv)
+            with etapa('ler_csv'):
+                df = self._ler_csv(caminho_csv)
             print(f"   ✅ {len(df)} linhas carregadas")
             print(f"   ✅ {len(df.columns)} colunas encontradas")
             
             # Limpar e preparar dados
             print("\n🧹 Limpando e preparando dados...")
-            df = self._limpar_dados(df)
+            with etapa('limpar_dados'):
+                df = self._limpar_dados(df)
             print(f"   ✅ Dados limpos e preparados")
             
             # Conectar ao Google Sheets
@@ -127,7 +130,8 @@ def processar_e_enviar(self, caminho_csv):
             
             # Obter dados existentes
             print("\n📊 Verificando dados existentes...")
-            dados_existentes = aba.get_all_values()
+            with etapa('localizar_fim'):
+                dados_existentes = aba.get_all_values()
             
             if not dados_existentes:
                 print("   ⚠️  Planilha vazia - criando cabeçalho")
@@ -144,7 +148,8 @@ def processar_e_enviar(self, caminho_csv):
             print(f"   📍 Linha inicial: {linha_inicial}")
             
             # Converter DataFrame para lista de listas
-            dados = df.values.tolist()
+            with etapa('converter_lista'):
+                dados = df.values.tolist()
             
             # SEMPRE formatar CABEÇALHO (linha 1) PRIMEIRO - ANTES de enviar dados
             print("\n🎨 Aplicando formatação AMARELA no CABEÇALHO...")
@@ -154,49 +159,60 @@ def processar_e_enviar(self, caminho_csv):
             # Enviar dados em lote
             if dados:
                 # Processar dados para garantir compatibilidade com Google Sheets
-                dados_processados = []
-                for linha in dados:
-                    linha_processada = []
-                    for valor in linha:
-                        # Converter valores para tipos apropriados
-                        if valor is None or valor == '' or str(valor).lower() == 'nan':
-                            linha_processada.append('')
-                        else:
-                            valor_str = str(valor).strip()
-                            # Tentar converter para número se possível
-                            try:
-                                # Se contém apenas dígitos, ponto ou vírgula, pode ser número
-                                if valor_str.replace('.', '').replace(',', '').replace('-', '').replace('+', '').isdigit():
-                                    # Tentar converter para float
-                                    valor_num = float(valor_str.replace(',', '.'))
-                                    # Se for inteiro, converter para int
-                                    if valor_num.is_integer():
-                                        linha_processada.append(int(valor_num))
+                with etapa('formatar'):
+                    dados_processados = []
+                    for linha in dados:
+                        linha_processada = []
+                        for valor in linha:
+                            # Converter valores para tipos apropriados
+                            if valor is None or valor == '' or str(valor).lower() == 'nan':
+                                linha_processada.append('')
+                            else:
+                                valor_str = str(valor).strip()
+                                # Tentar converter para número se possível
+                                try:
+                                    # Se contém apenas dígitos, ponto ou vírgula, pode ser número
+                                    if valor_str.replace('.', '').replace(',', '').replace('-', '').replace('+', '').isdigit():
+                                        # Tentar converter para float
+                                        valor_num = float(valor_str.replace(',', '.'))
+                                        # Se for inteiro, converter para int
+                                        if valor_num.is_integer():
+                                            linha_processada.append(int(valor_num))
+                                        else:
+                                            linha_processada.append(valor_num)
                                     else:
-                                        linha_processada.append(valor_num)
-                                else:
-                                    # Manter como string
+                                        # Manter como string
+                                        linha_processada.append(valor_str)
+                                except:
+                                    # Se falhar, manter como string
                                     linha_processada.append(valor_str)
-                            except:
-                                # Se falhar, manter como string
-                                linha_processada.append(valor_str)
-                    dados_processados.append(linha_processada)
+                        dados_processados.append(linha_processada)
                 
                 # Usar USER_ENTERED para que o Sheets interprete números como números
-                aba.append_rows(dados_processados, value_input_option='USER_ENTERED')
+                with etapa('enviar'):
+                    self.garantir_grade(planilha, aba, linha_inicial + len(dados_processados) - 1, len(df.columns))
+                    self.escrever_linhas(aba, linha_inicial, dados_processados)
                 print(f"   ✅ {len(dados_processados)} linhas enviadas")
                 
-                # Formatar PRIMEIRA LINHA de dados com amarelo FORTE
                 print("\n🎨 Aplicando formatação AMARELA nos DADOS...")
-                if len(dados_processados) > 0:
-                    print(f"   🎨 Primeira linha de dados: amarelo FORTE (#FFA800)")
-                    self._aplicar_formatacao_linha_forte(aba, linha_inicial, len(df.columns))
-                
-                # Formatar DEMAIS LINHAS com amarelo CLARO
-                if len(dados_processados) > 1:
-                    print(f"   🎨 Demais linhas: amarelo claro (#FFF299)")
-                    self._aplicar_formatacao_amarela(aba, linha_inicial + 1, len(dados_processados) - 1, len(df.columns))
+                if self.modo_destaque(aba.title) == 'condicional':
+                    # Intervalo nomeado + regra condicional: nenhum formato novo na aba a cada envio
+                    with etapa('colorir'):
+                        self.destacar_linhas_novas(planilha, aba, linha_inicial, linha_inicial + len(dados_processados) - 1,
+                                                   len(df.columns), FORMATO_AMARELO_FORTE, FORMATO_AMARELO_CLARO)
+                else:
+                    # Formatar PRIMEIRA LINHA de dados com amarelo FORTE
+                    if len(dados_processados) > 0:
+                        print(f"   🎨 Primeira linha de dados: amarelo FORTE (#FFA800)")
+                        with etapa('colorir'):
+                            self._aplicar_formatacao_linha_forte(aba, linha_inicial, len(df.columns))
                 
+                    # Formatar DEMAIS LINHAS com amarelo CLARO
+                    if len(dados_processados) > 1:
+                        print(f"   🎨 Demais linhas: amarelo claro (#FFF299)")
+                        with etapa('colorir'):
+                            self._aplicar_formatacao_amarela(aba, linha_inicial + 1, len(dados_processados) - 1, len(df.columns))
+
                 print("   ✅ Dados formatados com destaque na primeira linha")
             
             resultado = {
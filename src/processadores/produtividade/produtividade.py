@@ -1,13 +1,15 @@
 import sys
 import os
 
-# Adicionar o diretório src ao path para imports funcionarem tanto no main.py quanto em testes
+# Adicionar a raiz do projeto ao path para imports funcionarem tanto no main.py quanto em testes
+# (sempre 'src.core.*': um caminho só, uma cópia de cada módulo)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(current_dir, '..', '..')
-if src_dir not in sys.path:
-    sys.path.insert(0, src_dir)
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from core.google_sheets_base import GoogleSheetsBase
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.perfilador import etapa
 
 class Produtividade(GoogleSheetsBase):
     """Processador especializado para arquivos de produtividade"""
@@ -69,7 +71,8 @@ def processar_todos(self):
         # função para iterar os processadores 
         for nome, funcao in processadores.items():
             try:
-                resultado = funcao()
+                with etapa(nome):
+                    resultado = funcao()
                 resultados[nome] = resultado
                 if resultado:
                     print(f"✅ {nome} processado")
@@ -5,10 +5,14 @@
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 from criado import ProcessadorCriado
 from resolvido import ProcessadorResolvido
 from comentario_bko import ProcessadorComentarioBKO
+from src.core.perfilador import etapa
 
 class ProcessadorSalesforce:
     """Orquestrador para todas as bases do Salesforce"""
@@ -28,7 +32,8 @@ def processar_todos(self):
         
         for nome, processador in self.processadores.items():
             try:
-                resultado = processador.processar()
+                with etapa(nome):
+                    resultado = processador.processar()
                 resultados[nome] = resultado
                 if resultado:
                     print(f"✅ {nome} processado")
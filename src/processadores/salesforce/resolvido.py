@@ -4,13 +4,14 @@
 import sys
 import os
 
-# Adicionar o diretório src ao path para imports funcionarem tanto no main.py quanto em testes
+# Adicionar a raiz do projeto ao path para imports funcionarem tanto no main.py quanto em testes
+# (sempre 'src.core.*': um caminho só, uma cópia de cada módulo)
 current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(current_dir, '..', '..')
-if src_dir not in sys.path:
-    sys.path.insert(0, src_dir)
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from core.google_sheets_base import GoogleSheetsBase
+from src.core.google_sheets_base import GoogleSheetsBase
 
 class ProcessadorResolvido(GoogleSheetsBase):
     """Processador para base RESOLVIDO"""
@@ -40,16 +41,8 @@ def processar(self, caminho_csv=None):
         if caminho_csv is None:
             caminho_csv = f"{self.PADRAO_ARQUIVO}.csv"
         
-        resultado = self.enviar_csv_para_planilha(caminho_csv, self.NOME_ABA)
-        
-        # Aplicar fórmulas APENAS nas linhas recém-adicionadas (as novas linhas verdes)
-        if resultado.get('sucesso') and resultado.get('num_linhas', 0) > 0:
-            print(f"🔧 Aplicando fórmulas nas {resultado['num_linhas']} linhas novas da aba {self.NOME_ABA}...")
-            self.aplicar_formulas_linhas_novas(
-                self.NOME_ABA,
-                self.FORMULAS_CONFIG,
-                resultado['linha_inicial'],
-                resultado['linha_final']
-            )
+        # Fórmulas das linhas novas (as verdes) no mesmo plano de escrita dos dados
+        resultado = self.enviar_csv_para_planilha(caminho_csv, self.NOME_ABA,
+                                                  formulas_config=self.FORMULAS_CONFIG)
         
         return resultado.get('sucesso', False)
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+🧪 PLANILHA FALSA PARA OS TESTES (sem acessar o Google Sheets)
+Aba, planilha e cliente em memória com a parte da API do gspread usada pelo envio,
+configuráveis por parâmetro. Cada teste sobrescreve só o comportamento que verifica
+(falhas, metadados de formatação, arquivo de capacidade...).
+
+Os testes também rodam direto (python tests/test_x.py): importe com
+`from conftest import AbaFalsa, ...` - a pasta tests está no sys.path nos dois casos.
+"""
+
+import os
+import sys
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import GoogleSheetsBase
+
+
+class AbaFalsa:
+    """
+    Aba em memória
+
+    valores: linhas já gravadas (cabeçalho incluído); celulas: conteúdo devolvido por
+    values_batch_get, ex.: {'P2': '=TEXT(C2;"DD/M")'}. As chamadas vão para `chamadas`,
+    compartilhada com a planilha para conferir a ordem.
+    """
+
+    def __init__(self, titulo='BASE TESTE', sheet_id=7, valores=None, linhas_grade=1000, colunas_grade=26,
+                 celulas=None):
+        self.title = titulo
+        self.id = sheet_id
+        self.row_count = linhas_grade
+        self.col_count = colunas_grade
+        self.valores = [list(linha) for linha in (valores or [])]
+        self.celulas = dict(celulas or {})
+        self.chamadas = []
+        self.atualizacoes = []
+        self.leituras = 0
+
+    def get_all_values(self):
+        self.chamadas.append('get_all_values')
+        self.leituras += 1
+        return [list(linha) for linha in self.valores]
+
+    def append_row(self, valores, **kwargs):
+        self.chamadas.append('append_row')
+        self.row_count += 1
+
+    def update(self, intervalo, valores, value_input_option=None):
+        self.chamadas.append(('update', intervalo))
+        self.atualizacoes.append((intervalo, valores, value_input_option))
+        self.gravar(intervalo, valores)
+
+    def format(self, intervalo, formato):
+        self.chamadas.append(('format', intervalo))
+
+    def gravar(self, intervalo, valores):
+        """Grava os valores (como texto, igual ao get_all_values) a partir da linha do intervalo A1"""
+        inicio = int(''.join(c for c in intervalo.split(':')[0] if c.isdigit()))
+        while len(self.valores) < inicio - 1 + len(valores):
+            self.valores.append([])
+        for i, linha in enumerate(valores):
+            self.valores[inicio - 1 + i] = [str(v) for v in linha]
+
+
+class PlanilhaFalsa:
+    """
+    Planilha com as abas dadas; registra lotes (batch_update), corpos de values.batchUpdate,
+    leituras (values_batch_get) e anexos (values_append)
+
+    metadados: resposta de fetch_sheet_metadata (padrão: só as propriedades das abas)
+    """
+
+    def __init__(self, abas=(), metadados=None, titulo='Planilha Teste'):
+        self.title = titulo
+        self.abas = {}
+        self.chamadas = []
+        self.metadados = metadados
+        self.lotes = []
+        self.corpos_valores = []
+        self.leituras = []
+        self.opcoes_leitura = []
+        self.anexos = []
+        self.listagens = 0
+        for aba in abas:
+            self.adicionar_aba(aba)
+
+    def adicionar_aba(self, aba):
+        aba.chamadas = self.chamadas
+        self.abas[aba.title] = aba
+        return aba
+
+    @property
+    def aba(self):
+        """A primeira aba (planilhas de uma aba só)"""
+        return next(iter(self.abas.values()))
+
+    def _aba_do_intervalo(self, intervalo):
+        titulo, celulas = intervalo.rsplit('!', 1)
+        if titulo.startswith("'"):
+            titulo = titulo[1:-1].replace("''", "'")
+        return self.abas[titulo], celulas
+
+    def worksheets(self):
+        self.listagens += 1
+        return list(self.abas.values())
+
+    def worksheet(self, nome):
+        return self.abas[nome]
+
+    def fetch_sheet_metadata(self, params=None):
+        self.chamadas.append('fetch_sheet_metadata')
+        if self.metadados is not None:
+            return self.metadados
+        return {'sheets': [{'properties': {'sheetId': aba.id, 'title': aba.title}} for aba in self.abas.values()]}
+
+    def batch_update(self, corpo):
+        self.chamadas.append('batch_update')
+        self.lotes.append(corpo['requests'])
+        for requisicao in corpo['requests']:
+            if 'appendDimension' in requisicao:
+                aumento = requisicao['appendDimension']
+                aba = next(a for a in self.abas.values() if a.id == aumento['sheetId'])
+                if aumento['dimension'] == 'ROWS':
+                    aba.row_count += aumento['length']
+                else:
+                    aba.col_count += aumento['length']
+
+    def values_batch_update(self, corpo):
+        self.chamadas.append('values_batch_update')
+        self.corpos_valores.append(corpo)
+        for dados in corpo['data']:
+            aba, celulas = self._aba_do_intervalo(dados['range'])
+            aba.gravar(celulas, dados['values'])
+
+    def intervalos_gravados(self):
+        """Intervalos de todas as values.batchUpdate, na ordem"""
+        return [dados['range'] for corpo in self.corpos_valores for dados in corpo['data']]
+
+    def values_batch_get(self, intervalos, params=None):
+        self.chamadas.append('values_batch_get')
+        self.leituras.append(intervalos)
+        self.opcoes_leitura.append(params)
+        respostas = []
+        for intervalo in intervalos:
+            aba, celula = self._aba_do_intervalo(intervalo)
+            conteudo = aba.celulas.get(celula)
+            respostas.append({'range': intervalo, 'values': [[conteudo]] if conteudo else []})
+        return {'valueRanges': respostas}
+
+    def values_append(self, intervalo, params=None, body=None):
+        self.anexos.append((intervalo, params, body['values']))
+        return {'updates': {'updatedRows': len(body['values'])}}
+
+
+class ClienteFalso:
+    """open_by_key: a planilha principal ou, pela chave, uma das outras"""
+
+    def __init__(self, planilha, outras=None):
+        self.planilha = planilha
+        self.outras = dict(outras or {})
+
+    def open_by_key(self, chave):
+        return self.outras.get(chave, self.planilha)
+
+
+def base_falsa(planilha, id_planilha='planilha-teste', classe=GoogleSheetsBase, outras=None, **opcoes):
+    """GoogleSheetsBase (ou subclasse) ligada à planilha falsa; destaque por célula se não informado"""
+    opcoes.setdefault('destaque', 'celulas')
+    sheets = classe(id_planilha=id_planilha, **opcoes)
+    sheets._client = ClienteFalso(planilha, outras)
+    return sheets
+
+
+def escrever_csv(pasta, nome, texto):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    return caminho
+
+
+def criar_csv(pasta, linhas=3, nome='BASE_SALESFORCE_CRIADO.csv', primeiro=1000, status='Novo'):
+    """CSV do Salesforce com `linhas` casos (Número do caso;Data de abertura;Status)"""
+    texto = 'Número do caso;Data de abertura;Status\n'
+    texto += ''.join(f'{primeiro + i};0{i + 1}/10/2025;{status}\n' for i in range(linhas))
+    return escrever_csv(pasta, nome, texto)
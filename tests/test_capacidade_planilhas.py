@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+📏 TESTE DA CAPACIDADE DAS PLANILHAS
+Verifica a soma de células pela grade em cache, a projeção de lotação pelo histórico
+e o arquivamento das linhas antigas (uma leitura da coluna de data, uma do bloco,
+a marca do último append do arquivo, um append, um deleteDimension e a confirmação)
+"""
+
+import re
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.historico_execucoes import HistoricoExecucoes
+from src.core.capacidade_planilhas import (arquivar_linhas, linhas_antigas, nivel_capacidade, projetar_lotacao,
+                                           subtrair_meses, verificar_capacidade)
+from src.core.colunas_derivadas import indice_coluna
+from conftest import AbaFalsa, PlanilhaFalsa as PlanilhaBase, base_falsa
+
+
+def test_projecao_e_corte():
+    inicio = datetime(2025, 1, 1)
+    amostras = [(inicio + timedelta(days=d), 1_000_000 + d * 10_000) for d in range(0, 30, 3)]
+    # 1,27M em 27 dias, 10 mil por dia: 8,73M faltando -> 873 dias depois da última amostra
+    assert projetar_lotacao(amostras) == inicio + timedelta(days=27 + 873)
+    assert projetar_lotacao(amostras[:1]) is None
+    assert projetar_lotacao([(inicio, 5), (inicio + timedelta(days=1), 4)]) is None
+
+    assert nivel_capacidade(0.5, {}) == 'ok'
+    assert nivel_capacidade(0.75, {}) == 'aviso'
+    assert nivel_capacidade(0.6, {'aviso': 0.3, 'arquivar': 0.5}) == 'arquivar'
+
+    assert subtrair_meses(date(2025, 8, 31), 6) == date(2025, 2, 28)
+    assert subtrair_meses(date(2025, 3, 15), 14) == date(2024, 1, 15)
+    # Número de série ou texto; para na primeira linha recente ou sem data
+    corte = date(2025, 3, 1)
+    assert linhas_antigas([[45688], ['15/02/2025'], [45717], [45688]], corte) == 2
+    assert linhas_antigas([[''], [45688]], corte) == 0
+
+
+class PlanilhaFalsa(PlanilhaBase):
+    """Aba viva: devolve a coluna de data (C2:C50001) ou as linhas [linha, 'x', data] do bloco"""
+    def __init__(self, abas, datas=None):
+        super().__init__(abas)
+        self.datas = datas or []
+
+    def values_batch_get(self, intervalos, params=None):
+        self.leituras.append((intervalos, params))
+        if intervalos[0].endswith(':C50001'):
+            return {'valueRanges': [{'values': [[d] for d in self.datas]}]}
+        fim = int(intervalos[0].split(':')[-1])
+        return {'valueRanges': [{'values': [[i, 'x', self.datas[i - 2]] for i in range(2, fim + 1)]}]}
+
+
+class ArquivoFalso(PlanilhaFalsa):
+    """Planilha de arquivo: guarda as linhas anexadas e devolve uma coluna ou um intervalo de linhas"""
+    def __init__(self):
+        super().__init__([])
+        self.linhas = []
+
+    def values_batch_get(self, intervalos, params=None):
+        self.leituras.append((intervalos, params))
+        inicio, fim = intervalos[0].split('!')[-1].split(':')
+        if not inicio.isdigit():
+            # Coluna inteira: células vazias viram [] e as do fim são omitidas, como na API
+            indice = indice_coluna(inicio)
+            valores = [[linha[indice]] if len(linha) > indice and linha[indice] != '' else []
+                       for linha in self.linhas]
+            while valores and not valores[-1]:
+                valores.pop()
+            return {'valueRanges': [{'values': valores}]}
+        return {'valueRanges': [{'values': self.linhas[int(inicio) - 1:int(fim)]}]}
+
+    def values_append(self, intervalo, params=None, body=None):
+        inicio = len(self.linhas) + 1
+        self.linhas.extend(list(linha) for linha in body['values'])
+        resposta = super().values_append(intervalo, params, body)
+        resposta['updates']['updatedRange'] = f"{intervalo.split('!')[0]}!A{inicio}:K{len(self.linhas)}"
+        return resposta
+
+    def values_batch_update(self, corpo):
+        for dados in corpo['data']:
+            coluna, inicio = re.match(r'([A-Z]+)(\d+)', dados['range'].split('!')[-1]).groups()
+            for deslocamento, (valor,) in enumerate(dados['values']):
+                self.linhas[int(inicio) - 1 + deslocamento][indice_coluna(coluna)] = valor
+
+    def marcas(self):
+        return [linha[10].rsplit(':', 1)[-1] if len(linha) > 10 else None for linha in self.linhas]
+
+
+def _sheets(planilha, arquivo):
+    return base_falsa(planilha, 'planilha-capacidade', outras={'planilha-arquivo': arquivo})
+
+
+def test_arquivamento():
+    # 4 linhas antes do corte (serial e texto) e 2 recentes
+    datas = [45600, 45610, '10/01/2025', 45680, 45900, 45901]
+    aba = AbaFalsa('BASE VOZ', 3, linhas_grade=900_000, colunas_grade=10)
+    planilha = PlanilhaFalsa([aba, AbaFalsa('BASE TEXTO', 4, colunas_grade=10)], datas)
+    arquivo = ArquivoFalso()
+    arquivo.linhas = [[1, 'x', 45000]]
+    sheets = _sheets(planilha, arquivo)
+    regra = {'planilha_arquivo': 'planilha-arquivo', 'aba_arquivo': "ARQUIVO D'VOZ", 'coluna_data': 'C', 'meses': 6}
+
+    relatorio = arquivar_linhas(sheets, 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+    assert relatorio == {'aba': 'BASE VOZ', 'linhas_arquivadas': 4, 'corte': '2025-02-10',
+                         'destino': "ARQUIVO D'VOZ"}
+    assert [l[0] for l in planilha.leituras] == [["'BASE VOZ'!C2:C50001"], ["'BASE VOZ'!2:5"]]
+    assert planilha.leituras[0][1]['valueRenderOption'] == 'UNFORMATTED_VALUE'
+    intervalo, params, valores = arquivo.anexos[0]
+    assert intervalo == "'ARQUIVO D''VOZ'!A1" and params['valueInputOption'] == 'RAW'
+    assert [linha[0] for linha in valores] == [2, 3, 4, 5]
+    # Dados até a última coluna da grade (10) e a marca na seguinte, confirmada depois da remoção
+    assert all(len(linha) == 11 and linha[10].startswith('arquivamento:') for linha in valores)
+    assert arquivo.marcas() == [None, 'ok', 'ok', 'ok', 'ok']
+    # O arquivo não termina num append pendente: só a coluna de marca é lida
+    assert [l[0] for l in arquivo.leituras] == [["'ARQUIVO D''VOZ'!K:K"]]
+    assert planilha.lotes == [[{'deleteDimension': {'range': {'sheetId': 3, 'dimension': 'ROWS',
+                                                               'startIndex': 1, 'endIndex': 5}}}]]
+
+    # Remoção falhou depois do append: a nova execução não anexa de novo, só remove
+    class PlanilhaSemRemocao(PlanilhaFalsa):
+        def batch_update(self, corpo):
+            raise RuntimeError('deleteDimension falhou')
+    arquivo = ArquivoFalso()
+    sheets = _sheets(PlanilhaSemRemocao([aba], datas), arquivo)
+    try:
+        arquivar_linhas(sheets, 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+    except RuntimeError:
+        pass
+    assert len(arquivo.linhas) == 4 and arquivo.marcas() == ['pendente'] * 4
+    planilha.lotes.clear()
+    sheets = _sheets(planilha, arquivo)
+    relatorio = arquivar_linhas(sheets, 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+    assert relatorio['linhas_arquivadas'] == 4 and len(arquivo.anexos) == 1 and len(arquivo.linhas) == 4
+    assert planilha.lotes[0][0]['deleteDimension']['range']['endIndex'] == 5
+    assert arquivo.marcas() == ['ok'] * 4
+
+    # Arquivo na própria planilha não libera células: recusado antes de qualquer leitura
+    planilha.leituras.clear()
+    for referencia in ('', 'planilha-capacidade'):
+        try:
+            arquivar_linhas(sheets, 'BASE VOZ', dict(regra, planilha_arquivo=referencia), hoje=date(2025, 8, 10))
+        except ValueError:
+            pass
+        else:
+            assert False, "arquivo na mesma planilha deveria ser recusado"
+    assert planilha.leituras == []
+
+    # Arquivo incompleto: nada é removido da aba viva
+    class ArquivoIncompleto(ArquivoFalso):
+        def values_append(self, intervalo, params=None, body=None):
+            return {'updates': {'updatedRows': 1}}
+    planilha.lotes.clear()
+    sheets = _sheets(planilha, ArquivoIncompleto())
+    try:
+        arquivar_linhas(sheets, 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+    except RuntimeError:
+        pass
+    else:
+        assert False, "append incompleto deveria interromper o arquivamento"
+    assert planilha.lotes == []
+
+
+def test_linha_repetida_no_fim_do_arquivo_nao_se_perde():
+    datas = [45600, 45610, '10/01/2025', 45680, 45900, 45901]
+    aba = AbaFalsa('BASE VOZ', 3, linhas_grade=900_000, colunas_grade=10)
+    regra = {'planilha_arquivo': 'planilha-arquivo', 'aba_arquivo': 'ARQUIVO', 'coluna_data': 'C', 'meses': 6}
+    primeira_viva = [2, 'x', 45600]
+    # Última linha do arquivo igual à primeira da aba viva: sem marca (arquivo antigo)
+    # ou de um arquivamento já confirmado - as 4 linhas são anexadas, nenhuma é dada como arquivada
+    for ultima in (list(primeira_viva), primeira_viva + [''] * 7 + ['arquivamento:abc123:ok']):
+        planilha = PlanilhaFalsa([aba], datas)
+        arquivo = ArquivoFalso()
+        arquivo.linhas = [['Caso', 'Status', 'Data'], ultima]
+        relatorio = arquivar_linhas(_sheets(planilha, arquivo), 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+        assert relatorio['linhas_arquivadas'] == 4
+        assert [linha[0] for linha in arquivo.anexos[0][2]] == [2, 3, 4, 5]
+        assert [linha[0] for linha in arquivo.linhas] == ['Caso', 2, 2, 3, 4, 5]
+
+    # Append pendente que não é o início da aba viva (remoção feita, confirmação perdida): anexa tudo
+    planilha = PlanilhaFalsa([aba], datas)
+    arquivo = ArquivoFalso()
+    arquivo.linhas = [['Caso', 'Status', 'Data'], [1, 'x', 45500] + [''] * 7 + ['arquivamento:abc123:pendente']]
+    relatorio = arquivar_linhas(_sheets(planilha, arquivo), 'BASE VOZ', regra, hoje=date(2025, 8, 10))
+    assert relatorio['linhas_arquivadas'] == 4 and len(arquivo.anexos[0][2]) == 4
+
+
+def test_verificacao_com_historico():
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoExecucoes(os.path.join(pasta, 'historico.db'))
+        aba = AbaFalsa('BASE VOZ', 3, linhas_grade=900_000, colunas_grade=10)
+        hoje = (datetime.now() - datetime(1899, 12, 30)).days
+        planilha = PlanilhaFalsa([aba, AbaFalsa('BASE TEXTO', 4, colunas_grade=10)], [hoje - 400, hoje])
+        arquivo = ArquivoFalso()
+        sheets = _sheets(planilha, arquivo)
+        # A aba aberta pelo envio tem a grade atualizada localmente
+        sheets.abrir_aba('BASE TEXTO').row_count = 2000
+        config = {'aviso': 0.5, 'arquivar': 0.9,
+                  'bases': {'BASE VOZ': {'planilha_arquivo': 'planilha-arquivo', 'aba_arquivo': 'ARQUIVO',
+                                         'coluna_data': 'C', 'meses': 6},
+                            'BASE TEXTO': {'aba_arquivo': 'ARQUIVO', 'coluna_data': 'C', 'meses': 6}}}
+        agora = datetime.now()
+        historico.registrar_capacidade('planilha-capacidade', 8_000_000, data=agora - timedelta(days=10))
+
+        resultado = verificar_capacidade(sheets, list(planilha.abas.values()), 'Boletim', historico, config, agora=agora)
+        assert resultado['celulas'] == 9_020_000 and resultado['nivel'] == 'arquivar'
+        # 102 mil células por dia: faltam 980 mil -> pouco menos de 10 dias
+        assert resultado['lotacao'][:10] == (agora + timedelta(days=980_000 / 102_000)).isoformat()[:10]
+        assert [a['linhas_arquivadas'] for a in resultado['arquivamentos']] == [1, 0]
+        assert arquivo.anexos[0][0] == "'ARQUIVO'!A1" and planilha.anexos == []
+        # Sem planilha_arquivo a regra é recusada e vira erro no relatório, sem tocar na aba
+        assert 'outra planilha' in resultado['arquivamentos'][1]['erro']
+        assert len(historico.amostras_capacidade('planilha-capacidade')) == 2
+
+        # Abaixo do limite: só mede
+        planilha.lotes.clear()
+        resultado = verificar_capacidade(sheets, list(planilha.abas.values()), 'Boletim', None,
+                                         dict(config, arquivar=0.95))
+        assert resultado['nivel'] == 'aviso' and resultado['arquivamentos'] == [] and planilha.lotes == []
+
+
+def main():
+    test_projecao_e_corte()
+    test_arquivamento()
+    test_linha_repetida_no_fim_do_arquivo_nao_se_perde()
+    test_verificacao_com_historico()
+    print("✅ Capacidade das planilhas: OK")
+
+
+if __name__ == "__main__":
+    main()
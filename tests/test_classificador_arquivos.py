@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+🏷️ TESTE DO CLASSIFICADOR DE ARQUIVOS
+Verifica que renomeador, cada sistema do main.py e o processar-todos-csvs classificam
+como antes (regras por ponto de entrada), a prioridade entre regras, a memorização por nome e o
+reconhecimento pelo cabeçalho (assinaturas) de CSVs com nome genérico
+"""
+
+import sys
+import os
+import re
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.classificador_arquivos import (ClassificadorArquivos, NOMES_PADRONIZADOS, REGRAS, ler_cabecalho,
+                                             tipo_do_arquivo)
+from renomeador_inteligente import RenomeadorInteligente
+import main as automacao
+
+
+EXEMPLOS = {
+    'Filas Genesys - Todas as Filas (1).csv': 'powerbi_filas',
+    'Fila genesys.csv': 'powerbi_filas',
+    'Autoserviço - Power BI 2024.csv': 'powerbi_autoservico',
+    'Relatório VOZ HC.csv': 'genesys_voz_hc',
+    'texto_hc_export.csv': 'genesys_texto_hc',
+    'GESTÃO ENTREGA N1 HC.csv': 'genesys_gestao_n1',
+    'gestao hc.csv': 'genesys_gestao',
+    'fila_hc.csv': 'genesys_fila',
+    'Casos criados-2024-05-01-10-00-00.csv': 'salesforce_criado',
+    'Casos resolvidos-2024-05-01-10-00-00.csv': 'salesforce_resolvido',
+    'Cópia de comentario bko.csv': 'salesforce_comentario_bko',
+    'dados seller-2024-05-01-10-00-00.csv': 'salesforce_seller',
+    'Base tempo visão produtiva.csv': 'produtividade_tempo',
+    'Base - visão produtiva.csv': 'produtividade_produtividade',
+    'BASE VOZ.csv': 'genesys_voz_hc',
+    'relatorio.csv': None,
+}
+
+# Nomes com palavras de mais de um sistema/tipo
+NOMES_MISTOS = [
+    'Tempo em fila.csv', 'Casos criados por fila.csv', 'BASE VOZ.csv', 'texto.csv', 'colaboradores.csv',
+    'Fila todas gestão.csv', 'Filas Genesys - Todas as Filas .csv', 'vendedor tempo.csv', 'visão fila hc.csv',
+    'comentario resolvido criado.csv', 'Resolvida tempo-2024-05-01-10-00-00.csv', 'gestao entrega hc.csv',
+    'gestão n1 colab.csv', 'voz texto hc.csv', 'bko seller visão.csv', 'Casos created resolved.csv',
+    'Autoserviço fila.csv', 'hibernação tempo.csv', 'relatorio.csv', 'criado.CSV', 'BASE_TEMPO.csv',
+]
+
+
+def _main_original(nome, sistema):
+    """detectar_tipo_arquivo do main.py antes do classificador compartilhado (só a chave)"""
+    n = nome.lower()
+    if sistema == "genesys":
+        if 'voz' in n and 'hc' in n:
+            return 'genesys_voz_hc'
+        elif 'texto' in n and 'hc' in n:
+            return 'genesys_texto_hc'
+        elif 'gestão' in n or 'gestao' in n:
+            return 'genesys_gestao_n1' if 'n1' in n or 'entrega' in n else 'genesys_gestao'
+        elif 'fila' in n and 'todas' in n:
+            return 'powerbi_filas'
+        elif 'fila' in n:
+            return 'genesys_fila'
+    elif sistema == "salesforce":
+        if 'criado' in n or 'created' in n:
+            return 'salesforce_criado'
+        elif 'resolvido' in n or 'resolved' in n:
+            return 'salesforce_resolvido'
+        elif 'comentario' in n or 'comment' in n or 'bko' in n:
+            return 'salesforce_comentario_bko'
+        elif 'seller' in n or 'vendedor' in n:
+            return 'salesforce_seller'
+    elif sistema == "produtividade":
+        if 'tempo' in n:
+            return 'produtividade_tempo'
+        elif 'produtiv' in n or 'visao' in n or 'visão' in n:
+            return 'produtividade_produtividade'
+    return None
+
+
+def _script_original(nome):
+    """detectar_tipo_arquivo do scripts/processar-todos-csvs.py antes do classificador (só a chave)"""
+    n = nome.lower()
+    if 'voz' in n and 'hc' in n:
+        return 'genesys_voz_hc'
+    elif 'texto' in n and 'hc' in n:
+        return 'genesys_texto_hc'
+    elif 'gestão' in n or 'gestao' in n:
+        return 'genesys_gestao_n1' if 'n1' in n else 'genesys_gestao'
+    elif 'fila' in n:
+        return 'genesys_fila'
+    elif 'colaborador' in n or 'colab' in n:
+        return 'genesys_colaborador'
+    return None
+
+
+def _renomeador_original(nome):
+    """RenomeadorInteligente.detectar_tipo_arquivo antes do classificador compartilhado (nome padronizado)"""
+    padroes = {
+        # POWER BI - Padrão para Filas Genesys (vários formatos possíveis)
+        r'.*filas.*genesys.*todas.*filas.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
+        r'.*filas.*genesys.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
+        r'.*genesys.*filas.*\.csv$': 'Filas Genesys - Todas as Filas .csv',
+        r'^filas\s*genesys\.csv$': 'Filas Genesys - Todas as Filas .csv',  # "Filas genesys.csv"
+        r'^fila\s*genesys\.csv$': 'Filas Genesys - Todas as Filas .csv',   # "Fila genesys.csv"
+
+        # POWER BI - Padrão para Autoserviço (vários formatos possíveis)
+        r'.*autoservi[cç]o.*power\s*bi.*\.csv$': 'Autoserviço Power BI.csv',
+        r'.*autoservi[cç]o.*powerbi.*\.csv$': 'Autoserviço Power BI.csv',
+        r'.*auto.*servi[cç]o.*\.csv$': 'Autoserviço Power BI.csv',
+        r'^autoservi[cç]o\s*-.*\.csv$': 'Autoserviço Power BI.csv',
+        r'^autoservi[cç]o.*\.csv$': 'Autoserviço Power BI.csv',
+
+        # SALESFORCE - Padrões
+        r'.*criado.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_CRIADO.csv',
+        r'.*resolvid[oa].*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_RESOLVIDO.csv',
+        r'.*comentario.*bko.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
+        r'cópia de.*comentario.*bko.*\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
+        r'.*seller.*-\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}\.csv$': 'BASE_SALESFORCE_SELLER.csv',
+
+        # GENESYS - Padrões
+        r'.*voz.*hc.*\.csv$': 'BASE_GENESYS_VOZ_HC.csv',
+        r'.*texto.*hc.*\.csv$': 'BASE_GENESYS_TEXTO_HC.csv',
+        r'.*gestão.*entrega.*n1.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_N1_HC.csv',
+        r'.*gestao.*entrega.*n1.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_N1_HC.csv',
+        r'.*gestão.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
+        r'.*gestao.*hc.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
+        r'.*fila.*hc.*\.csv$': 'BASE_GENESYS_FILA_HC.csv',
+
+        # PRODUTIVIDADE - Padrões (mais específicos primeiro)
+        r'.*base.*tempo.*visão.*produtiva.*\.csv$': 'BASE_TEMPO.csv',
+        r'.*base\s*-\s*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
+        r'.*base.*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
+        r'.*tempo.*visão.*produtiva.*\.csv$': 'BASE_TEMPO.csv',
+        r'.*visão.*produtiva.*\.csv$': 'BASE_PRODUTIVIDADE.csv',
+
+        # Padrões genéricos (fallback)
+        r'.*criado.*\.csv$': 'BASE_SALESFORCE_CRIADO.csv',
+        r'.*resolvid[oa].*\.csv$': 'BASE_SALESFORCE_RESOLVIDO.csv',
+        r'.*comentario.*\.csv$': 'BASE_SALESFORCE_COMENTARIO_BKO.csv',
+        r'.*voz.*\.csv$': 'BASE_GENESYS_VOZ_HC.csv',
+        r'.*texto.*\.csv$': 'BASE_GENESYS_TEXTO_HC.csv',
+        r'.*gestão.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
+        r'.*gestao.*\.csv$': 'BASE_GENESYS_GESTAO_HC.csv',
+    }
+    for padrao, novo_nome in padroes.items():
+        if re.match(padrao, nome.lower()):
+            return novo_nome
+    return None
+
+
+def test_tipos_e_prioridade():
+    for nome, esperado in EXEMPLOS.items():
+        assert tipo_do_arquivo(nome, 'renomeador') == esperado, (nome, tipo_do_arquivo(nome, 'renomeador'))
+
+    # Nomes padronizados pelo renomeador são reconhecidos pelo sistema que os envia
+    for chave, nome_padrao in NOMES_PADRONIZADOS.items():
+        sistema = chave.split('_', 1)[0]
+        assert tipo_do_arquivo(nome_padrao, sistema) == chave, nome_padrao
+
+
+def test_cada_ponto_de_entrada_classifica_como_antes():
+    for nome in NOMES_MISTOS + list(EXEMPLOS):
+        for sistema in ('genesys', 'salesforce', 'produtividade'):
+            assert tipo_do_arquivo(nome, sistema) == _main_original(nome, sistema), (nome, sistema)
+        assert tipo_do_arquivo(nome, 'processar_csvs') == _script_original(nome), nome
+        assert NOMES_PADRONIZADOS.get(tipo_do_arquivo(nome, 'renomeador')) == _renomeador_original(nome), nome
+
+    # O mesmo arquivo segue para a base de cada sistema que o reconhece
+    assert tipo_do_arquivo('Tempo em fila.csv', 'produtividade') == 'produtividade_tempo'
+    assert tipo_do_arquivo('Tempo em fila.csv', 'genesys') == 'genesys_fila'
+    assert tipo_do_arquivo('Casos criados por fila.csv', 'salesforce') == 'salesforce_criado'
+    # Fallbacks do renomeador não viram envio
+    assert tipo_do_arquivo('BASE VOZ.csv', 'genesys') is None
+
+
+def test_chamadores_usam_o_mesmo_classificador():
+    renomeador = RenomeadorInteligente(pasta_dados='inexistente')
+    assert renomeador.detectar_tipo_arquivo('Relatório VOZ HC.csv') == 'BASE_GENESYS_VOZ_HC.csv'
+    assert renomeador.detectar_tipo_arquivo('relatorio.csv') is None
+
+    config = {
+        'genesys': {'deteccao': {'voz_hc': ('BASE VOZ', 'GENESYS VOZ HC'), 'fila': ('BASE VOZ FILA', 'GENESYS FILA')}},
+        'salesforce': {'deteccao': {'criado': ('CRIADO', 'SALESFORCE CRIADO')}},
+        'produtividade': {'deteccao': {'tempo': ('BASE TEMPO', 'TEMPO')}},
+    }
+    original = automacao._planilhas_config
+    automacao._planilhas_config = config
+    try:
+        assert automacao.detectar_tipo_arquivo('BASE_GENESYS_VOZ_HC.csv', 'genesys') == ('BASE VOZ', 'GENESYS VOZ HC')
+        assert automacao.detectar_tipo_arquivo('BASE_GENESYS_VOZ_HC.csv', 'salesforce') == (None, None)
+        assert automacao.detectar_tipo_arquivo('Filas Genesys - Todas as Filas .csv', 'genesys') == (None, None)
+        assert automacao.detectar_tipos('BASE_SALESFORCE_CRIADO.csv') == {'salesforce': ('CRIADO', 'SALESFORCE CRIADO')}
+        assert automacao.detectar_tipos('Tempo em fila.csv') == {'genesys': ('BASE VOZ FILA', 'GENESYS FILA'),
+                                                                 'produtividade': ('BASE TEMPO', 'TEMPO')}
+        assert automacao.detectar_tipos('BASE VOZ.csv') == {}
+    finally:
+        automacao._planilhas_config = original
+
+
+def test_uma_passada_memorizada():
+    classificador = ClassificadorArquivos([('a', r'.*voz'), ('b', r'.*hc')])
+    assert classificador.classificar('voz_hc.csv') == 'a'
+    assert classificador.classificar('hc.csv') == 'b'
+
+    chamadas = []
+    expressao = classificador.expressao
+
+    class Contador:
+        def match(self, texto):
+            chamadas.append(texto)
+            return expressao.match(texto)
+
+    classificador.expressao = Contador()
+    assert classificador.classificar('outro_hc.csv') == 'b'
+    assert classificador.classificar('outro_hc.csv') == 'b'
+    assert chamadas == ['outro_hc.csv']
+
+
+def _gravar(pasta, nome, conteudo, encoding):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'w', encoding=encoding, newline='') as f:
+        f.write(conteudo)
+    return caminho
+
+
+def test_assinaturas_de_cabecalho():
+    classificador = ClassificadorArquivos(REGRAS['renomeador'], assinaturas={
+        'salesforce_criado': ['Número do caso', 'Data de abertura'],
+        'salesforce_resolvido': ['Número do caso', 'Data de abertura', 'Data de fechamento'],
+        'genesys_voz_hc': ['Agente', 'Fila'],
+    })
+    with tempfile.TemporaryDirectory() as pasta:
+        linhas = 'x;y;z\n' * 50_000
+        criado = _gravar(pasta, 'data (3).csv', '\ufeff"Número do Caso";"Data de abertura";Status\n' + linhas, 'utf-8')
+        resolvido = _gravar(pasta, 'data (4).csv',
+                            'Número do caso;Data de abertura;Data de fechamento\n' + linhas, 'cp1252')
+        voz = _gravar(pasta, 'criado.csv', 'Agente\tFila\tDuração\n', 'utf-16')
+        sem_assinatura = _gravar(pasta, 'texto hc.csv', 'a,b,c\n', 'utf-8')
+
+        assert ler_cabecalho(criado) == ['numero do caso', 'data de abertura', 'status']
+        assert classificador.classificar_caminho(criado) == 'salesforce_criado'
+        # A assinatura mais específica vence
+        assert classificador.classificar_caminho(resolvido) == 'salesforce_resolvido'
+        # O cabeçalho tem prioridade sobre o nome; sem correspondência, vale o nome
+        assert classificador.classificar_caminho(voz) == 'genesys_voz_hc'
+        assert classificador.classificar_caminho(sem_assinatura) == 'genesys_texto_hc'
+        assert classificador.classificar_caminho(os.path.join(pasta, 'inexistente.csv')) is None
+
+        # Só o início do arquivo é lido
+        lidos = []
+        abrir_original = open
+
+        class Arquivo:
+            def __init__(self, f):
+                self.f = f
+            def __enter__(self):
+                return self
+            def __exit__(self, *args):
+                self.f.close()
+            def read(self, n):
+                dados = self.f.read(n)
+                lidos.append(len(dados))
+                return dados
+
+        import builtins
+        builtins.open = lambda caminho, modo='r', *a, **k: Arquivo(abrir_original(caminho, modo, *a, **k))
+        try:
+            assert classificador.classificar_conteudo(criado) == 'salesforce_criado'
+        finally:
+            builtins.open = abrir_original
+        assert sum(lidos) <= 1024, lidos
+
+        # Sem assinaturas o arquivo nem é aberto
+        assert ClassificadorArquivos(REGRAS['renomeador']).classificar_conteudo(criado) is None
+
+
+def main():
+    test_tipos_e_prioridade()
+    test_cada_ponto_de_entrada_classifica_como_antes()
+    test_chamadores_usam_o_mesmo_classificador()
+    test_uma_passada_memorizada()
+    test_assinaturas_de_cabecalho()
+    print("✅ Classificador de arquivos: OK")
+
+
+if __name__ == "__main__":
+    main()
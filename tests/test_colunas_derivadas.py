@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+🧮 TESTE DAS COLUNAS DERIVADAS MATERIALIZADAS
+Verifica quais templates de FORMULAS_CONFIG são calculados localmente, os valores
+calculados (cópias e TEXT de datas) e que, no modo 'materializada', eles vão na mesma
+values.batchUpdate dos dados, sem fórmulas na batchUpdate
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.colunas_derivadas import agrupar_colunas, materializar_colunas, modo_da_base, separar_derivadas
+from conftest import AbaFalsa, PlanilhaFalsa, base_falsa, escrever_csv
+
+CONFIG = [
+    {'coluna': 'E', 'formula': '=TEXT(B{row};"DD/M")'},
+    {'coluna': 'F', 'formula': '=A{row}'},
+    {'coluna': 'G', 'formula': '=TEXTO(F{row};"dd/mm/yyyy")'},  # Origem derivada calculada antes
+    {'coluna': 'H', 'formula': '=SE(A{row}=""; ""; A{row}-B{row})'},
+    {'coluna': 'I', 'formula': '=TEXT(Z{row};"DD/M")'},  # Origem fora do CSV
+    {'coluna': 'J', 'formula': '=TEXT(B{row};"DD/MMM")'},  # Padrão não suportado
+    {'coluna': 'K', 'formula': '=A{row}', 'arrayformula': True},
+]
+
+
+def test_separacao_e_calculo():
+    calculaveis, restantes = separar_derivadas(CONFIG, 3)
+    assert [config['coluna'] for config, *_ in calculaveis] == ['E', 'F', 'G']
+    assert [config['coluna'] for config in restantes] == ['H', 'I', 'J', 'K']
+
+    # Datas como número de série (escrita tipada) ou texto, vazios e textos que não são data
+    dados = [[45688, '31/01/2025 08:30:00', 'x'],
+             [45689.5, '', 'y'],
+             ['', '2025-02-03', 'z'],
+             ['abc', 'sem data']]
+    formatos = {0: 'DATE'}
+    colunas = materializar_colunas(dados, calculaveis, formatos)
+    assert colunas[4] == ['31/1', '', '03/2', 'sem data']
+    assert colunas[5] == [45688, 45689.5, '', 'abc']
+    assert colunas[6] == ['31/01/2025', '01/02/2025', '', 'abc']
+    # A cópia de uma coluna de data herda o formato de número
+    assert formatos == {0: 'DATE', 5: 'DATE'}
+
+    # USER_ENTERED reinterpretaria '31/1' como data: textos vão com '
+    colunas = materializar_colunas(dados, calculaveis, texto_literal=True)
+    assert colunas[4] == ["'31/1", '', "'03/2", "'sem data"]
+
+    assert agrupar_colunas({4: [1, 2], 5: [3, 4], 7: [5, 6]}) == [(4, [[1, 3], [2, 4]]), (7, [[5], [6]])]
+    assert modo_da_base('BASE VOZ', {'padrao': 'formula', 'bases': {'BASE VOZ': 'materializada'}}) == 'materializada'
+    assert modo_da_base('BASE TEXTO', {'padrao': 'formula', 'bases': {'BASE VOZ': 'materializada'}}) == 'formula'
+    assert modo_da_base('BASE VOZ', {'padrao': 'outro'}) == 'formula'
+
+
+class SheetsMaterializado(GoogleSheetsBase):
+    def modo_colunas_derivadas(self, nome_aba):
+        return 'materializada'
+
+
+def test_envio_materializado():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = escrever_csv(pasta, 'BASE_VOZ.csv', 'Caso;Data;Status\n1000;03/02/2025;Novo\n1001;15/02/2025;Fechado\n')
+        planilha = PlanilhaFalsa([AbaFalsa('BASE VOZ', 9, [['Caso', 'Data', 'Status']], colunas_grade=5)])
+        sheets = base_falsa(planilha, 'planilha-derivadas', SheetsMaterializado, escrita_tipada=True)
+
+        config = [{'coluna': 'E', 'formula': '=TEXT(B{row};"DD/M")'},
+                  {'coluna': 'F', 'formula': '=B{row}'},
+                  {'coluna': 'H', 'formula': '=SE(F{row}=""; ""; F{row}+1)'}]
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE VOZ', formulas_config=config)
+        assert resultado['sucesso'] is True
+
+        # Uma values.batchUpdate: dados + colunas E:F calculadas
+        assert len(planilha.corpos_valores) == 1
+        dados = planilha.corpos_valores[0]['data']
+        assert [d['range'] for d in dados] == ["'BASE VOZ'!A2:C3", "'BASE VOZ'!E2:F3"]
+        assert dados[1]['values'] == [['03/2', 45691], ['15/2', 45703]]
+
+        # Só a coluna que não se sabe calcular continua como fórmula; a cópia da data recebe o formato
+        requisicoes = [r for lote in planilha.lotes for r in lote]
+        formulas = [r for r in requisicoes if 'updateCells' in r or 'copyPaste' in r]
+        assert len(formulas) == 1 and formulas[0]['updateCells']['start']['columnIndex'] == 7
+        assert planilha.leituras == [["'BASE VOZ'!H1"]]
+        colunas_data = [r['repeatCell']['range']['startColumnIndex'] for r in requisicoes
+                        if 'repeatCell' in r and 'numberFormat' in r['repeatCell']['cell']['userEnteredFormat']]
+        assert colunas_data == [1, 5]
+        # Grade ampliada até a coluna H, sozinha e antes dos valores
+        assert planilha.lotes[0] == [{'appendDimension': {'sheetId': 9, 'dimension': 'COLUMNS', 'length': 3}}]
+
+
+def main():
+    test_separacao_e_calculo()
+    test_envio_materializado()
+    print("✅ Colunas derivadas: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+🧹 TESTE DA COMPACTAÇÃO DE FORMATOS
+Verifica a contagem de trechos de formatação, a detecção do último lote destacado
+e que a compactação sai em uma leitura e uma batchUpdate por planilha
+"""
+
+import sys
+import os
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import FORMATO_VERDE_CLARO, FORMATO_AMARELO_FORTE
+from src.core.compactacao_formatos import (CAMPOS_ESTILO, compactar_planilha, contar_trechos,
+                                           planejar_compactacao, ultimo_lote)
+from conftest import AbaFalsa, PlanilhaFalsa as PlanilhaBase, base_falsa
+
+# Como a API devolve: componentes zerados omitidos, floats de 8 bits
+ESCURO = {'backgroundColor': {'green': 0.6627451, 'blue': 0.34901962}, 'borders': {'top': {'style': 'SOLID'}}}
+CLARO = {'backgroundColor': {'red': 0.8, 'green': 0.9490196, 'blue': 0.8509804},
+         'borders': {'top': {'style': 'SOLID'}}}
+AMARELO = {'backgroundColor': {'red': 1.0, 'green': 0.6627451}}
+
+
+def _historico():
+    # 3 lotes verdes antigos, linhas sem formato e o último lote
+    return [ESCURO, CLARO, CLARO, ESCURO, CLARO, None, None, ESCURO, CLARO, CLARO, None, {}]
+
+
+def test_trechos_e_ultimo_lote():
+    formatos = _historico()
+    assert contar_trechos(formatos) == 8
+    assert ultimo_lote(formatos) == (7, 9, 0)
+    assert ultimo_lote([None, AMARELO, None]) == (1, 1, 1)
+    assert ultimo_lote([None, CLARO]) is None
+
+    info = {'sheet_id': 5, 'formatos': formatos}
+    plano = planejar_compactacao(info, condicional=False)
+    assert plano['requisicoes'] == [{'repeatCell': {'range': {'sheetId': 5, 'startRowIndex': 1},
+                                                    'cell': {'userEnteredFormat': {}}, 'fields': CAMPOS_ESTILO}}]
+    # Depois: sem cor / primeira linha / demais / sem cor
+    assert plano['trechos_depois'] == 4
+    assert plano['ultimo_lote'] == (9, 11)
+    assert plano['destaque'][1] is FORMATO_VERDE_CLARO
+    # Destaque condicional não deixa formatos por célula
+    assert planejar_compactacao(info, condicional=True)['trechos_depois'] == 1
+    assert planejar_compactacao({'sheet_id': 5, 'formatos': [AMARELO]}, condicional=False)['destaque'][0] is FORMATO_AMARELO_FORTE
+
+
+class PlanilhaFalsa(PlanilhaBase):
+    """Duas abas com o mesmo histórico de formatos na coluna A"""
+    def __init__(self):
+        super().__init__([AbaFalsa('BASE VOZ', 1), AbaFalsa('BASE TEXTO', 2)])
+
+    def fetch_sheet_metadata(self, params=None):
+        self.leituras.append(params['ranges'])
+        linhas = [{'values': [{'userEnteredFormat': f}] if f else [{}]} for f in _historico()]
+        return {'sheets': [
+            {'properties': {'sheetId': aba.id, 'title': aba.title,
+                            'gridProperties': {'rowCount': 1000, 'columnCount': 26}},
+             'data': [{'rowData': [{'values': [{'formattedValue': 'A'}, {'formattedValue': 'B'}, {}]}]},
+                      {'startRow': 1, 'rowData': linhas}]}
+            for aba in self.abas.values()]}
+
+
+def test_compactacao_em_uma_leitura_e_um_lote():
+    sheets = base_falsa(PlanilhaFalsa(), 'planilha-compactacao')
+    planilha = sheets._client.planilha
+
+    relatorio = compactar_planilha(sheets, ['BASE VOZ', 'BASE TEXTO', 'BASE VOZ', 'NÃO EXISTE'])
+    assert [(r['aba'], r['trechos_antes'], r['trechos_depois']) for r in relatorio] == [
+        ('BASE VOZ', 8, 4), ('BASE TEXTO', 8, 4)]
+    # Relatório: nada enviado
+    assert planilha.lotes == [] and 'requisicoes' not in relatorio[0]
+    assert planilha.leituras[0] == ["'BASE VOZ'!1:1", "'BASE VOZ'!A2:A", "'BASE TEXTO'!1:1", "'BASE TEXTO'!A2:A"]
+
+    relatorio = compactar_planilha(sheets, ['BASE VOZ', 'BASE TEXTO'], aplicar=True)
+    assert len(planilha.lotes) == 1
+    # Por aba: limpeza + primeira linha + demais linhas do último lote (2 colunas do cabeçalho)
+    assert [r['requisicoes'] for r in relatorio] == [3, 3]
+    destaque = planilha.lotes[0][1]['repeatCell']['range']
+    assert destaque == {'sheetId': 1, 'startRowIndex': 8, 'endRowIndex': 11, 'startColumnIndex': 0, 'endColumnIndex': 2}
+
+
+def test_condicional_nao_move_o_intervalo_nomeado():
+    # Modo condicional: o último lote pintado é anterior à troca de modo; o intervalo nomeado
+    # já aponta para o envio mais recente e não é tocado - só a limpeza das cores
+    sheets = base_falsa(PlanilhaFalsa(), 'planilha-compactacao-condicional', destaque='condicional')
+    planilha = sheets._client.planilha
+
+    relatorio = compactar_planilha(sheets, ['BASE VOZ', 'BASE TEXTO'], aplicar=True)
+    assert [(r['ultimo_lote'], r['requisicoes'], r['trechos_depois']) for r in relatorio] == [(None, 1, 1)] * 2
+    assert [list(r) for r in planilha.lotes[0]] == [['repeatCell']] * 2
+    assert all(r['repeatCell']['fields'] == CAMPOS_ESTILO for r in planilha.lotes[0])
+
+
+def main():
+    test_trechos_e_ultimo_lote()
+    test_compactacao_em_uma_leitura_e_um_lote()
+    test_condicional_nao_move_o_intervalo_nomeado()
+    print("✅ Compactação de formatos: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+🖍️ TESTE DO DESTAQUE CONDICIONAL DAS LINHAS NOVAS
+Verifica que o intervalo nomeado e as regras condicionais são criados uma vez por aba,
+que cada regra cobre só as linhas novas (sem INDIRECT/ROW sobre a aba inteira), que os
+envios seguintes só movem o intervalo e as regras, e que 'celulas' continua o padrão
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import GoogleSheetsBase, FORMATO_PRIMEIRA_LINHA
+from src.core.destaque_linhas import (descartar_destaque, destaque_ambiente, destaque_da_base,
+                                      formato_condicional, nome_intervalo_novas)
+from conftest import AbaFalsa, PlanilhaFalsa, base_falsa, criar_csv as _criar_csv
+
+
+def _aba():
+    return AbaFalsa('BASE DESTAQUE', 11, [['Número do caso', 'Data de abertura', 'Status']])
+
+
+def _planilha(aba, metadados=None):
+    return PlanilhaFalsa([aba], metadados, 'Planilha Destaque')
+
+
+def _base(planilha, id_planilha):
+    return base_falsa(planilha, id_planilha, destaque='condicional')
+
+
+def _faixa(inicio, fim, colunas=3):
+    return {'sheetId': 11, 'startRowIndex': inicio, 'endRowIndex': fim, 'startColumnIndex': 0, 'endColumnIndex': colunas}
+
+
+def test_regras_criadas_uma_vez():
+    descartar_destaque()
+    aba = _aba()
+    planilha = _planilha(aba)
+    sheets = _base(planilha, 'planilha-destaque')
+    nome = nome_intervalo_novas(11)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta)
+        sheets.enviar_csv_para_planilha(caminho, aba.title)
+        sheets.enviar_csv_para_planilha(caminho, aba.title)
+
+    # Metadados lidos só no primeiro envio
+    assert aba.chamadas.count('fetch_sheet_metadata') == 1
+    # Formatos por célula só os de número (datas da escrita tipada), nunca cores
+    formatos = [r['repeatCell']['cell']['userEnteredFormat'] for lote in planilha.lotes for r in lote if 'repeatCell' in r]
+    assert formatos and all(list(f) == ['numberFormat'] for f in formatos)
+    primeiro, segundo = ([r for r in lote if 'repeatCell' not in r] for lote in planilha.lotes)
+    tipos = [next(iter(r)) for r in primeiro]
+    assert tipos == ['addNamedRange', 'addConditionalFormatRule', 'addConditionalFormatRule']
+    assert primeiro[0]['addNamedRange']['namedRange']['range'] == _faixa(1, 4)
+    # Cada regra só nas suas linhas: a primeira linha e as demais do envio
+    regras = [r['addConditionalFormatRule'] for r in primeiro[1:]]
+    assert [r['index'] for r in regras] == [0, 1]
+    assert [r['rule']['ranges'] for r in regras] == [[_faixa(1, 2)], [_faixa(2, 4)]]
+    for regra in regras:
+        formula = regra['rule']['booleanRule']['condition']['values'][0]['userEnteredValue']
+        assert formula == f'="{nome}"<>""'
+        assert 'INDIRECT' not in formula and 'ROW' not in formula
+        assert 'borders' not in regra['rule']['booleanRule']['format']
+
+    # Segundo envio: intervalo nomeado e faixas das duas regras movidos para as linhas novas
+    assert segundo[0] == {'updateNamedRange': {'namedRange': {
+        'namedRangeId': nome.lower(), 'name': nome, 'range': _faixa(4, 7)}, 'fields': 'range'}}
+    assert [next(iter(r)) for r in segundo[1:]] == ['updateConditionalFormatRule'] * 2
+    movidas = [r['updateConditionalFormatRule'] for r in segundo[1:]]
+    assert [(r['index'], r['sheetId'], r['rule']['ranges']) for r in movidas] == [
+        (0, 11, [_faixa(4, 5)]), (1, 11, [_faixa(5, 7)])]
+
+
+def test_regras_antigas_substituidas():
+    descartar_destaque()
+    aba = _aba()
+    nome = nome_intervalo_novas(11)
+    antiga = {'booleanRule': {'condition': {'values': [{'userEnteredValue': f'=ROW()=ROW(INDIRECT("{nome}"))'}]}}}
+    outra = {'booleanRule': {'condition': {'values': [{'userEnteredValue': '=$C2="Novo"'}]}}}
+    # Intervalo e duas regras (com INDIRECT) de uma versão anterior: substituídas no lugar
+    planilha = _planilha(aba, {
+        'namedRanges': [{'namedRangeId': 'abc123', 'name': nome}],
+        'sheets': [{'properties': {'sheetId': 11}, 'conditionalFormats': [outra, antiga, antiga]}]})
+    sheets = _base(planilha, 'planilha-preparada')
+    assert sheets.destacar_linhas_novas(planilha, aba, 10, 12, 5, FORMATO_PRIMEIRA_LINHA, FORMATO_PRIMEIRA_LINHA)
+    lote = planilha.lotes[0]
+    assert [next(iter(r)) for r in lote] == ['updateNamedRange'] + ['updateConditionalFormatRule'] * 2
+    assert lote[0]['updateNamedRange']['namedRange']['namedRangeId'] == 'abc123'
+    assert [r['updateConditionalFormatRule']['index'] for r in lote[1:]] == [1, 2]
+    assert not any('INDIRECT' in str(r) for r in lote)
+
+    # Só uma regra antiga: removida e as duas recriadas no topo
+    descartar_destaque()
+    planilha = _planilha(aba, {
+        'namedRanges': [{'namedRangeId': 'abc123', 'name': nome}],
+        'sheets': [{'properties': {'sheetId': 11}, 'conditionalFormats': [antiga, outra]}]})
+    sheets = _base(planilha, 'planilha-incompleta')
+    assert sheets.destacar_linhas_novas(planilha, aba, 10, 12, 5, FORMATO_PRIMEIRA_LINHA, FORMATO_PRIMEIRA_LINHA)
+    lote = planilha.lotes[0]
+    assert [next(iter(r)) for r in lote] == ['updateNamedRange', 'deleteConditionalFormatRule',
+                                             'addConditionalFormatRule', 'addConditionalFormatRule']
+    assert lote[1]['deleteConditionalFormatRule'] == {'index': 0, 'sheetId': 11}
+
+    formato = formato_condicional(FORMATO_PRIMEIRA_LINHA)
+    assert set(formato) == {'backgroundColor', 'textFormat'}
+    assert formato['textFormat'] == {'foregroundColor': {'red': 1.0, 'green': 1.0, 'blue': 1.0}, 'bold': True}
+
+
+def test_celulas_e_padrao_e_condicional_por_base():
+    anterior = os.environ.pop('AUTOMACAO_DESTAQUE', None)
+    try:
+        assert destaque_ambiente() is None
+        assert destaque_da_base('BASE VOZ', {}) == 'celulas'
+        config = {'padrao': 'celulas', 'bases': {'BASE VOZ': 'condicional'}}
+        assert destaque_da_base('BASE VOZ', config) == 'condicional'
+        assert destaque_da_base('BASE DADOS', config) == 'celulas'
+        assert GoogleSheetsBase().modo_destaque('BASE QUALQUER') == 'celulas'
+
+        # Sem condicional: o destaque são formatos por célula, sem ler metadados
+        aba = _aba()
+        planilha = _planilha(aba)
+        sheets = GoogleSheetsBase(id_planilha='planilha-celulas', destaque='celulas')
+        requisicoes = sheets.requisicoes_destaque(planilha, aba, 2, 4, 3, FORMATO_PRIMEIRA_LINHA, FORMATO_PRIMEIRA_LINHA)
+        assert requisicoes and all('repeatCell' in r for r in requisicoes)
+        assert 'fetch_sheet_metadata' not in aba.chamadas
+
+        os.environ['AUTOMACAO_DESTAQUE'] = 'condicional'
+        assert destaque_ambiente() == 'condicional'
+        assert GoogleSheetsBase().modo_destaque('BASE QUALQUER') == 'condicional'
+    finally:
+        os.environ.pop('AUTOMACAO_DESTAQUE', None)
+        if anterior is not None:
+            os.environ['AUTOMACAO_DESTAQUE'] = anterior
+
+
+def test_simulacao_e_falha_nao_marcam_aba_preparada():
+    descartar_destaque()
+    aba = _aba()
+    planilha = _planilha(aba)
+    sheets = _base(planilha, 'planilha-simulada')
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta)
+        # Simulação monta as requisições mas não cria nada: o envio real ainda cria o intervalo
+        assert sheets.enviar_csv_para_planilha(caminho, aba.title, simular=True)['simulado']
+        assert planilha.lotes == []
+        sheets.enviar_csv_para_planilha(caminho, aba.title)
+    criacao = [next(iter(r)) for r in planilha.lotes[-1] if 'repeatCell' not in r]
+    assert criacao[0] == 'addNamedRange'
+
+    # batchUpdate recusada: o próximo destaque relê os metadados em vez de só mover o intervalo
+    descartar_destaque()
+
+    class PlanilhaRecusa(PlanilhaFalsa):
+        def batch_update(self, corpo):
+            raise Exception("400 Bad Request")
+
+    recusa = PlanilhaRecusa([aba])
+    sheets = _base(recusa, 'planilha-recusa')
+    assert not sheets.destacar_linhas_novas(recusa, aba, 10, 12, 3, FORMATO_PRIMEIRA_LINHA, FORMATO_PRIMEIRA_LINHA)
+    antes = aba.chamadas.count('fetch_sheet_metadata')
+    sheets.requisicoes_destaque(recusa, aba, 13, 14, 3, FORMATO_PRIMEIRA_LINHA, FORMATO_PRIMEIRA_LINHA)
+    assert aba.chamadas.count('fetch_sheet_metadata') == antes + 1
+
+
+def main():
+    test_regras_criadas_uma_vez()
+    test_regras_antigas_substituidas()
+    test_celulas_e_padrao_e_condicional_por_base()
+    test_simulacao_e_falha_nao_marcam_aba_preparada()
+    print("✅ Destaque condicional: OK")
+
+
+if __name__ == "__main__":
+    main()
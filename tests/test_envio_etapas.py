@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+📤 TESTE DAS ETAPAS DE ENVIO (sem acessar o Google Sheets)
+Usa uma planilha falsa em memória para verificar o envio de CSV e as
+etapas perfiladas (ler_csv, localizar_fim, converter_lista, formatar, enviar)
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.perfilador import ativar_perfilador, finalizar_perfilador, etapa
+from conftest import AbaFalsa, PlanilhaFalsa, base_falsa, criar_csv as _criar_csv
+
+
+def _base_com_aba(aba):
+    return base_falsa(PlanilhaFalsa([aba]))
+
+
+def test_envio_complementa_dados_existentes():
+    """Novas linhas entram logo após a última linha com dados"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta)
+        aba = AbaFalsa(valores=[['Número do caso', 'Data de abertura', 'Status'], ['999', '30/09/2025', 'Fechado']])
+        resultado = _base_com_aba(aba).enviar_csv_para_planilha(caminho, 'BASE TESTE')
+
+        assert resultado['sucesso'] is True
+        assert resultado['linha_inicial'] == 3
+        assert resultado['linha_final'] == 5
+        assert resultado['num_linhas'] == 3
+        assert aba.valores[2][0] == '1000'
+
+
+def test_grade_antes_dos_valores_e_cores_depois():
+    """Grade aumentada (appendDimension) antes dos dados; cores só depois que os dados foram gravados"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta, linhas=5)
+        aba = AbaFalsa(valores=[['Número do caso', 'Data de abertura', 'Status']], linhas_grade=3)
+        sheets = _base_com_aba(aba)
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE')
+
+        assert resultado['linha_final'] == 6
+        assert 'append_row' not in aba.chamadas
+        lotes = [c for c in aba.chamadas if c in ('batch_update', 'values_batch_update')]
+        assert lotes == ['batch_update', 'values_batch_update', 'batch_update']
+        grade, cores = sheets._client.planilha.lotes
+        assert grade == [{'appendDimension': {'sheetId': 7, 'dimension': 'ROWS', 'length': 3}}]
+        assert cores and all('repeatCell' in r for r in cores)
+        assert aba.row_count == 6
+
+        # Próximo envio: a grade é calculada a partir do tamanho já registrado localmente
+        sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE')
+        assert sheets._client.planilha.lotes[2][0]['appendDimension']['length'] == 5
+
+        # Com a grade já suficiente, nada de appendDimension
+        aba_grande = AbaFalsa(linhas_grade=1000)
+        sheets = _base_com_aba(aba_grande)
+        sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE')
+        assert all('appendDimension' not in r for r in sheets._client.planilha.lotes[0])
+        assert [c for c in aba_grande.chamadas if isinstance(c, str)][-2:] == ['values_batch_update', 'batch_update']
+
+
+def test_falha_nos_valores_nao_deixa_linhas_formatadas():
+    """values.batchUpdate falhou: nenhuma cor/fórmula enviada, o próximo envio começa na mesma linha"""
+    class PlanilhaInstavel(PlanilhaFalsa):
+        falhar = True
+
+        def values_batch_update(self, corpo):
+            if self.falhar:
+                raise Exception("503 Service Unavailable")
+            super().values_batch_update(corpo)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta, linhas=3)
+        aba = AbaFalsa(valores=[['Número do caso', 'Data de abertura', 'Status']], linhas_grade=2)
+        sheets = _base_com_aba(aba)
+        sheets._client.planilha = planilha = PlanilhaInstavel([aba])
+        config = [{'coluna': 'P', 'formula': '=TEXT(B{row};"DD/M")'}]
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE', formulas_config=config)
+
+        assert resultado['sucesso'] is False
+        # Só a grade foi enviada: nada de cores nem fórmulas em linhas sem dados
+        assert planilha.lotes == [[{'appendDimension': {'sheetId': 7, 'dimension': 'ROWS', 'length': 2}}]]
+
+        planilha.falhar = False
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE', formulas_config=config)
+        assert resultado['linha_inicial'] == 2 and resultado['linha_final'] == 4
+        assert any('updateCells' in r for r in planilha.lotes[-1])
+
+
+def test_etapas_de_envio_sao_perfiladas():
+    """Cada etapa de ingestão aparece aninhada na etapa do arquivo"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = _criar_csv(pasta)
+        perfilador = ativar_perfilador('mem', pasta_base=pasta)
+        try:
+            with etapa('BASE_SALESFORCE_CRIADO.csv'):
+                _base_com_aba(AbaFalsa()).enviar_csv_para_planilha(caminho, 'BASE TESTE')
+        finally:
+            finalizar_perfilador()
+
+        caminhos = [e['caminho'] for e in perfilador.etapas]
+        for nome in ('ler_csv', 'localizar_fim', 'converter_lista', 'formatar', 'enviar', 'colorir'):
+            assert f'BASE_SALESFORCE_CRIADO.csv > {nome}' in caminhos, nome
+        assert all(e['pico_bytes'] is not None for e in perfilador.etapas)
+
+
+def test_duracao_percentual_e_moeda_gravados_como_numero():
+    """Com RAW, TMA/percentual/moeda vão como números + formato, como o USER_ENTERED fazia"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'BASE_TMA.csv')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write('Fila;TMA;Abandono;Custo\nVoz;00:05:32;12,5%;R$ 1.234,56\n')
+        aba = AbaFalsa(valores=[['Fila', 'TMA', 'Abandono', 'Custo']])
+        sheets = _base_com_aba(aba)
+        sheets.enviar_csv_para_planilha(caminho, 'BASE TESTE')
+
+        corpo = sheets._client.planilha.corpos_valores[0]
+        assert corpo['valueInputOption'] == 'RAW'
+        assert corpo['data'][0]['values'] == [['Voz', 332 / 86400, 0.125, 1234.56]]
+        formatos = {r['repeatCell']['range']['startColumnIndex']: r['repeatCell']['cell']['userEnteredFormat']['numberFormat']
+                    for lote in sheets._client.planilha.lotes for r in lote
+                    if 'numberFormat' in r.get('repeatCell', {}).get('cell', {}).get('userEnteredFormat', {})}
+        assert {i: f['type'] for i, f in formatos.items()} == {1: 'TIME', 2: 'PERCENT', 3: 'CURRENCY'}
+        assert formatos[1]['pattern'] == '[h]:mm:ss'
+
+
+def main():
+    test_envio_complementa_dados_existentes()
+    test_grade_antes_dos_valores_e_cores_depois()
+    test_falha_nos_valores_nao_deixa_linhas_formatadas()
+    test_etapas_de_envio_sao_perfiladas()
+    test_duracao_percentual_e_moeda_gravados_como_numero()
+    print("✅ Etapas de envio: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+📦 TESTE DA ESCRITA EM BLOCOS
+Verifica a divisão por tamanho estimado, os intervalos A1 disjuntos, a repetição
+de um bloco que falha, a confirmação do progresso na ordem dos blocos e que uma
+falha no meio não deixa buraco na aba
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.escrita_blocos import dividir_em_blocos, escrever_em_blocos, estimar_bytes, letra_coluna
+from src.core.google_sheets_base import GoogleSheetsBase
+
+
+class AbaFalsa:
+    def __init__(self, falhas=None, atraso=None):
+        self.gravados = {}
+        self.falhas = dict(falhas or {})
+        self.atraso = atraso or {}
+        self.simultaneos = 0
+        self.max_simultaneos = 0
+        self.limpos = []
+        self._trava = threading.Lock()
+
+    def batch_clear(self, intervalos):
+        with self._trava:
+            self.limpos.extend(intervalos)
+            for intervalo in intervalos:
+                self.gravados.pop(intervalo)
+
+    def update(self, intervalo, valores, value_input_option=None):
+        with self._trava:
+            self.simultaneos += 1
+            self.max_simultaneos = max(self.max_simultaneos, self.simultaneos)
+        try:
+            time.sleep(self.atraso.get(intervalo, 0.01))
+            with self._trava:
+                if self.falhas.get(intervalo, 0) > 0:
+                    self.falhas[intervalo] -= 1
+                    raise Exception("503 backend error")
+                self.gravados[intervalo] = valores
+        finally:
+            with self._trava:
+                self.simultaneos -= 1
+
+
+def test_divisao_por_bytes():
+    assert letra_coluna(1) == 'A' and letra_coluna(26) == 'Z' and letra_coluna(28) == 'AB'
+    linhas = [['x' * 100]] * 10 + [['y' * 1000]] + [['z']] * 5
+    limite = estimar_bytes(['x' * 100]) * 4
+    blocos = dividir_em_blocos(linhas, limite)
+    assert blocos[:3] == [(0, 4), (4, 8), (8, 10)]
+    # Linha maior que o limite vira um bloco sozinha
+    assert (10, 11) in blocos
+    assert blocos[-1][1] == len(linhas)
+    assert dividir_em_blocos([], limite) == []
+
+
+def test_blocos_paralelos_em_ordem():
+    linhas = [[f'{i:03d}', f'nome {i:03d}', 'ç' * 20] for i in range(100)]
+    limite = sum(estimar_bytes(l) for l in linhas[:10])
+    # O primeiro bloco demora mais: a confirmação ainda segue a ordem dos blocos
+    aba = AbaFalsa(atraso={'A5:C14': 0.2})
+    progresso = []
+    resultado = escrever_em_blocos(aba, 5, linhas, max_bytes=limite, max_paralelo=4, max_por_minuto=0,
+                                   ao_progresso=progresso.append)
+
+    assert resultado['sucesso'] and resultado['blocos'] == 10
+    assert resultado['linhas_confirmadas'] == 100
+    assert sorted(aba.gravados) == sorted(f"A{5 + i}:C{14 + i}" for i in range(0, 100, 10))
+    assert aba.gravados['A95:C104'] == [list(l) for l in linhas[90:]]
+    assert 1 < aba.max_simultaneos <= 4
+    assert [p['bloco'] for p in progresso] == list(range(1, 11))
+    assert [p['linhas_confirmadas'] for p in progresso] == list(range(10, 101, 10))
+
+
+def test_repeticao_e_falha_de_bloco():
+    linhas = [[f'{i:02d}'] for i in range(30)]
+    limite = sum(estimar_bytes(l) for l in linhas[:10])
+    # Falha transitória: só o bloco afetado é repetido
+    aba = AbaFalsa(falhas={'A11:A20': 1})
+    resultado = escrever_em_blocos(aba, 1, linhas, max_bytes=limite, max_por_minuto=0, espera_tentativa=0)
+    assert resultado['sucesso'] and len(aba.gravados) == 3
+
+    # Falha persistente: a confirmação para antes do bloco que falhou e o bloco seguinte,
+    # gravado em paralelo, é limpo - a aba termina contígua na última linha confirmada
+    aba = AbaFalsa(falhas={'A11:A20': 99})
+    resultado = escrever_em_blocos(aba, 1, linhas, max_bytes=limite, max_por_minuto=0, espera_tentativa=0)
+    assert not resultado['sucesso']
+    assert resultado['linhas_confirmadas'] == 10
+    assert resultado['falhas'][0]['intervalo'] == 'A11:A20'
+    assert sorted(aba.gravados) == ['A1:A10']
+    assert resultado['desfeitos'] == aba.limpos == ['A21:A30']
+
+    # GoogleSheetsBase.escrever_linhas transforma a falha em exceção (envio conta como falha)
+    try:
+        GoogleSheetsBase().escrever_linhas(AbaFalsa(falhas={'A1:A1': 99}), 1, [[1]],
+                                         max_por_minuto=0, espera_tentativa=0)
+    except Exception as e:
+        assert 'A1:A1' in str(e)
+    else:
+        assert False, "falha de bloco deveria lançar exceção"
+
+
+def test_falha_no_meio_mantem_a_aba_contigua():
+    linhas = [[f'{i:03d}'] for i in range(100)]
+    limite = sum(estimar_bytes(l) for l in linhas[:10])
+    # Bloco 2 falha de vez enquanto os seguintes estão em andamento ou na fila
+    atrasos = {f"A{i + 1}:A{i + 10}": 0.05 for i in range(0, 100, 10)}
+    aba = AbaFalsa(falhas={'A11:A20': 99}, atraso=dict(atrasos, **{'A11:A20': 0}))
+    progresso = []
+    resultado = escrever_em_blocos(aba, 1, linhas, max_bytes=limite, max_paralelo=3, max_por_minuto=0,
+                                   espera_tentativa=0, ao_progresso=progresso.append)
+    assert not resultado['sucesso'] and resultado['linhas_confirmadas'] == 10
+    # Nada depois da linha 10 fica na aba: o que foi gravado é limpo, o resto nem começa
+    assert sorted(aba.gravados) == ['A1:A10']
+    assert len(resultado['desfeitos']) + resultado['cancelados'] == 8 and resultado['cancelados'] > 0
+    assert [p['bloco'] for p in progresso] == [1]
+
+    # Limpeza também falhou: a exceção avisa que a aba pode ter ficado com buraco
+    class AbaSemLimpeza(AbaFalsa):
+        def batch_clear(self, intervalos):
+            raise Exception("429 quota")
+    try:
+        GoogleSheetsBase().escrever_linhas(AbaSemLimpeza(falhas={'A11:A20': 99}), 1, linhas[:30],
+                                         max_bytes=limite, max_por_minuto=0, espera_tentativa=0)
+    except Exception as e:
+        assert 'NÃO puderam ser limpos' in str(e)
+    else:
+        assert False, "falha de bloco deveria lançar exceção"
+
+
+def test_grade_cresce_antes_dos_blocos():
+    # values.update não cresce a grade: as abas de semestre pedem as linhas que faltam antes de escrever
+    class PlanilhaFalsa:
+        def __init__(self):
+            self.lotes = []
+
+        def batch_update(self, corpo):
+            self.lotes.append(corpo['requests'])
+
+    aba = AbaFalsa()
+    aba.id, aba.title, aba.row_count, aba.col_count = 7, 'BASE FILAS', 1000, 12
+    planilha = PlanilhaFalsa()
+    sheets = GoogleSheetsBase()
+    assert sheets.garantir_grade(planilha, aba, 1000, 12) is False and planilha.lotes == []
+    assert sheets.garantir_grade(planilha, aba, 1250, 12) is True
+    assert planilha.lotes == [[{'appendDimension': {'sheetId': 7, 'dimension': 'ROWS', 'length': 250}}]]
+
+
+def main():
+    test_divisao_por_bytes()
+    test_blocos_paralelos_em_ordem()
+    test_repeticao_e_falha_de_bloco()
+    test_falha_no_meio_mantem_a_aba_contigua()
+    test_grade_cresce_antes_dos_blocos()
+    print("✅ Escrita em blocos: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+📡 TESTE DO CANAL DE EVENTOS
+Verifica a escrita e a leitura incremental dos eventos JSON lines
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.eventos import CanalEventos, LeitorEventos, ler_eventos
+
+
+def test_leitura_incremental():
+    """O leitor só devolve eventos novos e ignora linha incompleta"""
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'eventos.jsonl')
+        canal = CanalEventos(caminho)
+        leitor = LeitorEventos(caminho)
+
+        canal.emitir('arquivo_inicio', arquivo='BASE_SALESFORCE_CRIADO.csv', indice=1, total=2)
+        assert [e['tipo'] for e in leitor.novos()] == ['arquivo_inicio']
+        assert leitor.novos() == []
+
+        # Linha parcial (escrita ainda em andamento) não é devolvida
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write('{"tipo": "arquivo_fim", "linhas": 12')
+        assert leitor.novos() == []
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write('}\n')
+        assert leitor.novos()[0]['linhas'] == 12
+
+        canal.emitir('fim', sucessos=1, falhas=0, linhas=12, duracao=1.5)
+        canal.fechar()
+
+        tipos = [e['tipo'] for e in ler_eventos(caminho)]
+        assert tipos == ['arquivo_inicio', 'arquivo_fim', 'fim']
+
+
+def main():
+    test_leitura_incremental()
+    print("✅ Canal de eventos: OK")
+
+
+if __name__ == "__main__":
+    main()
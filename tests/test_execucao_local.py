@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+⚡ TESTE DA EXECUÇÃO NO PROCESSO DA INTERFACE
+Verifica o canal de eventos em fila, o desvio da saída por execução (inclusive
+dos workers da escrita em blocos) e o
+reaproveitamento do cliente Google autorizado entre instâncias
+"""
+
+import sys
+import os
+import queue
+import tempfile
+import threading
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import eventos
+from src.core import google_sheets_base
+from src.core.escrita_blocos import escrever_em_blocos
+from interfaces.execucao_local import SaidaPorExecucao, iniciar_subprocesso
+
+
+def test_canal_fila_entrega_eventos():
+    fila = queue.Queue()
+    eventos.abrir_canal_fila(fila)
+    try:
+        eventos.emitir('inicio', sistemas=['genesys'])
+    finally:
+        eventos.fechar_canal()
+    eventos.emitir('ignorado')
+
+    evento = fila.get_nowait()
+    assert evento['tipo'] == 'inicio'
+    assert evento['sistemas'] == ['genesys']
+    assert 'ts' in evento
+    assert fila.empty()
+
+
+class Console:
+    def __init__(self):
+        self.texto = ''
+
+    def write(self, texto):
+        self.texto += texto
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def test_saida_desviada_so_da_execucao():
+    fila = queue.Queue()
+    console = Console()
+    saida = SaidaPorExecucao(console, fila, 'stdout')
+
+    def executar():
+        saida.ativar()
+        saida.write("✅ linha 1\nlinha ")
+        saida.write("2\nsem quebra")
+
+    thread = threading.Thread(target=executar)
+    thread.start()
+    thread.join()
+    saida.write("LOG: interface\n")
+    saida.descarregar()
+
+    linhas = [fila.get_nowait()['linha'] for _ in range(3)]
+    assert linhas == ["✅ linha 1", "linha 2", "sem quebra"]
+    assert console.texto == "LOG: interface\n"
+
+
+def test_saida_dos_workers_da_escrita_em_blocos():
+    class AbaInstavel:
+        def __init__(self):
+            self.falhas = set()
+
+        def update(self, intervalo, valores, value_input_option=None):
+            if intervalo not in self.falhas:
+                self.falhas.add(intervalo)
+                raise RuntimeError('timeout')
+
+    fila = queue.Queue()
+    console = Console()
+    saida = SaidaPorExecucao(console, fila, 'stdout')
+    original = sys.stdout
+
+    def executar():
+        saida.ativar()
+        escrever_em_blocos(AbaInstavel(), 2, [['a', 1]] * 4, max_bytes=20, max_por_minuto=0, espera_tentativa=0)
+
+    sys.stdout = saida
+    try:
+        thread = threading.Thread(target=executar)
+        thread.start()
+        thread.join()
+        print("LOG: interface")
+    finally:
+        sys.stdout = original
+    saida.descarregar()
+
+    linhas = []
+    while not fila.empty():
+        linhas.append(fila.get_nowait()['linha'])
+    # Avisos de nova tentativa saem dos workers do pool e vão inteiros para a fila
+    assert len(linhas) == 4 and all(linha.startswith('⚠️ Bloco ') for linha in linhas)
+    assert console.texto == "LOG: interface\n"
+
+
+def test_cliente_autorizado_reaproveitado():
+    cliente = object()
+    primeira = google_sheets_base.GoogleSheetsBase()
+    google_sheets_base._clientes_autorizados[primeira.CAMINHO_CREDENCIAIS] = cliente
+    try:
+        assert primeira.client is cliente
+        assert google_sheets_base.GoogleSheetsBase().client is cliente
+    finally:
+        google_sheets_base.limpar_clientes_autorizados()
+    assert google_sheets_base._clientes_autorizados == {}
+
+
+FILHO = """
+import json, sys
+with open(sys.argv[1], 'a', encoding='utf-8') as f:
+    f.write(json.dumps({'tipo': 'inicio'}) + '\\n')
+for i in range(5000):
+    print(f'erro {i} ' + 'x' * 40, file=sys.stderr)
+for i in range(3):
+    print(f'linha {i}')
+with open(sys.argv[1], 'a', encoding='utf-8') as f:
+    f.write(json.dumps({'tipo': 'fim', 'sucesso': 3}) + '\\n')
+sys.exit(2)
+"""
+
+
+def test_subprocesso_com_stderr_volumoso_nao_trava():
+    descritor, arquivo_eventos = tempfile.mkstemp(suffix='.jsonl')
+    os.close(descritor)
+    try:
+        # Fila pequena: as threads leitoras esperam o consumidor sem o filho travar
+        fila = iniciar_subprocesso(
+            [sys.executable, '-c', FILHO, arquivo_eventos], arquivo_eventos=arquivo_eventos, max_itens=10
+        )
+        itens = []
+        while True:
+            item = fila.get(timeout=30)
+            itens.append(item)
+            if item['tipo'] == 'execucao_encerrada':
+                break
+    finally:
+        os.remove(arquivo_eventos)
+
+    erros = [i['linha'] for i in itens if i['tipo'] == 'log' and i['fluxo'] == 'stderr']
+    saida = [i['linha'] for i in itens if i['tipo'] == 'log' and i['fluxo'] == 'stdout']
+    eventos = [i['tipo'] for i in itens if i['tipo'] not in ('log', 'execucao_encerrada')]
+    assert len(erros) == 5000 and erros[-1].startswith('erro 4999 ')
+    assert saida == ['linha 0', 'linha 1', 'linha 2']
+    assert eventos == ['inicio', 'fim']
+    assert itens[-1]['codigo'] == 2
+
+
+def main():
+    test_canal_fila_entrega_eventos()
+    test_saida_desviada_so_da_execucao()
+    test_saida_dos_workers_da_escrita_em_blocos()
+    test_cliente_autorizado_reaproveitado()
+    test_subprocesso_com_stderr_volumoso_nao_trava()
+    print("✅ Execução no processo da interface: OK")
+
+
+if __name__ == "__main__":
+    main()
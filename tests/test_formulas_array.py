@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+🧮 TESTE DO MODO ARRAYFORMULA
+Verifica a tradução do template {row} para ARRAYFORMULA, a instalação única no
+cabeçalho e que, instalada, nenhum envio volta a gravar fórmulas por linha
+"""
+
+import sys
+import os
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.plano_escrita import PlanoEscrita
+from src.core.formulas_array import corpo_arrayformula, eh_arrayformula, formula_cabecalho
+from conftest import AbaFalsa, PlanilhaFalsa
+
+CONFIG_P = {'coluna': 'P', 'formula': '=TEXT(C{row};"DD/M")', 'arrayformula': True}
+
+
+def test_traducao_do_template():
+    assert corpo_arrayformula(CONFIG_P) == 'IF(C2:C="";"";TEXT(C2:C;"DD/M"))'
+    assert formula_cabecalho(CONFIG_P, 'Data "curta"') == \
+        '={"Data ""curta""";ARRAYFORMULA(IF(C2:C="";"";TEXT(C2:C;"DD/M")))}'
+    # Referências absolutas ficam como estão; a guarda usa a primeira referência de linha
+    config = {'coluna': 'W', 'formula': '=SE(V{row}=""; ""; V{row}-U{row}*$Z$2)', 'arrayformula': True}
+    assert corpo_arrayformula(config) == 'IF(V2:V="";"";SE(V2:V=""; ""; V2:V-U2:U*$Z$2))'
+    # Corpo informado diretamente
+    assert corpo_arrayformula({'coluna': 'X', 'formula': '=A{row}', 'arrayformula': 'A2:A*2'}) == 'A2:A*2'
+    try:
+        corpo_arrayformula({'coluna': 'X', 'formula': '=$Z$2', 'arrayformula': True})
+    except ValueError:
+        pass
+    else:
+        assert False, "template sem {row} deveria exigir o corpo"
+    assert eh_arrayformula('={"Data";ARRAYFORMULA(C2:C)}') and not eh_arrayformula('Data')
+
+
+def _planilha(celulas):
+    return PlanilhaFalsa([AbaFalsa('BASE VOZ', 4, celulas=celulas)])
+
+
+def test_instalacao_unica_no_cabecalho():
+    sheets = GoogleSheetsBase(id_planilha='planilha-array')
+    config = [CONFIG_P, {'coluna': 'Q', 'formula': '=A{row}*2'}]
+
+    # Primeiro envio: cabeçalho ainda é texto -> limpa P2:P e instala a fórmula em P1
+    planilha = _planilha({'P1': 'Data', 'Q9': '=A9*2'})
+    plano = PlanoEscrita(planilha.aba)
+    sheets._planejar_formulas(plano, planilha, config, 10, 500)
+    assert planilha.leituras == [["'BASE VOZ'!P1", "'BASE VOZ'!Q9"]]
+    limpeza, cabecalho, copia = plano.formulas
+    assert limpeza['updateCells']['range'] == {'sheetId': 4, 'startRowIndex': 1, 'startColumnIndex': 15, 'endColumnIndex': 16}
+    assert cabecalho['updateCells']['start'] == {'sheetId': 4, 'rowIndex': 0, 'columnIndex': 15}
+    assert cabecalho['updateCells']['rows'][0]['values'][0]['userEnteredValue']['formulaValue'].startswith('={"Data";ARRAYFORMULA(')
+    assert 'copyPaste' in copia
+    assert 'Coluna P limpa' in plano.descrever()
+
+    # Envios seguintes: nada para P, qualquer que seja o número de linhas
+    planilha = _planilha({'P1': formula_cabecalho(CONFIG_P, 'Data'), 'Q9': '=A9*2'})
+    plano = PlanoEscrita(planilha.aba)
+    sheets._planejar_formulas(plano, planilha, config, 10, 50000)
+    assert [list(r) for r in plano.formulas] == [['copyPaste']]
+
+    # Leitura falhou: não instala (não sobrescreve o cabeçalho sem saber o rótulo)
+    class PlanilhaComErro:
+        def values_batch_get(self, intervalos, params=None):
+            raise Exception("503")
+    plano = PlanoEscrita(planilha.aba)
+    sheets._planejar_formulas(plano, PlanilhaComErro(), [CONFIG_P], 10, 20)
+    assert plano.formulas == []
+
+
+def main():
+    test_traducao_do_template()
+    test_instalacao_unica_no_cabecalho()
+    print("✅ Modo ARRAYFORMULA: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+🔧 TESTE DO GERENCIADOR DE PLANILHAS COMPARTILHADO
+Verifica a instância única por arquivo, o índice chave -> (id, abas) e a
+releitura do JSON só quando o mtime muda
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.gerenciador_planilhas import obter_gerenciador
+
+
+def _gravar_config(caminho, id_planilha, mtime_ns):
+    config = {
+        "planilhas": {
+            "genesys_boletim": {"id": id_planilha, "nome": "GENESYS", "abas": {"voz_hc": "BASE VOZ"}}
+        },
+        "historico_mudancas": []
+    }
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+
+def test_instancia_compartilhada_e_recarga_por_mtime():
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'planilhas_config.json')
+        _gravar_config(caminho, 'id-antigo', 1_700_000_000_000_000_000)
+
+        # Várias threads pedindo o gerenciador ao mesmo tempo recebem a mesma instância
+        instancias = []
+        threads = [threading.Thread(target=lambda: instancias.append(obter_gerenciador(caminho))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        gp = instancias[0]
+        assert all(instancia is gp for instancia in instancias)
+
+        assert gp.obter_id('genesys_boletim') == 'id-antigo'
+        assert gp.obter_abas('genesys_boletim') == {'voz_hc': 'BASE VOZ'}
+        assert gp.recarregar_se_alterado() is False
+
+        # Arquivo alterado por fora (outro processo/editor): relido no próximo obter_gerenciador()
+        _gravar_config(caminho, 'id-novo', 1_700_000_100_000_000_000)
+        assert gp.obter_id('genesys_boletim') == 'id-antigo'
+        assert obter_gerenciador(caminho) is gp
+        assert gp.obter_id('genesys_boletim') == 'id-novo'
+
+        # Salvar pelo próprio gerenciador atualiza o índice sem reler o arquivo
+        assert gp.atualizar_planilha('genesys_boletim', 'id-salvo')
+        assert gp.obter_id('genesys_boletim') == 'id-salvo'
+        assert gp.recarregar_se_alterado() is False
+
+        # Arquivo pela metade (GUI/editor gravando): a última configuração válida continua valendo
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write('{"planilhas": {"genesys_boletim": {"id": ')
+        os.utime(caminho, ns=(1_700_000_200_000_000_000, 1_700_000_200_000_000_000))
+        assert gp.recarregar_se_alterado() is False
+        assert gp.obter_id('genesys_boletim') == 'id-salvo'
+        assert gp.obter_abas('genesys_boletim') == {'voz_hc': 'BASE VOZ'}
+        # O mtime não avançou: a próxima consulta tenta de novo e pega o arquivo completo
+        _gravar_config(caminho, 'id-completo', 1_700_000_200_000_000_000)
+        assert gp.recarregar_se_alterado() is True
+        assert gp.obter_id('genesys_boletim') == 'id-completo'
+
+
+def main():
+    test_instancia_compartilhada_e_recarga_por_mtime()
+    print("✅ Gerenciador compartilhado: OK")
+
+
+if __name__ == "__main__":
+    main()
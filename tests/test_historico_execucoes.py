@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🗄️ TESTE DO HISTÓRICO DE EXECUÇÕES (SQLite)
+Verifica percentis, vazão, taxa de falha e compactação diária
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.historico_execucoes import HistoricoExecucoes, percentil
+
+
+def _registrar(historico, data, duracao, sucesso=True, linhas=100):
+    historico.registrar_execucao(
+        origem='pulso_boletim', sucesso=sucesso, linhas=linhas, duracao=duracao, data=data,
+        etapas=[{'base': 'BASE RESOLVIDO', 'sucesso': sucesso, 'linhas': linhas, 'duracao': duracao}]
+    )
+
+
+def test_percentil():
+    assert percentil([], 50) is None
+    assert percentil([10], 95) == 10
+    assert percentil([1, 2, 3, 4], 50) == 2.5
+    assert percentil(list(range(1, 101)), 95) == 95.05
+
+
+def test_estatisticas_e_compactacao():
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoExecucoes(os.path.join(pasta, 'historico.db'), dias_detalhe=30)
+        agora = datetime.now()
+
+        # 2 execuções antigas (viram resumo diário) e 4 recentes
+        _registrar(historico, agora - timedelta(days=35), 20.0, sucesso=False, linhas=0)
+        _registrar(historico, agora - timedelta(days=35), 30.0)
+        for duracao in (10.0, 10.0, 20.0, 40.0):
+            _registrar(historico, agora - timedelta(hours=1), duracao)
+
+        antes = historico.estatisticas(base='BASE RESOLVIDO')
+        assert antes['execucoes'] == 6
+        assert antes['falhas'] == 1
+
+        removidas = historico.compactar()
+        assert removidas == {'execucoes': 2, 'etapas': 2}
+
+        depois = historico.estatisticas(base='BASE RESOLVIDO')
+        # Contagens preservadas pelo resumo diário; percentis só com o detalhe recente
+        assert depois['execucoes'] == 6
+        assert depois['falhas'] == 1
+        assert depois['linhas'] == antes['linhas']
+        assert depois['duracao_p50'] == 15.0
+        assert round(depois['taxa_falha'], 1) == 16.7
+
+        geral = historico.estatisticas(dias=7)
+        assert geral['execucoes'] == 4
+        assert geral['linhas_por_segundo'] == 400 / 80.0
+
+
+def test_estatisticas_por_origem():
+    # Cada interface mostra só as próprias execuções (também nos dias já compactados)
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoExecucoes(os.path.join(pasta, 'historico.db'), dias_detalhe=30)
+        agora = datetime.now()
+        _registrar(historico, agora - timedelta(days=35), 30.0)
+        _registrar(historico, agora - timedelta(hours=1), 10.0)
+        for data in (agora - timedelta(days=35), agora - timedelta(hours=2)):
+            historico.registrar_execucao(origem='powerbi', sucesso=False, linhas=5000, duracao=300.0, data=data)
+        historico.compactar()
+
+        pulso = historico.estatisticas(origem='pulso_boletim')
+        assert pulso['execucoes'] == 2 and pulso['falhas'] == 0 and pulso['linhas'] == 200
+        assert pulso['duracao_p95'] == 10.0
+        powerbi = historico.estatisticas(origem='powerbi')
+        assert powerbi['execucoes'] == 2 and powerbi['falhas'] == 2 and powerbi['linhas'] == 10000
+        assert historico.estatisticas()['execucoes'] == 4
+
+
+def main():
+    test_percentil()
+    test_estatisticas_e_compactacao()
+    test_estatisticas_por_origem()
+    print("✅ Histórico de execuções: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+🗂️ TESTE DO ÍNDICE DA PASTA DE DADOS
+Verifica que as buscas usam uma única leitura da pasta, a escolha do CSV mais
+recente (inclusive duplicados 'arquivo (1).csv') e a atualização incremental
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import indice_dados
+from src.core.google_sheets_base import GoogleSheetsBase
+
+
+def _criar(pasta, nome, mtime):
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write('a;b\n')
+    os.utime(caminho, (mtime, mtime))
+    return caminho
+
+
+def test_buscas_respondidas_pelo_indice():
+    leituras = []
+    scandir_original = os.scandir
+
+    def scandir_contado(pasta):
+        leituras.append(pasta)
+        return scandir_original(pasta)
+
+    classificados = []
+
+    def classificar(nome):
+        classificados.append(nome)
+        return 'criado' if 'CRIADO' in nome else None
+
+    with tempfile.TemporaryDirectory() as pasta:
+        _criar(pasta, 'CASOS_CRIADO.csv', 1_700_000_000)
+        _criar(pasta, 'CASOS_CRIADO (1).csv', 1_700_000_500)
+        _criar(pasta, 'voz_hc.csv', 1_700_000_100)
+        _criar(pasta, 'notas.txt', 1_700_000_900)
+
+        os.scandir = scandir_contado
+        try:
+            indice = indice_dados.obter_indice(pasta, classificar=classificar)
+            sheets = GoogleSheetsBase()
+            assert os.path.basename(sheets.encontrar_arquivo_mais_recente('CASOS_CRIADO.csv', pasta)) == 'CASOS_CRIADO (1).csv'
+            assert os.path.basename(sheets.encontrar_arquivo_mais_recente('voz_hc', pasta)) == 'voz_hc.csv'
+            assert sheets.encontrar_arquivo_mais_recente('inexistente', pasta) is None
+            assert sorted(indice.nomes()) == ['CASOS_CRIADO (1).csv', 'CASOS_CRIADO.csv', 'voz_hc.csv']
+            assert indice.obter('voz_hc.csv')['tipo'] is None
+            assert indice.obter('CASOS_CRIADO.csv')['tipo'] == 'criado'
+            assert len(leituras) == 1
+
+            # Modo --observar: só a entrada do arquivo novo é lida e classificada
+            novo = _criar(pasta, 'NOVO_CRIADO.csv', 1_700_001_000)
+            classificados.clear()
+            assert indice.atualizar_arquivo(novo)['tipo'] == 'criado'
+            assert classificados == ['NOVO_CRIADO.csv']
+            assert indice.mais_recente()['nome'] == 'NOVO_CRIADO.csv'
+            os.remove(novo)
+            assert indice.atualizar_arquivo(novo) is None
+            assert len(leituras) == 1
+
+            # Releitura completa só reclassifica o que mudou
+            classificados.clear()
+            _criar(pasta, 'voz_hc.csv', 1_700_002_000)
+            assert indice.atualizar() == [os.path.join(indice.pasta, 'voz_hc.csv')]
+            assert classificados == ['voz_hc.csv']
+        finally:
+            os.scandir = scandir_original
+            indice_dados.descartar_indices()
+
+
+def main():
+    test_buscas_respondidas_pelo_indice()
+    print("✅ Índice da pasta de dados: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+⚡ TESTE DE INICIALIZAÇÃO RÁPIDA
+Garante que main.py não carrega pandas/gspread/google-auth nem lê a
+configuração das planilhas antes de um sistema realmente rodar
+"""
+
+import sys
+import os
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODIGO = """
+import sys
+sys.argv = ['main.py']
+import main
+pesados = [m for m in ('pandas', 'gspread', 'google.oauth2', 'scripts.gerenciador_planilhas') if m in sys.modules]
+print(','.join(pesados) or 'nenhum')
+print(main._planilhas_config is None)
+"""
+
+
+def test_importar_main_nao_carrega_dependencias_pesadas():
+    saida = subprocess.run(
+        [sys.executable, '-c', CODIGO], cwd=RAIZ, capture_output=True, text=True, encoding='utf-8', timeout=60
+    )
+    assert saida.returncode == 0, saida.stderr
+    linhas = saida.stdout.strip().splitlines()
+    assert linhas[-2] == 'nenhum', linhas[-2]
+    assert linhas[-1] == 'True'
+
+
+def test_help_nao_importa_pandas():
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'main.py', '--help'],
+        cwd=RAIZ, capture_output=True, text=True, encoding='utf-8', timeout=60
+    )
+    assert saida.returncode == 0
+    modulos = {linha.split('|')[-1].strip() for linha in saida.stderr.splitlines() if linha.startswith('import time:')}
+    assert 'pandas' not in modulos
+    assert 'gspread' not in modulos
+
+
+def main():
+    test_importar_main_nao_carrega_dependencias_pesadas()
+    test_help_nao_importa_pandas()
+    print("✅ Inicialização rápida: OK")
+
+
+if __name__ == "__main__":
+    main()
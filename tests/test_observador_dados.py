@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+👀 TESTE DO OBSERVADOR DA PASTA DE DADOS
+Verifica que só CSVs novos são entregues, e só depois que tamanho e mtime
+ficam estáveis (arquivo ainda sendo gravado não é enviado)
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.observador_dados import ObservadorDados
+
+
+def _gravar(caminho, texto, mtime_ns):
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(texto)
+    os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+
+def test_entrega_apenas_arquivos_novos_e_estaveis():
+    with tempfile.TemporaryDirectory() as pasta:
+        _gravar(os.path.join(pasta, 'antigo.csv'), 'a;b\n', 1_700_000_000_000_000_000)
+
+        entregues = []
+        observador = ObservadorDados(pasta, entregues.append, estabilidade=2.0, usar_watchdog=False)
+        observador.marcar_existentes()
+        assert observador.modo == 'varredura'
+
+        # Download em andamento: cresce entre as varreduras
+        novo = os.path.join(pasta, 'BASE_VOZ_HC.csv')
+        _gravar(novo, 'a;b\n', 1_700_000_100_000_000_000)
+        _gravar(os.path.join(pasta, 'ignorar.txt'), 'x', 1_700_000_100_000_000_000)
+        assert observador.ciclo(agora=0.0) == []
+        _gravar(novo, '1;2\n', 1_700_000_101_000_000_000)
+        assert observador.ciclo(agora=1.5) == []
+        assert observador.ciclo(agora=3.0) == []
+
+        # Parado há 2 s: entregue uma única vez
+        assert observador.ciclo(agora=3.6) == [novo]
+        assert observador.ciclo(agora=10.0) == []
+        assert entregues == [novo]
+
+        # Evento repetido (watchdog) para arquivo sem mudança não gera nova entrega
+        observador.notificar(novo, agora=11.0)
+        observador.notificar(os.path.join(pasta, 'antigo.csv'), agora=11.0)
+        assert observador.verificar_pendentes(agora=20.0) == []
+
+        # Arquivo sobrescrito com outro conteúdo volta a ser entregue
+        _gravar(novo, '3;4\n', 1_700_000_200_000_000_000)
+        observador.ciclo(agora=20.0)
+        assert observador.ciclo(agora=22.0) == [novo]
+
+
+def main():
+    test_entrega_apenas_arquivos_novos_e_estaveis()
+    print("✅ Observador de dados: OK")
+
+
+if __name__ == "__main__":
+    main()
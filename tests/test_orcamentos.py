@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+🐢 TESTE DOS ORÇAMENTOS DE LATÊNCIA
+Verifica a medição das etapas sem perfil, a avaliação dos orçamentos por base
+e o registro dos estouros no histórico
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.perfilador import etapa, medir_etapas, anotar_etapa, perfilador_ativo
+from src.core.orcamentos import avaliar_orcamentos, orcamentos_da_base
+from src.core.historico_execucoes import HistoricoExecucoes
+
+CONFIG = {
+    'padrao': {'arquivo': 180, 'localizar_fim': 30, 'enviar': 90},
+    'bases': {'BASE RESOLVIDO': {'arquivo': 60, 'localizar_fim': 10}},
+}
+
+
+def test_medicao_sem_perfilador():
+    """Etapas são cronometradas e anotadas mesmo sem perfil ativo"""
+    assert perfilador_ativo() is None
+    with medir_etapas() as medicoes:
+        with etapa('localizar_fim'):
+            anotar_etapa(linhas_aba=512000)
+        with etapa('colorir'):
+            pass
+        with etapa('colorir'):
+            pass
+
+    assert [m['nome'] for m in medicoes] == ['localizar_fim', 'colorir', 'colorir']
+    assert medicoes[0]['contexto'] == {'linhas_aba': 512000}
+    assert all(m['duracao'] is not None for m in medicoes)
+
+    # Fora de medir_etapas, etapa() não coleta nada
+    with etapa('enviar') as registro:
+        assert registro is None
+    assert len(medicoes) == 3
+
+
+def test_avaliacao_dos_orcamentos():
+    assert orcamentos_da_base(CONFIG, 'BASE RESOLVIDO') == {'arquivo': 60.0, 'localizar_fim': 10.0, 'enviar': 90.0}
+    assert orcamentos_da_base(None, 'BASE RESOLVIDO') == {}
+
+    medicoes = [
+        {'nome': 'localizar_fim', 'duracao': 48.2, 'contexto': {'linhas_aba': 512000}},
+        {'nome': 'enviar', 'duracao': 12.0, 'contexto': {'linhas_enviadas': 800}},
+    ]
+    estouros = avaliar_orcamentos('BASE RESOLVIDO', medicoes, 65.0, CONFIG)
+    por_etapa = {e['etapa']: e for e in estouros}
+
+    assert set(por_etapa) == {'arquivo', 'localizar_fim'}
+    assert por_etapa['localizar_fim']['mensagem'] == (
+        "BASE RESOLVIDO localizar_fim 48 s acima do orçamento de 10 s; aba tem 512.000 linhas"
+    )
+    assert por_etapa['arquivo']['detalhamento'] == {'localizar_fim': 48.2, 'enviar': 12.0}
+    assert por_etapa['arquivo']['mensagem'].endswith("localizar_fim 48 s · enviar 12 s")
+
+    # Outra base usa só o padrão
+    assert [e['etapa'] for e in avaliar_orcamentos('BASE CRIADO', medicoes, 65.0, CONFIG)] == ['localizar_fim']
+
+
+def test_estouros_no_historico():
+    with tempfile.TemporaryDirectory() as pasta:
+        historico = HistoricoExecucoes(os.path.join(pasta, 'historico.db'))
+        historico.registrar_execucao(
+            origem='pulso_boletim', sucesso=True, linhas=800, duracao=65.0,
+            etapas=[
+                {'base': 'BASE RESOLVIDO', 'linhas': 800, 'duracao': 65.0, 'orcamento': 60.0},
+                {'base': 'BASE RESOLVIDO', 'etapa': 'localizar_fim', 'linhas': 800, 'duracao': 48.2, 'orcamento': 10.0},
+                {'base': 'BASE RESOLVIDO', 'etapa': 'enviar', 'linhas': 800, 'duracao': 12.0, 'orcamento': 90.0},
+            ]
+        )
+
+        estouros = historico.estouros_orcamento()
+        assert sorted(e['etapa'] for e in estouros) == ['arquivo', 'localizar_fim']
+        # Linhas de etapa de ingestão não entram nas estatísticas do arquivo
+        assert historico.estatisticas(base='BASE RESOLVIDO')['execucoes'] == 1
+        assert historico.estatisticas(base='BASE RESOLVIDO', etapa='localizar_fim')['duracao_p50'] == 48.2
+
+
+def main():
+    test_medicao_sem_perfilador()
+    test_avaliacao_dos_orcamentos()
+    test_estouros_no_historico()
+    print("✅ Orçamentos de latência: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+📜 TESTE DO PAINEL DE LOG
+Verifica a gravação em lote (um insert por descarga), o limite de linhas do
+widget e o enfileiramento a partir de várias threads
+"""
+
+import sys
+import os
+import threading
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interfaces.painel_log import PainelLog
+
+
+class TextoFalso:
+    """Imita o necessário de tk.Text: insert com pares texto/tags, index, delete e see"""
+
+    def __init__(self):
+        self.linhas = ['']
+        self.inserts = 0
+        self.rolagens = 0
+
+    def configure(self, **opcoes):
+        pass
+
+    def insert(self, indice, *pares):
+        self.inserts += 1
+        texto = ''.join(pares[0::2])
+        partes = (self.linhas[-1] + texto).split('\n')
+        self.linhas[-1:] = partes
+
+    def index(self, indice):
+        return f"{len(self.linhas)}.{len(self.linhas[-1])}"
+
+    def delete(self, inicio, fim):
+        if fim == 'end':
+            self.linhas = ['']
+        else:
+            del self.linhas[:int(fim.split('.')[0]) - 1]
+
+    def see(self, indice):
+        self.rolagens += 1
+
+
+class JanelaFalsa:
+    def after(self, ms, funcao):
+        pass
+
+
+def test_descarga_em_lote_com_limite_de_linhas():
+    texto = TextoFalso()
+    painel = PainelLog(JanelaFalsa(), texto, max_linhas=100)
+
+    threads = [
+        threading.Thread(target=lambda n=n: [painel.adicionar(f"[{n}] linha {i}\n", 'info') for i in range(50)])
+        for n in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert painel.descarregar() == 300
+    assert texto.inserts == 1
+    assert texto.rolagens == 1
+    assert len(texto.linhas) == 100
+    assert texto.linhas[-1] == ''
+    assert painel.descarregar() == 0
+    assert texto.inserts == 1
+
+
+def test_limpar_descarta_pendentes():
+    texto = TextoFalso()
+    painel = PainelLog(JanelaFalsa(), texto)
+    painel.adicionar("antiga\n")
+    painel.limpar()
+    painel.adicionar("nova\n", 'sucesso')
+    painel.descarregar()
+    assert texto.linhas == ['nova', '']
+
+
+def main():
+    test_descarga_em_lote_com_limite_de_linhas()
+    test_limpar_descarta_pendentes()
+    print("✅ Painel de log: OK")
+
+
+if __name__ == "__main__":
+    main()
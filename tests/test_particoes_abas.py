@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+🗂️ TESTE DAS ABAS PARTICIONADAS
+Verifica o nome das partições, o roteamento das linhas pela coluna de data, a criação
+das partições que faltam numa batchUpdate (com a visão) e que o envio só lê e grava
+as partições do arquivo
+"""
+
+import sys
+import os
+import tempfile
+from datetime import date
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.google_sheets_base import GoogleSheetsBase
+from src.core.particoes_abas import (descartar_abas_conhecidas, formula_visao, nome_particao, particoes_da_base,
+                                     requisicoes_criacao, rotear_linhas)
+from conftest import AbaFalsa, PlanilhaFalsa as PlanilhaBase, base_falsa, escrever_csv
+
+
+def test_nomes_e_roteamento():
+    assert nome_particao('BASE VOZ', date(2026, 10, 17)) == 'BASE VOZ 2026-10'
+    assert nome_particao('BASE VOZ', date(2026, 10, 17), 'semanal') == 'BASE VOZ 2026-S42'
+    # Semana ISO: 01/01/2027 ainda é a semana 53 de 2026
+    assert nome_particao('BASE', date(2027, 1, 1), 'semanal') == 'BASE 2026-S53'
+
+    dados = [['sem data', ''], ['a', 46296], ['b', '02/09/2026'], ['c', ''], ['d', '30/10/2026 08:00:00']]
+    grupos = rotear_linhas(dados, 1, 'BASE VOZ')
+    assert grupos == [('BASE VOZ 2026-09', [['b', '02/09/2026'], ['c', '']]),
+                      ('BASE VOZ 2026-10', [['sem data', ''], ['a', 46296], ['d', '30/10/2026 08:00:00']])]
+    assert rotear_linhas([['x', '']], 1, 'BASE', hoje=date(2026, 1, 5)) == [('BASE 2026-01', [['x', '']])]
+
+    abas = {'BASE VOZ': (1, 16), 'BASE VOZ 2026-10': (5, 16), 'BASE VOZ 2026-S42': (6, 16),
+            'BASE VOZ (TODAS)': (7, 16), 'BASE VOZ 2026-09': (4, 16), 'BASE TEXTO': (2, 10)}
+    assert particoes_da_base(abas, 'BASE VOZ') == ['BASE VOZ 2026-09', 'BASE VOZ 2026-10', 'BASE VOZ 2026-S42']
+    assert formula_visao(['BASE VOZ', 'BASE VOZ 2026-10'], 16) == (
+        "=FILTER({'BASE VOZ'!A1:P;'BASE VOZ 2026-10'!A2:P};{'BASE VOZ'!A1:A;'BASE VOZ 2026-10'!A2:A}<>\"\")")
+
+
+def test_requisicoes_de_criacao():
+    abas = {'BASE VOZ': (1, 16), 'MODELO': (9, 20), 'BASE VOZ 2026-09': (4, 16)}
+    # Sem modelo: addSheet + cabeçalho copiado da base; visão criada e reescrita
+    requisicoes = requisicoes_criacao(abas, 'BASE VOZ', {'visao': 'BASE VOZ (TODAS)'}, ['BASE VOZ 2026-10'])
+    assert [next(iter(r)) for r in requisicoes] == ['addSheet', 'copyPaste', 'addSheet', 'updateCells']
+    # Visão com grade mínima: a FILTER expande o que precisar
+    assert requisicoes[2]['addSheet']['properties']['gridProperties'] == {'rowCount': 1, 'columnCount': 16}
+    nova_id = requisicoes[0]['addSheet']['properties']['sheetId']
+    assert abas['BASE VOZ 2026-10'] == (nova_id, 16)
+    assert requisicoes[1]['copyPaste']['source']['sheetId'] == 1
+    assert requisicoes[1]['copyPaste']['destination']['sheetId'] == nova_id
+    formula = requisicoes[3]['updateCells']['rows'][0]['values'][0]['userEnteredValue']['formulaValue']
+    assert "'BASE VOZ 2026-09'!A2:P;'BASE VOZ 2026-10'!A2:P" in formula
+    # Com modelo: duplicateSheet; visão já existente só é reescrita
+    requisicoes = requisicoes_criacao(abas, 'BASE VOZ', {'modelo': 'MODELO', 'visao': 'BASE VOZ (TODAS)'},
+                                      ['BASE VOZ 2026-11'])
+    assert [next(iter(r)) for r in requisicoes] == ['duplicateSheet', 'updateCells']
+    assert requisicoes[0]['duplicateSheet']['sourceSheetId'] == 9
+    assert len({sheet_id for sheet_id, _ in abas.values()}) == len(abas)
+
+
+CABECALHO = ['Caso', 'Data', 'Status']
+
+
+class PlanilhaFalsa(PlanilhaBase):
+    """Base com o histórico inteiro e a partição de setembro; addSheet cria a aba com o cabeçalho"""
+    def __init__(self):
+        super().__init__([AbaFalsa('BASE VOZ', 1, [CABECALHO] + [['1', '01/01/2025', 'x']] * 500, colunas_grade=3),
+                          AbaFalsa('BASE VOZ 2026-09', 4, [CABECALHO, ['9', '01/09/2026', 'x']], colunas_grade=3)])
+
+    def batch_update(self, corpo):
+        super().batch_update(corpo)
+        for requisicao in corpo['requests']:
+            if 'addSheet' in requisicao:
+                propriedades = requisicao['addSheet']['properties']
+                self.adicionar_aba(AbaFalsa(propriedades['title'], propriedades['sheetId'], [CABECALHO],
+                                            colunas_grade=3))
+
+
+class SheetsParticionado(GoogleSheetsBase):
+    def regra_particao(self, nome_aba):
+        return {'periodo': 'mensal', 'coluna_data': 'B', 'visao': 'BASE VOZ (TODAS)'}
+
+    def modo_colunas_derivadas(self, nome_aba):
+        # Regra por base: só 'BASE VOZ' está configurada, as partições não têm entrada própria
+        return 'materializada' if nome_aba == 'BASE VOZ' else 'formula'
+
+
+def test_envio_particionado():
+    descartar_abas_conhecidas()
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = escrever_csv(pasta, 'BASE_VOZ.csv',
+                               'Caso;Data;Status\n1000;29/09/2026;Novo\n1001;01/10/2026;Novo\n1002;02/10/2026;Fechado\n')
+        planilha = PlanilhaFalsa()
+        sheets = base_falsa(planilha, 'planilha-particoes', SheetsParticionado)
+
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE VOZ')
+        assert resultado['sucesso'] and resultado['num_linhas'] == 3
+        assert [(p['aba'], p['linha_inicial'], p['linha_final']) for p in resultado['particoes']] == [
+            ('BASE VOZ 2026-09', 3, 3), ('BASE VOZ 2026-10', 2, 3)]
+        # A aba com o histórico inteiro não é lida nem escrita
+        assert planilha.abas['BASE VOZ'].leituras == 0
+        assert planilha.intervalos_gravados() == ["'BASE VOZ 2026-09'!A3:C3", "'BASE VOZ 2026-10'!A2:C3"]
+        # Criação: partição + visão num lote, antes dos lotes de escrita
+        criacao = planilha.lotes[0]
+        assert [next(iter(r)) for r in criacao] == ['addSheet', 'copyPaste', 'addSheet', 'updateCells']
+
+        # Próximo envio no mesmo período: nada a criar, sem nova listagem de abas
+        planilha.lotes.clear()
+        sheets.enviar_csv_para_planilha(caminho, 'BASE VOZ')
+        assert planilha.listagens == 1
+        assert all('addSheet' not in r for lote in planilha.lotes for r in lote)
+
+
+def test_particao_usa_regras_da_base():
+    descartar_abas_conhecidas()
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = escrever_csv(pasta, 'BASE_VOZ.csv', 'Caso;Data;Status\n1000;29/09/2026;Novo\n')
+        planilha = PlanilhaFalsa()
+        sheets = base_falsa(planilha, 'planilha-particoes-derivadas', SheetsParticionado)
+        formulas = [{'coluna': 'D', 'formula': '=A{row}'}]
+
+        resultado = sheets.enviar_csv_para_planilha(caminho, 'BASE VOZ', formulas_config=formulas)
+        assert resultado['sucesso']
+        # Base materializada: a coluna D vai como valor, nenhuma fórmula é gravada na partição
+        assert planilha.intervalos_gravados() == ["'BASE VOZ 2026-09'!A3:C3", "'BASE VOZ 2026-09'!D3:D3"]
+        assert not any('=A' in str(r) for lote in planilha.lotes for r in lote)
+
+
+def main():
+    test_nomes_e_roteamento()
+    test_requisicoes_de_criacao()
+    test_envio_particionado()
+    test_particao_usa_regras_da_base()
+    print("✅ Abas particionadas: OK")
+
+
+if __name__ == "__main__":
+    main()
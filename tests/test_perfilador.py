@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🔬 TESTE DO PERFILADOR POR ETAPA
+Verifica os artefatos gerados por --profile (sem acessar o Google Sheets)
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.perfilador import Perfilador
+
+
+def _trabalho():
+    return sum(i * i for i in range(20000))
+
+
+def test_etapas_aninhadas_geram_artefatos():
+    """Cada etapa gera .prof + resumo e o índice lista todas"""
+    with tempfile.TemporaryDirectory() as pasta:
+        perfilador = Perfilador('completo', pasta_base=pasta, top_n=5)
+        with perfilador.etapa("genesys"):
+            with perfilador.etapa("BASE_GENESYS_VOZ_HC.csv"):
+                _trabalho()
+            with perfilador.etapa("BASE_GENESYS_TEXTO_HC.csv"):
+                _trabalho()
+        pasta_execucao = perfilador.finalizar()
+
+        arquivos = sorted(os.listdir(pasta_execucao))
+        assert 'indice.txt' in arquivos
+        assert len([a for a in arquivos if a.endswith('.prof')]) == 3
+        assert len([a for a in arquivos if a.endswith('.txt')]) == 4
+
+        with open(os.path.join(pasta_execucao, 'indice.txt'), encoding='utf-8') as f:
+            indice = f.read()
+        assert "genesys > BASE_GENESYS_VOZ_HC.csv" in indice
+        assert "pico" in indice
+
+        # A etapa externa inclui as chamadas das internas
+        externa = [e for e in perfilador.etapas if e['caminho'] == 'genesys'][0]
+        with open(os.path.join(pasta_execucao, externa['arquivo'] + '.txt'), encoding='utf-8') as f:
+            assert "_trabalho" in f.read()
+
+
+def test_erro_na_etapa_e_registrado():
+    """Exceção propaga e fica registrada no resumo"""
+    with tempfile.TemporaryDirectory() as pasta:
+        perfilador = Perfilador('cpu', pasta_base=pasta)
+        try:
+            with perfilador.etapa("resolvido"):
+                raise ValueError("falha simulada")
+        except ValueError:
+            pass
+        perfilador.finalizar()
+        assert perfilador.etapas[0]['erro'] == "falha simulada"
+
+
+def test_processadores_usam_o_mesmo_modulo():
+    # Um caminho só ('src.core.*'): o perfilador ativado pelo main.py é o que os processadores veem
+    import src.core.perfilador as perfilador
+    from src.processadores.produtividade import produtividade
+    from src.processadores.genesys import processador_genesys
+    assert produtividade.etapa is perfilador.etapa and processador_genesys.etapa is perfilador.etapa
+    assert 'core.perfilador' not in sys.modules and 'core.google_sheets_base' not in sys.modules
+
+
+def main():
+    test_etapas_aninhadas_geram_artefatos()
+    test_erro_na_etapa_e_registrado()
+    test_processadores_usam_o_mesmo_modulo()
+    print("✅ Perfilador: OK")
+
+
+if __name__ == "__main__":
+    main()
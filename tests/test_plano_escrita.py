@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+🗺️ TESTE DO PLANO DE ESCRITA
+Verifica que cada arquivo é gravado com a grade (se faltar), uma values.batchUpdate e
+uma spreadsheets.batchUpdate (cores, fórmulas), qualquer que seja o número de colunas
+de fórmula, e que a simulação mostra o plano sem gravar nada
+"""
+
+import sys
+import os
+import tempfile
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.plano_escrita import PlanoEscrita, titulo_a1
+from conftest import AbaFalsa, PlanilhaFalsa, base_falsa, criar_csv
+
+
+def _aba(valores, celulas=None):
+    return AbaFalsa("BASE D'TESTE", 9, valores, celulas=celulas)
+
+
+def _base(aba):
+    return base_falsa(PlanilhaFalsa([aba]), 'planilha-plano', escrita_tipada=True)
+
+
+def _enviar(formulas_config, simular=False):
+    aba = _aba([['Número do caso', 'Data de abertura', 'Status'], ['1999', '30/09/2025', 'Resolvido']],
+               celulas={'P2': '=TEXT(B2;"DD/M")', 'Q2': '=A2*2'})
+    sheets = _base(aba)
+    with tempfile.TemporaryDirectory() as pasta:
+        csv = criar_csv(pasta, 4, 'BASE_SALESFORCE_RESOLVIDO.csv', primeiro=2000, status='Resolvido')
+        resultado = sheets.enviar_csv_para_planilha(csv, aba.title,
+                                                    formulas_config=formulas_config, simular=simular)
+    return resultado, aba, sheets._client.planilha
+
+
+def test_chamadas_constantes_por_arquivo():
+    """Uma ou três colunas de fórmula: as mesmas chamadas (2 leituras; grade, valores, fórmulas)"""
+    _, aba, _ = _enviar([{'coluna': 'P', 'formula': '=TEXT(B{row};"DD/M")'}])
+    uma_coluna = list(aba.chamadas)
+    resultado, aba, planilha = _enviar([
+        {'coluna': 'P', 'formula': '=TEXT(B{row};"DD/M")'},
+        {'coluna': 'Q', 'formula': '=A{row}*2'},
+        {'coluna': 'AB', 'formula': '=C{row}'},
+    ])
+    assert aba.chamadas[2:] == ['batch_update', 'values_batch_update', 'batch_update']
+    assert uma_coluna == ['get_all_values', 'values_batch_get', 'values_batch_update', 'batch_update']
+    assert resultado['linha_inicial'] == 3 and resultado['linha_final'] == 6
+    assert resultado['linhas_existentes'] == 2
+    assert set(map(str, planilha.opcoes_leitura)) == {str({'valueRenderOption': 'FORMULA'})}
+
+    grade, lote = planilha.lotes
+    # P e Q têm fórmula na linha anterior: copyPaste; AB não tem: template linha a linha
+    copias = [r['copyPaste'] for r in lote if 'copyPaste' in r]
+    assert [(c['source']['startColumnIndex'], c['source']['startRowIndex'], c['destination']['endRowIndex'],
+             c['pasteType']) for c in copias] == [(15, 1, 6, 'PASTE_FORMULA'), (16, 1, 6, 'PASTE_FORMULA')]
+    celulas = [r['updateCells'] for r in lote if 'updateCells' in r][0]
+    assert celulas['start'] == {'sheetId': 9, 'rowIndex': 2, 'columnIndex': 27}
+    assert [linha['values'][0]['userEnteredValue']['formulaValue'] for linha in celulas['rows']] == [
+        '=C3', '=C4', '=C5', '=C6']
+    # Coluna AB além das 26 da grade: a grade cresce antes dos valores, num lote só dela
+    assert grade == [{'appendDimension': {'sheetId': 9, 'dimension': 'COLUMNS', 'length': 2}}]
+
+    corpo = planilha.corpos_valores[0]
+    assert corpo['valueInputOption'] == 'RAW'
+    assert [d['range'] for d in corpo['data']] == ["'BASE D''TESTE'!A3:C6"]
+    assert corpo['data'][0]['values'][0] == [2000, 45931, 'Resolvido']
+
+
+def test_simulacao_mostra_plano_sem_gravar():
+    resultado, aba, planilha = _enviar([{'coluna': 'P', 'formula': '=TEXT(B{row};"DD/M")'}], simular=True)
+    assert resultado['simulado'] and resultado['sucesso']
+    assert 'batch_update' not in aba.chamadas and 'values_batch_update' not in aba.chamadas
+    assert resultado['plano']['chamadas'] == 2
+    assert resultado['plano']['formulas'] == 1 and resultado['plano']['linhas'] == 4
+    assert not resultado['plano']['valores_em_blocos']
+
+    plano = PlanoEscrita(_aba([]), 'USER_ENTERED')
+    plano.garantir_grade(1200, 3)
+    plano.formatar(3, 6, {'numberFormat': {'type': 'DATE'}}, 1, 2)
+    plano.adicionar_valores(3, [[1, 2, 3]])
+    texto = plano.descrever()
+    assert '+200 linhas' in texto and 'B3:B6' in texto and "'BASE D''TESTE'!A3:C3" in texto
+    assert titulo_a1('BASE VOZ') == "'BASE VOZ'"
+
+
+def test_formulas_linhas_novas_em_um_lote():
+    """aplicar_formulas_linhas_novas: uma leitura e uma batchUpdate para todas as colunas"""
+    aba = _aba([['x']] * 9, celulas={'P9': '=B9'})
+    sheets = _base(aba)
+    assert sheets.aplicar_formulas_linhas_novas(aba.title, [
+        {'coluna': 'P', 'formula': '=B{row}'},
+        {'coluna': 'R', 'formula': '=C{row}'},
+    ], 10, 12)
+    assert aba.chamadas == ['values_batch_get', 'batch_update']
+    assert [list(r) for r in sheets._client.planilha.lotes[0]] == [['copyPaste'], ['updateCells']]
+
+
+def main():
+    test_chamadas_constantes_por_arquivo()
+    test_simulacao_mostra_plano_sem_gravar()
+    test_formulas_linhas_novas_em_um_lote()
+    print("✅ Plano de escrita: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+🛰️ TESTE DO SERVIÇO DE AUTOMAÇÃO
+Sobe o serviço num socket local com um executor falso e verifica fila,
+deduplicação, execução serial e o cache de planilhas/abas abertas
+"""
+
+import sys
+import os
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import servico_automacao
+from scripts.servico_automacao import ServicoAutomacao, chave_servico, enviar_pedido
+from src.core import google_sheets_base
+
+CHAVE = b'chave-teste'
+
+
+def test_jobs_enfileirados_deduplicados_e_seriais():
+    liberar = threading.Event()
+    executados = []
+
+    def executor(job):
+        executados.append(job)
+        liberar.wait(10)
+        return {'sucesso': True, 'resumo': {'sucessos': 1}}
+
+    servico = ServicoAutomacao(executor=executor)
+    thread = threading.Thread(target=servico.servir, args=(('127.0.0.1', 0), CHAVE), daemon=True)
+    thread.start()
+    while servico._listener is None:
+        time.sleep(0.01)
+    endereco = servico._listener.address
+
+    def pedir(pedido):
+        return enviar_pedido(pedido, endereco, CHAVE)
+
+    inicio = time.perf_counter()
+    primeiro = pedir({'acao': 'enviar', 'job': {'tipo': 'sistema', 'sistemas': ['genesys']}, 'usuario': 'ana'})
+    assert time.perf_counter() - inicio < 1
+    while servico.status(primeiro['job']['id'])['estado'] != 'executando':
+        time.sleep(0.01)
+
+    # Mesmo job com o primeiro já executando: entra na fila; repetido enquanto na fila: deduplicado
+    segundo = pedir({'acao': 'enviar', 'job': {'tipo': 'sistema', 'sistemas': ['genesys']}, 'usuario': 'bruno'})
+    repetido = pedir({'acao': 'enviar', 'job': {'tipo': 'sistema', 'sistemas': ['genesys']}, 'usuario': 'carla'})
+    assert not segundo['duplicado'] and repetido['duplicado']
+    assert repetido['job']['id'] == segundo['job']['id']
+
+    invalido = pedir({'acao': 'enviar', 'job': {'tipo': 'sistema', 'sistemas': ['sap']}})
+    assert not invalido['ok'] and 'sap' in invalido['erro']
+
+    liberar.set()
+    final = pedir({'acao': 'aguardar', 'id': segundo['job']['id'], 'timeout': 10})['status']
+    assert final['estado'] == 'concluido'
+    assert final['resultado']['resumo'] == {'sucessos': 1}
+    assert len(executados) == 2
+
+    # Pickle autenticado não é desserializado: a conexão é descartada sem executar nada
+    with Client(endereco, authkey=CHAVE) as conexao:
+        conexao.send(Explosivo())
+        try:
+            conexao.recv_bytes()
+        except (EOFError, OSError):
+            pass
+    assert not EXPLODIU
+    assert pedir({'acao': 'status'})['ok']
+
+    assert pedir({'acao': 'encerrar'})['ok']
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+EXPLODIU = []
+
+
+class Explosivo:
+    def __reduce__(self):
+        return (EXPLODIU.append, (True,))
+
+
+def test_chave_aleatoria_so_do_dono():
+    chave_ambiente = os.environ.pop('AUTOMACAO_SERVICO_CHAVE', None)
+    caminho_original = servico_automacao.caminho_chave
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'servico', 'chave')
+        servico_automacao.caminho_chave = lambda: caminho
+        try:
+            # Cliente sem chave configurada e sem serviço iniciado: recusa em vez de usar chave fixa
+            try:
+                chave_servico()
+            except PermissionError:
+                pass
+            else:
+                assert False, "sem chave o cliente não deveria conectar"
+            chave = chave_servico(criar=True)
+            assert len(chave) == 64 and chave_servico() == chave and chave_servico(criar=True) == chave
+            if os.name == 'posix':
+                assert stat.S_IMODE(os.stat(caminho).st_mode) == 0o600
+                os.chmod(caminho, 0o644)
+                try:
+                    chave_servico()
+                except PermissionError:
+                    pass
+                else:
+                    assert False, "chave legível por outros usuários deveria ser recusada"
+            os.environ['AUTOMACAO_SERVICO_CHAVE'] = 'da-variavel'
+            assert chave_servico() == b'da-variavel'
+        finally:
+            servico_automacao.caminho_chave = caminho_original
+            os.environ.pop('AUTOMACAO_SERVICO_CHAVE', None)
+            if chave_ambiente is not None:
+                os.environ['AUTOMACAO_SERVICO_CHAVE'] = chave_ambiente
+
+
+class ClienteContador:
+    def __init__(self):
+        self.aberturas = 0
+        self.abas_abertas = 0
+
+    def open_by_key(self, chave):
+        self.aberturas += 1
+        cliente = self
+
+        class Planilha:
+            title = 'Planilha'
+
+            def worksheet(self, nome):
+                cliente.abas_abertas += 1
+                return object()
+
+        return Planilha()
+
+
+def test_planilha_e_aba_abertas_uma_vez_por_cliente():
+    cliente = ClienteContador()
+    try:
+        for _ in range(3):
+            sheets = google_sheets_base.GoogleSheetsBase(id_planilha='planilha-cache')
+            sheets._client = cliente
+            assert sheets.abrir_aba('BASE VOZ') is sheets.abrir_aba('BASE VOZ')
+        assert (cliente.aberturas, cliente.abas_abertas) == (1, 1)
+
+        sheets.descartar_aba('BASE VOZ')
+        sheets.abrir_aba('BASE VOZ')
+        assert (cliente.aberturas, cliente.abas_abertas) == (1, 2)
+
+        # Outro cliente (credencial diferente) não reaproveita os handles
+        outro = ClienteContador()
+        sheets._client = outro
+        sheets.abrir_aba('BASE VOZ')
+        assert (outro.aberturas, outro.abas_abertas) == (1, 1)
+    finally:
+        google_sheets_base.limpar_clientes_autorizados()
+
+
+def main():
+    test_jobs_enfileirados_deduplicados_e_seriais()
+    test_chave_aleatoria_so_do_dono()
+    test_planilha_e_aba_abertas_uma_vez_por_cliente()
+    print("✅ Serviço de automação: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+📅 TESTE DA ESCRITA TIPADA
+Verifica a conversão de datas/horas em número de série da planilha, o formato por
+coluna e o envio com RAW + formato de data na batchUpdate das linhas novas
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.valores_tipados import (FORMATOS_NUMERO, converter_data, converter_numero_formatado, serial_planilha,
+                                      tipar_colunas_data, tipar_colunas_numericas)
+from src.core.google_sheets_base import GoogleSheetsBase
+from conftest import AbaFalsa, PlanilhaFalsa
+
+
+def test_conversao_de_datas():
+    assert serial_planilha(datetime(1899, 12, 31)) == 1
+    assert converter_data('31/01/2025') == (45688, 'DATE')
+    assert converter_data('2025-01-31') == (45688, 'DATE')
+    serial, tipo = converter_data('31/01/2025 12:00:00')
+    assert (serial, tipo) == (45688.5, 'DATE_TIME')
+    assert converter_data('06:00') == (0.25, 'TIME')
+    # Texto que não é data continua texto
+    assert converter_data('Loja 31/01') is None
+    assert converter_data('31/13/2025') is None
+    assert converter_data('') is None
+
+
+def test_tipar_colunas():
+    dados = [
+        ['01/02/2025', 'abc', 10, '08:00'],
+        ['02/02/2025 10:30', '01/02/2025', 11, ''],
+        ['', 'x', 12, 'sem hora'],
+    ]
+    tipos = tipar_colunas_data(dados, [0, 3])
+    # Coluna com datas e datas/horas fica com o formato mais completo
+    assert tipos == {0: 'DATE_TIME', 3: 'TIME'}
+    assert dados[0][0] == 45689 and isinstance(dados[1][0], float)
+    # Colunas fora da lista não são tocadas
+    assert dados[1][1] == '01/02/2025'
+    assert dados[2] == ['', 'x', 12, 'sem hora']
+
+
+def test_duracao_percentual_e_moeda():
+    # Com USER_ENTERED o Sheets convertia estes textos; com RAW a conversão é local
+    assert converter_numero_formatado('00:05:32') == (332 / 86400, 'DURATION')
+    assert converter_numero_formatado('36:00:00') == (1.5, 'DURATION')
+    assert converter_numero_formatado('12,5%') == (0.125, 'PERCENT')
+    assert converter_numero_formatado('-3%') == (-0.03, 'PERCENT')
+    assert converter_numero_formatado('R$ 1.234,56') == (1234.56, 'CURRENCY')
+    assert converter_numero_formatado('-R$ 10,00') == (-10.0, 'CURRENCY')
+    for texto in ('Loja 5%', 'R$ abc', '5:75', 'abc', ''):
+        assert converter_numero_formatado(texto) is None
+
+    dados = [['01/02/2025', '00:05:32', '12,5%', 'R$ 1.234,56', 'texto'],
+             ['08:00', '01:00:00', '', 'R$ 2,00', '5%']]
+    tipos = tipar_colunas_numericas(dados, ignorar=[0])
+    assert tipos == {1: 'DURATION', 2: 'PERCENT', 3: 'CURRENCY', 4: 'PERCENT'}
+    assert dados[0][1:4] == [332 / 86400, 0.125, 1234.56] and dados[1][3] == 2.0
+    # Colunas de data ficam para tipar_colunas_data; texto comum continua texto
+    assert dados[1][0] == '08:00' and dados[0][4] == 'texto'
+    assert FORMATOS_NUMERO['DURATION']['pattern'] == '[h]:mm:ss'
+
+
+def test_envio_tipado():
+    aba = AbaFalsa(sheet_id=3)
+    planilha = PlanilhaFalsa([aba])
+    sheets = GoogleSheetsBase(escrita_tipada=True, destaque='celulas')
+    # Formatos de data vão na mesma batchUpdate das cores das linhas novas
+    plano = sheets.montar_plano_escrita(planilha, aba, 10, [[1, 2, 3, 4]] * 11, 4, {3: 'DATE', 0: 'DATE_TIME'})
+    assert plano.value_input_option == 'RAW'
+    assert plano.aplicar_lote(planilha)
+    formatos = [r['repeatCell'] for r in planilha.lotes[0] if 'numberFormat' in r['repeatCell']['cell']['userEnteredFormat']]
+    assert [(f['range']['startColumnIndex'], f['range']['startRowIndex'], f['range']['endRowIndex'],
+             f['cell']['userEnteredFormat']['numberFormat']['type'], f['fields']) for f in formatos] == [
+        (0, 9, 20, 'DATE_TIME', 'userEnteredFormat(numberFormat)'),
+        (3, 9, 20, 'DATE', 'userEnteredFormat(numberFormat)'),
+    ]
+
+    sheets.escrever_linhas(aba, 10, [[45688, 'x']], value_input_option='RAW')
+    assert aba.atualizacoes == [('A10:B10', [[45688, 'x']], 'RAW')]
+
+    # Modo antigo pela variável de ambiente
+    os.environ['AUTOMACAO_ESCRITA'] = 'user_entered'
+    try:
+        assert GoogleSheetsBase().escrita_tipada is False
+    finally:
+        del os.environ['AUTOMACAO_ESCRITA']
+    assert GoogleSheetsBase().escrita_tipada is True
+
+
+def main():
+    test_conversao_de_datas()
+    test_tipar_colunas()
+    test_duracao_percentual_e_moeda()
+    test_envio_tipado()
+    print("✅ Escrita tipada: OK")
+
+
+if __name__ == "__main__":
+    main()